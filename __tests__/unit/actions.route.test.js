@@ -184,6 +184,8 @@ describe('/api/actions POST', () => {
     expect(res.status).toBe(400);
     const data = await res.json();
     expect(data.details).toContain('agent_id is required');
+    expect(mockGetOrgPlan).not.toHaveBeenCalled();
+    expect(mockCheckQuotaFast).not.toHaveBeenCalled();
   });
 
   it('returns 402 when actions quota is exceeded', async () => {
@@ -324,6 +326,168 @@ describe('/api/actions POST', () => {
   });
 });
 
+describe('/api/actions POST batch', () => {
+  const record = (id) => ({ action_id: id, agent_id: 'agent_1', action_type: 'build', declared_goal: 'Span' });
+
+  beforeEach(() => {
+    mockValidateActionRecord.mockImplementation((body) => ({ valid: Boolean(body.agent_id), data: { ...body }, errors: body.agent_id ? [] : ['agent_id is required'] }));
+    mockCreateActionRecord.mockImplementation(async (_sql, { action_id, data }) => ({ ...data, action_id }));
+    mockScanSensitiveData.mockImplementation((val) => ({ clean: true, redacted: val, findings: [] }));
+  });
+
+  it('records every action and returns one result per record, in order', async () => {
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), record('act_2'), { action_id: 'act_bad' }] },
+    }));
+
+    expect(res.status).toBe(200);
+    const data = await res.json();
+    expect(data.created).toBe(2);
+    expect(data.results.map((r) => r.status)).toEqual([201, 201, 400]);
+    expect(data.results[1].action_id).toBe('act_2');
+    expect(mockCreateActionRecord).toHaveBeenCalledTimes(2);
+    expect(mockGetOrgPlan).toHaveBeenCalledTimes(1);
+    expect(mockCheckQuotaFast).toHaveBeenCalledTimes(1);
+    expect(mockPublishOrgEvent).toHaveBeenCalledTimes(2);
+  });
+
+  it('reports a duplicate action_id for that record only', async () => {
+    mockCreateActionRecord.mockImplementation(async (_sql, { action_id, data }) => {
+      if (action_id === 'act_dup') throw new Error('duplicate key value');
+      return { ...data, action_id };
+    });
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_dup'), record('act_ok')] },
+    }));
+
+    const data = await res.json();
+    expect(data.results[0]).toMatchObject({ status: 409, action_id: 'act_dup' });
+    expect(data.results[1]).toMatchObject({ status: 201, action_id: 'act_ok' });
+  });
+
+  it('guards each record', async () => {
+    mockEvaluateGuard.mockImplementation(async (_orgId, data) => (data.action_id === 'act_2'
+      ? { decision: 'block', reasons: ['nope'], warnings: [], matched_policies: [] }
+      : defaultGuardDecision));
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), record('act_2')] },
+    }));
+
+    const data = await res.json();
+    expect(data.results.map((r) => r.status)).toEqual([201, 403]);
+    expect(data.created).toBe(1);
+  });
+
+  it('returns 402 for the whole batch when the actions quota is exceeded', async () => {
+    mockCheckQuotaFast.mockResolvedValue({ allowed: false, usage: 1000, limit: 1000, percent: 100 });
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), record('act_2')] },
+    }));
+
+    expect(res.status).toBe(402);
+    const data = await res.json();
+    expect(data.code).toBe('QUOTA_EXCEEDED');
+    expect(mockCreateActionRecord).not.toHaveBeenCalled();
+  });
+
+  it('rejects a batch larger than the remaining monthly quota', async () => {
+    mockCheckQuotaFast.mockResolvedValue({ allowed: true, usage: 998, limit: 1000, percent: 99 });
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), record('act_2'), record('act_3'), { action_id: 'act_bad' }] },
+    }));
+
+    expect(res.status).toBe(402);
+    const data = await res.json();
+    expect(data).toMatchObject({ code: 'QUOTA_EXCEEDED', requested: 3, remaining: 2 });
+    expect(mockCreateActionRecord).not.toHaveBeenCalled();
+  });
+
+  it('accepts a batch that exactly fills the remaining quota, not counting invalid records', async () => {
+    mockCheckQuotaFast.mockResolvedValue({ allowed: true, usage: 998, limit: 1000, percent: 99 });
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), { action_id: 'act_bad' }, record('act_2')] },
+    }));
+
+    expect(res.status).toBe(200);
+    const data = await res.json();
+    expect(data.results.map((r) => r.status)).toEqual([201, 400, 201]);
+  });
+
+  it('stores records concurrently with a bounded number in flight', async () => {
+    let inFlight = 0;
+    let peak = 0;
+    mockCreateActionRecord.mockImplementation(async (_sql, { action_id, data }) => {
+      inFlight += 1;
+      peak = Math.max(peak, inFlight);
+      await new Promise((resolve) => setTimeout(resolve, 1));
+      inFlight -= 1;
+      return { ...data, action_id };
+    });
+    const actions = Array.from({ length: 40 }, (_, i) => record(`act_${i}`));
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions },
+    }));
+
+    const data = await res.json();
+    expect(data.created).toBe(40);
+    expect(data.results.map((r) => r.action_id)).toEqual(actions.map((a) => a.action_id));
+    expect(peak).toBeGreaterThan(1);
+    expect(peak).toBeLessThanOrEqual(8);
+  });
+
+  it('looks up and meters a new agent once per batch', async () => {
+    mockHasAgentAction.mockResolvedValue(false);
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), record('act_2'), record('act_3')] },
+    }));
+
+    expect((await res.json()).created).toBe(3);
+    expect(mockHasAgentAction).toHaveBeenCalledTimes(1);
+    const agentMeters = mockIncrementMeter.mock.calls.filter(([, resource]) => resource === 'agents');
+    expect(agentMeters).toHaveLength(1);
+  });
+
+  it('rejects every record of an unknown agent under closed enrollment', async () => {
+    process.env.DASHCLAW_CLOSED_ENROLLMENT = 'true';
+    mockHasAgentAction.mockResolvedValue(false);
+
+    const res = await POST(makeRequest('http://localhost/api/actions', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { actions: [record('act_1'), record('act_2')] },
+    }));
+
+    const data = await res.json();
+    expect(data.results.map((r) => r.code)).toEqual(['AGENT_NOT_REGISTERED', 'AGENT_NOT_REGISTERED']);
+    expect(mockCreateActionRecord).not.toHaveBeenCalled();
+  });
+
+  it('rejects empty and oversized batches', async () => {
+    for (const actions of [[], Array.from({ length: 101 }, (_, i) => record(`act_${i}`))]) {
+      const res = await POST(makeRequest('http://localhost/api/actions', {
+        headers: { 'x-org-id': 'org_1' },
+        body: { actions },
+      }));
+      expect(res.status).toBe(400);
+    }
+    expect(mockCreateActionRecord).not.toHaveBeenCalled();
+  });
+});
+
 describe('/api/actions DELETE', () => {
   it('returns 403 for non-admins', async () => {
     const res = await DELETE(makeRequest('http://localhost/api/actions?action_id=act_1', {
@@ -4,11 +4,13 @@ import { makeRequest } from '../../helpers.js';
 const {
   mockSql,
   mockUpsertAgentPresence,
+  mockUpsertAgentPresenceBatch,
   mockEnsureAgentPresenceTable,
   mockPublishOrgEvent,
 } = vi.hoisted(() => ({
   mockSql: Object.assign(vi.fn(async () => []), { query: vi.fn(async () => []) }),
   mockUpsertAgentPresence: vi.fn(),
+  mockUpsertAgentPresenceBatch: vi.fn(),
   mockEnsureAgentPresenceTable: vi.fn(),
   mockPublishOrgEvent: vi.fn(),
 }));
@@ -16,6 +18,7 @@ const {
 vi.mock('@/lib/db.js', () => ({ getSql: () => mockSql }));
 vi.mock('@/lib/repositories/agents.repository.js', () => ({
   upsertAgentPresence: mockUpsertAgentPresence,
+  upsertAgentPresenceBatch: mockUpsertAgentPresenceBatch,
   ensureAgentPresenceTable: mockEnsureAgentPresenceTable,
   listAgentsForOrg: vi.fn(async () => []),
   attachAgentConnections: vi.fn(async () => undefined),
@@ -31,6 +34,7 @@ beforeEach(() => {
   vi.clearAllMocks();
   process.env.DATABASE_URL = 'postgres://unit-test';
   mockUpsertAgentPresence.mockResolvedValue(undefined);
+  mockUpsertAgentPresenceBatch.mockResolvedValue([]);
   mockPublishOrgEvent.mockResolvedValue(undefined);
 });
 
@@ -134,3 +138,73 @@ describe('/api/agents/heartbeat POST', () => {
     );
   });
 });
+
+describe('/api/agents/heartbeat POST (batch)', () => {
+  it('upserts every heartbeat in one statement and emits an event per agent', async () => {
+    const res = await POST(makeRequest('http://localhost/api/agents/heartbeat', {
+      headers: { 'x-org-id': 'org_1' },
+      body: {
+        heartbeats: [
+          { agent_id: 'worker_1' },
+          { agent_id: 'worker_2', status: 'busy', current_task_id: 'task_7', metadata: { shard: 2 } },
+        ],
+      },
+    }));
+
+    expect(res.status).toBe(200);
+    const data = await res.json();
+    expect(data.count).toBe(2);
+    expect(mockUpsertAgentPresence).not.toHaveBeenCalled();
+    expect(mockUpsertAgentPresenceBatch).toHaveBeenCalledTimes(1);
+    expect(mockUpsertAgentPresenceBatch).toHaveBeenCalledWith(
+      mockSql,
+      'org_1',
+      [
+        expect.objectContaining({ agent_id: 'worker_1', status: 'online' }),
+        expect.objectContaining({ agent_id: 'worker_2', status: 'busy', current_task_id: 'task_7', metadata: { shard: 2 } }),
+      ],
+      data.timestamp
+    );
+    expect(mockPublishOrgEvent).toHaveBeenCalledTimes(2);
+    expect(mockPublishOrgEvent).toHaveBeenCalledWith(
+      'agent.heartbeat',
+      expect.objectContaining({ orgId: 'org_1', agent_id: 'worker_2', status: 'busy' })
+    );
+  });
+
+  it('rejects a batch with a heartbeat missing agent_id', async () => {
+    const res = await POST(makeRequest('http://localhost/api/agents/heartbeat', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { heartbeats: [{ agent_id: 'worker_1' }, { status: 'online' }] },
+    }));
+
+    expect(res.status).toBe(400);
+    expect(mockUpsertAgentPresenceBatch).not.toHaveBeenCalled();
+  });
+
+  it('rejects batches over the size limit', async () => {
+    const heartbeats = Array.from({ length: 1001 }, (_, i) => ({ agent_id: `worker_${i}` }));
+    const res = await POST(makeRequest('http://localhost/api/agents/heartbeat', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { heartbeats },
+    }));
+
+    expect(res.status).toBe(400);
+    const data = await res.json();
+    expect(data.error).toContain('1000');
+    expect(mockUpsertAgentPresenceBatch).not.toHaveBeenCalled();
+  });
+
+  it('returns 503 and initializes the table when it is missing', async () => {
+    mockUpsertAgentPresenceBatch.mockRejectedValue(new Error('relation agent_presence does not exist'));
+    mockEnsureAgentPresenceTable.mockResolvedValue(undefined);
+
+    const res = await POST(makeRequest('http://localhost/api/agents/heartbeat', {
+      headers: { 'x-org-id': 'org_1' },
+      body: { heartbeats: [{ agent_id: 'worker_1' }] },
+    }));
+
+    expect(res.status).toBe(503);
+    expect(mockEnsureAgentPresenceTable).toHaveBeenCalled();
+  });
+});
@@ -1,5 +1,5 @@
 import { describe, expect, it, vi, beforeEach } from 'vitest';
-import { listAgentsForOrg } from '../../app/lib/repositories/agents.repository.js';
+import { listAgentsForOrg, upsertAgentPresenceBatch } from '../../app/lib/repositories/agents.repository.js';
 
 // Mock the SQL client
 const mockSql = {
@@ -108,4 +108,31 @@ describe('agents.repository.js', () => {
       expect(agent.presence_state).toBe('online');
     });
   });
+
+  describe('upsertAgentPresenceBatch', () => {
+    it('upserts all agents in one statement, keeping the last beat per agent', async () => {
+      mockSql.query.mockResolvedValueOnce([]);
+
+      await upsertAgentPresenceBatch(mockSql, 'org_1', [
+        { agent_id: 'a', status: 'online' },
+        { agent_id: 'b', status: 'busy', current_task_id: 'task_1', metadata: { x: 1 } },
+        { agent_id: 'a', status: 'offline' },
+      ], '2026-01-01T00:00:00.000Z');
+
+      expect(mockSql.query).toHaveBeenCalledTimes(1);
+      const [text, params] = mockSql.query.mock.calls[0];
+      expect(text).toContain('ON CONFLICT (org_id, agent_id) DO UPDATE');
+      expect(text.match(/\(\$1, /g)).toHaveLength(2);
+      expect(params).toEqual([
+        'org_1', '2026-01-01T00:00:00.000Z',
+        'a', null, 'offline', null, '{}',
+        'b', null, 'busy', 'task_1', '{"x":1}',
+      ]);
+    });
+
+    it('does nothing for an empty batch', async () => {
+      await upsertAgentPresenceBatch(mockSql, 'org_1', [], '2026-01-01T00:00:00.000Z');
+      expect(mockSql.query).not.toHaveBeenCalled();
+    });
+  });
 });
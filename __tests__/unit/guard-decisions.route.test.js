@@ -0,0 +1,91 @@
+import { beforeEach, describe, expect, it, vi } from 'vitest';
+import { makeRequest } from '../helpers.js';
+
+const { mockSql, mockRecordGuardDecision } = vi.hoisted(() => ({
+  mockSql: Object.assign(vi.fn(async () => []), { query: vi.fn(async () => []) }),
+  mockRecordGuardDecision: vi.fn(),
+}));
+
+vi.mock('@/lib/db.js', () => ({ getSql: () => mockSql }));
+vi.mock('@/lib/guard', () => ({ recordGuardDecision: mockRecordGuardDecision }));
+
+import { POST } from '@/api/guard/decisions/route.js';
+
+function post(body) {
+  return POST(makeRequest('http://localhost/api/guard/decisions', {
+    headers: { 'x-org-id': 'org_1' },
+    body,
+  }));
+}
+
+describe('/api/guard/decisions', () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    process.env.DATABASE_URL = 'postgres://unit-test';
+    let n = 0;
+    mockRecordGuardDecision.mockImplementation(() => ({ id: `gd_${++n}`, created_at: '2026-01-01T00:00:00.000Z' }));
+  });
+
+  it('records each decision as made without re-evaluating it', async () => {
+    const res = await post({
+      decisions: [
+        {
+          action_type: 'deploy',
+          risk_score: 95,
+          agent_id: 'agent-1',
+          decision: 'block',
+          reasons: ['RISK: Risk score 95 >= threshold 90'],
+          matched_policies: ['gp_risk'],
+          evaluated_at: '2026-01-01T00:00:00Z',
+          snapshot_version: 'abc123',
+        },
+        { action_type: 'read', decision: 'allow' },
+      ],
+    });
+
+    expect(res.status).toBe(201);
+    const data = await res.json();
+    expect(data.recorded_count).toBe(2);
+    expect(mockRecordGuardDecision).toHaveBeenCalledTimes(2);
+    expect(mockRecordGuardDecision).toHaveBeenNthCalledWith(
+      1,
+      'org_1',
+      {
+        action_type: 'deploy',
+        risk_score: 95,
+        agent_id: 'agent-1',
+        evaluated_locally: true,
+        evaluated_at: '2026-01-01T00:00:00Z',
+        snapshot_version: 'abc123',
+      },
+      { decision: 'block', reasons: ['RISK: Risk score 95 >= threshold 90'], matched_policies: ['gp_risk'] },
+      mockSql,
+    );
+  });
+
+  it('accepts a single decision object', async () => {
+    const res = await post({ action_type: 'read', decision: 'warn' });
+    expect(res.status).toBe(201);
+    expect(mockRecordGuardDecision).toHaveBeenCalledTimes(1);
+  });
+
+  it('rejects the whole batch when any entry is invalid', async () => {
+    const res = await post({
+      decisions: [
+        { action_type: 'read', decision: 'allow' },
+        { action_type: 'deploy', decision: 'maybe' },
+      ],
+    });
+    expect(res.status).toBe(400);
+    const data = await res.json();
+    expect(data.details[0]).toContain('decisions[1]');
+    expect(mockRecordGuardDecision).not.toHaveBeenCalled();
+  });
+
+  it('caps the batch at 100 decisions', async () => {
+    const decisions = Array.from({ length: 101 }, () => ({ action_type: 'read', decision: 'allow' }));
+    const res = await post({ decisions });
+    expect(res.status).toBe(400);
+    expect(mockRecordGuardDecision).not.toHaveBeenCalled();
+  });
+});
@@ -1,5 +1,7 @@
 import { describe, it, expect } from 'vitest';
 import { buildRecommendationsFromEpisodes, scoreActionEpisode } from '@/lib/learning-loop';
+import { getLearningRecommendationMetrics } from '@/lib/learningLoop.service';
+import { createSqlMock } from '../helpers.js';
 
 describe('scoreActionEpisode', () => {
   it('scores successful low-risk reversible actions higher than failed high-risk actions', () => {
@@ -51,3 +53,57 @@ describe('buildRecommendationsFromEpisodes', () => {
   });
 });
 
+
+describe('getLearningRecommendationMetrics', () => {
+  const recommendation = { id: 'lr_1', agent_id: 'agent_1', action_type: 'deploy', active: true };
+  const event = (eventType, details) => ({
+    recommendation_id: 'lr_1',
+    event_type: eventType,
+    details: details === undefined ? null : JSON.stringify(details),
+  });
+
+  it('weights merged telemetry events by details.count', async () => {
+    const sql = createSqlMock({
+      queryResponses: [[
+        event('fetched', { count: 10 }),
+        event('applied', { count: 3, reason: 'auto' }),
+        event('applied'),
+        event('overridden', { count: '2' }),
+      ]],
+    });
+
+    const { metrics } = await getLearningRecommendationMetrics(sql, 'org_1', { recommendations: [recommendation] });
+
+    expect(metrics[0].telemetry).toMatchObject({ fetched: 10, applied: 4, overridden: 2, adoption_rate: 0.4 });
+  });
+
+  it('counts events without a valid positive count once', async () => {
+    const sql = createSqlMock({
+      queryResponses: [[
+        event('outcome', { count: 0 }),
+        event('outcome', { count: -3 }),
+        event('outcome', { count: 1.5 }),
+        event('outcome', {}),
+      ]],
+    });
+
+    const { metrics } = await getLearningRecommendationMetrics(sql, 'org_1', { recommendations: [recommendation] });
+
+    expect(metrics[0].telemetry.outcomes).toBe(4);
+  });
+
+  it('matches the adoption rate of the same events sent one by one', async () => {
+    const merged = createSqlMock({ queryResponses: [[event('applied', { count: 3 }), event('overridden', { count: 1 })]] });
+    const single = createSqlMock({
+      queryResponses: [[event('applied'), event('applied'), event('applied'), event('overridden')]],
+    });
+
+    const [a, b] = await Promise.all([
+      getLearningRecommendationMetrics(merged, 'org_1', { recommendations: [recommendation] }),
+      getLearningRecommendationMetrics(single, 'org_1', { recommendations: [recommendation] }),
+    ]);
+
+    expect(a.metrics[0].telemetry).toEqual(b.metrics[0].telemetry);
+    expect(a.metrics[0].telemetry.adoption_rate).toBe(0.75);
+  });
+});
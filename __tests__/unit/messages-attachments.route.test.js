@@ -0,0 +1,94 @@
+import { beforeEach, describe, expect, it, vi } from 'vitest';
+import { makeRequest } from '../helpers.js';
+
+const { mockSql, mockGetAttachmentWithData } = vi.hoisted(() => ({
+  mockSql: vi.fn(),
+  mockGetAttachmentWithData: vi.fn(),
+}));
+
+vi.mock('@/lib/db.js', () => ({ getSql: () => mockSql }));
+vi.mock('@/lib/repositories/messagesContext.repository.js', () => ({
+  getAttachmentWithData: mockGetAttachmentWithData,
+}));
+
+import { GET } from '@/api/messages/attachments/route.js';
+
+const CONTENT = '0123456789abcdefghij';
+
+function download(range) {
+  const headers = { 'x-org-id': 'org_1' };
+  if (range) headers.range = range;
+  return GET(makeRequest('http://localhost/api/messages/attachments?id=att_1', { headers }));
+}
+
+beforeEach(() => {
+  vi.clearAllMocks();
+  mockGetAttachmentWithData.mockResolvedValue({
+    filename: 'notes.txt',
+    mime_type: 'text/plain',
+    data: Buffer.from(CONTENT).toString('base64'),
+  });
+});
+
+describe('/api/messages/attachments GET', () => {
+  it('returns the whole attachment and advertises byte ranges', async () => {
+    const res = await download();
+
+    expect(res.status).toBe(200);
+    expect(res.headers.get('accept-ranges')).toBe('bytes');
+    expect(res.headers.get('content-length')).toBe(String(CONTENT.length));
+    expect(await res.text()).toBe(CONTENT);
+  });
+
+  it('returns 206 with the requested slice for bytes=start-end', async () => {
+    const res = await download('bytes=5-9');
+
+    expect(res.status).toBe(206);
+    expect(res.headers.get('content-range')).toBe(`bytes 5-9/${CONTENT.length}`);
+    expect(res.headers.get('content-length')).toBe('5');
+    expect(await res.text()).toBe('56789');
+  });
+
+  it('serves an open-ended range to the end of the attachment', async () => {
+    const res = await download('bytes=15-');
+
+    expect(res.status).toBe(206);
+    expect(res.headers.get('content-range')).toBe(`bytes 15-19/${CONTENT.length}`);
+    expect(await res.text()).toBe('fghij');
+  });
+
+  it('clamps a range that runs past the end', async () => {
+    const res = await download('bytes=18-100');
+
+    expect(res.status).toBe(206);
+    expect(res.headers.get('content-range')).toBe(`bytes 18-19/${CONTENT.length}`);
+    expect(await res.text()).toBe('ij');
+  });
+
+  it('returns 416 for a range starting at or past the end', async () => {
+    for (const range of [`bytes=${CONTENT.length}-`, 'bytes=9-3']) {
+      const res = await download(range);
+
+      expect(res.status).toBe(416);
+      expect(res.headers.get('content-range')).toBe(`bytes */${CONTENT.length}`);
+    }
+  });
+
+  it('ignores ranges it does not support and returns the full body', async () => {
+    const res = await download('bytes=0-1,4-5');
+
+    expect(res.status).toBe(200);
+    expect(await res.text()).toBe(CONTENT);
+  });
+
+  it('returns 400 without an id and 404 for an unknown attachment', async () => {
+    const missing = await GET(makeRequest('http://localhost/api/messages/attachments', {
+      headers: { 'x-org-id': 'org_1' },
+    }));
+    expect(missing.status).toBe(400);
+
+    mockGetAttachmentWithData.mockResolvedValue(null);
+    const unknown = await download();
+    expect(unknown.status).toBe(404);
+  });
+});
@@ -0,0 +1,61 @@
+import { beforeEach, describe, expect, it, vi } from 'vitest';
+import { makeRequest } from '../helpers.js';
+
+const {
+  mockSql,
+  mockListMessages,
+  mockGetUnreadMessageCount,
+  mockGetAttachmentsForMessages,
+} = vi.hoisted(() => ({
+  mockSql: vi.fn(),
+  mockListMessages: vi.fn(),
+  mockGetUnreadMessageCount: vi.fn(),
+  mockGetAttachmentsForMessages: vi.fn(),
+}));
+
+vi.mock('@/lib/db.js', () => ({ getSql: () => mockSql }));
+vi.mock('@/lib/repositories/messagesContext.repository.js', () => ({
+  listMessages: mockListMessages,
+  getUnreadMessageCount: mockGetUnreadMessageCount,
+  getAttachmentsForMessages: mockGetAttachmentsForMessages,
+}));
+vi.mock('@/lib/events.js', () => ({ EVENTS: {}, publishOrgEvent: vi.fn() }));
+
+import { GET } from '@/api/messages/route.js';
+
+beforeEach(() => {
+  vi.clearAllMocks();
+  mockListMessages.mockResolvedValue([
+    { id: 'msg_2', to_agent_id: 'agent_1', status: 'sent', created_at: '2026-02-01T00:00:05.000Z' },
+  ]);
+  mockGetUnreadMessageCount.mockResolvedValue(1);
+  mockGetAttachmentsForMessages.mockResolvedValue([]);
+});
+
+describe('/api/messages GET', () => {
+  it('passes the since cursor to listMessages', async () => {
+    const res = await GET(makeRequest(
+      'http://localhost/api/messages?agent_id=agent_1&since=2026-02-01T00:00:00.000Z&limit=200',
+      { headers: { 'x-org-id': 'org_1' } },
+    ));
+
+    expect(res.status).toBe(200);
+    expect(mockListMessages).toHaveBeenCalledWith(mockSql, 'org_1', expect.objectContaining({
+      agentId: 'agent_1',
+      direction: 'inbox',
+      since: '2026-02-01T00:00:00.000Z',
+      limit: 200,
+    }));
+    const data = await res.json();
+    expect(data.messages.map((m) => m.id)).toEqual(['msg_2']);
+    expect(data.unread_count).toBe(1);
+  });
+
+  it('lists without a cursor when since is absent', async () => {
+    await GET(makeRequest('http://localhost/api/messages?agent_id=agent_1', {
+      headers: { 'x-org-id': 'org_1' },
+    }));
+
+    expect(mockListMessages.mock.calls[0][2].since).toBeNull();
+  });
+});
@@ -1,13 +1,21 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { makeRequest } from '../helpers.js';
 
-const { mockSql } = vi.hoisted(() => ({
+const { mockSql, mockPublishOrgEvent } = vi.hoisted(() => ({
   mockSql: Object.assign(vi.fn(async () => []), { query: vi.fn(async () => []) }),
+  mockPublishOrgEvent: vi.fn(),
 }));
 
 vi.mock('@/lib/db.js', () => ({ getSql: () => mockSql }));
 vi.mock('@/lib/org.js', () => ({ getOrgId: () => 'org_test' }));
+vi.mock('@/lib/events.js', () => ({
+  EVENTS: { PROMPT_VERSION_ACTIVATED: 'prompt.version_activated' },
+  publishOrgEvent: mockPublishOrgEvent,
+}));
 
 import { renderPrompt } from '@/lib/prompt.js';
+import { POST as recordRuns } from '@/api/prompts/runs/route.js';
+import { POST as activateVersionRoute } from '@/api/prompts/templates/[templateId]/versions/[versionId]/route.js';
 
 describe('renderPrompt', () => {
   it('renders simple mustache variables', () => {
@@ -55,3 +63,110 @@ describe('renderPrompt', () => {
     expect(result).toBe('Count: 42');
   });
 });
+
+describe('POST /api/prompts/runs', () => {
+  // Versions visible to org_test; getVersion() filters by id and org_id.
+  const orgVersions = [{ id: 'pv_1', template_id: 'pt_1' }, { id: 'pv_2', template_id: 'pt_2' }];
+  const query = (strings) => strings.join('?');
+  const inserts = () => mockSql.mock.calls.filter(([strings]) => query(strings).includes('INSERT INTO prompt_runs'));
+
+  beforeEach(() => {
+    vi.clearAllMocks();
+    mockSql.mockImplementation(async (strings, ...values) => (
+      query(strings).includes('FROM prompt_versions') ? orgVersions.filter((v) => v.id === values[0]) : []
+    ));
+  });
+
+  const run = (n) => ({ template_id: 'pt_1', version_id: 'pv_1', rendered: `run ${n}`, tokens_used: n });
+
+  it('records every run of a batch', async () => {
+    const res = await recordRuns(makeRequest('http://localhost/api/prompts/runs', {
+      body: { runs: [run(1), run(2), run(3)] },
+    }));
+
+    expect(res.status).toBe(201);
+    const data = await res.json();
+    expect(data.recorded).toBe(3);
+    expect(data.run_ids).toHaveLength(3);
+    expect(new Set(data.run_ids).size).toBe(3);
+    expect(data.run_ids.every((id) => id.startsWith('pr_'))).toBe(true);
+    expect(inserts()).toHaveLength(3);
+  });
+
+  it('looks each distinct version up once', async () => {
+    const res = await recordRuns(makeRequest('http://localhost/api/prompts/runs', {
+      body: { runs: [run(1), run(2), { template_id: 'pt_2', version_id: 'pv_2' }] },
+    }));
+
+    expect(res.status).toBe(201);
+    const lookups = mockSql.mock.calls.filter(([strings]) => query(strings).includes('FROM prompt_versions'));
+    expect(lookups.map(([, id]) => id).sort()).toEqual(['pv_1', 'pv_2']);
+  });
+
+  it('rejects runs for versions outside the org or under another template', async () => {
+    for (const foreign of [
+      { template_id: 'pt_other', version_id: 'pv_other' },
+      { template_id: 'pt_2', version_id: 'pv_1' },
+    ]) {
+      const res = await recordRuns(makeRequest('http://localhost/api/prompts/runs', {
+        body: { runs: [run(1), foreign] },
+      }));
+
+      expect(res.status).toBe(404);
+      expect((await res.json()).details).toEqual([foreign]);
+    }
+    expect(inserts()).toHaveLength(0);
+  });
+
+  it('rejects a missing, empty or oversized runs array', async () => {
+    for (const body of [{}, { runs: [] }, { runs: Array.from({ length: 501 }, (_, i) => run(i)) }]) {
+      const res = await recordRuns(makeRequest('http://localhost/api/prompts/runs', { body }));
+      expect(res.status).toBe(400);
+    }
+    expect(mockSql).not.toHaveBeenCalled();
+  });
+
+  it('rejects the whole batch when a run lacks its template or version', async () => {
+    const res = await recordRuns(makeRequest('http://localhost/api/prompts/runs', {
+      body: { runs: [run(1), { template_id: 'pt_1' }] },
+    }));
+
+    expect(res.status).toBe(400);
+    expect(mockSql).not.toHaveBeenCalled();
+  });
+});
+
+describe('POST /api/prompts/templates/:templateId/versions/:versionId', () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    mockSql.mockImplementation(async () => []);
+  });
+
+  it('publishes prompt.version_activated when a version is activated', async () => {
+    mockSql.mockImplementationOnce(async () => [{ id: 'pv_2', template_id: 'pt_1', version: 2, content: 'Hi' }]);
+
+    const res = await activateVersionRoute(
+      makeRequest('http://localhost/api/prompts/templates/pt_1/versions/pv_2'),
+      { params: { templateId: 'pt_1', versionId: 'pv_2' } },
+    );
+
+    expect(res.status).toBe(200);
+    expect((await res.json()).is_active).toBe(true);
+    expect(mockPublishOrgEvent).toHaveBeenCalledWith('prompt.version_activated', {
+      orgId: 'org_test',
+      template_id: 'pt_1',
+      version_id: 'pv_2',
+      version: 2,
+    });
+  });
+
+  it('publishes nothing for an unknown version', async () => {
+    const res = await activateVersionRoute(
+      makeRequest('http://localhost/api/prompts/templates/pt_1/versions/pv_missing'),
+      { params: { templateId: 'pt_1', versionId: 'pv_missing' } },
+    );
+
+    expect(res.status).toBe(404);
+    expect(mockPublishOrgEvent).not.toHaveBeenCalled();
+  });
+});
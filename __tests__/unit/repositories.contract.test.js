@@ -134,6 +134,21 @@ describe('messages/context repository contract', () => {
     expect(sql.queryCalls[0].params).toEqual(['org_1', 'agent_1', 'agent_1', 5, 1]);
   });
 
+  it('listMessages filters inclusively from a since cursor', async () => {
+    const sql = createSqlMock({ queryResponses: [[]] });
+
+    await messagesContextRepository.listMessages(sql, 'org_1', {
+      agentId: 'agent_1',
+      direction: 'inbox',
+      since: '2026-02-01T00:00:00.000Z',
+      limit: 5,
+    });
+
+    expect(sql.queryCalls[0].text).toContain('created_at >= $4');
+    expect(sql.queryCalls[0].text).toContain('ORDER BY created_at DESC');
+    expect(sql.queryCalls[0].params).toEqual(['org_1', 'agent_1', 'agent_1', '2026-02-01T00:00:00.000Z', 5, 0]);
+  });
+
   it('getUnreadMessageCount supports scoped and global reads', async () => {
     const sql = createSqlMock({
       queryResponses: [[{ count: 3 }]],
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick multi-pattern matcher.
+
+Finds which of many patterns occur in a text in one left-to-right pass,
+however many patterns there are, instead of one substring search per
+pattern. Used by the knowledge graph to find every known entity name in a
+paragraph.
+"""
+
+from collections import deque
+
+class Automaton:
+    """Matcher over a fixed set of patterns (matched case-sensitively; lowercase
+    patterns and text for case-insensitive matching)."""
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (index,)
+
+        # Breadth-first: a state's failure link is the longest proper suffix that is
+        # also a trie path; its outputs include everything matched along that link.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def matches(self, text):
+        """Indexes (into self.patterns) of the patterns that occur in text, each once."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def find(self, text):
+        """The patterns that occur in text, in pattern order."""
+        return [self.patterns[i] for i in sorted(self.matches(text))]
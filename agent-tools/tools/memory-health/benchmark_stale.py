@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the stale-fact detector on a synthetic corpus.
+
+Compares the single-pass detector (one compiled alternation regex, file dates
+parsed once per file, streamed) with the previous per-pattern, per-fact
+implementation, on the same generated facts.
+
+Usage:
+  python benchmark_stale.py [--facts 1000000] [--files 365] [--seed 7]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+from scanner import iter_stale_facts
+
+FILLER = ('deploy', 'pipeline', 'database', 'migration', 'review', 'agent', 'release',
+          'config', 'token', 'budget', 'customer', 'latency', 'cache', 'dashboard')
+TIME_PHRASES = ('today', 'right now', 'going to', 'next week', 'currently', '2026-03-14')
+
+POOL_SIZE = 10007
+
+def sentence_pool(seed):
+    """Synthetic fact texts; about one in five uses time-sensitive language."""
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(POOL_SIZE):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(6, 14))]
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words)), rng.choice(TIME_PHRASES))
+        pool.append(' '.join(words))
+    return pool
+
+def synthetic_facts(count, files, pool):
+    """Yield `count` facts spread evenly over `files` daily files (plus MEMORY.md)."""
+    start = datetime.now() - timedelta(days=files)
+    names = ['MEMORY.md'] + [(start + timedelta(days=d)).strftime('%Y-%m-%d') + '.md' for d in range(files)]
+    per_file = max(1, count // len(names))
+    for n in range(count):
+        yield {
+            'source_file': names[min(n // per_file, len(names) - 1)],
+            'line_number': n % per_file + 1,
+            'content': pool[n % POOL_SIZE],
+        }
+
+def legacy_stale_facts(facts, stale_days=30):
+    """The detector as it was: four uncompiled patterns and a strptime per fact."""
+    stale = []
+    today = datetime.now()
+    time_patterns = [
+        r'\b(today|tomorrow|yesterday|this week|next week)\b',
+        r'\b(currently|now|at the moment|right now)\b',
+        r'\b(will|going to|planning to|about to)\b',
+        r'\b\d{4}-\d{2}-\d{2}\b',
+    ]
+    for fact in facts:
+        if fact['source_file'].startswith('20'):
+            try:
+                file_date = datetime.strptime(fact['source_file'][:10], '%Y-%m-%d')
+                age = (today - file_date).days
+                if age > stale_days:
+                    for pattern in time_patterns:
+                        if re.search(pattern, fact['content'], re.IGNORECASE):
+                            stale.append({
+                                'source': fact['source_file'],
+                                'line': fact['line_number'],
+                                'age_days': age,
+                                'content': fact['content'][:100],
+                                'reason': 'Time-sensitive language in old file'
+                            })
+                            break
+            except ValueError:
+                pass
+    return stale
+
+def timed(fn):
+    start = time.perf_counter()
+    count = fn()
+    return time.perf_counter() - start, count
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark stale-fact detection')
+    parser.add_argument('--facts', type=int, default=1_000_000, help='Number of synthetic facts')
+    parser.add_argument('--files', type=int, default=365, help='Number of daily files')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    pool = sentence_pool(args.seed)
+    corpus = lambda: synthetic_facts(args.facts, args.files, pool)
+
+    print(f"Stale detection over {args.facts:,} facts in {args.files + 1} files:")
+    base_time, _ = timed(lambda: sum(1 for _ in corpus()))
+    new_time, new_count = timed(lambda: sum(1 for _ in iter_stale_facts(corpus())))
+    old_time, old_count = timed(lambda: len(legacy_stale_facts(corpus())))
+    new_time, old_time = max(new_time - base_time, 1e-9), max(old_time - base_time, 1e-9)
+
+    print(f"  corpus generation {base_time:8.2f}s (subtracted below)")
+    print(f"  single-pass       {new_time:8.2f}s  {args.facts / new_time:,.0f} facts/s  {new_count} stale")
+    print(f"  legacy            {old_time:8.2f}s  {args.facts / old_time:,.0f} facts/s  {old_count} stale")
+    if new_count != old_count:
+        print(f"[!] Results differ: {new_count} vs {old_count}")
+        sys.exit(1)
+    print(f"  Speedup: {old_time / new_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
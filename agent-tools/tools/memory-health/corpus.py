@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Shared memory corpus pipeline for the health scanner and the knowledge graph.
+
+walk() lists and stats the memory files once; both tools decide from it
+which files they need to re-read. process() then reads each of those files
+once and runs every extractor that asked for it, fanning chunks of files out
+over a process pool (the extraction is regex-heavy and CPU-bound). Each chunk
+returns its per-file results and the chunks are merged into one dict, so a
+combined scan costs one walk, one read per changed file and one pool.
+"""
+
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+MEMORY_DIR = Path(__file__).parent.parent.parent / "memory"
+MEMORY_MD = Path(__file__).parent.parent.parent / "MEMORY.md"
+MIN_PARALLEL_FILES = 16  # Below this, starting a pool costs more than it saves
+CHUNKS_PER_WORKER = 4
+
+CorpusFile = namedtuple('CorpusFile', 'source_file path mtime_ns size')
+
+def walk(memory_md=MEMORY_MD, memory_dir=MEMORY_DIR):
+    """CorpusFile for MEMORY.md and every daily file, MEMORY.md first, then by date."""
+    files = []
+    candidates = [('MEMORY.md', Path(memory_md))]
+    if Path(memory_dir).exists():
+        candidates += [(f.name, f) for f in sorted(Path(memory_dir).glob('*.md')) if f.name.startswith('20')]
+    for source_file, path in candidates:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files.append(CorpusFile(source_file, path, st.st_mtime_ns, st.st_size))
+    return files
+
+def default_workers():
+    return os.cpu_count() or 1
+
+def _run_chunk(extractors, chunk):
+    """Map step: read each file of the chunk once and run the extractors it needs."""
+    results = {}
+    for corpus_file, names in chunk:
+        content = corpus_file.path.read_text(encoding='utf-8', errors='ignore')
+        results[corpus_file.source_file] = {
+            name: extractors[name](content, corpus_file.source_file) for name in names
+        }
+    return results
+
+def process(work, extractors, workers=None, chunk_size=None):
+    """Run extractors over files, in parallel when there are enough of them.
+
+    work is an iterable of (CorpusFile, extractor names); extractors maps each
+    name to a picklable callable(content, source_file), e.g. a module-level
+    function or a functools.partial of one. Returns
+    {source_file: {name: result}}.
+    """
+    work = [(f, tuple(names)) for f, names in work if names]
+    if not work:
+        return {}
+    workers = min(workers or default_workers(), len(work))
+    if workers <= 1 or len(work) < MIN_PARALLEL_FILES:
+        return _run_chunk(extractors, work)
+
+    # Largest files first, dealt round-robin, so chunks carry similar amounts of text.
+    work.sort(key=lambda item: -item[0].size)
+    chunk_count = max(workers, math.ceil(len(work) / chunk_size) if chunk_size else workers * CHUNKS_PER_WORKER)
+    chunks = [work[i::chunk_count] for i in range(chunk_count)]
+
+    # Reduce step: per-file results are keyed by file, so chunks merge without conflicts.
+    merged = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_run_chunk, repeat(extractors), [c for c in chunks if c]):
+            merged.update(partial)
+    return merged
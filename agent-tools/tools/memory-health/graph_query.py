@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Knowledge graph queries.
+
+The graph is kept as an adjacency table with one row per direction of every
+relationship, keyed (entity, neighbor), so an entity's neighbours are one
+index range scan. knowledge_graph.build_graph() applies each file's change in
+relationships to it as a delta instead of rebuilding it.
+
+On top of it:
+  neighbors()      - directly related entities, strongest first
+  k_hop()          - everything within k relationships of an entity
+  shortest_path()  - fewest-hop path between two entities
+  update_rank()    - weighted PageRank, warm-started from the previous scores
+                     so a small change converges in a few iterations
+
+Query results are cached in the database against the graph version, which
+build_graph() bumps whenever the graph changes, so repeated dashboard reads
+are a single lookup.
+"""
+
+import json
+import sqlite3
+from collections import Counter
+
+DAMPING = 0.85
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS graph_adjacency (
+        entity TEXT NOT NULL,
+        neighbor TEXT NOT NULL,
+        strength INTEGER NOT NULL,
+        PRIMARY KEY (entity, neighbor)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_graph_adjacency_strength ON graph_adjacency(entity, strength)',
+    '''
+    CREATE TABLE IF NOT EXISTS entity_rank (
+        name TEXT PRIMARY KEY,
+        score REAL NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS graph_cache (
+        key TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        payload TEXT NOT NULL
+    )
+    ''',
+]
+
+def init_schema(c):
+    for statement in SCHEMA:
+        c.execute(statement)
+
+def graph_version(conn):
+    row = conn.execute("SELECT value FROM graph_config WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+def bump_version(c):
+    """Mark the graph as changed, dropping every cached query result."""
+    c.execute("INSERT OR REPLACE INTO graph_config (key, value) VALUES ('version', ?)", (str(graph_version(c) + 1),))
+    c.execute('DELETE FROM graph_cache')
+
+def apply_edge_delta(c, delta):
+    """Add a Counter of {(entity1, entity2): strength change} to the adjacency table, both directions."""
+    rows = []
+    for (e1, e2), change in delta.items():
+        if change and e1 != e2:
+            rows.append((e1, e2, change))
+            rows.append((e2, e1, change))
+    c.executemany('''
+        INSERT INTO graph_adjacency (entity, neighbor, strength) VALUES (?, ?, ?)
+        ON CONFLICT (entity, neighbor) DO UPDATE SET strength = strength + excluded.strength
+    ''', rows)
+    c.execute('DELETE FROM graph_adjacency WHERE strength <= 0')
+
+def rebuild_adjacency(c):
+    """Recreate the adjacency table from the per-file relationship contributions."""
+    c.execute('DELETE FROM graph_adjacency')
+    delta = Counter()
+    for e1, e2, strength in c.execute('SELECT entity1, entity2, strength FROM file_relationships'):
+        delta[(e1, e2)] += strength
+    apply_edge_delta(c, delta)
+
+def update_rank(c, damping=DAMPING, tol=1e-6, max_iter=100):
+    """Weighted PageRank over the adjacency table, starting from the stored
+    scores. Returns the number of iterations it took to converge."""
+    out = {}
+    for entity, neighbor, strength in c.execute('SELECT entity, neighbor, strength FROM graph_adjacency'):
+        out.setdefault(entity, []).append((neighbor, strength))
+    nodes = list(out)
+    if not nodes:
+        c.execute('DELETE FROM entity_rank')
+        return 0
+
+    n = len(nodes)
+    previous = dict(c.execute('SELECT name, score FROM entity_rank'))
+    rank = {node: previous.get(node, 1.0 / n) for node in nodes}
+    total = sum(rank.values())
+    rank = {node: score / total for node, score in rank.items()}
+    weights = {node: sum(s for _, s in edges) for node, edges in out.items()}
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        nxt = dict.fromkeys(nodes, (1.0 - damping) / n)
+        for node, edges in out.items():
+            share = damping * rank[node] / weights[node]
+            for neighbor, strength in edges:
+                nxt[neighbor] += share * strength
+        delta = sum(abs(nxt[node] - rank[node]) for node in nodes)
+        rank = nxt
+        if delta < tol:
+            break
+
+    c.execute('DELETE FROM entity_rank')
+    c.executemany('INSERT INTO entity_rank (name, score) VALUES (?, ?)', rank.items())
+    return iterations
+
+def cached(conn, key, compute):
+    """compute() for the current graph version, from graph_cache when already stored."""
+    version = graph_version(conn)
+    row = conn.execute('SELECT version, payload FROM graph_cache WHERE key = ?', (key,)).fetchone()
+    if row and row[0] == version:
+        return json.loads(row[1])
+    result = compute()
+    try:
+        conn.execute('INSERT OR REPLACE INTO graph_cache (key, version, payload) VALUES (?, ?, ?)',
+                     (key, version, json.dumps(result)))
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass  # read-only or busy database: serve uncached
+    return result
+
+def resolve(conn, name):
+    """The stored spelling of an entity name (exact match first, then case-insensitive)."""
+    row = conn.execute('SELECT entity FROM graph_adjacency WHERE entity = ? LIMIT 1', (name,)).fetchone()
+    if row is None:
+        row = conn.execute('SELECT entity FROM graph_adjacency WHERE entity = ? COLLATE NOCASE LIMIT 1',
+                           (name,)).fetchone()
+    return row[0] if row else None
+
+def _neighbors(conn, entity, min_strength=1, limit=None):
+    return conn.execute('''
+        SELECT neighbor, strength FROM graph_adjacency
+        WHERE entity = ? AND strength >= ?
+        ORDER BY strength DESC, neighbor LIMIT ?
+    ''', (entity, min_strength, -1 if limit is None else int(limit))).fetchall()
+
+def neighbors(conn, name, min_strength=1, limit=20):
+    """Entities directly related to name, strongest first."""
+    def compute():
+        entity = resolve(conn, name)
+        if entity is None:
+            return None
+        return {
+            'entity': entity,
+            'neighbors': [{'name': n, 'strength': s} for n, s in _neighbors(conn, entity, min_strength, limit)]
+        }
+    return cached(conn, f'neighbors:{name}:{min_strength}:{limit}', compute)
+
+def k_hop(conn, name, k=2, min_strength=1, per_node=25, limit=100):
+    """Entities within k relationships of name, by distance then PageRank.
+
+    Only the per_node strongest relationships of each entity are followed,
+    which keeps hub entities from pulling in the whole graph.
+    """
+    def compute():
+        entity = resolve(conn, name)
+        if entity is None:
+            return None
+        distance = {entity: 0}
+        via = {}
+        edges = []
+        frontier = [entity]
+        for hop in range(1, k + 1):
+            nxt = []
+            for node in frontier:
+                for neighbor, strength in _neighbors(conn, node, min_strength, per_node):
+                    if neighbor not in distance:
+                        distance[neighbor] = hop
+                        via[neighbor] = node
+                        nxt.append(neighbor)
+                        edges.append({'source': node, 'target': neighbor, 'strength': strength})
+            frontier = nxt
+            if not frontier:
+                break
+
+        ranks = _ranks(conn, distance)
+        nodes = sorted((n for n in distance if n != entity), key=lambda n: (distance[n], -ranks.get(n, 0), n))[:limit]
+        kept = set(nodes) | {entity}
+        return {
+            'entity': entity,
+            'hops': k,
+            'nodes': [{'name': n, 'distance': distance[n], 'via': via[n], 'rank': ranks.get(n, 0)} for n in nodes],
+            'edges': [e for e in edges if e['target'] in kept]
+        }
+    return cached(conn, f'k_hop:{name}:{k}:{min_strength}:{per_node}:{limit}', compute)
+
+def shortest_path(conn, source, target, max_hops=6, min_strength=1):
+    """Fewest-hop path from source to target as a list of entity names, or None.
+    Searches from both ends at once, always expanding the smaller frontier."""
+    def compute():
+        start, goal = resolve(conn, source), resolve(conn, target)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [start]
+        parents = ({start: None}, {goal: None})
+        frontiers = ([start], [goal])
+        for _ in range(max_hops):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, other = parents[side], parents[1 - side]
+            nxt = []
+            for node in frontiers[side]:
+                for neighbor, _ in _neighbors(conn, node, min_strength):
+                    if neighbor in seen:
+                        continue
+                    seen[neighbor] = node
+                    if neighbor in other:
+                        return _join(parents, neighbor)
+                    nxt.append(neighbor)
+            frontiers = (nxt, frontiers[1]) if side == 0 else (frontiers[0], nxt)
+            if not nxt:
+                return None
+        return None
+    return cached(conn, f'path:{source}:{target}:{max_hops}:{min_strength}', compute)
+
+def _join(parents, meet):
+    path = []
+    node = meet
+    while node is not None:
+        path.append(node)
+        node = parents[0][node]
+    path.reverse()
+    node = parents[1][meet]
+    while node is not None:
+        path.append(node)
+        node = parents[1][node]
+    return path
+
+def _ranks(conn, names):
+    names = list(names)
+    ranks = {}
+    for i in range(0, len(names), 500):
+        batch = names[i:i + 500]
+        ranks.update(conn.execute(
+            f"SELECT name, score FROM entity_rank WHERE name IN ({','.join('?' * len(batch))})", batch))
+    return {name: round(score, 6) for name, score in ranks.items()}
+
+def central_entities(conn, limit=20):
+    """Entities by PageRank, most central first."""
+    def compute():
+        return [{'name': name, 'rank': round(score, 6)} for name, score in conn.execute(
+            'SELECT name, score FROM entity_rank ORDER BY score DESC LIMIT ?', (limit,))]
+    return cached(conn, f'central:{limit}', compute)
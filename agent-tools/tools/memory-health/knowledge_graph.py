@@ -10,10 +10,16 @@ import re
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict, Counter
+from functools import partial
+
+import corpus
+import graph_query
+from aho_corasick import Automaton
 
 DB_PATH = Path(__file__).parent / "data" / "memory_health.db"
 MEMORY_DIR = Path(__file__).parent.parent.parent / "memory"
 MEMORY_MD = Path(__file__).parent.parent.parent / "MEMORY.md"
+DEFAULT_WINDOW = 1  # Paragraphs within which entities count as related
 
 def init_db():
     """Initialize knowledge graph tables."""
@@ -56,6 +62,50 @@ def init_db():
     
     c.execute('CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(name)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_topics_name ON topics(name)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_relationships_entity1 ON relationships(entity1)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_relationships_entity2 ON relationships(entity2)')
+
+    # What each memory file contributes to the graph, so a build only
+    # re-extracts files that changed and swaps their rows.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS graph_files (
+            source_file TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS file_entities (
+            source_file TEXT NOT NULL,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            mentions INTEGER NOT NULL
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS file_topics (
+            source_file TEXT NOT NULL,
+            name TEXT NOT NULL,
+            mentions INTEGER NOT NULL
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS file_relationships (
+            source_file TEXT NOT NULL,
+            entity1 TEXT NOT NULL,
+            entity2 TEXT NOT NULL,
+            strength INTEGER NOT NULL
+        )
+    ''')
+    for table in ('file_entities', 'file_topics', 'file_relationships'):
+        c.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_source ON {table}(source_file)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS graph_config (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+    graph_query.init_schema(c)
     
     conn.commit()
     conn.close()
@@ -128,111 +178,203 @@ def extract_topics(text):
     
     return topics
 
-def extract_relationships(text, entities):
-    """Find relationships between entities mentioned together."""
-    relationships = []
-    
-    # Group entities by sentence/paragraph
+def extract_relationships(text, entities, window=DEFAULT_WINDOW):
+    """Find relationships between entities mentioned together.
+
+    Every unique entity name goes into one Aho-Corasick automaton, and each
+    paragraph is scanned once (case-insensitively) for all of them. Entities
+    co-occur when they appear within `window` consecutive paragraphs (1 = the
+    same paragraph); each pair is counted once per paragraph, however often
+    its names repeat there.
+    """
+    # Several spellings of one name ("Neon", "neon") match the same text
+    names_by_pattern = defaultdict(list)
+    for name in dict.fromkeys(e['name'] for e in entities):
+        names_by_pattern[name.lower()].append(name)
+    automaton = Automaton(names_by_pattern)
+    patterns = automaton.patterns
+
     paragraphs = text.split('\n\n')
-    
+    found = []
     for para in paragraphs:
-        para_entities = []
-        for e in entities:
-            if e['name'].lower() in para.lower():
-                para_entities.append(e['name'])
-        
-        # Create relationships between entities in same paragraph
-        for i, e1 in enumerate(para_entities):
-            for e2 in para_entities[i+1:]:
-                if e1 != e2:
-                    relationships.append({
-                        'entity1': e1,
-                        'entity2': e2,
-                        'context': para[:100]
-                    })
-    
+        names = set()
+        for i in automaton.matches(para.lower()):
+            names.update(names_by_pattern[patterns[i]])
+        found.append(names)
+
+    relationships = []
+    for i, para in enumerate(paragraphs):
+        if not found[i]:
+            continue
+        nearby = set().union(*found[i:i + max(1, window)])
+        pairs = {(min(e1, e2), max(e1, e2)) for e1 in found[i] for e2 in nearby if e1 != e2}
+        for e1, e2 in sorted(pairs):
+            relationships.append({
+                'entity1': e1,
+                'entity2': e2,
+                'context': para[:100]
+            })
+
     return relationships
 
-def build_graph():
-    """Build the knowledge graph from all memory files."""
-    init_db()
-    
-    all_entities = []
-    all_topics = []
-    all_relationships = []
-    
-    # Process MEMORY.md
-    if MEMORY_MD.exists():
-        content = MEMORY_MD.read_text(encoding='utf-8', errors='ignore')
-        entities = extract_entities(content, 'MEMORY.md')
-        topics = extract_topics(content)
-        relationships = extract_relationships(content, entities)
-        
-        all_entities.extend(entities)
-        all_topics.extend(topics)
-        all_relationships.extend(relationships)
-    
-    # Process daily files
-    if MEMORY_DIR.exists():
-        for f in sorted(MEMORY_DIR.glob('*.md')):
-            if f.name.startswith('20'):
-                content = f.read_text(encoding='utf-8', errors='ignore')
-                entities = extract_entities(content, f.name)
-                topics = extract_topics(content)
-                relationships = extract_relationships(content, entities)
-                
-                all_entities.extend(entities)
-                all_topics.extend(topics)
-                all_relationships.extend(relationships)
-    
-    # Aggregate and store
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Clear old data
+def extract_file(content, source_file, window=DEFAULT_WINDOW):
+    """One file's contribution to the graph, counted per key."""
+    entities = extract_entities(content, source_file)
+    relationships = extract_relationships(content, entities, window)
+    return {
+        'entities': Counter((e['name'], e['type']) for e in entities),
+        'topics': Counter(extract_topics(content)),
+        'relationships': Counter((r['entity1'], r['entity2']) for r in relationships),
+    }
+
+def store_contribution(c, source_file, contribution, edges=None):
+    """Swap the stored contribution of one file for a new one (None removes it).
+    With an `edges` Counter, the resulting change in relationship strengths is added to it."""
+    if edges is not None:
+        for e1, e2, strength in c.execute(
+                'SELECT entity1, entity2, strength FROM file_relationships WHERE source_file = ?', (source_file,)):
+            edges[(e1, e2)] -= strength
+        if contribution is not None:
+            edges.update(contribution['relationships'])
+    for table in ('file_entities', 'file_topics', 'file_relationships'):
+        c.execute(f'DELETE FROM {table} WHERE source_file = ?', (source_file,))
+    if contribution is None:
+        return
+    c.executemany('INSERT INTO file_entities (source_file, name, type, mentions) VALUES (?, ?, ?, ?)',
+                  [(source_file, name, etype, n) for (name, etype), n in contribution['entities'].items()])
+    c.executemany('INSERT INTO file_topics (source_file, name, mentions) VALUES (?, ?, ?)',
+                  [(source_file, name, n) for name, n in contribution['topics'].items()])
+    c.executemany('INSERT INTO file_relationships (source_file, entity1, entity2, strength) VALUES (?, ?, ?, ?)',
+                  [(source_file, e1, e2, n) for (e1, e2), n in contribution['relationships'].items()])
+
+def aggregate_graph(c):
+    """Rebuild entities, topics and relationships from the per-file contributions."""
+    entity_counts = Counter()
+    seen = {}  # name -> [first source, last source]
+    for source, name, etype, mentions in c.execute(
+            'SELECT source_file, name, type, mentions FROM file_entities'):
+        entity_counts[(name, etype)] += mentions
+        span = seen.get(name)
+        if span is None:
+            seen[name] = [source, source]
+        elif source < span[0]:
+            span[0] = source
+        elif source > span[1]:
+            span[1] = source
+
+    topic_counts = Counter()
+    for name, mentions in c.execute('SELECT name, mentions FROM file_topics'):
+        topic_counts[name] += mentions
+
     c.execute('DELETE FROM entities')
     c.execute('DELETE FROM topics')
     c.execute('DELETE FROM relationships')
-    
-    # Store entities
-    entity_counts = Counter((e['name'], e['type']) for e in all_entities)
-    for (name, etype), count in entity_counts.most_common():
-        sources = [e['source'] for e in all_entities if e['name'] == name]
-        c.execute('''
-            INSERT INTO entities (name, type, mention_count, first_seen, last_seen)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, etype, count, min(sources), max(sources)))
-    
-    # Store topics
-    topic_counts = Counter(all_topics)
-    for topic, count in topic_counts.most_common():
-        c.execute('''
-            INSERT OR REPLACE INTO topics (name, mention_count)
-            VALUES (?, ?)
-        ''', (topic, count))
-    
-    # Store relationships
-    rel_counts = Counter((r['entity1'], r['entity2']) for r in all_relationships)
-    for (e1, e2), strength in rel_counts.most_common(50):  # Top 50 relationships
-        c.execute('''
-            INSERT INTO relationships (entity1, entity2, strength)
-            VALUES (?, ?, ?)
-        ''', (e1, e2, strength))
-    
-    conn.commit()
-    conn.close()
-    
+    c.executemany('''
+        INSERT INTO entities (name, type, mention_count, first_seen, last_seen)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(name, etype, count, *seen[name]) for (name, etype), count in entity_counts.most_common()])
+    c.executemany('INSERT INTO topics (name, mention_count) VALUES (?, ?)', topic_counts.most_common())
+    c.execute('''
+        INSERT INTO relationships (entity1, entity2, strength)
+        SELECT entity, neighbor, strength FROM graph_adjacency
+        WHERE entity < neighbor
+        ORDER BY strength DESC, entity, neighbor LIMIT 50
+    ''')  # Top 50 relationships; the full graph is in graph_adjacency
+
     return {
         'entities': len(entity_counts),
         'topics': len(topic_counts),
-        'relationships': len(rel_counts)
+        'relationships': count_relationships(c)
     }
 
-def get_graph_data():
-    """Get knowledge graph data for visualization."""
+def count_relationships(c):
+    return c.execute('SELECT COUNT(*) FROM graph_adjacency WHERE entity < neighbor').fetchone()[0]
+
+def graph_extractor(window=DEFAULT_WINDOW):
+    """Picklable per-file extractor for corpus.process()."""
+    return partial(extract_file, window=window)
+
+def _params(window):
+    return f'window={window}'
+
+def pending_files(files, window=DEFAULT_WINDOW, full=False):
+    """Files the next build_graph() call will re-extract."""
+    init_db()
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        stored = conn.execute("SELECT value FROM graph_config WHERE key = 'params'").fetchone()
+        if full or stored is None or stored[0] != _params(window):
+            return list(files)
+        known = {row[0]: (row[1], row[2]) for row in conn.execute(
+            'SELECT source_file, mtime_ns, size FROM graph_files')}
+        return [f for f in files if known.get(f.source_file) != (f.mtime_ns, f.size)]
+    finally:
+        conn.close()
+
+def build_graph(full=False, window=DEFAULT_WINDOW, files=None, parsed=None, workers=None):
+    """Build the knowledge graph from memory files, re-extracting only files that
+    changed since the last build (all of them with full=True, or when the
+    co-occurrence window changed). Extraction runs across worker processes
+    when many files changed. `files` and `parsed` let a caller share one
+    corpus walk and parse with the health scanner."""
+    files = corpus.walk(MEMORY_MD, MEMORY_DIR) if files is None else files
+    changed = pending_files(files, window, full)
+    parsed = dict(parsed or {})
+    missing = [f for f in changed if 'graph' not in parsed.get(f.source_file, {})]
+    parsed.update(corpus.process([(f, ['graph']) for f in missing], {'graph': graph_extractor(window)}, workers))
+
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    
+    known = {row[0] for row in c.execute('SELECT source_file FROM graph_files')}
+    stored = c.execute("SELECT value FROM graph_config WHERE key = 'params'").fetchone()
+    if full or stored is None or stored[0] != _params(window):
+        full = True
+        c.execute("INSERT OR REPLACE INTO graph_config (key, value) VALUES ('params', ?)", (_params(window),))
+    edges = None if full else Counter()  # A full build recreates the adjacency table instead
+
+    counts = {'processed': 0, 'unchanged': len(files) - len(changed), 'removed': 0}
+    for f in changed:
+        store_contribution(c, f.source_file, parsed[f.source_file]['graph'], edges)
+        c.execute('INSERT OR REPLACE INTO graph_files (source_file, mtime_ns, size) VALUES (?, ?, ?)',
+                  (f.source_file, f.mtime_ns, f.size))
+        counts['processed'] += 1
+
+    for source_file in known - {f.source_file for f in files}:
+        store_contribution(c, source_file, None, edges)
+        c.execute('DELETE FROM graph_files WHERE source_file = ?', (source_file,))
+        counts['removed'] += 1
+
+    # Graph rows are rebuilt only when some contribution changed.
+    if counts['processed'] or counts['removed'] or full:
+        if full:
+            graph_query.rebuild_adjacency(c)
+        else:
+            graph_query.apply_edge_delta(c, edges)
+        result = aggregate_graph(c)
+        result['rank_iterations'] = graph_query.update_rank(c)
+        graph_query.bump_version(c)
+    else:
+        result = {
+            'entities': c.execute('SELECT COUNT(*) FROM entities').fetchone()[0],
+            'topics': c.execute('SELECT COUNT(*) FROM topics').fetchone()[0],
+            'relationships': count_relationships(c)
+        }
+
+    conn.commit()
+    conn.close()
+
+    result['files'] = counts
+    return result
+
+def get_graph_data():
+    """Get knowledge graph data for visualization (cached until the graph changes)."""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return graph_query.cached(conn, 'graph_data', lambda: _graph_data(conn.cursor()))
+    finally:
+        conn.close()
+
+def _graph_data(c):
     # Get top entities
     c.execute('SELECT name, type, mention_count FROM entities ORDER BY mention_count DESC LIMIT 30')
     entities = [{'name': r[0], 'type': r[1], 'mentions': r[2]} for r in c.fetchall()]
@@ -245,8 +387,6 @@ def get_graph_data():
     c.execute('SELECT entity1, entity2, strength FROM relationships ORDER BY strength DESC LIMIT 50')
     relationships = [{'source': r[0], 'target': r[1], 'strength': r[2]} for r in c.fetchall()]
     
-    conn.close()
-    
     return {
         'entities': entities,
         'topics': topics,
@@ -259,17 +399,31 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: knowledge_graph.py <command>")
         print("Commands:")
-        print("  build    - Build knowledge graph from memory files")
-        print("  entities - List top entities")
-        print("  topics   - List topics")
-        print("  json     - Output graph data as JSON")
+        print("  build [--full] [--window N] [--workers N]")
+        print("                 - Build knowledge graph from memory files (only changed")
+        print("                   files are re-read; --full re-reads all; --window N relates")
+        print("                   entities up to N paragraphs apart, default 1)")
+        print("  entities       - List top entities")
+        print("  topics         - List topics")
+        print("  json           - Output graph data as JSON")
+        print("  related <entity> [--hops N]")
+        print("                 - Entities within N relationships (default 2), as JSON")
+        print("  path <from> <to>")
+        print("                 - Shortest chain of relationships between two entities")
+        print("  central [N]    - Most central entities by PageRank")
         return
     
     cmd = sys.argv[1]
     
     if cmd == 'build':
-        result = build_graph()
+        window = DEFAULT_WINDOW
+        if '--window' in sys.argv:
+            window = int(sys.argv[sys.argv.index('--window') + 1])
+        workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else None
+        result = build_graph(full='--full' in sys.argv, window=window, workers=workers)
+        files = result['files']
         print(f"Knowledge graph built:")
+        print(f"  Files: {files['processed']} processed, {files['unchanged']} unchanged, {files['removed']} removed")
         print(f"  Entities: {result['entities']}")
         print(f"  Topics: {result['topics']}")
         print(f"  Relationships: {result['relationships']}")
@@ -293,6 +447,26 @@ def main():
         data = get_graph_data()
         print(json.dumps(data))
     
+    elif cmd in ('related', 'path', 'central'):
+        init_db()
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            if cmd == 'related' and len(sys.argv) > 2:
+                hops = int(sys.argv[sys.argv.index('--hops') + 1]) if '--hops' in sys.argv else 2
+                result = graph_query.k_hop(conn, sys.argv[2], k=hops)
+                print(json.dumps(result, indent=2) if result else f"Unknown entity: {sys.argv[2]}")
+            elif cmd == 'path' and len(sys.argv) > 3:
+                path = graph_query.shortest_path(conn, sys.argv[2], sys.argv[3])
+                print(' -> '.join(path) if path else f"No path between {sys.argv[2]} and {sys.argv[3]}")
+            elif cmd == 'central':
+                limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+                for e in graph_query.central_entities(conn, limit):
+                    print(f"  {e['name']}: {e['rank']}")
+            else:
+                print(f"Missing arguments for {cmd}")
+        finally:
+            conn.close()
+    
     else:
         print(f"Unknown command: {cmd}")
 
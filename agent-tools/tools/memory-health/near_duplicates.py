@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for memory facts.
+
+Exact duplicates share a content hash; a fact reworded slightly ("We use
+blue/green deploys" vs "we deploy blue-green") does not. Each fact is turned
+into character shingles and a MinHash signature, whose agreement estimates
+the Jaccard similarity of two facts. Signatures are split into LSH bands:
+facts that share any band bucket become candidates, and only candidates are
+compared, so checking a new fact costs a few indexed lookups instead of a
+pass over every stored fact.
+
+Facts are grouped by content hash first (exact copies are the duplicate
+report's job), and each distinct text joins the cluster of the most similar
+representative text, if one is at least `threshold` similar; otherwise it
+becomes a representative itself. Only representatives are bucketed, so a new
+text is compared with a handful of representatives rather than with every
+similar text, and every member of a reported cluster is within the threshold
+of its representative.
+
+Signatures and cluster assignments are stored next to memory_facts. A scan
+only signs and assigns texts that are new, and re-assigns the members of a
+cluster whose representative disappeared.
+
+NumPy is optional. Without it, signatures are computed in pure Python.
+"""
+
+import operator
+import random
+import re
+import zlib
+from array import array
+from hashlib import blake2b
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.7
+PRIME = 4294967291  # largest prime below 2**32, so a*x + b fits in 64 bits
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+_rng = random.Random(42)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+if np is not None:
+    _A = np.array([p[0] for p in PERMUTATIONS], dtype=np.uint64)[:, None]
+    _B = np.array([p[1] for p in PERMUTATIONS], dtype=np.uint64)[:, None]
+
+SCHEMA = [
+    # Tables from the per-fact layout, which compared every similar pair
+    'DROP TRIGGER IF EXISTS memory_facts_lsh_ad',
+    'DROP TABLE IF EXISTS fact_signatures',
+    'DROP TABLE IF EXISTS near_duplicate_pairs',
+    'DROP INDEX IF EXISTS idx_lsh_buckets_fact',
+    '''
+    CREATE TABLE IF NOT EXISTS near_duplicate_texts (
+        content_hash TEXT PRIMARY KEY,
+        signature BLOB NOT NULL,
+        representative TEXT,
+        similarity REAL
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_near_duplicate_texts_rep ON near_duplicate_texts(representative)',
+    '''
+    CREATE TABLE IF NOT EXISTS lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        content_hash TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets(band, bucket)',
+    'CREATE INDEX IF NOT EXISTS idx_lsh_buckets_hash ON lsh_buckets(content_hash)',
+    '''
+    CREATE TABLE IF NOT EXISTS lsh_config (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    ''',
+]
+
+def init_schema(c):
+    """Create the near-duplicate tables."""
+    if c.execute("SELECT 1 FROM pragma_table_info('lsh_buckets') WHERE name = 'fact_id'").fetchone():
+        c.execute('DROP TABLE lsh_buckets')
+    for statement in SCHEMA:
+        c.execute(statement)
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) whose S-curve midpoint (1/bands)**(1/rows) is closest to threshold."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+def shingles(text, k=SHINGLE_SIZE):
+    """Character k-grams of the normalised text (lowercased words joined by single spaces)."""
+    normalised = ' '.join(WORD_PATTERN.findall(text.lower()))
+    if len(normalised) <= k:
+        return {normalised} if normalised else set()
+    return {normalised[i:i + k] for i in range(len(normalised) - k + 1)}
+
+def _shingle_hashes(text):
+    return [zlib.crc32(s.encode('utf-8')) for s in shingles(text)] or [0]
+
+def signature(text):
+    """MinHash signature of text as array('I') of NUM_PERM values."""
+    hashes = _shingle_hashes(text)
+    if np is not None:
+        x = np.array(hashes, dtype=np.uint64)
+        mins = ((_A * x + _B) % np.uint64(PRIME)).min(axis=1)
+        return array('I', mins.astype(np.uint32).tobytes())
+    return array('I', [min((a * x + b) % PRIME for x in hashes) for a, b in PERMUTATIONS])
+
+def signatures(texts, batch_size=512):
+    """Signatures of many texts, in order. With NumPy, each batch of texts is
+    permuted as one matrix and reduced per text, instead of one small matrix
+    per text."""
+    if np is None:
+        for text in texts:
+            yield signature(text)
+        return
+    texts = list(texts)
+    for start in range(0, len(texts), batch_size):
+        hashed = [_shingle_hashes(text) for text in texts[start:start + batch_size]]
+        lengths = [len(h) for h in hashed]
+        x = np.fromiter(chain.from_iterable(hashed), dtype=np.uint64, count=sum(lengths))
+        offsets = np.cumsum([0] + lengths[:-1])
+        mins = np.minimum.reduceat((_A * x + _B) % np.uint64(PRIME), offsets, axis=1)
+        for column in mins.T.astype(np.uint32):
+            yield array('I', column.tobytes())
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: the fraction of MinHash values that agree."""
+    if np is not None:
+        agree = np.frombuffer(sig_a, dtype=np.uint32) == np.frombuffer(sig_b, dtype=np.uint32)
+        return int(np.count_nonzero(agree)) / len(sig_a)
+    return sum(map(operator.eq, sig_a, sig_b)) / len(sig_a)
+
+def band_buckets(sig, bands, rows):
+    """(band, bucket) keys of a signature; bucket is a 64-bit hash of the band's rows."""
+    keys = []
+    for band in range(bands):
+        chunk = sig[band * rows:(band + 1) * rows].tobytes()
+        keys.append((band, int.from_bytes(blake2b(chunk, digest_size=8).digest(), 'big', signed=True)))
+    return keys
+
+def _load_signature(blob):
+    sig = array('I')
+    sig.frombytes(blob)
+    return sig
+
+def _drop_texts(c, hashes):
+    """Forget texts, sending the members of any cluster they represented back for re-assignment."""
+    rows = [(h,) for h in hashes]
+    c.executemany('DELETE FROM near_duplicate_texts WHERE content_hash = ?', rows)
+    c.executemany('DELETE FROM lsh_buckets WHERE content_hash = ?', rows)
+    c.executemany('UPDATE near_duplicate_texts SET representative = NULL, similarity = NULL '
+                  'WHERE representative = ?', rows)
+
+def update_near_duplicates(conn, threshold=DEFAULT_THRESHOLD):
+    """Sign texts that have no signature yet and assign every unassigned text
+    to a cluster. Changing the threshold re-assigns the stored signatures.
+    Returns {'signed', 'assigned', 'removed'}."""
+    c = conn.cursor()
+    bands, rows = lsh_params(threshold)
+    config = f'{NUM_PERM}:{SHINGLE_SIZE}:{bands}x{rows}:{threshold}'
+    stored = c.execute("SELECT value FROM lsh_config WHERE key = 'params'").fetchone()
+    if stored is None or stored[0] != config:
+        if stored is None or not stored[0].startswith(f'{NUM_PERM}:{SHINGLE_SIZE}:'):
+            c.execute('DELETE FROM near_duplicate_texts')
+        c.execute('UPDATE near_duplicate_texts SET representative = NULL, similarity = NULL')
+        c.execute('DELETE FROM lsh_buckets')
+        c.execute("INSERT OR REPLACE INTO lsh_config (key, value) VALUES ('params', ?)", (config,))
+
+    removed = [row[0] for row in c.execute('''
+        SELECT content_hash FROM near_duplicate_texts t
+        WHERE NOT EXISTS (SELECT 1 FROM memory_facts f WHERE f.content_hash = t.content_hash)
+    ''').fetchall()]
+    _drop_texts(c, removed)
+
+    signed = c.execute('''
+        SELECT f.content_hash, MIN(f.content) FROM memory_facts f
+        WHERE NOT EXISTS (SELECT 1 FROM near_duplicate_texts t WHERE t.content_hash = f.content_hash)
+        GROUP BY f.content_hash
+    ''').fetchall()
+    c.executemany('INSERT INTO near_duplicate_texts (content_hash, signature) VALUES (?, ?)', zip(
+        (content_hash for content_hash, _ in signed),
+        (sig.tobytes() for sig in signatures(content for _, content in signed))))
+
+    # Oldest text first, so the earliest wording of a fact is the one others are measured against.
+    pending = c.execute('''
+        SELECT t.content_hash, t.signature FROM near_duplicate_texts t
+        JOIN memory_facts f ON f.content_hash = t.content_hash
+        WHERE t.representative IS NULL
+        GROUP BY t.content_hash ORDER BY MIN(f.id)
+    ''').fetchall()
+    representatives = {}
+    def signature_of(content_hash):
+        if content_hash not in representatives:
+            representatives[content_hash] = _load_signature(c.execute(
+                'SELECT signature FROM near_duplicate_texts WHERE content_hash = ?', (content_hash,)).fetchone()[0])
+        return representatives[content_hash]
+
+    assignments = []
+    lookup = 'SELECT DISTINCT content_hash FROM lsh_buckets WHERE ' + ' OR '.join(
+        ['(band = ? AND bucket = ?)'] * bands)
+    for content_hash, blob in pending:
+        sig = _load_signature(blob)
+        keys = band_buckets(sig, bands, rows)
+        best, best_score = content_hash, 1.0
+        scores = [(similarity(sig, signature_of(rep)), rep)
+                  for (rep,) in c.execute(lookup, [value for key in keys for value in key]).fetchall()]
+        if scores:
+            score, rep = max(scores)
+            if score >= threshold:
+                best, best_score = rep, round(score, 3)
+        if best == content_hash:
+            c.executemany('INSERT INTO lsh_buckets (band, bucket, content_hash) VALUES (?, ?, ?)',
+                          [(band, bucket, content_hash) for band, bucket in keys])
+            representatives[content_hash] = sig
+        assignments.append((best, best_score, content_hash))
+    c.executemany('UPDATE near_duplicate_texts SET representative = ?, similarity = ? WHERE content_hash = ?',
+                  assignments)
+    conn.commit()
+    return {'signed': len(signed), 'assigned': len(pending), 'removed': len(removed)}
+
+def load_clusters(conn, order_by='source_file, line_number'):
+    """Near-duplicate clusters, largest first: every fact whose text was
+    assigned to the same representative, with the lowest similarity of a
+    member to that representative. The representative's text is the first
+    sample."""
+    facts = conn.execute(f'''
+        SELECT t.representative, t.similarity, f.content_hash, f.source_file, f.line_number, f.content
+        FROM near_duplicate_texts t
+        JOIN memory_facts f ON f.content_hash = t.content_hash
+        WHERE t.representative IN (
+            SELECT representative FROM near_duplicate_texts
+            GROUP BY representative HAVING COUNT(*) > 1
+        )
+        ORDER BY {order_by}
+    ''').fetchall()
+    groups = {}
+    for rep, score, content_hash, source_file, line_number, content in facts:
+        groups.setdefault(rep, []).append((score, content_hash, source_file, line_number, content))
+
+    clusters = []
+    for rep, members in groups.items():
+        texts = {content_hash: content[:100] for _, content_hash, _, _, content in members}
+        samples = [texts.pop(rep)] + list(dict.fromkeys(texts.values()))
+        clusters.append({
+            'count': len(members),
+            'similarity': min(score for score, *_ in members),
+            'locations': [(source_file, line_number) for _, _, source_file, line_number, _ in members],
+            'samples': samples[:3]
+        })
+    clusters.sort(key=lambda cl: (-cl['count'], -cl['similarity']))
+    return clusters
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Retrieval logging for memory lookups.
+
+Logging happens on every memory lookup, so it stays off the critical path:
+one persistent WAL-mode connection per process, entries buffered in memory
+and written in batches: when the buffer fills, when its oldest entry has
+waited flush_interval seconds (a timer thread, so a process that stops
+logging still writes), at exit, or before stats are read. Each batch also updates hourly and daily rollup
+tables, so stats read a few hundred rollup rows instead of scanning the log.
+
+Usage:
+    from retrieval_log import log_retrieval, get_retrieval_stats
+    log_retrieval("deploy steps", results_count=5, snippets_used=2)
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent / "data" / "memory_health.db"
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0  # seconds an entry may wait in the buffer
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS retrieval_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        query TEXT,
+        results_count INTEGER,
+        snippets_used INTEGER,
+        relevance_score REAL,
+        session_key TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_retrieval_log_timestamp ON retrieval_log(timestamp)',
+] + [
+    f'''
+    CREATE TABLE IF NOT EXISTS retrieval_rollup_{period} (
+        bucket TEXT PRIMARY KEY,
+        queries INTEGER NOT NULL,
+        results_sum INTEGER NOT NULL,
+        snippets_sum INTEGER NOT NULL,
+        relevance_sum REAL NOT NULL,
+        relevance_count INTEGER NOT NULL
+    )
+    '''
+    for period in ('hourly', 'daily')
+]
+
+# Bucket keys are prefixes of the ISO timestamp: '2026-02-04T13' and '2026-02-04'
+PERIODS = {'hourly': 13, 'daily': 10}
+
+def init_schema(c):
+    """Create the log and rollup tables, backfilling rollups for a log that predates them."""
+    had_rollups = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'retrieval_rollup_daily'").fetchone()
+    for statement in SCHEMA:
+        c.execute(statement)
+    if not had_rollups:
+        rebuild_rollups(c)
+
+def rebuild_rollups(c):
+    """Recompute both rollup tables from the full log."""
+    for period, width in PERIODS.items():
+        c.execute(f'DELETE FROM retrieval_rollup_{period}')
+        c.execute(f'''
+            INSERT INTO retrieval_rollup_{period}
+            (bucket, queries, results_sum, snippets_sum, relevance_sum, relevance_count)
+            SELECT substr(timestamp, 1, {width}), COUNT(*), COALESCE(SUM(results_count), 0),
+                   COALESCE(SUM(snippets_used), 0), COALESCE(SUM(relevance_score), 0), COUNT(relevance_score)
+            FROM retrieval_log GROUP BY 1
+        ''')
+
+def _rollup_rows(entries, width):
+    buckets = defaultdict(lambda: [0, 0, 0, 0.0, 0])
+    for timestamp, _query, results_count, snippets_used, relevance_score, _session in entries:
+        b = buckets[timestamp[:width]]
+        b[0] += 1
+        b[1] += results_count or 0
+        b[2] += snippets_used or 0
+        if relevance_score is not None:
+            b[3] += relevance_score
+            b[4] += 1
+    return [(bucket, *values) for bucket, values in buckets.items()]
+
+class RetrievalLogger:
+    """Buffered retrieval log over one long-lived connection. Thread-safe."""
+
+    def __init__(self, db_path=DB_PATH, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = None
+        self._buffer = []
+        self._oldest = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                init_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def log(self, query, results_count, snippets_used, relevance_score=None, session_key=None):
+        entry = (datetime.now().isoformat(), query, results_count, snippets_used, relevance_score, session_key)
+        with self._lock:
+            self._buffer.append(entry)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_interval:
+                self._flush_locked()
+            elif self._timer is None:
+                # Writes the buffer flush_interval after its first entry even if no more arrive.
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write buffered entries and their rollups in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        entries, self._buffer, self._oldest = self._buffer, [], None
+        conn = self._connection()
+        with conn:
+            conn.executemany('''
+                INSERT INTO retrieval_log (timestamp, query, results_count, snippets_used, relevance_score, session_key)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', entries)
+            for period, width in PERIODS.items():
+                conn.executemany(f'''
+                    INSERT INTO retrieval_rollup_{period}
+                    (bucket, queries, results_sum, snippets_sum, relevance_sum, relevance_count)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (bucket) DO UPDATE SET
+                        queries = queries + excluded.queries,
+                        results_sum = results_sum + excluded.results_sum,
+                        snippets_sum = snippets_sum + excluded.snippets_sum,
+                        relevance_sum = relevance_sum + excluded.relevance_sum,
+                        relevance_count = relevance_count + excluded.relevance_count
+                ''', _rollup_rows(entries, width))
+
+    def stats(self, days=7):
+        """Averages over the last `days` days, from the hourly rollups."""
+        self.flush()
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()[:PERIODS['hourly']]
+        with self._lock:
+            row = self._connection().execute('''
+                SELECT SUM(queries), SUM(results_sum), SUM(snippets_sum), SUM(relevance_sum), SUM(relevance_count)
+                FROM retrieval_rollup_hourly WHERE bucket >= ?
+            ''', (cutoff,)).fetchone()
+        queries, results, snippets, relevance, relevance_count = row
+        queries = queries or 0
+        return {
+            'total_queries': queries,
+            'avg_results': round(results / queries, 1) if queries else 0,
+            'avg_snippets': round(snippets / queries, 1) if queries else 0,
+            'avg_relevance': round(relevance / relevance_count, 2) if relevance_count else None
+        }
+
+    def daily(self, days=30):
+        """Per-day totals for the last `days` days, oldest first."""
+        self.flush()
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()[:PERIODS['daily']]
+        with self._lock:
+            rows = self._connection().execute('''
+                SELECT bucket, queries, results_sum, snippets_sum, relevance_sum, relevance_count
+                FROM retrieval_rollup_daily WHERE bucket > ? ORDER BY bucket
+            ''', (cutoff,)).fetchall()
+        return [{
+            'date': bucket,
+            'queries': queries,
+            'avg_results': round(results / queries, 1) if queries else 0,
+            'avg_snippets': round(snippets / queries, 1) if queries else 0,
+            'avg_relevance': round(relevance / relevance_count, 2) if relevance_count else None
+        } for bucket, queries, results, snippets, relevance, relevance_count in rows]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+def get_logger(db_path=DB_PATH):
+    """The process-wide logger for a database, flushed and closed at exit."""
+    key = str(db_path)
+    with _loggers_lock:
+        if key not in _loggers:
+            _loggers[key] = RetrievalLogger(db_path)
+            atexit.register(_loggers[key].close)
+        return _loggers[key]
+
+def log_retrieval(query, results_count, snippets_used, relevance_score=None, session_key=None, db_path=DB_PATH):
+    """Log a memory retrieval operation (buffered)."""
+    get_logger(db_path).log(query, results_count, snippets_used, relevance_score, session_key)
+
+def get_retrieval_stats(days=7, db_path=DB_PATH):
+    """Retrieval statistics for the last `days` days."""
+    return get_logger(db_path).stats(days)
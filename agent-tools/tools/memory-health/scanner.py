@@ -16,10 +16,14 @@ from collections import defaultdict
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from _shared.dashclaw_push import push_to_api, load_config
+import corpus
+import near_duplicates
+import retrieval_log
 
 DB_PATH = Path(__file__).parent / "data" / "memory_health.db"
 MEMORY_DIR = Path(__file__).parent.parent.parent / "memory"
 MEMORY_MD = Path(__file__).parent.parent.parent / "MEMORY.md"
+SCAN_ORDER = "source_file != 'MEMORY.md', source_file, line_number"  # MEMORY.md, then daily files by date
 
 def init_db():
     """Initialize the database."""
@@ -62,24 +66,99 @@ def init_db():
         )
     ''')
     
+    _ensure_column(c, 'health_snapshots', 'near_duplicate_clusters', 'INTEGER')
+    _ensure_column(c, 'memory_facts', 'time_sensitive', 'INTEGER DEFAULT 0')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_memory_facts_hash ON memory_facts(content_hash)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_memory_facts_source ON memory_facts(source_file)')
+    near_duplicates.init_schema(c)
+
+    # One row per scanned file, so unchanged files are skipped on the next scan
     c.execute('''
-        CREATE TABLE IF NOT EXISTS retrieval_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            query TEXT,
-            results_count INTEGER,
-            snippets_used INTEGER,
-            relevance_score REAL,
-            session_key TEXT
+        CREATE TABLE IF NOT EXISTS file_manifest (
+            source_file TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            line_count INTEGER NOT NULL,
+            size_kb REAL NOT NULL,
+            scanned_at TEXT NOT NULL
         )
     ''')
     
+    retrieval_log.init_schema(c)
+    
     conn.commit()
     conn.close()
     print(f"[OK] Database initialized: {DB_PATH}")
 
-def scan_memory_files():
-    """Scan all memory files and extract metrics."""
+def _ensure_column(c, table, column, decl):
+    """Add a column to a table created by an older version of this tool."""
+    columns = {row[1] for row in c.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        c.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+
+def pending_files(conn, files):
+    """Files whose mtime or size differ from file_manifest (new files included)."""
+    manifest = {row[0]: (row[1], row[2]) for row in conn.execute(
+        'SELECT source_file, mtime_ns, size FROM file_manifest')}
+    return [f for f in files if manifest.get(f.source_file) != (f.mtime_ns, f.size)]
+
+def parse_file(content, source_file):
+    """Everything a scan needs from one file. Runs in corpus worker processes."""
+    encoded = content.encode('utf-8')
+    facts = list(iter_facts(content, source_file))
+    for fact in facts:
+        fact['time_sensitive'] = 1 if is_time_sensitive(fact['content']) else 0
+    return {
+        'content_hash': hashlib.sha1(encoded).hexdigest(),
+        'line_count': len(content.splitlines()),
+        'size_kb': len(encoded) / 1024,
+        'facts': facts
+    }
+
+def scan_memory_files(conn, files=None, parsed=None, workers=None):
+    """Scan memory files, re-parsing only the ones that changed since the last scan.
+
+    Files whose mtime and size match file_manifest are not read at all. Other
+    files are parsed (across worker processes when there are many), and their
+    facts in memory_facts are replaced only when the content actually changed.
+    Files that disappeared lose their facts. `files` and `parsed` let a caller
+    share one corpus walk and parse with the knowledge graph.
+    Returns (stats, changes).
+    """
+    c = conn.cursor()
+    files = corpus.walk(MEMORY_MD, MEMORY_DIR) if files is None else files
+    hashes = dict(c.execute('SELECT source_file, content_hash FROM file_manifest'))
+    now = datetime.now().isoformat()
+    changed = pending_files(conn, files)
+    changes = {'parsed': 0, 'unchanged': len(files) - len(changed), 'removed': 0, 'hashes': set()}
+
+    parsed = dict(parsed or {})
+    missing = [f for f in changed if 'scan' not in parsed.get(f.source_file, {})]
+    parsed.update(corpus.process([(f, ['scan']) for f in missing], {'scan': parse_file}, workers))
+
+    for f in changed:
+        result = parsed[f.source_file]['scan']
+        if hashes.get(f.source_file) == result['content_hash']:
+            changes['unchanged'] += 1  # touched, not edited
+        else:
+            changes['hashes'].update(store_facts(c, f.source_file, result['facts'], now))
+            changes['parsed'] += 1
+        c.execute('''
+            INSERT OR REPLACE INTO file_manifest
+            (source_file, mtime_ns, size, content_hash, line_count, size_kb, scanned_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (f.source_file, f.mtime_ns, f.size, result['content_hash'],
+              result['line_count'], result['size_kb'], now))
+
+    seen = {f.source_file for f in files}
+    for source_file in hashes:
+        if source_file not in seen:
+            changes['hashes'].update(store_facts(c, source_file, [], now))
+            c.execute('DELETE FROM file_manifest WHERE source_file = ?', (source_file,))
+            changes['removed'] += 1
+    conn.commit()
+
     stats = {
         'total_files': 0,
         'total_lines': 0,
@@ -88,48 +167,116 @@ def scan_memory_files():
         'memory_md_size_kb': 0,
         'oldest_daily': None,
         'newest_daily': None,
-        'daily_files': [],
-        'all_content': []
+        'daily_files': []
     }
-    
-    # Scan MEMORY.md
-    if MEMORY_MD.exists():
-        content = MEMORY_MD.read_text(encoding='utf-8', errors='ignore')
-        stats['memory_md_lines'] = len(content.splitlines())
-        stats['memory_md_size_kb'] = len(content.encode('utf-8')) / 1024
+    for source_file, line_count, size_kb in c.execute(
+            'SELECT source_file, line_count, size_kb FROM file_manifest'):
         stats['total_files'] += 1
-        stats['total_lines'] += stats['memory_md_lines']
-        stats['total_size_kb'] += stats['memory_md_size_kb']
-        stats['all_content'].append(('MEMORY.md', content))
-    
-    # Scan daily memory files
-    if MEMORY_DIR.exists():
-        for f in MEMORY_DIR.glob('*.md'):
-            if f.name.startswith('20'):  # Daily files like 2026-02-04.md
-                stats['daily_files'].append(f.name)
-                content = f.read_text(encoding='utf-8', errors='ignore')
-                lines = len(content.splitlines())
-                size_kb = len(content.encode('utf-8')) / 1024
-                
-                stats['total_files'] += 1
-                stats['total_lines'] += lines
-                stats['total_size_kb'] += size_kb
-                stats['all_content'].append((f.name, content))
-    
+        stats['total_lines'] += line_count
+        stats['total_size_kb'] += size_kb
+        if source_file == 'MEMORY.md':
+            stats['memory_md_lines'] = line_count
+            stats['memory_md_size_kb'] = size_kb
+        else:
+            stats['daily_files'].append(source_file)
+
     # Find oldest and newest daily files
     if stats['daily_files']:
         stats['daily_files'].sort()
         stats['oldest_daily'] = stats['daily_files'][0]
         stats['newest_daily'] = stats['daily_files'][-1]
-    
-    return stats
 
-def extract_facts(content, source_file):
-    """Extract individual facts/statements from content."""
-    facts = []
-    lines = content.splitlines()
-    
-    for i, line in enumerate(lines):
+    return stats, changes
+
+def store_facts(c, source_file, facts, timestamp):
+    """Replace the stored facts of one file. Returns the content hashes whose
+    duplicate status may have changed (old and new)."""
+    hashes = {row[0] for row in c.execute(
+        'SELECT content_hash FROM memory_facts WHERE source_file = ?', (source_file,))}
+    c.execute('DELETE FROM memory_facts WHERE source_file = ?', (source_file,))
+
+    def rows():
+        for f in facts:
+            hashes.add(f['content_hash'])
+            yield (timestamp, f['source_file'], f['line_number'], f['content'], f['content_hash'],
+                   f['time_sensitive'])
+
+    c.executemany('''
+        INSERT INTO memory_facts (timestamp, source_file, line_number, content, content_hash, time_sensitive)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', rows())
+    return hashes
+
+def refresh_fact_flags(conn, hashes, stale_days=30):
+    """Update is_duplicate for the changed content hashes and age/is_stale for
+    time-sensitive facts, in SQL, without re-reading any file."""
+    c = conn.cursor()
+    c.execute('CREATE TEMP TABLE IF NOT EXISTS changed_hashes (content_hash TEXT PRIMARY KEY)')
+    c.execute('DELETE FROM changed_hashes')
+    c.executemany('INSERT OR IGNORE INTO changed_hashes VALUES (?)', [(h,) for h in hashes])
+    c.execute('''
+        UPDATE memory_facts
+        SET is_duplicate = (SELECT COUNT(*) FROM memory_facts m WHERE m.content_hash = memory_facts.content_hash) > 1
+        WHERE content_hash IN (SELECT content_hash FROM changed_hashes)
+    ''')
+    # Ages grow every day, so staleness is re-derived from the file date in each scan.
+    c.execute('''
+        UPDATE memory_facts
+        SET age_days = CAST(julianday('now', 'localtime') - julianday(substr(source_file, 1, 10)) AS INTEGER)
+        WHERE source_file LIKE '20%'
+    ''')
+    c.execute('''
+        UPDATE memory_facts
+        SET is_stale = COALESCE(age_days > ?, 0)
+        WHERE time_sensitive = 1
+    ''', (stale_days,))
+    conn.commit()
+
+def load_duplicates(conn):
+    """Duplicate groups from memory_facts, in the format of detect_duplicates()."""
+    groups = {}
+    for content_hash, source_file, line_number, content in conn.execute(f'''
+        SELECT content_hash, source_file, line_number, content FROM memory_facts
+        WHERE is_duplicate = 1 ORDER BY {SCAN_ORDER}
+    '''):
+        group = groups.setdefault(content_hash, {'hash': content_hash, 'count': 0, 'locations': [], 'sample': content[:100]})
+        group['count'] += 1
+        group['locations'].append((source_file, line_number))
+    return list(groups.values())
+
+def load_stale_facts(conn):
+    """Stale facts from memory_facts, in the format of detect_stale_facts()."""
+    return [
+        {
+            'source': source_file,
+            'line': line_number,
+            'age_days': age_days,
+            'content': content[:100],
+            'reason': 'Time-sensitive language in old file'
+        }
+        for source_file, line_number, age_days, content in conn.execute(f'''
+            SELECT source_file, line_number, age_days, content FROM memory_facts
+            WHERE is_stale = 1 ORDER BY {SCAN_ORDER}
+        ''')
+    ]
+
+# Patterns that suggest time-sensitive info
+TIME_PATTERNS = [
+    r'today|tomorrow|yesterday|this week|next week',
+    r'currently|now|at the moment|right now',
+    r'will|going to|planning to|about to',
+    r'\d{4}-\d{2}-\d{2}',  # Dates
+]
+# One alternation, matched against lowercased text (cheaper than re.IGNORECASE)
+TIME_SENSITIVE = re.compile(r'\b(?:' + '|'.join(TIME_PATTERNS) + r')\b')
+
+def is_time_sensitive(content):
+    """Whether a fact uses language that goes stale as its file ages."""
+    return TIME_SENSITIVE.search(content.lower()) is not None
+
+def iter_facts(content, source_file):
+    """Yield individual facts/statements from content."""
+    for i, line in enumerate(content.splitlines()):
         line = line.strip()
         # Skip empty lines, headers, and very short lines
         if not line or line.startswith('#') or len(line) < 20:
@@ -138,14 +285,16 @@ def extract_facts(content, source_file):
         if line.startswith('```') or line.startswith('   '):
             continue
             
-        facts.append({
+        yield {
             'source_file': source_file,
             'line_number': i + 1,
             'content': line[:500],  # Truncate long lines
             'content_hash': hashlib.md5(line.lower().encode()).hexdigest()[:16]
-        })
-    
-    return facts
+        }
+
+def extract_facts(content, source_file):
+    """Extract individual facts/statements from content."""
+    return list(iter_facts(content, source_file))
 
 def detect_duplicates(facts):
     """Find potential duplicate content across memory files."""
@@ -166,41 +315,40 @@ def detect_duplicates(facts):
     
     return duplicates
 
+def iter_stale_facts(facts, stale_days=30, today=None):
+    """Yield facts that might be outdated, one at a time, from any iterable of facts.
+
+    The date of each daily file is parsed once, and a fact from a file that is
+    not old enough is skipped before the time-sensitive regex runs.
+    """
+    today = today or datetime.now()
+    ages = {}  # source_file -> age in days, or None when not a dated daily file
+    search = TIME_SENSITIVE.search
+
+    for fact in facts:
+        source = fact['source_file']
+        if source not in ages:
+            ages[source] = None
+            if source.startswith('20'):
+                try:
+                    ages[source] = (today - datetime.strptime(source[:10], '%Y-%m-%d')).days
+                except ValueError:
+                    pass
+        age = ages[source]
+        # Only old daily files with time-sensitive language
+        if age is None or age <= stale_days or search(fact['content'].lower()) is None:
+            continue
+        yield {
+            'source': source,
+            'line': fact['line_number'],
+            'age_days': age,
+            'content': fact['content'][:100],
+            'reason': 'Time-sensitive language in old file'
+        }
+
 def detect_stale_facts(facts, stale_days=30):
     """Identify facts that might be outdated."""
-    stale = []
-    today = datetime.now()
-    
-    # Patterns that suggest time-sensitive info
-    time_patterns = [
-        r'\b(today|tomorrow|yesterday|this week|next week)\b',
-        r'\b(currently|now|at the moment|right now)\b',
-        r'\b(will|going to|planning to|about to)\b',
-        r'\b\d{4}-\d{2}-\d{2}\b',  # Dates
-    ]
-    
-    for fact in facts:
-        # Check if from an old daily file
-        if fact['source_file'].startswith('20'):
-            try:
-                file_date = datetime.strptime(fact['source_file'][:10], '%Y-%m-%d')
-                age = (today - file_date).days
-                if age > stale_days:
-                    # Check if content has time-sensitive language
-                    for pattern in time_patterns:
-                        if re.search(pattern, fact['content'], re.IGNORECASE):
-                            stale.append({
-                                'source': fact['source_file'],
-                                'line': fact['line_number'],
-                                'age_days': age,
-                                'content': fact['content'][:100],
-                                'reason': 'Time-sensitive language in old file'
-                            })
-                            break
-            except ValueError:
-                pass
-    
-    return stale
+    return list(iter_stale_facts(facts, stale_days))
 
 def calculate_health_score(stats, duplicates, stale):
     """Calculate overall memory health score (0-100)."""
@@ -234,7 +382,7 @@ def calculate_health_score(stats, duplicates, stale):
     
     return max(0, min(100, score))
 
-def store_health_snapshot(stats, duplicates, stale, health_score):
+def store_health_snapshot(stats, duplicates, stale, health_score, near_duplicate_clusters=()):
     """Store health metrics in database."""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -243,8 +391,8 @@ def store_health_snapshot(stats, duplicates, stale, health_score):
         INSERT INTO health_snapshots 
         (timestamp, total_files, total_lines, total_size_kb, memory_md_lines, memory_md_size_kb,
          oldest_daily_file, newest_daily_file, days_with_notes, avg_lines_per_day,
-         potential_duplicates, stale_facts_count, health_score)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+         potential_duplicates, stale_facts_count, health_score, near_duplicate_clusters)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', (
         datetime.now().isoformat(),
         stats['total_files'],
@@ -258,74 +406,64 @@ def store_health_snapshot(stats, duplicates, stale, health_score):
         round(stats['total_lines'] / max(1, len(stats['daily_files'])), 1),
         len(duplicates),
         len(stale),
-        health_score
+        health_score,
+        len(near_duplicate_clusters)
     ))
     
     conn.commit()
     conn.close()
 
 def log_retrieval(query, results_count, snippets_used, relevance_score=None, session_key=None):
-    """Log a memory retrieval operation."""
-    init_db()
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    c.execute('''
-        INSERT INTO retrieval_log (timestamp, query, results_count, snippets_used, relevance_score, session_key)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (datetime.now().isoformat(), query, results_count, snippets_used, relevance_score, session_key))
-    
-    conn.commit()
-    conn.close()
+    """Log a memory retrieval operation (buffered; see retrieval_log)."""
+    retrieval_log.log_retrieval(query, results_count, snippets_used, relevance_score, session_key, db_path=DB_PATH)
 
-def get_retrieval_stats():
+def get_retrieval_stats(days=7):
     """Get retrieval statistics."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    c.execute('''
-        SELECT 
-            COUNT(*) as total_queries,
-            AVG(results_count) as avg_results,
-            AVG(snippets_used) as avg_snippets,
-            AVG(relevance_score) as avg_relevance
-        FROM retrieval_log
-        WHERE timestamp > datetime('now', '-7 days')
-    ''')
-    
-    row = c.fetchone()
-    conn.close()
-    
-    return {
-        'total_queries': row[0] or 0,
-        'avg_results': round(row[1] or 0, 1),
-        'avg_snippets': round(row[2] or 0, 1),
-        'avg_relevance': round(row[3] or 0, 2) if row[3] else None
-    }
+    return retrieval_log.get_retrieval_stats(days, db_path=DB_PATH)
 
-def run_full_scan():
-    """Run a complete memory health scan."""
+def run_full_scan(near_dup_threshold=near_duplicates.DEFAULT_THRESHOLD, workers=None, graph=False):
+    """Run a complete memory health scan. With graph=True the knowledge graph is
+    rebuilt in the same pass, sharing the file walk and the worker pool."""
     init_db()
     
-    print("Scanning memory files...")
-    stats = scan_memory_files()
-    
-    print("Extracting facts...")
-    all_facts = []
-    for source, content in stats['all_content']:
-        all_facts.extend(extract_facts(content, source))
-    
-    print("Detecting duplicates...")
-    duplicates = detect_duplicates(all_facts)
-    
-    print("Detecting stale content...")
-    stale = detect_stale_facts(all_facts)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        print("Scanning memory files...")
+        files = corpus.walk(MEMORY_MD, MEMORY_DIR)
+        parsed = None
+        if graph:
+            import knowledge_graph
+            extractors = {'scan': parse_file, 'graph': knowledge_graph.graph_extractor()}
+            needs = {f.source_file: ['scan'] for f in pending_files(conn, files)}
+            for f in knowledge_graph.pending_files(files):
+                needs.setdefault(f.source_file, []).append('graph')
+            parsed = corpus.process([(f, needs[f.source_file]) for f in files if f.source_file in needs],
+                                    extractors, workers)
+        stats, changes = scan_memory_files(conn, files, parsed, workers)
+        print(f"  {changes['parsed']} re-parsed, {changes['unchanged']} unchanged, {changes['removed']} removed")
+        if graph:
+            result = knowledge_graph.build_graph(files=files, parsed=parsed, workers=workers)
+            print(f"  Knowledge graph: {result['entities']} entities, {result['relationships']} relationships")
+
+        print("Detecting duplicates...")
+        refresh_fact_flags(conn, changes['hashes'])
+        duplicates = load_duplicates(conn)
+
+        print("Detecting near-duplicates...")
+        near = near_duplicates.update_near_duplicates(conn, near_dup_threshold)
+        print(f"  {near['signed']} new texts signed, {near['assigned']} assigned to clusters")
+        clusters = near_duplicates.load_clusters(conn, order_by=SCAN_ORDER)
+
+        print("Detecting stale content...")
+        stale = load_stale_facts(conn)
+    finally:
+        conn.close()
     
     print("Calculating health score...")
     health_score = calculate_health_score(stats, duplicates, stale)
     
     print("Storing snapshot...")
-    store_health_snapshot(stats, duplicates, stale, health_score)
+    store_health_snapshot(stats, duplicates, stale, health_score, clusters)
     
     return {
         'health_score': health_score,
@@ -338,6 +476,8 @@ def run_full_scan():
         'newest_daily': stats['newest_daily'],
         'duplicates': len(duplicates),
         'duplicate_details': duplicates[:5],  # Top 5
+        'near_duplicates': len(clusters),
+        'near_duplicate_details': clusters[:5],  # Largest 5
         'stale_count': len(stale),
         'stale_details': stale[:5],  # Top 5
         'timestamp': datetime.now().isoformat()
@@ -365,7 +505,8 @@ def get_latest_health():
             'avg_lines_per_day': row[10],
             'duplicates': row[11],
             'stale_count': row[12],
-            'health_score': row[14]
+            'health_score': row[14],
+            'near_duplicates': row[15] if len(row) > 15 else None
         }
     return None
 
@@ -373,16 +514,25 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: scanner.py <command>")
         print("Commands:")
-        print("  scan [--push]  - Run full health scan (--push syncs to DashClaw)")
+        print("  scan [--push] [--threshold 0.7] [--workers N] [--graph]")
+        print("                 - Run full health scan (--push syncs to DashClaw,")
+        print("                   --threshold sets near-duplicate similarity,")
+        print("                   --workers caps parser processes (default: all cores),")
+        print("                   --graph also rebuilds the knowledge graph in the same pass)")
         print("  latest         - Show latest health snapshot")
         print("  json           - Output latest as JSON (for API)")
-        print("  retrieval      - Show retrieval stats")
+        print("  retrieval [--daily N]")
+        print("                 - Show retrieval stats (--daily adds per-day totals for N days)")
         return
     
     cmd = sys.argv[1]
     
     if cmd == 'scan':
-        result = run_full_scan()
+        threshold = near_duplicates.DEFAULT_THRESHOLD
+        if '--threshold' in sys.argv:
+            threshold = float(sys.argv[sys.argv.index('--threshold') + 1])
+        workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else None
+        result = run_full_scan(threshold, workers=workers, graph='--graph' in sys.argv)
         print(f"\n=== Memory Health Report ===")
         print(f"Health Score: {result['health_score']}/100")
         print(f"Total Files: {result['total_files']}")
@@ -390,6 +540,7 @@ def main():
         print(f"MEMORY.md: {result['memory_md_lines']} lines")
         print(f"Daily Files: {result['daily_files']} ({result['oldest_daily']} to {result['newest_daily']})")
         print(f"Potential Duplicates: {result['duplicates']}")
+        print(f"Near-Duplicate Clusters: {result['near_duplicates']}")
         print(f"Stale Facts: {result['stale_count']}")
 
         if result['duplicate_details']:
@@ -397,6 +548,11 @@ def main():
             for d in result['duplicate_details'][:3]:
                 print(f"  - '{d['sample']}...' ({d['count']}x)")
 
+        if result['near_duplicate_details']:
+            print(f"\nNear-Duplicates:")
+            for cl in result['near_duplicate_details'][:3]:
+                print(f"  - '{cl['samples'][0]}...' ({cl['count']}x, each >= {cl['similarity']} similar to it)")
+
         if result['stale_details']:
             print(f"\nStale Content:")
             for s in result['stale_details'][:3]:
@@ -439,8 +595,10 @@ def main():
         }))
     
     elif cmd == 'retrieval':
-        init_db()
         stats = get_retrieval_stats()
+        if '--daily' in sys.argv:
+            days = int(sys.argv[sys.argv.index('--daily') + 1])
+            stats['daily'] = retrieval_log.get_logger(DB_PATH).daily(days)
         print(json.dumps(stats, indent=2))
     
     else:
@@ -0,0 +1,60 @@
+import pathlib
+import random
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from aho_corasick import Automaton  # noqa: E402
+
+
+def naive(patterns, text):
+    return [p for p in dict.fromkeys(patterns) if p and p in text]
+
+
+class AutomatonTests(unittest.TestCase):
+    def test_overlapping_patterns(self):
+        automaton = Automaton(['he', 'she', 'his', 'hers'])
+
+        self.assertEqual(automaton.find('ushers'), ['he', 'she', 'hers'])
+        self.assertEqual(automaton.find('ahishers'), ['he', 'she', 'his', 'hers'])
+        self.assertEqual(automaton.find('hi'), [])
+
+    def test_nested_prefixes_and_suffixes(self):
+        automaton = Automaton(['a', 'ab', 'bab', 'bc', 'bca', 'c', 'caa'])
+
+        self.assertEqual(automaton.find('abccab'), ['a', 'ab', 'bc', 'c'])
+        self.assertEqual(automaton.find('xbabx'), ['a', 'ab', 'bab'])
+        self.assertEqual(automaton.find('bcaa'), ['a', 'bc', 'bca', 'c', 'caa'])
+
+    def test_matches_are_indexes_reported_once(self):
+        automaton = Automaton(['ab', 'b'])
+
+        self.assertEqual(automaton.matches('abababab'), {0, 1})
+        self.assertEqual(automaton.matches(''), set())
+
+    def test_duplicate_and_empty_patterns_are_dropped(self):
+        automaton = Automaton(['neon', '', 'bob', 'neon'])
+
+        self.assertEqual(automaton.patterns, ['neon', 'bob'])
+        self.assertEqual(automaton.find('bob uses neon'), ['neon', 'bob'])
+        self.assertEqual(Automaton([]).find('anything'), [])
+
+    def test_matching_is_case_sensitive(self):
+        automaton = Automaton(['Neon', 'neon'])
+
+        self.assertEqual(automaton.find('Neon'), ['Neon'])
+        self.assertEqual(automaton.find('NEON'), [])
+        self.assertEqual(Automaton(['neon']).find('Moved to NEON'.lower()), ['neon'])
+
+    def test_agrees_with_naive_search_on_random_inputs(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            patterns = [''.join(rng.choice('abc') for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(1, 8))]
+            text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 30)))
+
+            self.assertEqual(Automaton(patterns).find(text), naive(patterns, text), (patterns, text))
+
+
+if __name__ == '__main__':
+    unittest.main()
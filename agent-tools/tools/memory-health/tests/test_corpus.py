@@ -0,0 +1,138 @@
+import contextlib
+import io
+import os
+import pathlib
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import corpus  # noqa: E402
+import knowledge_graph  # noqa: E402
+import scanner  # noqa: E402
+
+WORDS = ['deploy', 'pipeline', 'Neon', 'DashClaw', 'Alice Smith', 'GitHub', 'today', 'will',
+         'database', 'migration', 'Bob', 'release', 'token', 'budget', 'currently', 'SlackBot']
+
+
+def write_corpus(root, files=24, seed=5):
+    rng = random.Random(seed)
+    memory_dir = root / 'memory'
+    memory_dir.mkdir()
+    (root / 'MEMORY.md').write_text('# Memory\nCore facts about DashClaw and Neon.\n')
+    for i in range(files):
+        paragraphs = ['\n'.join(' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+                                for _ in range(3))
+                      for _ in range(rng.randint(2, 8))]
+        (memory_dir / f'2025-{1 + i // 28:02d}-{1 + i % 28:02d}.md').write_text('\n\n'.join(paragraphs))
+    return memory_dir
+
+
+class CorpusTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name)
+        self.memory_dir = write_corpus(self.root)
+        self.memory_md = self.root / 'MEMORY.md'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_walk_lists_memory_md_first_then_daily_files_by_date(self):
+        (self.memory_dir / 'notes.md').write_text('not a daily file')
+        (self.memory_dir / '2024-12-31.md').write_text('oldest')
+
+        files = corpus.walk(self.memory_md, self.memory_dir)
+
+        names = [f.source_file for f in files]
+        self.assertEqual(names[0], 'MEMORY.md')
+        self.assertEqual(names[1], '2024-12-31.md')
+        self.assertEqual(names[1:], sorted(names[1:]))
+        self.assertNotIn('notes.md', names)
+        self.assertEqual(files[1].size, len('oldest'))
+        self.assertEqual(files[1].mtime_ns, (self.memory_dir / '2024-12-31.md').stat().st_mtime_ns)
+
+    def test_walk_skips_missing_paths(self):
+        self.memory_md.unlink()
+
+        self.assertEqual(len(corpus.walk(self.memory_md, self.memory_dir)), 24)
+        self.assertEqual(corpus.walk(self.root / 'missing.md', self.root / 'missing'), [])
+
+    def test_parallel_process_matches_serial(self):
+        files = corpus.walk(self.memory_md, self.memory_dir)
+        self.assertGreaterEqual(len(files), corpus.MIN_PARALLEL_FILES)
+        extractors = {'scan': scanner.parse_file, 'graph': knowledge_graph.graph_extractor()}
+        work = [(f, ['scan', 'graph'] if i % 3 else ['scan']) for i, f in enumerate(files)]
+
+        serial = corpus.process(work, extractors, workers=1)
+        parallel = corpus.process(work, extractors, workers=4)
+        chunked = corpus.process(work, extractors, workers=4, chunk_size=3)
+
+        self.assertEqual(set(serial), {f.source_file for f in files})
+        self.assertEqual(parallel, serial)
+        self.assertEqual(chunked, serial)
+        self.assertEqual(set(serial['MEMORY.md']), {'scan'})
+
+    def test_small_batches_run_in_process(self):
+        files = corpus.walk(self.memory_md, self.memory_dir)[:corpus.MIN_PARALLEL_FILES - 1]
+        seen = []
+
+        def record(content, source_file):  # not picklable: would fail in a pool
+            seen.append(source_file)
+            return len(content)
+
+        result = corpus.process([(f, ['size']) for f in files], {'size': record}, workers=4)
+
+        self.assertEqual(seen, [f.source_file for f in files])
+        self.assertEqual(result, {f.source_file: {'size': len(f.path.read_text())} for f in files})
+
+    def test_files_without_extractors_are_skipped(self):
+        files = corpus.walk(self.memory_md, self.memory_dir)
+
+        self.assertEqual(corpus.process([(f, []) for f in files], {'scan': scanner.parse_file}), {})
+
+
+class CombinedScanTests(unittest.TestCase):
+    def setUp(self):
+        self._saved = [(m, m.DB_PATH, m.MEMORY_DIR, m.MEMORY_MD) for m in (scanner, knowledge_graph)]
+
+    def tearDown(self):
+        for m, db_path, memory_dir, memory_md in self._saved:
+            m.DB_PATH, m.MEMORY_DIR, m.MEMORY_MD = db_path, memory_dir, memory_md
+
+    def run_scan(self, workers):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            memory_dir = write_corpus(root)
+            for m in (scanner, knowledge_graph):
+                m.DB_PATH, m.MEMORY_DIR, m.MEMORY_MD = root / 'health.db', memory_dir, root / 'MEMORY.md'
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = scanner.run_full_scan(workers=workers, graph=True)
+            conn = sqlite3.connect(root / 'health.db')
+            try:
+                tables = {
+                    'facts': sorted(conn.execute(
+                        'SELECT source_file, line_number, content, time_sensitive FROM memory_facts')),
+                    'adjacency': sorted(conn.execute('SELECT entity, neighbor, strength FROM graph_adjacency')),
+                    'entities': sorted(conn.execute('SELECT name, type, mention_count FROM entities')),
+                }
+            finally:
+                conn.close()
+        result.pop('timestamp')
+        return result, tables
+
+    def test_parallel_scan_matches_serial_scan(self):
+        serial, serial_tables = self.run_scan(workers=1)
+        parallel, parallel_tables = self.run_scan(workers=4)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_tables, serial_tables)
+        self.assertGreater(len(serial_tables['facts']), 0)
+        self.assertGreater(len(serial_tables['adjacency']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import pathlib
+import sqlite3
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import graph_query  # noqa: E402
+
+EDGES = {
+    ('Alice', 'Bob'): 5,
+    ('Bob', 'Carol'): 3,
+    ('Carol', 'Dave'): 2,
+    ('Alice', 'Eve'): 1,
+    ('Eve', 'Dave'): 1,
+    ('Frank', 'Grace'): 4,
+    ('Hub', 'N1'): 5,
+    ('Hub', 'N2'): 4,
+    ('Hub', 'N3'): 3,
+    ('Hub', 'N4'): 2,
+    ('Hub', 'N5'): 1,
+}
+
+
+class GraphQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE graph_config (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        graph_query.init_schema(self.conn)
+        graph_query.apply_edge_delta(self.conn, Counter(EDGES))
+        graph_query.update_rank(self.conn)
+        graph_query.bump_version(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_adjacency_holds_both_directions(self):
+        rows = self.conn.execute('SELECT entity, neighbor, strength FROM graph_adjacency').fetchall()
+
+        self.assertEqual(len(rows), 2 * len(EDGES))
+        self.assertIn(('Bob', 'Alice', 5), rows)
+        self.assertIn(('Alice', 'Bob', 5), rows)
+
+    def test_edge_deltas_accumulate_and_drop_at_zero(self):
+        graph_query.apply_edge_delta(self.conn, Counter({('Alice', 'Bob'): 2, ('Eve', 'Dave'): -1}))
+
+        self.assertEqual(graph_query._neighbors(self.conn, 'Alice'), [('Bob', 7), ('Eve', 1)])
+        self.assertEqual(graph_query._neighbors(self.conn, 'Dave'), [('Carol', 2)])
+
+    def test_neighbors_strongest_first(self):
+        result = graph_query.neighbors(self.conn, 'Alice')
+
+        self.assertEqual(result, {'entity': 'Alice', 'neighbors': [{'name': 'Bob', 'strength': 5},
+                                                                   {'name': 'Eve', 'strength': 1}]})
+        self.assertEqual(graph_query.neighbors(self.conn, 'Hub', min_strength=3, limit=2)['neighbors'],
+                         [{'name': 'N1', 'strength': 5}, {'name': 'N2', 'strength': 4}])
+        self.assertIsNone(graph_query.neighbors(self.conn, 'Nobody'))
+
+    def test_names_resolve_case_insensitively(self):
+        self.assertEqual(graph_query.resolve(self.conn, 'alice'), 'Alice')
+        self.assertEqual(graph_query.neighbors(self.conn, 'ALICE')['entity'], 'Alice')
+        self.assertEqual(graph_query.shortest_path(self.conn, 'alice', 'dave'), ['Alice', 'Eve', 'Dave'])
+
+    def test_k_hop_distances_and_via(self):
+        result = graph_query.k_hop(self.conn, 'Alice', k=2)
+
+        self.assertEqual(result['entity'], 'Alice')
+        self.assertEqual(result['hops'], 2)
+        nodes = {n['name']: (n['distance'], n['via']) for n in result['nodes']}
+        self.assertEqual(nodes, {'Bob': (1, 'Alice'), 'Eve': (1, 'Alice'),
+                                 'Carol': (2, 'Bob'), 'Dave': (2, 'Eve')})
+        self.assertEqual([n['distance'] for n in result['nodes']], [1, 1, 2, 2])
+        self.assertEqual(len(result['edges']), 4)
+        self.assertNotIn('Frank', nodes)
+
+        self.assertEqual([n['name'] for n in graph_query.k_hop(self.conn, 'Alice', k=1)['nodes']], ['Bob', 'Eve'])
+        three = graph_query.k_hop(self.conn, 'Frank', k=3)
+        self.assertEqual([(n['name'], n['distance']) for n in three['nodes']], [('Grace', 1)])
+
+    def test_k_hop_orders_by_rank_within_a_distance(self):
+        nodes = graph_query.k_hop(self.conn, 'Alice', k=2)['nodes']
+
+        for a, b in zip(nodes, nodes[1:]):
+            if a['distance'] == b['distance']:
+                self.assertGreaterEqual(a['rank'], b['rank'])
+
+    def test_k_hop_follows_only_the_strongest_edges_per_node(self):
+        result = graph_query.k_hop(self.conn, 'Hub', k=1, per_node=2)
+        self.assertEqual(sorted(n['name'] for n in result['nodes']), ['N1', 'N2'])
+
+        limited = graph_query.k_hop(self.conn, 'Hub', k=1, limit=3)
+        self.assertEqual(len(limited['nodes']), 3)
+        self.assertTrue(all(e['target'] in {n['name'] for n in limited['nodes']} for e in limited['edges']))
+
+    def test_shortest_path(self):
+        self.assertEqual(graph_query.shortest_path(self.conn, 'Alice', 'Dave'), ['Alice', 'Eve', 'Dave'])
+        self.assertEqual(graph_query.shortest_path(self.conn, 'Dave', 'Alice'), ['Dave', 'Eve', 'Alice'])
+        self.assertEqual(graph_query.shortest_path(self.conn, 'Alice', 'Bob'), ['Alice', 'Bob'])
+        self.assertEqual(graph_query.shortest_path(self.conn, 'Alice', 'Alice'), ['Alice'])
+
+    def test_shortest_path_limits(self):
+        self.assertEqual(graph_query.shortest_path(self.conn, 'Alice', 'Dave', min_strength=2),
+                         ['Alice', 'Bob', 'Carol', 'Dave'])
+        self.assertIsNone(graph_query.shortest_path(self.conn, 'Alice', 'Dave', max_hops=1))
+        self.assertIsNone(graph_query.shortest_path(self.conn, 'Alice', 'Grace'))
+        self.assertIsNone(graph_query.shortest_path(self.conn, 'Alice', 'Nobody'))
+
+    def test_rank_is_a_distribution_and_warm_starts(self):
+        scores = dict(self.conn.execute('SELECT name, score FROM entity_rank'))
+        self.assertAlmostEqual(sum(scores.values()), 1.0, places=5)
+
+        central = graph_query.central_entities(self.conn, limit=3)
+        self.assertEqual(len(central), 3)
+        self.assertEqual(central[0]['name'], 'Hub')
+        self.assertEqual([c['rank'] for c in central], sorted((c['rank'] for c in central), reverse=True))
+
+        self.assertLessEqual(graph_query.update_rank(self.conn), 2)
+
+    def test_cached_results_last_until_the_version_bumps(self):
+        before = graph_query.neighbors(self.conn, 'Alice')
+        graph_query.apply_edge_delta(self.conn, Counter({('Alice', 'Zed'): 9}))
+
+        self.assertEqual(graph_query.neighbors(self.conn, 'Alice'), before)
+
+        graph_query.bump_version(self.conn)
+        self.assertEqual(graph_query.neighbors(self.conn, 'Alice')['neighbors'][0], {'name': 'Zed', 'strength': 9})
+        self.assertEqual(graph_query.shortest_path(self.conn, 'Zed', 'Dave'), ['Zed', 'Alice', 'Eve', 'Dave'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import pathlib
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import knowledge_graph  # noqa: E402
+
+NAMES = ['Alice Smith', 'Bob', 'Carol Jones', '@dave', 'DashClaw', 'GitHub', 'Neon', 'SlackBot',
+         'MemoryAPI', '`tools/run.py`', 'https://example.com/x', 'Telegram']
+FILLER = ['deploy the code', 'memory context', 'token secret', 'client money']
+
+
+class IncrementalBuildTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name)
+        self.memory_dir = self.root / 'memory'
+        self.memory_dir.mkdir()
+        self._saved = (knowledge_graph.DB_PATH, knowledge_graph.MEMORY_DIR, knowledge_graph.MEMORY_MD)
+        knowledge_graph.DB_PATH = self.root / 'graph.db'
+        knowledge_graph.MEMORY_DIR = self.memory_dir
+        knowledge_graph.MEMORY_MD = self.root / 'MEMORY.md'
+
+        knowledge_graph.MEMORY_MD.write_text('Alice Smith uses DashClaw and GitHub daily.\n\nBob likes Neon.')
+        rng = random.Random(3)
+        for i in range(20):
+            paragraphs = [' '.join(rng.choice(NAMES + FILLER) for _ in range(8)) for _ in range(4)]
+            self.write(f'2026-01-{i + 1:02d}.md', '\n\n'.join(paragraphs))
+
+    def tearDown(self):
+        knowledge_graph.DB_PATH, knowledge_graph.MEMORY_DIR, knowledge_graph.MEMORY_MD = self._saved
+        self._tmp.cleanup()
+
+    def write(self, name, text, bump=1):
+        path = self.memory_dir / name
+        path.write_text(text)
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+        return path
+
+    def build(self, **kwargs):
+        knowledge_graph.init_db()
+        return knowledge_graph.build_graph(workers=1, **kwargs)
+
+    def snapshot(self):
+        conn = sqlite3.connect(knowledge_graph.DB_PATH)
+        try:
+            return {
+                'adjacency': sorted(conn.execute('SELECT entity, neighbor, strength FROM graph_adjacency')),
+                'entities': sorted(conn.execute(
+                    'SELECT name, type, mention_count, first_seen, last_seen FROM entities')),
+                'topics': sorted(conn.execute('SELECT name, mention_count FROM topics')),
+                'relationships': sorted(conn.execute('SELECT entity1, entity2, strength FROM relationships')),
+                'rank': dict(conn.execute('SELECT name, score FROM entity_rank')),
+            }
+        finally:
+            conn.close()
+
+    def assertMatchesFullBuild(self):
+        incremental = self.snapshot()
+        self.build(full=True)
+        full = self.snapshot()
+        for key in ('adjacency', 'entities', 'topics', 'relationships'):
+            self.assertEqual(incremental[key], full[key], key)
+        self.assertEqual(set(incremental['rank']), set(full['rank']))
+        for name, score in full['rank'].items():
+            self.assertAlmostEqual(incremental['rank'][name], score, places=4, msg=name)
+
+    def test_first_build_processes_every_file(self):
+        result = self.build()
+
+        self.assertEqual(result['files'], {'processed': 21, 'unchanged': 0, 'removed': 0})
+        self.assertGreater(result['entities'], 0)
+        self.assertGreater(result['relationships'], 0)
+        self.assertMatchesFullBuild()
+
+    def test_unchanged_rebuild_is_a_no_op(self):
+        self.build()
+        before = self.snapshot()
+        conn = sqlite3.connect(knowledge_graph.DB_PATH)
+        version = conn.execute("SELECT value FROM graph_config WHERE key = 'version'").fetchone()
+        conn.close()
+
+        result = self.build()
+
+        self.assertEqual(result['files'], {'processed': 0, 'unchanged': 21, 'removed': 0})
+        self.assertEqual(self.snapshot(), before)
+        conn = sqlite3.connect(knowledge_graph.DB_PATH)
+        self.assertEqual(conn.execute("SELECT value FROM graph_config WHERE key = 'version'").fetchone(), version)
+        conn.close()
+
+    def test_edits_additions_and_deletions_match_a_full_build(self):
+        self.build()
+        edited = self.memory_dir / '2026-01-05.md'
+        self.write(edited.name, edited.read_text() + '\n\nZed Newman joined GitHub with Bob.', bump=2)
+        self.write('2026-02-01.md', 'Carol Jones moved SlackBot to Neon.\n\nTelegram alerts for DashClaw.')
+        (self.memory_dir / '2026-01-07.md').unlink()
+
+        result = self.build()
+
+        self.assertEqual(result['files'], {'processed': 2, 'unchanged': 19, 'removed': 1})
+        conn = sqlite3.connect(knowledge_graph.DB_PATH)
+        self.assertEqual(conn.execute(
+            "SELECT strength FROM graph_adjacency WHERE entity = 'Zed Newman' AND neighbor = 'Bob'").fetchone(), (1,))
+        self.assertIsNone(conn.execute(
+            "SELECT 1 FROM graph_files WHERE source_file = '2026-01-07.md'").fetchone())
+        conn.close()
+        self.assertMatchesFullBuild()
+
+    def test_removing_every_mention_of_an_edge_drops_it(self):
+        self.write('2026-03-01.md', 'Quentin Tarrow met Wilma Brook.')
+        self.build()
+        self.write('2026-03-01.md', 'Nothing to see here.', bump=2)
+
+        self.build()
+
+        conn = sqlite3.connect(knowledge_graph.DB_PATH)
+        self.assertIsNone(conn.execute(
+            "SELECT 1 FROM graph_adjacency WHERE entity = 'Quentin Tarrow'").fetchone())
+        self.assertIsNone(conn.execute("SELECT 1 FROM entities WHERE name = 'Wilma Brook'").fetchone())
+        conn.close()
+        self.assertMatchesFullBuild()
+
+    def test_changing_the_window_rebuilds_everything(self):
+        self.build()
+
+        result = self.build(window=2)
+
+        self.assertEqual(result['files']['processed'], 21)
+        incremental = self.snapshot()
+        self.build(window=2, full=True)
+        self.assertEqual(incremental['adjacency'], self.snapshot()['adjacency'])
+
+    def test_relationships_are_counted_once_per_paragraph_within_the_window(self):
+        text = 'Neon and neon and DashClaw.\n\nGitHub alone.\n\nBob here.'
+        entities = [{'name': n} for n in ('Neon', 'neon', 'DashClaw', 'GitHub', 'Bob')]
+
+        same = knowledge_graph.extract_relationships(text, entities, window=1)
+        nearby = knowledge_graph.extract_relationships(text, entities, window=2)
+
+        self.assertEqual(sorted((r['entity1'], r['entity2']) for r in same),
+                         [('DashClaw', 'Neon'), ('DashClaw', 'neon'), ('Neon', 'neon')])
+        self.assertEqual(sorted((r['entity1'], r['entity2']) for r in nearby),
+                         [('Bob', 'GitHub'), ('DashClaw', 'GitHub'), ('DashClaw', 'Neon'), ('DashClaw', 'neon'),
+                          ('GitHub', 'Neon'), ('GitHub', 'neon'), ('Neon', 'neon')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import hashlib
+import pathlib
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import near_duplicates  # noqa: E402
+
+BASE = ('The deploy pipeline for the billing service uses a blue green rollout '
+        'with a manual approval step before production')
+REWORDED = BASE.replace('manual', 'human')  # ~0.8 similar to BASE
+EXTENDED = BASE + ' and a rollback plan'    # ~0.85 similar to BASE
+DISTANT = BASE.replace('manual approval step', 'required sign off').replace('billing', 'payments')  # ~0.55
+UNRELATED = 'Lunch on fridays is pizza from the place around the corner near the office building downtown'
+
+
+class NearDuplicateTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('''
+            CREATE TABLE memory_facts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_file TEXT, line_number INTEGER, content TEXT, content_hash TEXT
+            )
+        ''')
+        near_duplicates.init_schema(self.conn)
+        self.lines = 0
+
+    def tearDown(self):
+        self.conn.close()
+
+    def add(self, content, source_file='2026-01-01.md'):
+        self.lines += 1
+        self.conn.execute(
+            'INSERT INTO memory_facts (source_file, line_number, content, content_hash) VALUES (?, ?, ?, ?)',
+            (source_file, self.lines, content, hashlib.md5(content.lower().encode()).hexdigest()[:16]))
+
+    def remove(self, content):
+        self.conn.execute('DELETE FROM memory_facts WHERE content = ?', (content,))
+
+    def update(self, threshold=near_duplicates.DEFAULT_THRESHOLD):
+        result = near_duplicates.update_near_duplicates(self.conn, threshold)
+        self.assert_consistent(threshold)
+        return result
+
+    def clusters(self):
+        return [sorted(cl['samples']) for cl in near_duplicates.load_clusters(self.conn)]
+
+    def assert_consistent(self, threshold):
+        """Every text is assigned to a representative of its own cluster, within the
+        threshold of it, and only representatives are bucketed."""
+        rows = self.conn.execute(
+            'SELECT content_hash, signature, representative FROM near_duplicate_texts').fetchall()
+        signatures = {h: near_duplicates._load_signature(blob) for h, blob, _ in rows}
+        representatives = {h: rep for h, _, rep in rows}
+        for content_hash, rep in representatives.items():
+            self.assertEqual(representatives[rep], rep)
+            self.assertGreaterEqual(near_duplicates.similarity(signatures[content_hash], signatures[rep]), threshold)
+        bucketed = {row[0] for row in self.conn.execute('SELECT DISTINCT content_hash FROM lsh_buckets')}
+        self.assertEqual(bucketed, {h for h, rep in representatives.items() if h == rep})
+        stored_hashes = {row[0] for row in self.conn.execute('SELECT DISTINCT content_hash FROM memory_facts')}
+        self.assertEqual(set(representatives), stored_hashes)
+
+    def test_lsh_bands_follow_the_threshold(self):
+        for threshold in (0.5, 0.7, 0.9):
+            bands, rows = near_duplicates.lsh_params(threshold)
+            self.assertLessEqual(bands * rows, near_duplicates.NUM_PERM)
+            self.assertAlmostEqual((1 / bands) ** (1 / rows), threshold, delta=0.05)
+        self.assertLess(near_duplicates.lsh_params(0.5)[1], near_duplicates.lsh_params(0.9)[1])
+
+    @unittest.skipIf(near_duplicates.np is None, 'NumPy is not installed')
+    def test_numpy_and_pure_python_signatures_agree(self):
+        texts = [BASE, UNRELATED, 'tiny', '']
+        with_numpy = [sig.tolist() for sig in near_duplicates.signatures(texts, batch_size=2)]
+        np_module, near_duplicates.np = near_duplicates.np, None
+        try:
+            pure = [sig.tolist() for sig in near_duplicates.signatures(texts)]
+            self.assertAlmostEqual(near_duplicates.similarity(near_duplicates.signature(BASE),
+                                                              near_duplicates.signature(REWORDED)),
+                                   0.81, delta=0.05)
+        finally:
+            near_duplicates.np = np_module
+        self.assertEqual(with_numpy, pure)
+
+    def test_reworded_facts_cluster_around_the_earliest_wording(self):
+        for text in (BASE, UNRELATED, REWORDED, DISTANT, EXTENDED):
+            self.add(text)
+        self.add(REWORDED, '2026-01-02.md')  # exact copy: another location, same text
+
+        self.assertEqual(self.update(), {'signed': 5, 'assigned': 5, 'removed': 0})
+
+        clusters = near_duplicates.load_clusters(self.conn)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['samples'][0], BASE[:100])
+        self.assertEqual(clusters[0]['count'], 4)
+        self.assertGreaterEqual(clusters[0]['similarity'], near_duplicates.DEFAULT_THRESHOLD)
+
+    def test_rescans_only_sign_and_assign_new_texts(self):
+        self.add(BASE)
+        self.add(UNRELATED)
+        self.update()
+
+        self.assertEqual(self.update(), {'signed': 0, 'assigned': 0, 'removed': 0})
+
+        self.add(EXTENDED)
+        self.assertEqual(self.update(), {'signed': 1, 'assigned': 1, 'removed': 0})
+        self.assertEqual(self.clusters(), [sorted([BASE[:100], EXTENDED[:100]])])
+
+    def test_members_are_reassigned_when_their_representative_disappears(self):
+        for text in (BASE, REWORDED, EXTENDED):
+            self.add(text)
+        self.update()
+
+        self.remove(BASE)
+        self.assertEqual(self.update(), {'signed': 0, 'assigned': 2, 'removed': 1})
+        self.assertEqual(self.clusters(), [sorted([REWORDED[:100], EXTENDED[:100]])])
+
+    def test_changing_the_threshold_reassigns_without_resigning(self):
+        for text in (BASE, REWORDED, DISTANT, EXTENDED, UNRELATED):
+            self.add(text)
+        self.update(0.7)
+        loose = self.clusters()
+
+        self.assertEqual(self.update(0.9), {'signed': 0, 'assigned': 5, 'removed': 0})
+        self.assertEqual(self.clusters(), [])
+
+        self.assertEqual(self.update(0.5)['signed'], 0)
+        self.assertIn(DISTANT[:100], self.clusters()[0])
+
+        self.update(0.7)
+        self.assertEqual(self.clusters(), loose)
+
+
+if __name__ == '__main__':
+    unittest.main()
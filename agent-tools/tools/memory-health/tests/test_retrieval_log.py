@@ -0,0 +1,186 @@
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import retrieval_log  # noqa: E402
+from retrieval_log import RetrievalLogger  # noqa: E402
+
+ROLLUP_COLUMNS = 'bucket, queries, results_sum, snippets_sum, relevance_sum, relevance_count'
+
+
+class RetrievalLogTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self._tmp.name) / 'health.db'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def query(self, sql, *params):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def raw_rollup(self, width):
+        return self.query(f'''
+            SELECT substr(timestamp, 1, {width}), COUNT(*), COALESCE(SUM(results_count), 0),
+                   COALESCE(SUM(snippets_used), 0), COALESCE(SUM(relevance_score), 0), COUNT(relevance_score)
+            FROM retrieval_log GROUP BY 1 ORDER BY 1
+        ''')
+
+    def assertRollupsMatchLog(self):
+        for period, width in retrieval_log.PERIODS.items():
+            rollup = self.query(f'SELECT {ROLLUP_COLUMNS} FROM retrieval_rollup_{period} ORDER BY bucket')
+            raw = self.raw_rollup(width)
+            self.assertEqual([r[:4] + r[5:] for r in rollup], [r[:4] + r[5:] for r in raw], period)
+            for got, expected in zip(rollup, raw):
+                self.assertAlmostEqual(got[4], expected[4], places=6)
+
+    def test_concurrent_logging_keeps_rollups_equal_to_the_log(self):
+        logger = RetrievalLogger(self.db_path, batch_size=7, flush_interval=60)
+
+        def worker(n):
+            for i in range(250):
+                relevance = None if i % 4 == 0 else (i % 10) / 10
+                logger.log(f'query {n}-{i}', results_count=i % 9, snippets_used=i % 3,
+                           relevance_score=relevance, session_key=f'session-{n}')
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        logger.close()
+
+        self.assertEqual(self.query('SELECT COUNT(*) FROM retrieval_log'), [(1000,)])
+        self.assertEqual(self.query('SELECT COUNT(DISTINCT query) FROM retrieval_log'), [(1000,)])
+        self.assertEqual(self.query('SELECT SUM(queries) FROM retrieval_rollup_daily'), [(1000,)])
+        self.assertRollupsMatchLog()
+
+    def test_stats_and_daily_match_the_raw_log(self):
+        logger = RetrievalLogger(self.db_path, batch_size=4)
+        entries = [(5, 2, 0.8), (3, 1, None), (0, 0, 0.2), (7, 3, 0.5), (2, 2, None)]
+        for results, snippets, relevance in entries:
+            logger.log('deploy steps', results, snippets, relevance)
+
+        stats = logger.stats()
+        daily = logger.daily()
+        logger.close()
+
+        queries, results, snippets, relevance = self.query(
+            'SELECT COUNT(*), AVG(results_count), AVG(snippets_used), AVG(relevance_score) FROM retrieval_log')[0]
+        self.assertEqual(queries, len(entries))
+        self.assertEqual(stats, {
+            'total_queries': queries,
+            'avg_results': round(results, 1),
+            'avg_snippets': round(snippets, 1),
+            'avg_relevance': round(relevance, 2),
+        })
+        self.assertEqual(daily, [{
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'queries': queries,
+            'avg_results': round(results, 1),
+            'avg_snippets': round(snippets, 1),
+            'avg_relevance': round(relevance, 2),
+        }])
+
+    def test_empty_log_stats(self):
+        logger = RetrievalLogger(self.db_path)
+
+        self.assertEqual(logger.stats(), {'total_queries': 0, 'avg_results': 0, 'avg_snippets': 0,
+                                          'avg_relevance': None})
+        self.assertEqual(logger.daily(), [])
+        logger.close()
+
+    def test_entries_are_buffered_until_a_flush(self):
+        logger = RetrievalLogger(self.db_path, batch_size=3, flush_interval=60)
+        logger.log('a', 1, 1)
+        logger.log('b', 1, 1)
+
+        self.assertFalse(self.db_path.exists())  # the connection opens on the first flush
+
+        logger.log('c', 1, 1)
+        self.assertEqual(self.query('SELECT COUNT(*) FROM retrieval_log'), [(3,)])
+
+        logger.log('d', 1, 1)
+        logger.close()
+        self.assertEqual(self.query('SELECT COUNT(*) FROM retrieval_log'), [(4,)])
+        self.assertRollupsMatchLog()
+
+    def test_old_entries_are_flushed_on_the_next_log(self):
+        logger = RetrievalLogger(self.db_path, batch_size=100, flush_interval=0)
+        logger.log('a', 1, 1)
+
+        self.assertEqual(self.query('SELECT COUNT(*) FROM retrieval_log'), [(1,)])
+        logger.close()
+
+    def test_buffer_is_flushed_by_timer_without_further_logging(self):
+        logger = RetrievalLogger(self.db_path, batch_size=100, flush_interval=0.05)
+        logger.log('a', 1, 1)
+        timer = logger._timer
+        self.assertIsNotNone(timer)
+
+        timer.join(timeout=5)
+        self.assertEqual(self.query('SELECT COUNT(*) FROM retrieval_log'), [(1,)])
+        self.assertIsNone(logger._timer)
+        logger.close()
+
+    def test_explicit_flush_cancels_the_timer(self):
+        logger = RetrievalLogger(self.db_path, batch_size=100, flush_interval=60)
+        logger.log('a', 1, 1)
+        timer = logger._timer
+
+        logger.flush()
+        self.assertIsNone(logger._timer)
+        self.assertTrue(timer.finished.is_set())  # cancelled
+        self.assertEqual(self.query('SELECT COUNT(*) FROM retrieval_log'), [(1,)])
+        logger.close()
+
+    def test_rollups_are_backfilled_for_a_log_that_predates_them(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(retrieval_log.SCHEMA[0])
+        old = (datetime.now() - timedelta(days=10)).isoformat()
+        recent = (datetime.now() - timedelta(days=1)).isoformat()
+        conn.executemany('''
+            INSERT INTO retrieval_log (timestamp, query, results_count, snippets_used, relevance_score)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(old, 'old', 4, 2, 0.5), (old, 'old', 2, 0, None), (recent, 'recent', 6, 1, 0.9)])
+        conn.commit()
+        conn.close()
+
+        logger = RetrievalLogger(self.db_path)
+        week = logger.stats(days=7)
+        month = logger.stats(days=30)
+        logger.close()
+
+        self.assertRollupsMatchLog()
+        self.assertEqual(week['total_queries'], 1)
+        self.assertEqual(month, {'total_queries': 3, 'avg_results': 4.0, 'avg_snippets': 1.0,
+                                 'avg_relevance': 0.7})
+
+    def test_rebuild_rollups_recomputes_from_the_log(self):
+        logger = RetrievalLogger(self.db_path, batch_size=1)
+        for i in range(5):
+            logger.log(f'q{i}', i, 1, 0.1 * i)
+        logger.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM retrieval_rollup_hourly')
+        conn.execute('UPDATE retrieval_rollup_daily SET queries = 99')
+
+        retrieval_log.rebuild_rollups(conn)
+        conn.commit()
+        conn.close()
+
+        self.assertRollupsMatchLog()
+
+
+if __name__ == '__main__':
+    unittest.main()
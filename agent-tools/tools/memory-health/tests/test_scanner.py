@@ -0,0 +1,126 @@
+import contextlib
+import io
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import corpus  # noqa: E402
+import scanner  # noqa: E402
+
+
+def day(days_ago):
+    return (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+
+
+class IncrementalScanTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name)
+        self.memory_dir = self.root / 'memory'
+        self.memory_dir.mkdir()
+        self._saved = (scanner.DB_PATH, scanner.MEMORY_DIR, scanner.MEMORY_MD)
+        scanner.DB_PATH = self.root / 'health.db'
+        scanner.MEMORY_DIR = self.memory_dir
+        scanner.MEMORY_MD = self.root / 'MEMORY.md'
+
+        scanner.MEMORY_MD.write_text(
+            '# Memory\n'
+            'The deploy pipeline uses a blue green rollout.\n'
+            'We are currently migrating the billing database.\n'
+        )
+        for days_ago in (2, 40, 90):
+            self.write(f'{day(days_ago)}.md',
+                       f'Today we will ship the release candidate number {days_ago}.\n'
+                       'The deploy pipeline uses a blue green rollout.\n'
+                       f'Plain notes that are long enough to count, set {days_ago}.\n'
+                       'short\n')
+
+    def tearDown(self):
+        scanner.DB_PATH, scanner.MEMORY_DIR, scanner.MEMORY_MD = self._saved
+        self._tmp.cleanup()
+
+    def write(self, name, text, bump=1):
+        path = self.memory_dir / name
+        path.write_text(text)
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+        return path
+
+    def quietly(self, fn, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn(*args, **kwargs)
+
+    def scan(self):
+        self.quietly(scanner.init_db)
+        conn = sqlite3.connect(scanner.DB_PATH)
+        try:
+            _stats, changes = scanner.scan_memory_files(conn, workers=1)
+            scanner.refresh_fact_flags(conn, changes['hashes'])
+            return changes, scanner.load_duplicates(conn), scanner.load_stale_facts(conn)
+        finally:
+            conn.close()
+
+    def legacy(self):
+        """Duplicates and stale facts from the original detectors, over every file."""
+        facts = []
+        for f in corpus.walk(scanner.MEMORY_MD, scanner.MEMORY_DIR):
+            facts += scanner.extract_facts(f.path.read_text(), f.source_file)
+        return scanner.detect_duplicates(facts), scanner.detect_stale_facts(facts)
+
+    def test_stored_results_match_the_legacy_detectors(self):
+        _changes, duplicates, stale = self.scan()
+        legacy_duplicates, legacy_stale = self.legacy()
+
+        self.assertEqual(duplicates, legacy_duplicates)
+        self.assertEqual(stale, legacy_stale)
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]['count'], 4)
+        self.assertEqual([s['source'] for s in stale], [f'{day(90)}.md', f'{day(40)}.md'])
+
+    def test_unchanged_and_touched_files_are_not_reparsed(self):
+        first, *_ = self.scan()
+        self.assertEqual((first['parsed'], first['unchanged'], first['removed']), (4, 0, 0))
+
+        second, *_ = self.scan()
+        self.assertEqual((second['parsed'], second['unchanged']), (0, 4))
+
+        path = self.memory_dir / f'{day(2)}.md'
+        self.write(path.name, path.read_text(), bump=5)  # touched, same content
+        third, *_ = self.scan()
+        self.assertEqual((third['parsed'], third['unchanged']), (0, 4))
+
+    def test_edits_and_deletions_update_counts_like_a_full_rescan(self):
+        self.scan()
+        self.write(f'{day(40)}.md', 'Nothing time related in this longer sentence.\n')
+        (self.memory_dir / f'{day(90)}.md').unlink()
+
+        changes, duplicates, stale = self.scan()
+
+        self.assertEqual((changes['parsed'], changes['removed']), (1, 1))
+        self.assertEqual((duplicates, stale), self.legacy())
+        self.assertEqual(duplicates[0]['count'], 2)
+        self.assertEqual(stale, [])
+
+    def test_full_scan_reports_legacy_counts(self):
+        result = self.quietly(scanner.run_full_scan, workers=1)
+        legacy_duplicates, legacy_stale = self.legacy()
+
+        self.assertEqual(result['duplicates'], len(legacy_duplicates))
+        self.assertEqual(result['stale_count'], len(legacy_stale))
+        self.assertEqual(result['duplicate_details'], legacy_duplicates[:5])
+        self.assertEqual(result['stale_details'], legacy_stale[:5])
+        self.assertEqual((result['total_files'], result['daily_files']), (4, 3))
+
+        again = self.quietly(scanner.run_full_scan, workers=1)
+        for key in ('duplicates', 'stale_count', 'total_lines', 'health_score', 'near_duplicates'):
+            self.assertEqual(again[key], result[key])
+
+
+if __name__ == '__main__':
+    unittest.main()
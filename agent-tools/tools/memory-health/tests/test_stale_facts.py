@@ -0,0 +1,74 @@
+import pathlib
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import benchmark_stale  # noqa: E402
+import scanner  # noqa: E402
+
+
+def fact(source_file, content, line_number=1):
+    return {'source_file': source_file, 'line_number': line_number, 'content': content}
+
+
+def dated(days_ago):
+    return (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d') + '.md'
+
+
+class StaleFactTests(unittest.TestCase):
+    def test_single_pass_matches_the_legacy_detector_on_a_synthetic_corpus(self):
+        pool = benchmark_stale.sentence_pool(seed=3)
+        corpus = lambda: benchmark_stale.synthetic_facts(20_000, 120, pool)
+
+        stale = list(scanner.iter_stale_facts(corpus()))
+
+        self.assertEqual(stale, benchmark_stale.legacy_stale_facts(corpus()))
+        self.assertGreater(len(stale), 0)
+
+    def test_edge_cases_match_the_legacy_detector(self):
+        facts = [
+            fact(dated(45), 'Deploy TODAY after the review'),           # case-insensitive
+            fact(dated(45), 'I know the snowy mountain route well'),     # "now" only inside words
+            fact(dated(45), 'Rotated keys on 2026-01-02 for the api'),   # dates
+            fact(dated(45), 'We are planning to migrate the cache'),
+            fact(dated(30), 'Currently on call for the api'),            # exactly stale_days old
+            fact(dated(31), 'Currently on call for the api'),
+            fact('MEMORY.md', 'We will always review deploys'),           # not a daily file
+            fact('2026-13-45.md', 'We will fix this right now'),          # unparseable date
+            fact('notes.md', 'Going to refactor the scanner'),
+        ]
+
+        stale = list(scanner.iter_stale_facts(facts))
+
+        self.assertEqual(stale, benchmark_stale.legacy_stale_facts(facts))
+        self.assertEqual([s['content'] for s in stale], [
+            'Deploy TODAY after the review',
+            'Rotated keys on 2026-01-02 for the api',
+            'We are planning to migrate the cache',
+            'Currently on call for the api',
+        ])
+        self.assertEqual(stale[-1]['age_days'], 31)
+
+    def test_facts_are_streamed_and_stale_days_is_respected(self):
+        consumed = []
+
+        def facts():
+            for i in range(1000):
+                consumed.append(i)
+                yield fact(dated(60), f'Shipping the release today, batch {i}', i + 1)
+
+        first = next(scanner.iter_stale_facts(facts()))
+        self.assertEqual(first['line'], 1)
+        self.assertEqual(len(consumed), 1)
+        self.assertEqual(list(scanner.iter_stale_facts(facts(), stale_days=90)), [])
+
+    def test_is_time_sensitive_uses_the_same_patterns(self):
+        self.assertTrue(scanner.is_time_sensitive('Right now the queue is empty'))
+        self.assertTrue(scanner.is_time_sensitive('next week: rotate tokens'))
+        self.assertFalse(scanner.is_time_sensitive('Nowhere in the wiki is this documented'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,12 +3,19 @@
 DashClaw Memory Search
 Semantic and keyword search across all memory files.
 
+Queries are answered from a persistent full-text index (search_index.py) that
+is refreshed incrementally before each search. Results are ranked by BM25.
+
 Usage:
     python search.py "query"
     python search.py "query" --file MEMORY.md
     python search.py "query" --recent 7  # Last 7 days
+    python search.py "query" --no-index  # Rescan files instead of using the index
+    python search.py "query" --mode hybrid    # Semantic + keyword ranking
+    python search.py "query" --mode semantic  # Meaning only (paraphrases)
     python search.py recent  # Show recent entries
     python search.py files  # List all memory files
+    python search.py index  # Refresh the search index
 """
 
 import argparse
@@ -16,6 +23,9 @@ import re
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import search_index
+import semantic_index
+
 WORKSPACE = Path(__file__).parent.parent.parent
 MEMORY_DIR = WORKSPACE / "memory"
 
@@ -41,8 +51,55 @@ def get_memory_files():
     
     return files
 
-def search_files(query, files=None, recent_days=None, context_lines=2):
+def search_files(query, files=None, recent_days=None, context_lines=2, limit=None, use_index=True):
     """Search for query across memory files."""
+    if use_index and search_index.fts5_available():
+        return search_indexed(query, files, recent_days, context_lines, limit)
+    return scan_files(query, files, recent_days, context_lines)
+
+def search_indexed(query, files=None, recent_days=None, context_lines=2, limit=None):
+    """Search the persistent index, re-indexing changed files first."""
+    conn = search_index.connect()
+    try:
+        if files is None:
+            search_index.update_index(conn, get_memory_files())
+        else:
+            search_index.update_index(conn, files, prune=False)
+        return search_index.search(conn, query, paths=files, since=recent_since(recent_days),
+                                   context_lines=context_lines, limit=limit)
+    finally:
+        conn.close()
+
+def count_indexed(query, files=None, recent_days=None):
+    """Total number of indexed matches, for reporting alongside a limited search."""
+    conn = search_index.connect()
+    try:
+        return search_index.count(conn, query, paths=files, since=recent_since(recent_days))
+    finally:
+        conn.close()
+
+def recent_since(recent_days):
+    """ISO timestamp for --recent, or None."""
+    if not recent_days:
+        return None
+    return (datetime.now() - timedelta(days=recent_days)).isoformat(timespec='seconds')
+
+def search_semantic(query, files=None, recent_days=None, limit=20, hybrid=True):
+    """Search by meaning (hashing-trick embeddings), optionally fused with BM25 keyword ranking."""
+    conn = search_index.connect()
+    try:
+        semantic_index.init_schema(conn)
+        store = semantic_index.VectorStore()
+        scope = get_memory_files() if files is None else files
+        search_index.update_index(conn, scope, prune=files is None)
+        semantic_index.update_vectors(conn, store, scope, prune=files is None)
+        return semantic_index.search(conn, store, query, paths=files, since=recent_since(recent_days),
+                                     limit=limit, hybrid=hybrid)
+    finally:
+        conn.close()
+
+def scan_files(query, files=None, recent_days=None, context_lines=2):
+    """Search by reading every file (used when SQLite lacks FTS5)."""
     if files is None:
         files = get_memory_files()
     
@@ -111,14 +168,17 @@ def safe_print(text):
     except UnicodeEncodeError:
         print(text.encode('ascii', 'replace').decode('ascii'))
 
-def display_results(results, limit=20, show_context=True):
-    """Display search results."""
+def display_results(results, limit=20, show_context=True, total=None):
+    """Display search results. total is the number of matches when results
+    was already limited."""
     if not results:
         print("\nNo results found.")
         return
+    if total is None:
+        total = len(results)
     
     print(f"\n{'='*60}")
-    print(f"SEARCH RESULTS ({len(results)} matches)")
+    print(f"SEARCH RESULTS ({total} matches)")
     print(f"{'='*60}")
     
     for i, r in enumerate(results[:limit]):
@@ -132,8 +192,8 @@ def display_results(results, limit=20, show_context=True):
                 if line.strip():
                     safe_print(f"    {line[:60]}...")
     
-    if len(results) > limit:
-        print(f"\n  ... and {len(results) - limit} more results")
+    if total > limit:
+        print(f"\n  ... and {total - limit} more results")
 
 def show_recent_entries(days=7):
     """Show recent memory entries."""
@@ -176,6 +236,27 @@ def list_files():
         mtime = datetime.fromtimestamp(f.stat().st_mtime)
         print(f"  {f.name:<30} {size:>8} bytes  {mtime.strftime('%Y-%m-%d')}")
 
+def refresh_index(semantic=False):
+    """Bring the search index up to date and report what changed."""
+    if not search_index.fts5_available():
+        print("SQLite FTS5 is not available; searches will scan files directly.")
+        return
+    conn = search_index.connect()
+    try:
+        files = get_memory_files()
+        changes = search_index.update_index(conn, files)
+        stats = search_index.index_stats(conn)
+        if semantic:
+            semantic_index.init_schema(conn)
+            vectors = semantic_index.update_vectors(conn, semantic_index.VectorStore(), files)
+    finally:
+        conn.close()
+    print(f"Index updated: {changes['indexed']} re-indexed, {changes['unchanged']} unchanged, {changes['removed']} removed")
+    print(f"  {stats['files']} files, {stats['lines']} lines in {search_index.INDEX_PATH}")
+    if semantic:
+        print(f"Vectors updated: {vectors['embedded']} chunks embedded, {vectors['reused']} reused, "
+              f"{vectors['removed']} files removed")
+
 def main():
     parser = argparse.ArgumentParser(description='DashClaw Memory Search')
     parser.add_argument('query', nargs='?', help='Search query')
@@ -183,6 +264,9 @@ def main():
     parser.add_argument('--recent', '-r', type=int, help='Only search recent N days')
     parser.add_argument('--limit', '-l', type=int, default=20, help='Max results')
     parser.add_argument('--no-context', action='store_true', help='Hide context')
+    parser.add_argument('--no-index', action='store_true', help='Scan files instead of using the search index')
+    parser.add_argument('--mode', '-m', choices=['keyword', 'semantic', 'hybrid'], default='keyword',
+                        help='keyword (BM25), semantic (embeddings) or hybrid (both)')
     
     args = parser.parse_args()
     
@@ -190,6 +274,8 @@ def main():
         show_recent_entries()
     elif args.query == 'files':
         list_files()
+    elif args.query == 'index':
+        refresh_index(semantic=args.mode != 'keyword')
     elif args.query:
         # Filter to specific file if requested
         files = None
@@ -206,8 +292,14 @@ def main():
                     print(f"File not found: {args.file}")
                     return
         
-        results = search_files(args.query, files, args.recent)
-        display_results(results, args.limit, not args.no_context)
+        total = None
+        if args.mode != 'keyword' and search_index.fts5_available():
+            results = search_semantic(args.query, files, args.recent, args.limit, hybrid=args.mode == 'hybrid')
+        else:
+            results = search_files(args.query, files, args.recent, limit=args.limit, use_index=not args.no_index)
+            if len(results) >= args.limit and not args.no_index and search_index.fts5_available():
+                total = count_indexed(args.query, files, args.recent)
+        display_results(results, args.limit, not args.no_context, total)
     else:
         parser.print_help()
 
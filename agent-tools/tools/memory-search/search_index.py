@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Persistent full-text index for memory search.
+
+Every line of every memory file is stored in SQLite with an FTS5 index on top,
+so a query is one indexed lookup ranked by BM25 instead of a rescan of all
+files. The index is refreshed incrementally: only files whose mtime or size
+changed since the last query are re-read.
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+INDEX_PATH = Path(__file__).parent / "data" / "search_index.db"
+DATE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})')
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        file_date TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS lines (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        line_number INTEGER NOT NULL,
+        content TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_lines_path ON lines(path, line_number)',
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(
+        content, content='lines', content_rowid='id', tokenize='unicode61'
+    )
+    ''',
+    # Keep the FTS index in step with the lines table.
+    '''
+    CREATE TRIGGER IF NOT EXISTS lines_ai AFTER INSERT ON lines BEGIN
+        INSERT INTO lines_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS lines_ad AFTER DELETE ON lines BEGIN
+        INSERT INTO lines_fts(lines_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    ''',
+]
+
+_fts5 = None
+
+def fts5_available():
+    """Whether this Python's SQLite was built with FTS5."""
+    global _fts5
+    if _fts5 is None:
+        try:
+            conn = sqlite3.connect(':memory:')
+            conn.execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+            conn.close()
+            _fts5 = True
+        except sqlite3.OperationalError:
+            _fts5 = False
+    return _fts5
+
+def connect(path=INDEX_PATH):
+    """Open the index, creating it if needed."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    return conn
+
+def file_date(filepath, mtime):
+    """Date used for --recent: the YYYY-MM-DD in the file name, else the modification time."""
+    match = DATE_PATTERN.search(filepath.name)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), '%Y-%m-%d').isoformat(timespec='seconds')
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(mtime).isoformat(timespec='seconds')
+
+def update_index(conn, files, prune=True):
+    """Re-index files whose mtime or size changed. With prune, files missing from
+    `files` are dropped from the index. Returns {'indexed', 'unchanged', 'removed'}."""
+    known = {row[0]: (row[1], row[2]) for row in conn.execute('SELECT path, mtime_ns, size FROM files')}
+    seen = set()
+    indexed = unchanged = 0
+
+    with conn:
+        for filepath in files:
+            key = str(filepath)
+            seen.add(key)
+            try:
+                st = filepath.stat()
+            except OSError:
+                continue
+            if known.get(key) == (st.st_mtime_ns, st.st_size):
+                unchanged += 1
+                continue
+            try:
+                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = f.read().splitlines()
+            except OSError as e:
+                print(f"Error reading {filepath}: {e}")
+                continue
+
+            conn.execute('DELETE FROM lines WHERE path = ?', (key,))
+            conn.executemany(
+                'INSERT INTO lines (path, line_number, content) VALUES (?, ?, ?)',
+                [(key, i + 1, line) for i, line in enumerate(lines)]
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO files (path, name, mtime_ns, size, file_date) VALUES (?, ?, ?, ?, ?)',
+                (key, filepath.name, st.st_mtime_ns, st.st_size, file_date(filepath, st.st_mtime))
+            )
+            indexed += 1
+
+        removed = [key for key in known if key not in seen] if prune else []
+        for key in removed:
+            conn.execute('DELETE FROM lines WHERE path = ?', (key,))
+            conn.execute('DELETE FROM files WHERE path = ?', (key,))
+
+    return {'indexed': indexed, 'unchanged': unchanged, 'removed': len(removed)}
+
+def build_match(query):
+    """FTS5 query matching lines that contain any query word as a word prefix."""
+    words = TOKEN_PATTERN.findall(query.lower())
+    return ' OR '.join(f'"{w}"*' for w in dict.fromkeys(words))
+
+def _match_filter(query, paths, since):
+    """FROM/WHERE clause and parameters shared by search() and count(), or None
+    when nothing can match."""
+    match = build_match(query)
+    if not match:
+        return None
+    sql = '''
+        FROM lines_fts
+        JOIN lines l ON l.id = lines_fts.rowid
+        JOIN files f ON f.path = l.path
+        WHERE lines_fts MATCH ?
+    '''
+    params = [match]
+    if paths is not None:
+        paths = [str(p) for p in paths]
+        if not paths:
+            return None
+        sql += f" AND l.path IN ({','.join('?' * len(paths))})"
+        params.extend(paths)
+    if since is not None:
+        sql += ' AND f.file_date >= ?'
+        params.append(since)
+    return sql, params
+
+def search(conn, query, paths=None, since=None, context_lines=2, limit=None):
+    """Lines matching any word of query, best BM25 match first, in the result
+    format of search.search_files(). `paths` restricts the search to those
+    files and `since` (ISO timestamp) to files dated at or after it. The limit
+    is applied in SQL, so context is only read for the lines returned."""
+    where = _match_filter(query, paths, since)
+    if where is None:
+        return []
+    sql, params = where
+    rows = conn.execute(
+        'SELECT l.path, f.name, l.line_number, l.content, bm25(lines_fts) AS rank ' + sql + ' ORDER BY rank LIMIT ?',
+        params + [-1 if limit is None else int(limit)]
+    ).fetchall()
+
+    results = []
+    for path, name, line_number, content, rank in rows:
+        if context_lines > 0:
+            context = '\n'.join(row[0] for row in conn.execute(
+                'SELECT content FROM lines WHERE path = ? AND line_number BETWEEN ? AND ? ORDER BY line_number',
+                (path, line_number - context_lines, line_number + context_lines)
+            ))
+        else:
+            context = content
+        results.append({
+            'file': name,
+            'path': path,
+            'line': line_number,
+            'match': content.strip(),
+            'context': context.strip(),
+            'score': round(-rank, 2)
+        })
+    return results
+
+def count(conn, query, paths=None, since=None):
+    """Number of lines search() would return without a limit."""
+    where = _match_filter(query, paths, since)
+    if where is None:
+        return 0
+    sql, params = where
+    return conn.execute('SELECT COUNT(*) ' + sql, params).fetchone()[0]
+
+def index_stats(conn):
+    """Size of the index: files and lines."""
+    files = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+    lines = conn.execute('SELECT COUNT(*) FROM lines').fetchone()[0]
+    return {'files': files, 'lines': lines}
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Semantic index for memory search.
+
+Memory files are split into chunks (paragraphs, capped at CHUNK_LINES lines)
+and each chunk is embedded with a hashing-trick vector: stemmed words and
+their character trigrams hashed into DIM signed buckets, then L2-normalised.
+Trigrams let "deploying" match "deployment" and catch typos, with no model
+to download.
+
+Vectors live in a float32 matrix file next to the search index, read through
+a NumPy memmap, so a query is one matrix-vector product. Chunk metadata lives
+in the search index database. A changed file is re-chunked, but only chunks
+whose text changed are re-embedded; unchanged chunks keep their vector rows.
+
+NumPy is optional. Without it, vectors are scored in pure Python, which is
+fine for small memory stores.
+"""
+
+import math
+import re
+import zlib
+from array import array
+from contextlib import contextmanager
+from hashlib import sha1
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import search_index
+
+DIM = 256
+CHUNK_LINES = 8
+VECTORS_PATH = search_index.INDEX_PATH.parent / "chunk_vectors.f32"
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+SUFFIXES = ('ations', 'ation', 'ings', 'ing', 'ments', 'ment', 'ness', 'edly', 'ed', 'es', 'ly', 's')
+RRF_K = 60
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS chunk_files (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS chunks (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        start_line INTEGER NOT NULL,
+        end_line INTEGER NOT NULL,
+        content_hash TEXT NOT NULL,
+        vector_row INTEGER NOT NULL UNIQUE
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_chunks_path ON chunks(path)',
+]
+
+def init_schema(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+def stem(word):
+    for suffix in SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def features(text):
+    """Weighted hashing features: stemmed words, plus their trigrams at lower weight."""
+    counts = {}
+    for word in WORD_PATTERN.findall(text.lower()):
+        word = stem(word)
+        counts[word] = counts.get(word, 0) + 1.0
+        padded = f'<{word}>'
+        for i in range(len(padded) - 2):
+            gram = '#' + padded[i:i + 3]
+            counts[gram] = counts.get(gram, 0) + 0.5
+    return counts
+
+def embed(text, dim=DIM):
+    """Hashing-trick embedding of text as an L2-normalised array('f')."""
+    vector = array('f', bytes(4 * dim))
+    for feature, count in features(text).items():
+        h = zlib.crc32(feature.encode('utf-8'))
+        weight = 1.0 + math.log(count) if count >= 1 else count
+        vector[h % dim] += weight if (h >> 31) & 1 else -weight
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm:
+        for i in range(dim):
+            vector[i] /= norm
+    return vector
+
+def chunk_lines(lines, max_lines=CHUNK_LINES):
+    """Split a file into chunks: paragraphs (blank-line separated), at most max_lines each.
+    Yields (start_line, end_line, text) with 1-based inclusive line numbers."""
+    start = None
+    for i, line in enumerate(lines + ['']):
+        if line.strip():
+            if start is None:
+                start = i
+            if i - start + 1 < max_lines:
+                continue
+            end = i + 1
+        elif start is not None:
+            end = i
+        else:
+            continue
+        yield start + 1, end, '\n'.join(lines[start:end])
+        start = None
+
+class VectorStore:
+    """Fixed-width float32 rows in a flat file. Rows are addressed by index; freed rows are reused."""
+
+    def __init__(self, path=VECTORS_PATH, dim=DIM):
+        self.path = Path(path)
+        self.dim = dim
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self._file = None
+
+    @property
+    def rows(self):
+        return self.path.stat().st_size // (4 * self.dim)
+
+    @contextmanager
+    def writing(self):
+        """Keep the file open across many write() calls."""
+        self._file = open(self.path, 'r+b')
+        try:
+            yield self
+        finally:
+            self._file.close()
+            self._file = None
+
+    def write(self, row, vector):
+        if self._file is None:
+            with self.writing():
+                return self.write(row, vector)
+        self._file.seek(row * 4 * self.dim)
+        self._file.write(vector.tobytes())
+
+    def clear(self, row):
+        self.write(row, array('f', bytes(4 * self.dim)))
+
+    def matrix(self):
+        """All rows: a read-only (rows, dim) memmap with NumPy, else a flat array('f')."""
+        rows = self.rows
+        if np is not None:
+            if rows == 0:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            return np.memmap(self.path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+        flat = array('f')
+        with open(self.path, 'rb') as f:
+            flat.frombytes(f.read(rows * 4 * self.dim))
+        return flat
+
+def update_vectors(conn, store, files, prune=True):
+    """Re-chunk files whose mtime or size changed, embedding only chunks whose text is new.
+    Returns {'files', 'embedded', 'reused', 'removed'}."""
+    known = {row[0]: (row[1], row[2]) for row in conn.execute('SELECT path, mtime_ns, size FROM chunk_files')}
+    used = {row[0] for row in conn.execute('SELECT vector_row FROM chunks')}
+    free = sorted(set(range(store.rows)) - used, reverse=True)
+    next_row = store.rows
+    seen = set()
+    stats = {'files': 0, 'embedded': 0, 'reused': 0, 'removed': 0}
+
+    def release(path):
+        for (row,) in conn.execute('SELECT vector_row FROM chunks WHERE path = ?', (path,)).fetchall():
+            store.clear(row)
+            free.append(row)
+        conn.execute('DELETE FROM chunks WHERE path = ?', (path,))
+
+    with conn, store.writing():
+        for filepath in files:
+            key = str(filepath)
+            seen.add(key)
+            try:
+                st = filepath.stat()
+            except OSError:
+                continue
+            if known.get(key) == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = f.read().splitlines()
+            except OSError as e:
+                print(f"Error reading {filepath}: {e}")
+                continue
+
+            # Vectors of unchanged chunks are kept, whatever line they moved to.
+            previous = {}
+            for content_hash, row in conn.execute(
+                    'SELECT content_hash, vector_row FROM chunks WHERE path = ?', (key,)).fetchall():
+                previous.setdefault(content_hash, []).append(row)
+            conn.execute('DELETE FROM chunks WHERE path = ?', (key,))
+
+            for start, end, text in chunk_lines(lines):
+                content_hash = sha1(text.encode('utf-8')).hexdigest()
+                if previous.get(content_hash):
+                    row = previous[content_hash].pop()
+                    stats['reused'] += 1
+                else:
+                    if free:
+                        row = free.pop()
+                    else:
+                        row, next_row = next_row, next_row + 1
+                    store.write(row, embed(text))
+                    stats['embedded'] += 1
+                conn.execute(
+                    'INSERT INTO chunks (path, start_line, end_line, content_hash, vector_row) VALUES (?, ?, ?, ?, ?)',
+                    (key, start, end, content_hash, row)
+                )
+            for rows in previous.values():
+                for row in rows:
+                    store.clear(row)
+                    free.append(row)
+            conn.execute('INSERT OR REPLACE INTO chunk_files (path, mtime_ns, size) VALUES (?, ?, ?)',
+                         (key, st.st_mtime_ns, st.st_size))
+            stats['files'] += 1
+
+        if prune:
+            for key in [k for k in known if k not in seen]:
+                release(key)
+                conn.execute('DELETE FROM chunk_files WHERE path = ?', (key,))
+                stats['removed'] += 1
+
+    return stats
+
+def top_rows(matrix, query_vector, k, allowed=None):
+    """(row, cosine) pairs of the k best rows, optionally restricted to `allowed` rows."""
+    if np is not None:
+        q = np.frombuffer(query_vector.tobytes(), dtype=np.float32)
+        if allowed is None:
+            scores = matrix @ q
+            rows = np.arange(len(scores))
+        else:
+            rows = np.fromiter(allowed, dtype=np.int64)
+            scores = matrix[rows] @ q if len(rows) else np.zeros(0, dtype=np.float32)
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(rows[i]), float(scores[i])) for i in best if scores[i] > 0]
+
+    dim = len(query_vector)
+    candidates = range(len(matrix) // dim) if allowed is None else allowed
+    scored = []
+    for row in candidates:
+        offset = row * dim
+        score = sum(matrix[offset + i] * query_vector[i] for i in range(dim))
+        if score > 0:
+            scored.append((row, score))
+    scored.sort(key=lambda x: -x[1])
+    return scored[:k]
+
+def _scope_rows(conn, paths=None, since=None):
+    sql = 'SELECT c.vector_row FROM chunks c'
+    params = []
+    clauses = []
+    if since is not None:
+        sql += ' JOIN files f ON f.path = c.path'
+        clauses.append('f.file_date >= ?')
+        params.append(since)
+    if paths is not None:
+        paths = [str(p) for p in paths]
+        clauses.append(f"c.path IN ({','.join('?' * len(paths))})" if paths else '0')
+        params.extend(paths)
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    return [row[0] for row in conn.execute(sql, params)]
+
+def _chunk_result(conn, vector_row, score):
+    path, name, start, end = conn.execute('''
+        SELECT c.path, COALESCE(f.name, c.path), c.start_line, c.end_line
+        FROM chunks c LEFT JOIN files f ON f.path = c.path
+        WHERE c.vector_row = ?
+    ''', (vector_row,)).fetchone()
+    lines = [row[0] for row in conn.execute(
+        'SELECT content FROM lines WHERE path = ? AND line_number BETWEEN ? AND ? ORDER BY line_number',
+        (path, start, end))]
+    text = '\n'.join(lines).strip()
+    return {
+        'file': Path(name).name,
+        'path': path,
+        'line': start,
+        'match': next((line.strip() for line in lines if line.strip()), ''),
+        'context': text,
+        'score': round(score, 3),
+    }
+
+def search(conn, store, query, paths=None, since=None, limit=20, hybrid=True):
+    """Chunks closest to query by cosine similarity. With hybrid, semantic and BM25
+    rankings are merged by reciprocal rank fusion, so exact keyword hits still rank."""
+    restricted = paths is not None or since is not None
+    allowed = _scope_rows(conn, paths, since) if restricted else None
+    depth = max(limit * 5, 50) if hybrid else limit
+    semantic = top_rows(store.matrix(), embed(query), depth, allowed)
+    if not hybrid:
+        return [_chunk_result(conn, row, score) for row, score in semantic]
+
+    fused = {}
+    for rank, (row, _score) in enumerate(semantic):
+        fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+    keyword_rank = 0
+    seen_rows = set()
+    for hit in search_index.search(conn, query, paths=paths, since=since, context_lines=0, limit=depth):
+        found = conn.execute(
+            'SELECT vector_row FROM chunks WHERE path = ? AND ? BETWEEN start_line AND end_line',
+            (hit['path'], hit['line'])).fetchone()
+        if found is None or found[0] in seen_rows:
+            continue
+        seen_rows.add(found[0])
+        fused[found[0]] = fused.get(found[0], 0.0) + 1.0 / (RRF_K + keyword_rank + 1)
+        keyword_rank += 1
+
+    ranked = sorted(fused.items(), key=lambda x: -x[1])[:limit]
+    # Scale fused scores so a chunk ranked first by both methods scores 1.0.
+    return [_chunk_result(conn, row, score * (RRF_K + 1) / 2) for row, score in ranked]
@@ -0,0 +1,111 @@
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import search_index  # noqa: E402
+
+
+@unittest.skipUnless(search_index.fts5_available(), "SQLite was built without FTS5")
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name)
+        self.conn = search_index.connect(self.root / "index.db")
+        self.files = {
+            "2026-01-05.md": "Deploy notes\nThe deploy pipeline uses blue green rollout.\nNothing else.\n",
+            "2026-03-01.md": "Release day\nWe deployed the dashboard.\nDatabase migration done.\n",
+            "MEMORY.md": "Core facts\nDeployments need a reviewer.\n",
+        }
+        for name, text in self.files.items():
+            (self.root / name).write_text(text)
+
+    def tearDown(self):
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def paths(self):
+        return sorted(p for p in self.root.glob("*.md"))
+
+    def touch(self, path, text):
+        path.write_text(text)
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_first_update_indexes_every_file_and_the_next_skips_them(self):
+        self.assertEqual(search_index.update_index(self.conn, self.paths()), {"indexed": 3, "unchanged": 0, "removed": 0})
+        self.assertEqual(search_index.update_index(self.conn, self.paths()), {"indexed": 0, "unchanged": 3, "removed": 0})
+        self.assertEqual(search_index.index_stats(self.conn), {"files": 3, "lines": 8})
+
+    def test_changed_file_is_reindexed_and_old_lines_leave_the_fts_index(self):
+        search_index.update_index(self.conn, self.paths())
+        self.touch(self.root / "2026-01-05.md", "Canary rollout only now.\n")
+
+        changes = search_index.update_index(self.conn, self.paths())
+
+        self.assertEqual(changes, {"indexed": 1, "unchanged": 2, "removed": 0})
+        self.assertEqual(search_index.search(self.conn, "pipeline"), [])
+        hits = search_index.search(self.conn, "canary")
+        self.assertEqual([(h["file"], h["line"]) for h in hits], [("2026-01-05.md", 1)])
+
+    def test_deleted_files_are_pruned_unless_pruning_is_off(self):
+        search_index.update_index(self.conn, self.paths())
+        (self.root / "2026-03-01.md").unlink()
+
+        kept = search_index.update_index(self.conn, self.paths(), prune=False)
+        self.assertEqual(kept["removed"], 0)
+        self.assertEqual(search_index.count(self.conn, "dashboard"), 1)
+
+        pruned = search_index.update_index(self.conn, self.paths())
+        self.assertEqual(pruned["removed"], 1)
+        self.assertEqual(search_index.count(self.conn, "dashboard"), 0)
+        self.assertEqual(search_index.index_stats(self.conn), {"files": 2, "lines": 5})
+
+    def test_prefix_match_ranks_and_returns_context(self):
+        search_index.update_index(self.conn, self.paths())
+
+        hits = search_index.search(self.conn, "deploy", context_lines=1)
+
+        self.assertEqual(len(hits), 4)  # deploy, Deploy, deployed, Deployments
+        self.assertEqual(hits, sorted(hits, key=lambda h: -h["score"]))
+        pipeline = next(h for h in hits if h["line"] == 2 and h["file"] == "2026-01-05.md")
+        self.assertEqual(pipeline["match"], "The deploy pipeline uses blue green rollout.")
+        self.assertEqual(pipeline["context"], "Deploy notes\nThe deploy pipeline uses blue green rollout.\nNothing else.")
+
+    def test_limit_is_applied_and_count_reports_the_total(self):
+        search_index.update_index(self.conn, self.paths())
+        unlimited = search_index.search(self.conn, "deploy")
+
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        limited = search_index.search(self.conn, "deploy", limit=2)
+        self.conn.set_trace_callback(None)
+
+        self.assertEqual(limited, unlimited[:2])
+        # Context is only read for the rows the limit kept.
+        self.assertEqual(sum("line_number BETWEEN" in s for s in statements), 2)
+        self.assertEqual(search_index.count(self.conn, "deploy"), len(unlimited))
+
+    def test_paths_and_since_restrict_the_search(self):
+        search_index.update_index(self.conn, self.paths())
+        dated = [self.root / "2026-01-05.md", self.root / "2026-03-01.md"]
+
+        in_paths = search_index.search(self.conn, "deploy", paths=dated)
+        recent = search_index.search(self.conn, "deploy", paths=dated, since="2026-02-01T00:00:00")
+
+        self.assertEqual({h["file"] for h in in_paths}, {"2026-01-05.md", "2026-03-01.md"})
+        self.assertEqual([h["file"] for h in recent], ["2026-03-01.md"])
+        self.assertEqual(search_index.count(self.conn, "deploy", paths=dated, since="2026-02-01T00:00:00"), 1)
+        self.assertEqual(search_index.search(self.conn, "deploy", paths=[]), [])
+
+    def test_query_without_words_matches_nothing(self):
+        search_index.update_index(self.conn, self.paths())
+        self.assertEqual(search_index.search(self.conn, "?!"), [])
+        self.assertEqual(search_index.count(self.conn, "?!"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import math
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+from array import array
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import search_index  # noqa: E402
+import semantic_index  # noqa: E402
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class EmbeddingTests(unittest.TestCase):
+    def test_chunks_are_paragraphs_capped_at_max_lines(self):
+        lines = ["a", "b", "", "", "c", "d", "e", "f", "g"]
+        self.assertEqual(list(semantic_index.chunk_lines(lines, max_lines=3)), [
+            (1, 2, "a\nb"),
+            (5, 7, "c\nd\ne"),
+            (8, 9, "f\ng"),
+        ])
+
+    def test_embeddings_are_normalised_and_related_words_are_closer(self):
+        deploying = semantic_index.embed("deploying the service")
+        self.assertAlmostEqual(math.sqrt(cosine(deploying, deploying)), 1.0, places=5)
+        related = cosine(deploying, semantic_index.embed("service deployment"))
+        unrelated = cosine(deploying, semantic_index.embed("grocery list bananas"))
+        self.assertGreater(related, unrelated + 0.3)
+
+    @unittest.skipIf(semantic_index.np is None, "NumPy is not installed")
+    def test_numpy_and_pure_python_scoring_agree(self):
+        texts = ["deploy pipeline", "database migration", "deploying services", "lunch order"]
+        flat = array("f")
+        for text in texts:
+            flat.extend(semantic_index.embed(text))
+        matrix = semantic_index.np.frombuffer(flat.tobytes(), dtype=semantic_index.np.float32).reshape(len(texts), -1)
+        query = semantic_index.embed("deploy")
+
+        with_numpy = semantic_index.top_rows(matrix, query, 2)
+        np_module, semantic_index.np = semantic_index.np, None
+        try:
+            pure = semantic_index.top_rows(flat, query, 2)
+            scoped = semantic_index.top_rows(flat, query, 2, allowed=[1, 3])
+        finally:
+            semantic_index.np = np_module
+
+        self.assertEqual([row for row, _ in with_numpy], [row for row, _ in pure])
+        for (_, a), (_, b) in zip(with_numpy, pure):
+            self.assertAlmostEqual(a, b, places=5)
+        self.assertTrue(all(row in (1, 3) for row, _ in scoped))
+
+
+@unittest.skipUnless(search_index.fts5_available(), "SQLite was built without FTS5")
+class SemanticIndexTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name)
+        self.conn = search_index.connect(self.root / "index.db")
+        semantic_index.init_schema(self.conn)
+        self.store = semantic_index.VectorStore(self.root / "vectors.f32")
+        self.write("2026-01-05.md", "Deployment checklist for the api.\n\nLunch was pizza.\n")
+        self.write("2026-02-10.md", "Database migration finished.\n\nThe token budget was raised.\n")
+
+    def tearDown(self):
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def write(self, name, text):
+        path = self.root / name
+        path.write_text(text)
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def update(self):
+        files = sorted(self.root.glob("*.md"))
+        search_index.update_index(self.conn, files)
+        return semantic_index.update_vectors(self.conn, self.store, files)
+
+    def test_only_new_chunk_text_is_embedded(self):
+        self.assertEqual(self.update(), {"files": 2, "embedded": 4, "reused": 0, "removed": 0})
+        self.assertEqual(self.update(), {"files": 0, "embedded": 0, "reused": 0, "removed": 0})
+
+        self.write("2026-01-05.md", "New intro paragraph.\n\nDeployment checklist for the api.\n\nLunch was pizza.\n")
+        self.assertEqual(self.update(), {"files": 1, "embedded": 1, "reused": 2, "removed": 0})
+        self.assertEqual(self.store.rows, 5)
+
+    def test_removed_files_free_their_rows_for_reuse(self):
+        self.update()
+        (self.root / "2026-02-10.md").unlink()
+        self.assertEqual(self.update()["removed"], 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0], 2)
+
+        self.write("2026-03-01.md", "Release notes.\n")
+        self.update()
+        self.assertEqual(self.store.rows, 4)
+
+    def test_semantic_search_matches_related_word_forms(self):
+        self.update()
+        hits = semantic_index.search(self.conn, self.store, "deploying", limit=1, hybrid=False)
+        self.assertEqual(hits[0]["match"], "Deployment checklist for the api.")
+        self.assertEqual((hits[0]["file"], hits[0]["line"]), ("2026-01-05.md", 1))
+
+    def test_hybrid_search_ranks_exact_keyword_hits_and_respects_scope(self):
+        self.update()
+        hits = semantic_index.search(self.conn, self.store, "token budget", limit=2)
+        self.assertEqual(hits[0]["match"], "The token budget was raised.")
+
+        scoped = semantic_index.search(self.conn, self.store, "token budget", limit=5,
+                                       paths=[self.root / "2026-01-05.md"])
+        self.assertTrue(scoped)
+        self.assertTrue(all(h["file"] == "2026-01-05.md" for h in scoped))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -76,171 +76,201 @@ export async function GET(request) {
   }
 }
 
-export async function POST(request) {
-  try {
-    const sql = getSql();
-    const orgId = getOrgId(request);
-    const body = await request.json();
+const MAX_BATCH_ACTIONS = 100;
+const BATCH_CONCURRENCY = 8;
 
-    const { valid, data, errors } = validateActionRecord(body);
-    if (!valid) {
-      return NextResponse.json({ error: 'Validation failed', details: errors }, { status: 400 });
-    }
+function isDuplicateError(error) {
+  return Boolean(error.message?.includes('unique') || error.message?.includes('duplicate'));
+}
 
-    // SECURITY: redact likely secrets before storing the action record.
-    // Signature verification is performed against the original payload below, not the redacted copy.
-    const dlpFindings = [];
-    for (const k of [
-      'agent_name',
-      'declared_goal',
-      'reasoning',
-      'authorization_scope',
-      'trigger',
-      'input_summary',
-      'output_summary',
-      'error_message',
-    ]) {
-      if (data[k] != null) data[k] = redactAny(data[k], dlpFindings);
-    }
-    if (data.systems_touched != null) data.systems_touched = redactAny(data.systems_touched, dlpFindings);
-    if (data.side_effects != null) data.side_effects = redactAny(data.side_effects, dlpFindings);
-    if (data.artifacts_created != null) data.artifacts_created = redactAny(data.artifacts_created, dlpFindings);
+function quotaExceeded(actionsQuota) {
+  return {
+    status: 402,
+    payload: { error: 'Monthly action limit exceeded. Upgrade your plan.', code: 'QUOTA_EXCEEDED', usage: actionsQuota.usage, limit: actionsQuota.limit },
+  };
+}
 
-    // Quota check: actions per month (fast meter path)
-    const plan = await getOrgPlan(orgId, sql);
-    const actionsQuota = await checkQuotaFast(orgId, 'actions_per_month', plan, sql);
-    if (!actionsQuota.allowed) {
-      return NextResponse.json(
-        { error: 'Monthly action limit exceeded. Upgrade your plan.', code: 'QUOTA_EXCEEDED', usage: actionsQuota.usage, limit: actionsQuota.limit },
-        { status: 402 }
-      );
-    }
+/**
+ * Validate one action record and redact likely secrets from it.
+ * Returns { data, dlpFindings }, or { error: { status, payload } }.
+ */
+function prepareAction(body) {
+  const { valid, data, errors } = validateActionRecord(body);
+  if (!valid) {
+    return { error: { status: 400, payload: { error: 'Validation failed', details: errors } } };
+  }
 
-    // Quota check: agents (only block new agent_ids)
-    let isNewAgent = false;
-    if (data.agent_id) {
-      const existing = await hasAgentAction(sql, orgId, data.agent_id);
-      isNewAgent = !existing;
-
-      // SECURITY: Closed enrollment mode — reject unknown agent_ids
-      if (isNewAgent && process.env.DASHCLAW_CLOSED_ENROLLMENT === 'true') {
-        return NextResponse.json(
-          { error: 'Agent not registered. Enable open enrollment or pre-register this agent.', code: 'AGENT_NOT_REGISTERED' },
-          { status: 403 }
-        );
-      }
+  // SECURITY: redact likely secrets before storing the action record.
+  // Signature verification is performed against the original payload below, not the redacted copy.
+  const dlpFindings = [];
+  for (const k of [
+    'agent_name',
+    'declared_goal',
+    'reasoning',
+    'authorization_scope',
+    'trigger',
+    'input_summary',
+    'output_summary',
+    'error_message',
+  ]) {
+    if (data[k] != null) data[k] = redactAny(data[k], dlpFindings);
+  }
+  if (data.systems_touched != null) data.systems_touched = redactAny(data.systems_touched, dlpFindings);
+  if (data.side_effects != null) data.side_effects = redactAny(data.side_effects, dlpFindings);
+  if (data.artifacts_created != null) data.artifacts_created = redactAny(data.artifacts_created, dlpFindings);
 
-      if (!existing) {
-        const agentsQuota = await checkQuotaFast(orgId, 'agents', plan, sql);
-        if (!agentsQuota.allowed) {
-          return NextResponse.json(
-            { error: 'Agent limit reached. Upgrade your plan.', code: 'QUOTA_EXCEEDED', usage: agentsQuota.usage, limit: agentsQuota.limit },
-            { status: 402 }
-          );
-        }
-      }
-    }
+  return { data, dlpFindings };
+}
+
+/**
+ * Known-agent lookups shared by the records of one request, so a batch checks
+ * each agent_id once and counts a new agent towards the agents meter once.
+ */
+function agentLookup(sql, orgId) {
+  const existing = new Map();
+  const counted = new Set();
+  return {
+    exists(agentId) {
+      if (!existing.has(agentId)) existing.set(agentId, hasAgentAction(sql, orgId, agentId));
+      return existing.get(agentId);
+    },
+    claim(agentId) {
+      if (counted.has(agentId)) return false;
+      counted.add(agentId);
+      return true;
+    },
+  };
+}
 
-    // Generate action_id if not provided
-    const action_id = data.action_id || `act_${crypto.randomUUID()}`;
-    const timestamp_start = data.timestamp_start || new Date().toISOString();
-
-    // Identity Verification
-    const signature = body._signature || null;
-    let verified = false;
-    // SECURITY: Default to enforcing signatures in production unless explicitly disabled
-    const enforceSignatures = process.env.NODE_ENV === 'production'
-      ? process.env.ENFORCE_AGENT_SIGNATURES !== 'false'
-      : process.env.ENFORCE_AGENT_SIGNATURES === 'true';
-
-    if (enforceSignatures && !signature) {
-      return NextResponse.json(
-        { error: 'Signature required', code: 'SIGNATURE_REQUIRED' },
-        { status: 401 }
-      );
+/**
+ * Guard and store one prepared action record. Returns { status, payload } for
+ * the response; storage errors are thrown to the caller.
+ */
+async function storeAction(sql, orgId, body, { data, dlpFindings }, plan, agents) {
+  // Quota check: agents (only block new agent_ids)
+  let isNewAgent = false;
+  if (data.agent_id) {
+    const existing = await agents.exists(data.agent_id);
+    isNewAgent = !existing;
+
+    // SECURITY: Closed enrollment mode — reject unknown agent_ids
+    if (isNewAgent && process.env.DASHCLAW_CLOSED_ENROLLMENT === 'true') {
+      return {
+        status: 403,
+        payload: { error: 'Agent not registered. Enable open enrollment or pre-register this agent.', code: 'AGENT_NOT_REGISTERED' },
+      };
     }
 
-    if (signature && data.agent_id) {
-      // verify against the exact payload received (minus signature)
-      const { _signature: s, ...payload } = body;
-      verified = await verifyAgentSignature(orgId, data.agent_id, payload, signature, sql);
-      
-      if (!verified && enforceSignatures) {
-        return NextResponse.json(
-          { error: 'Invalid agent signature', code: 'INVALID_AGENT_SIGNATURE' },
-          { status: 401 }
-        );
+    if (!existing) {
+      const agentsQuota = await checkQuotaFast(orgId, 'agents', plan, sql);
+      if (!agentsQuota.allowed) {
+        return {
+          status: 402,
+          payload: { error: 'Agent limit reached. Upgrade your plan.', code: 'QUOTA_EXCEEDED', usage: agentsQuota.usage, limit: agentsQuota.limit },
+        };
       }
     }
+  }
 
-    // BEHAVIOR GUARD EVALUATION
-    const guardDecision = await evaluateGuard(orgId, {
-      ...data,
-      agent_id: data.agent_id
-    }, sql);
-
-    if (guardDecision.decision === 'block') {
-      return NextResponse.json({ 
-        error: 'Action blocked by policy', 
-        decision: guardDecision 
-      }, { status: 403 });
-    }
+  // Generate action_id if not provided
+  const action_id = data.action_id || `act_${crypto.randomUUID()}`;
+  const timestamp_start = data.timestamp_start || new Date().toISOString();
+
+  // Identity Verification
+  const signature = body._signature || null;
+  let verified = false;
+  // SECURITY: Default to enforcing signatures in production unless explicitly disabled
+  const enforceSignatures = process.env.NODE_ENV === 'production'
+    ? process.env.ENFORCE_AGENT_SIGNATURES !== 'false'
+    : process.env.ENFORCE_AGENT_SIGNATURES === 'true';
 
-    const isPendingApproval = guardDecision.decision === 'require_approval';
-    const actionStatus = isPendingApproval ? 'pending_approval' : (data.status || 'running');
+  if (enforceSignatures && !signature) {
+    return { status: 401, payload: { error: 'Signature required', code: 'SIGNATURE_REQUIRED' } };
+  }
 
-    // Auto-calculate cost if tokens are provided
-    // SECURITY: Clamp agent-reported cost/token values to reasonable bounds
-    const MAX_TOKENS = 10_000_000;
-    const MAX_COST_USD = 10_000;
-    if (data.tokens_in !== undefined) data.tokens_in = Math.max(0, Math.min(Number(data.tokens_in) || 0, MAX_TOKENS));
-    if (data.tokens_out !== undefined) data.tokens_out = Math.max(0, Math.min(Number(data.tokens_out) || 0, MAX_TOKENS));
-    if (data.cost_estimate !== undefined) data.cost_estimate = Math.max(0, Math.min(Number(data.cost_estimate) || 0, MAX_COST_USD));
+  if (signature && data.agent_id) {
+    // verify against the exact payload received (minus signature)
+    const { _signature: s, ...payload } = body;
+    verified = await verifyAgentSignature(orgId, data.agent_id, payload, signature, sql);
 
-    let costEstimate = data.cost_estimate || 0;
-    if ((data.tokens_in || data.tokens_out) && !data.cost_estimate) {
-      costEstimate = estimateCost(data.tokens_in || 0, data.tokens_out || 0, data.model);
+    if (!verified && enforceSignatures) {
+      return { status: 401, payload: { error: 'Invalid agent signature', code: 'INVALID_AGENT_SIGNATURE' } };
     }
+  }
 
-    const createdAction = await createActionRecord(sql, {
-      orgId,
-      action_id,
-      data,
-      actionStatus,
-      costEstimate,
-      signature,
-      verified,
-      timestamp_start,
-    });
+  // BEHAVIOR GUARD EVALUATION
+  const guardDecision = await evaluateGuard(orgId, {
+    ...data,
+    agent_id: data.agent_id
+  }, sql);
 
-    // Fire-and-forget meter increments (don't block response)
-    const meterUpdates = [incrementMeter(orgId, 'actions_per_month', sql)];
-    if (isNewAgent) {
-      meterUpdates.push(incrementMeter(orgId, 'agents', sql));
-    }
-    
-    // Background indexing for behavioral anomaly detection
-    const indexAction = async () => {
-      if (!isEmbeddingsEnabled()) return;
-      try {
-        const embedding = await generateActionEmbedding(data);
-        if (embedding) {
-          await insertActionEmbedding(sql, {
-            orgId,
-            agentId: data.agent_id,
-            actionId: action_id,
-            embedding,
-          });
-        }
-      } catch (e) {
-        console.warn('[API] Background indexing failed:', e.message);
+  if (guardDecision.decision === 'block') {
+    return { status: 403, payload: { error: 'Action blocked by policy', decision: guardDecision } };
+  }
+
+  const isPendingApproval = guardDecision.decision === 'require_approval';
+  const actionStatus = isPendingApproval ? 'pending_approval' : (data.status || 'running');
+
+  // Auto-calculate cost if tokens are provided
+  // SECURITY: Clamp agent-reported cost/token values to reasonable bounds
+  const MAX_TOKENS = 10_000_000;
+  const MAX_COST_USD = 10_000;
+  if (data.tokens_in !== undefined) data.tokens_in = Math.max(0, Math.min(Number(data.tokens_in) || 0, MAX_TOKENS));
+  if (data.tokens_out !== undefined) data.tokens_out = Math.max(0, Math.min(Number(data.tokens_out) || 0, MAX_TOKENS));
+  if (data.cost_estimate !== undefined) data.cost_estimate = Math.max(0, Math.min(Number(data.cost_estimate) || 0, MAX_COST_USD));
+
+  let costEstimate = data.cost_estimate || 0;
+  if ((data.tokens_in || data.tokens_out) && !data.cost_estimate) {
+    costEstimate = estimateCost(data.tokens_in || 0, data.tokens_out || 0, data.model);
+  }
+
+  const createdAction = await createActionRecord(sql, {
+    orgId,
+    action_id,
+    data,
+    actionStatus,
+    costEstimate,
+    signature,
+    verified,
+    timestamp_start,
+  });
+
+  // Fire-and-forget meter increments (don't block response)
+  const meterUpdates = [incrementMeter(orgId, 'actions_per_month', sql)];
+  if (isNewAgent && agents.claim(data.agent_id)) {
+    meterUpdates.push(incrementMeter(orgId, 'agents', sql));
+  }
+
+  // Background indexing for behavioral anomaly detection
+  const indexAction = async () => {
+    if (!isEmbeddingsEnabled()) return;
+    try {
+      const embedding = await generateActionEmbedding(data);
+      if (embedding) {
+        await insertActionEmbedding(sql, {
+          orgId,
+          agentId: data.agent_id,
+          actionId: action_id,
+          embedding,
+        });
       }
-    };
+    } catch (e) {
+      console.warn('[API] Background indexing failed:', e.message);
+    }
+  };
+
+  Promise.all([...meterUpdates, indexAction()]).catch(() => {});
 
-    Promise.all([...meterUpdates, indexAction()]).catch(() => {});
+  // Emit real-time event
+  void publishOrgEvent(EVENTS.ACTION_CREATED, {
+    orgId,
+    action: createdAction,
+  });
 
-    const response = NextResponse.json({ 
-      action: createdAction, 
+  return {
+    status: isPendingApproval ? 202 : 201,
+    payload: {
+      action: createdAction,
       action_id,
       decision: guardDecision,
       security: {
@@ -249,21 +279,111 @@ export async function POST(request) {
         critical_count: dlpFindings.filter(f => f.severity === 'critical').length,
         categories: [...new Set(dlpFindings.map(f => f.category))],
       },
-    }, { status: isPendingApproval ? 202 : 201 });
-    
-    // Emit real-time event
-    void publishOrgEvent(EVENTS.ACTION_CREATED, {
-      orgId,
-      action: createdAction,
-    });
+    },
+  };
+}
+
+/** fn(item, index) over items with at most `limit` calls in flight; results keep input order. */
+async function mapWithConcurrency(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+  return results;
+}
+
+async function recordBatch(sql, orgId, batch) {
+  if (batch.length === 0 || batch.length > MAX_BATCH_ACTIONS) {
+    return NextResponse.json({ error: `actions must contain 1 to ${MAX_BATCH_ACTIONS} records` }, { status: 400 });
+  }
+
+  const records = batch.map((record) => record || {});
+  const prepared = records.map(prepareAction);
+  const valid = prepared.filter((p) => !p.error).length;
+
+  let plan = null;
+  let actionsQuota = null;
+  if (valid > 0) {
+    plan = await getOrgPlan(orgId, sql);
+    actionsQuota = await checkQuotaFast(orgId, 'actions_per_month', plan, sql);
+    // The whole batch must fit in what is left of the monthly quota.
+    const remaining = Number.isFinite(actionsQuota.limit) ? actionsQuota.limit - (actionsQuota.usage || 0) : Infinity;
+    if (!actionsQuota.allowed || valid > remaining) {
+      const { status, payload } = quotaExceeded(actionsQuota);
+      return NextResponse.json({ ...payload, requested: valid, remaining: Math.max(0, remaining) }, { status });
+    }
+  }
+
+  const agents = agentLookup(sql, orgId);
+  const results = await mapWithConcurrency(records, BATCH_CONCURRENCY, async (record, index) => {
+    if (prepared[index].error) {
+      const { status, payload } = prepared[index].error;
+      return { status, ...payload };
+    }
+    try {
+      const { status, payload } = await storeAction(sql, orgId, record, prepared[index], plan, agents);
+      return { status, ...payload };
+    } catch (error) {
+      console.error('Actions API POST batch record error:', error);
+      return isDuplicateError(error)
+        ? { status: 409, error: 'Action with this action_id already exists', action_id: record.action_id }
+        : { status: 500, error: 'An error occurred while creating the action', action_id: record.action_id };
+    }
+  });
+
+  const created = results.filter((r) => r.status === 201 || r.status === 202).length;
+  const response = NextResponse.json({ results, created }, { status: 200 });
+  if (actionsQuota?.warning) {
+    response.headers.set('x-quota-warning', `actions_per_month at ${actionsQuota.percent}%`);
+  }
+  return response;
+}
+
+/**
+ * POST /api/actions — Record an action.
+ * Body: an action record, or { actions: [record, ...] } to record up to
+ * MAX_BATCH_ACTIONS in one request (e.g. a finished trace). A batch answers 200
+ * with one { status, ...response } result per record, in order; each record is
+ * validated, guarded and signed exactly as it would be on its own. A batch that
+ * does not fit in the remaining monthly action quota is rejected as a whole (402).
+ */
+export async function POST(request) {
+  try {
+    const sql = getSql();
+    const orgId = getOrgId(request);
+    const body = await request.json();
+
+    if (Array.isArray(body?.actions)) {
+      return await recordBatch(sql, orgId, body.actions);
+    }
+
+    const prepared = prepareAction(body);
+    if (prepared.error) {
+      return NextResponse.json(prepared.error.payload, { status: prepared.error.status });
+    }
+
+    // Quota check: actions per month (fast meter path)
+    const plan = await getOrgPlan(orgId, sql);
+    const actionsQuota = await checkQuotaFast(orgId, 'actions_per_month', plan, sql);
+    if (!actionsQuota.allowed) {
+      const { status, payload } = quotaExceeded(actionsQuota);
+      return NextResponse.json(payload, { status });
+    }
 
-    if (actionsQuota.warning) {
+    const { status, payload } = await storeAction(sql, orgId, body, prepared, plan, agentLookup(sql, orgId));
+    const response = NextResponse.json(payload, { status });
+    if (status < 400 && actionsQuota.warning) {
       response.headers.set('x-quota-warning', `actions_per_month at ${actionsQuota.percent}%`);
     }
     return response;
   } catch (error) {
     console.error('Actions API POST error:', error);
-    if (error.message?.includes('unique') || error.message?.includes('duplicate')) {
+    if (isDuplicateError(error)) {
       return NextResponse.json({ error: 'Action with this action_id already exists' }, { status: 409 });
     }
     return NextResponse.json({ error: 'An error occurred while creating the action' }, { status: 500 });
@@ -5,11 +5,19 @@ import { NextResponse } from 'next/server';
 import { getSql } from '../../../lib/db.js';
 import { getOrgId } from '../../../lib/org.js';
 import { EVENTS, publishOrgEvent } from '../../../lib/events.js';
-import { upsertAgentPresence, ensureAgentPresenceTable } from '../../../lib/repositories/agents.repository.js';
+import {
+  upsertAgentPresence,
+  upsertAgentPresenceBatch,
+  ensureAgentPresenceTable,
+} from '../../../lib/repositories/agents.repository.js';
+
+const MAX_BATCH_HEARTBEATS = 1000;
 
 /**
  * POST /api/agents/heartbeat — Report agent presence and health.
  * Body: { agent_id, agent_name?, status, current_task_id?, metadata? }
+ *   or  { heartbeats: [{ agent_id, agent_name?, status, current_task_id?, metadata? }, ...] }
+ *       to report many agents (e.g. one process hosting a fleet) in one request.
  */
 export async function POST(request) {
   try {
@@ -17,6 +25,37 @@ export async function POST(request) {
     const orgId = getOrgId(request);
     const body = await request.json();
 
+    if (Array.isArray(body.heartbeats)) {
+      if (body.heartbeats.length > MAX_BATCH_HEARTBEATS) {
+        return NextResponse.json({ error: `Maximum ${MAX_BATCH_HEARTBEATS} heartbeats per request` }, { status: 400 });
+      }
+      if (body.heartbeats.some((hb) => !hb || !hb.agent_id)) {
+        return NextResponse.json({ error: 'agent_id is required for every heartbeat' }, { status: 400 });
+      }
+
+      const now = new Date().toISOString();
+      const heartbeats = body.heartbeats.map(({ agent_id, agent_name, status = 'online', current_task_id, metadata }) => ({
+        agent_id,
+        agent_name,
+        status,
+        current_task_id,
+        metadata,
+      }));
+      await upsertAgentPresenceBatch(sql, orgId, heartbeats, now);
+      for (const { agent_id, status, current_task_id } of heartbeats) {
+        void publishOrgEvent('agent.heartbeat', {
+          orgId,
+          agent_id,
+          status,
+          last_heartbeat_at: now,
+          current_task_id
+        });
+      }
+      console.log(`[Heartbeat] Received batch of ${body.heartbeats.length} for org=${orgId}`);
+
+      return NextResponse.json({ status: 'ok', count: body.heartbeats.length, timestamp: now });
+    }
+
     const { agent_id, agent_name, status = 'online', current_task_id, metadata } = body;
 
     if (!agent_id) {
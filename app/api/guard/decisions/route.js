@@ -0,0 +1,63 @@
+export const dynamic = 'force-dynamic';
+export const revalidate = 0;
+
+import { NextResponse } from 'next/server';
+import { getOrgId } from '../../../lib/org';
+import { validateGuardDecisionRecord } from '../../../lib/validate';
+import { recordGuardDecision } from '../../../lib/guard';
+import { getSql } from '../../../lib/db.js';
+
+const MAX_DECISIONS = 100;
+
+/**
+ * POST /api/guard/decisions — Record guard decisions an SDK already made against its
+ * local policy snapshot (guard_evaluation="local"). Nothing is re-evaluated: each
+ * entry is written to the audit trail as decided, marked evaluated_locally.
+ *
+ * Body: { decisions: [{ action_type, risk_score?, agent_id?, systems_touched?, reversible?,
+ *         declared_goal?, decision, reasons?, matched_policies?, evaluated_at?, snapshot_version? }] }
+ *       or a single decision object.
+ */
+export async function POST(request) {
+  try {
+    const orgId = getOrgId(request);
+    const body = await request.json().catch(() => ({}));
+    const entries = Array.isArray(body?.decisions) ? body.decisions : [body];
+
+    if (entries.length === 0) {
+      return NextResponse.json({ error: 'At least one decision is required' }, { status: 400 });
+    }
+    if (entries.length > MAX_DECISIONS) {
+      return NextResponse.json({ error: `decisions exceeds maximum batch size of ${MAX_DECISIONS}` }, { status: 400 });
+    }
+
+    const records = [];
+    const errors = [];
+    entries.forEach((entry, idx) => {
+      const { valid, data, errors: entryErrors } = validateGuardDecisionRecord(entry && typeof entry === 'object' ? entry : {});
+      if (!valid) {
+        errors.push(...entryErrors.map((err) => `decisions[${idx}]: ${err}`));
+      } else {
+        records.push(data);
+      }
+    });
+    if (errors.length > 0) {
+      return NextResponse.json({ error: 'Validation failed', details: errors }, { status: 400 });
+    }
+
+    const sql = getSql();
+    const recorded = records.map(({ decision, reasons, matched_policies, evaluated_at, snapshot_version, ...context }) => (
+      recordGuardDecision(orgId, {
+        ...context,
+        evaluated_locally: true,
+        evaluated_at: evaluated_at || null,
+        snapshot_version: snapshot_version || null,
+      }, { decision, reasons, matched_policies }, sql)
+    ));
+
+    return NextResponse.json({ recorded, recorded_count: recorded.length }, { status: 201 });
+  } catch (err) {
+    console.error('[GUARD] decisions POST error:', err);
+    return NextResponse.json({ error: 'Internal server error' }, { status: 500 });
+  }
+}
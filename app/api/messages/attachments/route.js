@@ -29,14 +29,39 @@ export async function GET(request) {
     const safeFilename = (attachment.filename || 'download')
       .replace(/["\r\n\x00-\x1f\x7f]/g, '_');
 
+    const headers = {
+      'Content-Type': attachment.mime_type,
+      'Content-Disposition': `attachment; filename="${safeFilename}"`,
+      'Accept-Ranges': 'bytes',
+      'Cache-Control': 'private, max-age=3600',
+    };
+
+    // Single byte ranges ("bytes=start-" / "bytes=start-end") let SDKs resume
+    // interrupted downloads. Anything else falls back to the full body.
+    const range = /^bytes=(\d+)-(\d*)$/.exec(request.headers.get('range') || '');
+    if (range) {
+      const start = Number(range[1]);
+      const end = range[2] ? Math.min(Number(range[2]), buffer.length - 1) : buffer.length - 1;
+      if (start >= buffer.length || start > end) {
+        return new NextResponse(null, {
+          status: 416,
+          headers: { ...headers, 'Content-Range': `bytes */${buffer.length}` },
+        });
+      }
+      const slice = buffer.subarray(start, end + 1);
+      return new NextResponse(slice, {
+        status: 206,
+        headers: {
+          ...headers,
+          'Content-Range': `bytes ${start}-${end}/${buffer.length}`,
+          'Content-Length': String(slice.length),
+        },
+      });
+    }
+
     return new NextResponse(buffer, {
       status: 200,
-      headers: {
-        'Content-Type': attachment.mime_type,
-        'Content-Disposition': `attachment; filename="${safeFilename}"`,
-        'Content-Length': String(buffer.length),
-        'Cache-Control': 'private, max-age=3600',
-      },
+      headers: { ...headers, 'Content-Length': String(buffer.length) },
     });
   } catch (error) {
     console.error('Attachment GET error:', error);
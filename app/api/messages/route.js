@@ -44,6 +44,7 @@ export async function GET(request) {
     const type = searchParams.get('type');
     const unread = searchParams.get('unread');
     const threadId = searchParams.get('thread_id');
+    const since = searchParams.get('since');
     const limit = Math.min(parseInt(searchParams.get('limit') || '50', 10), 1000);
     const offset = parseInt(searchParams.get('offset') || '0', 10);
 
@@ -53,6 +54,7 @@ export async function GET(request) {
       type,
       unread: unread === 'true',
       threadId,
+      since,
       limit,
       offset,
     });
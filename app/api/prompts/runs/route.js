@@ -2,6 +2,9 @@ import { NextResponse } from 'next/server';
 import { getSql } from '../../../lib/db.js';
 import { getOrgId } from '../../../lib/org.js';
 import { listPromptRuns } from '../../../lib/repositories/prompts.repository.js';
+import { getVersion, recordPromptRun } from '../../../lib/prompt.js';
+
+const MAX_BATCH_RUNS = 500;
 
 export async function GET(request) {
   try {
@@ -20,3 +23,48 @@ export async function GET(request) {
     return NextResponse.json({ error: 'Failed to fetch runs' }, { status: 500 });
   }
 }
+
+/**
+ * POST /api/prompts/runs — Record prompt runs rendered client-side.
+ * Body: { runs: [{ template_id, version_id, action_id?, agent_id?, input_vars?, rendered?, tokens_used?, latency_ms?, outcome? }, ...] }
+ */
+export async function POST(request) {
+  try {
+    const body = await request.json();
+    const runs = Array.isArray(body?.runs) ? body.runs : null;
+    if (!runs || runs.length === 0) {
+      return NextResponse.json({ error: 'runs must be a non-empty array' }, { status: 400 });
+    }
+    if (runs.length > MAX_BATCH_RUNS) {
+      return NextResponse.json({ error: `Maximum ${MAX_BATCH_RUNS} runs per request` }, { status: 400 });
+    }
+    if (runs.some((run) => !run || !run.template_id || !run.version_id)) {
+      return NextResponse.json({ error: 'template_id and version_id are required for every run' }, { status: 400 });
+    }
+
+    // Runs may only reference this org's prompts: each version must exist in the org and
+    // belong to the template the run names.
+    const versionIds = [...new Set(runs.map((run) => run.version_id))];
+    const versions = new Map();
+    for (const version of await Promise.all(versionIds.map((id) => getVersion(request, id)))) {
+      if (version) versions.set(version.id, version);
+    }
+    const unknown = runs.filter((run) => versions.get(run.version_id)?.template_id !== run.template_id);
+    if (unknown.length > 0) {
+      return NextResponse.json({
+        error: 'Prompt template or version not found',
+        details: unknown.map((run) => ({ template_id: run.template_id, version_id: run.version_id })),
+      }, { status: 404 });
+    }
+
+    const runIds = [];
+    for (const run of runs) {
+      const { id } = await recordPromptRun(request, run);
+      runIds.push(id);
+    }
+    return NextResponse.json({ recorded: runIds.length, run_ids: runIds }, { status: 201 });
+  } catch (err) {
+    console.error('[prompts/runs] POST error:', err);
+    return NextResponse.json({ error: 'Failed to record runs' }, { status: 500 });
+  }
+}
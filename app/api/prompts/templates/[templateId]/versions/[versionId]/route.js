@@ -1,5 +1,7 @@
 import { NextResponse } from 'next/server';
 import { getVersion, activateVersion } from '../../../../../../lib/prompt.js';
+import { getOrgId } from '../../../../../../lib/org.js';
+import { EVENTS, publishOrgEvent } from '../../../../../../lib/events.js';
 
 export async function GET(request, { params }) {
   try {
@@ -21,6 +23,13 @@ export async function POST(request, { params }) {
     if (!activated) {
       return NextResponse.json({ error: 'Version not found' }, { status: 404 });
     }
+    // Lets SDK render caches drop the previous active version immediately.
+    void publishOrgEvent(EVENTS.PROMPT_VERSION_ACTIVATED, {
+      orgId: getOrgId(request),
+      template_id: activated.template_id,
+      version_id: activated.id,
+      version: activated.version,
+    });
     return NextResponse.json({ ...activated, message: 'Version activated' });
   } catch (err) {
     console.error('[prompts/versions/detail] POST error:', err);
@@ -16,6 +16,7 @@ export const EVENTS = {
   LOOP_UPDATED: 'loop.updated',
   GOAL_CREATED: 'goal.created',
   GOAL_UPDATED: 'goal.updated',
+  PROMPT_VERSION_ACTIVATED: 'prompt.version_activated',
 };
 
 const EVENT_VERSION = 'v1';
@@ -105,8 +105,37 @@ export async function evaluateGuard(orgId, context, sql, options = {}) {
 
   const evaluated_at = new Date().toISOString();
 
-  // Log decision fire-and-forget
+  recordGuardDecision(orgId, context, {
+    decision: highestDecision,
+    reasons,
+    matched_policies: matchedPolicies,
+  }, sql, evaluated_at);
+
+  return {
+    decision: highestDecision,
+    reasons,
+    warnings,
+    matched_policies: matchedPolicies,
+    risk_score: context.risk_score != null ? context.risk_score : null,
+    evaluated_at,
+  };
+}
+
+/**
+ * Write a guard decision to guard_decisions and publish it to org subscribers.
+ * The insert is fire-and-forget so logging never delays or fails the caller.
+ *
+ * @param {string} orgId
+ * @param {Object} context - guard context; stored (redacted) as the decision context
+ * @param {{ decision: string, reasons?: string[], matched_policies?: string[] }} result
+ * @param {Function} sql - neon sql tagged template
+ * @param {string} [createdAt] - ISO timestamp, defaults to now
+ * @returns {{ id: string, created_at: string }}
+ */
+export function recordGuardDecision(orgId, context, result, sql, createdAt = new Date().toISOString()) {
   const decisionId = `gd_${randomUUID().replace(/-/g, '').slice(0, 24)}`;
+  const reason = (result.reasons || []).join('; ') || null;
+  const matchedPolicies = result.matched_policies || [];
 
   // SECURITY: do not store raw secrets in guard decision context.
   // This keeps the evaluation logic unchanged; only the logged context is redacted.
@@ -122,13 +151,13 @@ export async function evaluateGuard(orgId, context, sql, options = {}) {
       ${decisionId},
       ${orgId},
       ${context.agent_id || null},
-      ${highestDecision},
-      ${reasons.join('; ') || null},
+      ${result.decision},
+      ${reason},
       ${JSON.stringify(matchedPolicies)},
       ${JSON.stringify(safeContextForLog)},
       ${context.risk_score != null ? context.risk_score : null},
       ${context.action_type || null},
-      ${evaluated_at}
+      ${createdAt}
     )
   `.catch(() => {});
 
@@ -138,24 +167,17 @@ export async function evaluateGuard(orgId, context, sql, options = {}) {
       id: decisionId,
       org_id: orgId,
       agent_id: context.agent_id || null,
-      decision: highestDecision,
-      reason: reasons.join('; ') || null,
+      decision: result.decision,
+      reason,
       matched_policies: matchedPolicies,
       context: safeContextForLog,
       risk_score: context.risk_score != null ? context.risk_score : null,
       action_type: context.action_type || null,
-      created_at: evaluated_at
+      created_at: createdAt
     }
   });
 
-  return {
-    decision: highestDecision,
-    reasons,
-    warnings,
-    matched_policies: matchedPolicies,
-    risk_score: context.risk_score != null ? context.risk_score : null,
-    evaluated_at,
-  };
+  return { id: decisionId, created_at: createdAt };
 }
 
 function applyResult(result, policy, reasons, warnings, matchedPolicies) {
@@ -74,6 +74,18 @@ function summarizeOutcomes(episodes) {
   };
 }
 
+// SDKs collapse repeated events into one row with details.count.
+function eventWeight(event) {
+  const count = Number(event?.details?.count);
+  return Number.isInteger(count) && count > 0 ? count : 1;
+}
+
+function countEvents(events, eventType) {
+  return events
+    .filter((e) => e.event_type === eventType)
+    .reduce((sum, e) => sum + eventWeight(e), 0);
+}
+
 function isRecommendationApplied(value) {
   return value === true || value === 1 || value === '1';
 }
@@ -96,10 +108,10 @@ export async function getLearningRecommendationMetrics(sql, orgId, options = {})
 
   const metrics = recommendations.map((rec) => {
     const recEvents = events.filter((event) => event.recommendation_id === rec.id);
-    const fetchedCount = recEvents.filter((e) => e.event_type === 'fetched').length;
-    const appliedCount = recEvents.filter((e) => e.event_type === 'applied').length;
-    const overriddenCount = recEvents.filter((e) => e.event_type === 'overridden').length;
-    const outcomeEventsCount = recEvents.filter((e) => e.event_type === 'outcome').length;
+    const fetchedCount = countEvents(recEvents, 'fetched');
+    const appliedCount = countEvents(recEvents, 'applied');
+    const overriddenCount = countEvents(recEvents, 'overridden');
+    const outcomeEventsCount = countEvents(recEvents, 'outcome');
 
     const appliedEpisodes = episodes.filter(
       (episode) =>
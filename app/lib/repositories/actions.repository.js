@@ -37,7 +37,7 @@ export async function listActions(sql, orgId, filters = {}) {
     }
 
     const where = `WHERE ${conditions.join(' AND ')}`;
-    const listCols = 'action_id, agent_id, agent_name, swarm_id, action_type, declared_goal, reasoning, authorization_scope, systems_touched, status, reversible, risk_score, confidence, output_summary, error_message, side_effects, artifacts_created, duration_ms, cost_estimate, timestamp_start, timestamp_end, created_at, verified';
+    const listCols = 'action_id, agent_id, agent_name, swarm_id, action_type, declared_goal, reasoning, authorization_scope, systems_touched, status, reversible, risk_score, confidence, output_summary, error_message, side_effects, artifacts_created, duration_ms, cost_estimate, tokens_in, tokens_out, timestamp_start, timestamp_end, created_at, verified';
     const query = `SELECT ${listCols} FROM action_records ${where} ORDER BY timestamp_start DESC LIMIT $${params.push(parsedLimit)} OFFSET $${params.push(parsedOffset)}`;
     const countQuery = `SELECT COUNT(*) as total FROM action_records ${where}`;
     const statsQuery = `
@@ -68,7 +68,7 @@ export async function listActions(sql, orgId, filters = {}) {
   const [actions, countResult, stats] = await Promise.all([
     sql`
       SELECT
-        action_id, agent_id, agent_name, swarm_id, action_type, declared_goal, reasoning, authorization_scope, systems_touched, status, reversible, risk_score, confidence, output_summary, error_message, side_effects, artifacts_created, duration_ms, cost_estimate, timestamp_start, timestamp_end, created_at, verified
+        action_id, agent_id, agent_name, swarm_id, action_type, declared_goal, reasoning, authorization_scope, systems_touched, status, reversible, risk_score, confidence, output_summary, error_message, side_effects, artifacts_created, duration_ms, cost_estimate, tokens_in, tokens_out, timestamp_start, timestamp_end, created_at, verified
       FROM action_records
       WHERE org_id = ${orgId}
         ${agent_id ? sql`AND agent_id = ${agent_id}` : sql``}
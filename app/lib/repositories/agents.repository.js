@@ -256,6 +256,42 @@ export async function upsertAgentPresence(sql, orgId, payload) {
   `;
 }
 
+/**
+ * Upsert many agents' presence records in one statement (batched heartbeats).
+ * When an agent appears more than once, its last heartbeat wins, since one
+ * INSERT ... ON CONFLICT cannot update the same row twice.
+ */
+export async function upsertAgentPresenceBatch(sql, orgId, heartbeats, timestamp) {
+  const latest = new Map();
+  for (const hb of heartbeats) latest.set(hb.agent_id, hb);
+
+  const params = [orgId, timestamp];
+  const rows = [];
+  for (const { agent_id, agent_name, status, current_task_id, metadata } of latest.values()) {
+    const n = params.length;
+    params.push(agent_id, agent_name || null, status, current_task_id || null, JSON.stringify(metadata || {}));
+    rows.push(`($1, $${n + 1}, $${n + 2}, $${n + 3}, $${n + 4}, $2, $${n + 5}, $2)`);
+  }
+  if (rows.length === 0) return [];
+
+  return sql.query(
+    `
+      INSERT INTO agent_presence (
+        org_id, agent_id, agent_name, status, current_task_id,
+        last_heartbeat_at, metadata, updated_at
+      ) VALUES ${rows.join(', ')}
+      ON CONFLICT (org_id, agent_id) DO UPDATE SET
+        agent_name = EXCLUDED.agent_name,
+        status = EXCLUDED.status,
+        current_task_id = EXCLUDED.current_task_id,
+        last_heartbeat_at = EXCLUDED.last_heartbeat_at,
+        metadata = EXCLUDED.metadata,
+        updated_at = EXCLUDED.updated_at
+    `,
+    params
+  );
+}
+
 /**
  * Ensure the agent_presence table exists (lazy migration).
  */
@@ -5,6 +5,7 @@ export async function listMessages(sql, orgId, filters = {}) {
     type,
     unread,
     threadId,
+    since,
     limit = 50,
     offset = 0,
   } = filters;
@@ -48,6 +49,12 @@ export async function listMessages(sql, orgId, filters = {}) {
     params.push(threadId);
     idx++;
   }
+  if (since) {
+    // Inclusive so messages sharing the cursor timestamp are not skipped; clients dedupe by id.
+    conditions.push(`created_at >= $${idx}`);
+    params.push(since);
+    idx++;
+  }
 
   const where = conditions.join(' AND ');
   const rows = await sql.query(
@@ -201,6 +201,16 @@ const GUARD_INPUT_SCHEMA = {
 const POLICY_TYPES = ['risk_threshold', 'require_approval', 'block_action_type', 'rate_limit', 'webhook_check', 'behavioral_anomaly', 'semantic_check'];
 const GUARD_ACTIONS = ['allow', 'warn', 'block', 'require_approval'];
 
+// A decision already made by an SDK against its local policy snapshot, sent for the audit trail.
+const GUARD_DECISION_RECORD_SCHEMA = {
+  ...GUARD_INPUT_SCHEMA,
+  decision:         { type: 'string', required: true, enum: GUARD_ACTIONS },
+  reasons:          { type: 'array', maxItems: 50 },
+  matched_policies: { type: 'array', maxItems: 100 },
+  evaluated_at:     { type: 'string', maxLength: 64 },
+  snapshot_version: { type: 'string', maxLength: 64 },
+};
+
 const POLICY_SCHEMA = {
   name:        { type: 'string', required: true, maxLength: 256 },
   policy_type: { type: 'string', required: true, enum: POLICY_TYPES },
@@ -212,6 +222,10 @@ export function validateGuardInput(body) {
   return validate(body, GUARD_INPUT_SCHEMA);
 }
 
+export function validateGuardDecisionRecord(body) {
+  return validate(body, GUARD_DECISION_RECORD_SCHEMA);
+}
+
 export function validatePolicy(body) {
   const result = validate(body, POLICY_SCHEMA);
   if (!result.valid) return result;
@@ -7,22 +7,29 @@ ROOT = pathlib.Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "sdk-python"))
 
 from dashclaw.client import DashClaw  # noqa: E402
+from dashclaw.transport import InProcessTransport  # noqa: E402
 
 
 class RecordingDashClaw(DashClaw):
+    """Records each request as it reaches the transport, i.e. as it would go on the wire."""
+
     def __init__(self):
+        self.calls = []
         super().__init__(
             base_url="https://example.test",
             api_key="test-key",
             agent_id="agent-1",
             agent_name="Agent One",
+            transport=InProcessTransport(self._handle),
         )
-        self.calls = []
 
-    def _request(self, path, method="GET", body=None):
-        call = {"path": path, "method": method, "body": body}
-        self.calls.append(call)
-        return {"ok": True}
+    def _handle(self, method, path, headers, body):
+        self.calls.append({
+            "path": path,
+            "method": method,
+            "body": json.loads(body) if body else None,
+        })
+        return 200, {"ok": True}
 
 
 def run():
@@ -1,3 +1,4 @@
 from .client import DashClaw, DashClawError, GuardBlockedError, OpenClawAgent, ApprovalDeniedError
+from .attachments import AttachmentFile
 
-__all__ = ["DashClaw", "DashClawError", "GuardBlockedError", "OpenClawAgent", "ApprovalDeniedError"]
+__all__ = ["DashClaw", "DashClawError", "GuardBlockedError", "OpenClawAgent", "ApprovalDeniedError", "AttachmentFile"]
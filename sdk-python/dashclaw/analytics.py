@@ -0,0 +1,694 @@
+import bisect
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+from .scoring import _js_str, _to_number, np
+
+DAY_MS = 86400000
+
+DRIFT_METRICS = (
+    {"id": "risk_score", "label": "Risk Score", "source": "action_records"},
+    {"id": "confidence", "label": "Confidence", "source": "action_records"},
+    {"id": "duration_ms", "label": "Duration (ms)", "source": "action_records"},
+    {"id": "cost_estimate", "label": "Cost Estimate", "source": "action_records"},
+    {"id": "tokens_total", "label": "Total Tokens", "source": "action_records"},
+    {"id": "learning_score", "label": "Learning Score", "source": "learning_episodes"},
+)
+
+SEVERITY_THRESHOLDS = {"info": 1.5, "warning": 2.0, "critical": 3.0}
+
+MATURITY_LEVELS = (
+    {"level": "novice", "min_episodes": 0, "min_success_rate": 0, "min_avg_score": 0},
+    {"level": "developing", "min_episodes": 10, "min_success_rate": 0.4, "min_avg_score": 40},
+    {"level": "competent", "min_episodes": 50, "min_success_rate": 0.6, "min_avg_score": 55},
+    {"level": "proficient", "min_episodes": 150, "min_success_rate": 0.75, "min_avg_score": 65},
+    {"level": "expert", "min_episodes": 500, "min_success_rate": 0.85, "min_avg_score": 75},
+    {"level": "master", "min_episodes": 1000, "min_success_rate": 0.92, "min_avg_score": 85},
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+# --- Statistics (ports of app/lib/drift.js and app/lib/learningAnalytics.js) ---
+
+def _round3(value):
+    """Math.round(value * 1000) / 1000."""
+    return math.floor(value * 1000 + 0.5) / 1000
+
+
+def _percentile(sorted_values, pct):
+    if len(sorted_values) == 0:
+        return 0
+    idx = (pct / 100) * (len(sorted_values) - 1)
+    lo, hi = math.floor(idx), math.ceil(idx)
+    if lo == hi:
+        return float(sorted_values[lo])
+    return float(sorted_values[lo]) + (float(sorted_values[hi]) - float(sorted_values[lo])) * (idx - lo)
+
+
+def z_score(current_mean, baseline_mean, baseline_stddev):
+    if baseline_stddev == 0:
+        return 0 if current_mean == baseline_mean else 999
+    return (current_mean - baseline_mean) / baseline_stddev
+
+
+def classify_severity(abs_z):
+    for level in ("critical", "warning", "info"):
+        if abs_z >= SEVERITY_THRESHOLDS[level]:
+            return level
+    return None
+
+
+def linear_reg_slope(values):
+    n = len(values)
+    if n < 2:
+        return 0
+    x_mean = (n - 1) / 2
+    y_mean = sum(values) / n
+    num = sum((i - x_mean) * (v - y_mean) for i, v in enumerate(values))
+    den = sum((i - x_mean) ** 2 for i in range(n))
+    return 0 if den == 0 else num / den
+
+
+def classify_maturity(total_episodes, success_rate, avg_score):
+    best = MATURITY_LEVELS[0]
+    for level in MATURITY_LEVELS:
+        if (total_episodes >= level["min_episodes"] and success_rate >= level["min_success_rate"]
+                and avg_score >= level["min_avg_score"]):
+            best = level
+    score = min(total_episodes / 1000, 1) * 30 + success_rate * 40 + (avg_score / 100) * 30
+    return {"level": best["level"], "score": _round3(score)}
+
+
+def _js_number(value, fallback):
+    """Number(value) with a fallback for non-finite results; Number(null) is 0."""
+    if value is None:
+        return 0.0
+    if isinstance(value, str) and not value.strip():
+        return 0.0
+    number = _to_number(value)
+    return number if math.isfinite(number) else fallback
+
+
+def _clamp(value, lo, hi):
+    return min(hi, max(lo, value))
+
+
+def _js_round(value):
+    return math.floor(value + 0.5)
+
+
+def score_action_episode(action):
+    """Port of scoreActionEpisode() in app/lib/learning-loop.js. Returns {"score", "outcome_label"}."""
+    status = str(action.get("status") or "pending")
+    risk = _clamp(_js_round(_js_number(action.get("risk_score"), 0)), 0, 100)
+    reversible = action.get("reversible") in (True, 1, "1")
+    duration = _js_number(action.get("duration_ms"), None)
+    cost = _js_number(action.get("cost_estimate"), None)
+    confidence = _clamp(_js_round(_js_number(action.get("confidence"), 50)), 0, 100)
+    invalidated = max(0, _js_round(_js_number(action.get("invalidated_assumptions"), 0)))
+    open_loops = max(0, _js_round(_js_number(action.get("open_loops"), 0)))
+
+    score = 50
+    score += {"completed": 30, "failed": -35, "cancelled": -20, "pending_approval": -8, "running": -5}.get(status, 0)
+    if risk > 60:
+        score -= min(20, _js_round((risk - 60) / 2))
+    elif risk <= 30:
+        score += 4
+    score += 5 if reversible else -8
+    if duration is not None:
+        score += 6 if duration <= 60000 else 3 if duration <= 300000 else -4 if duration <= 1800000 else -10
+    if cost is not None:
+        score += 4 if cost <= 0.05 else 1 if cost <= 1 else -4 if cost <= 5 else -8
+    if status == "completed" and confidence >= 70:
+        score += 4
+    if status == "failed" and confidence >= 80:
+        score -= 8
+    score -= min(16, invalidated * 4)
+    score -= min(10, open_loops * 2)
+
+    if status == "completed":
+        label = "success"
+    elif status in ("failed", "cancelled"):
+        label = "failure"
+    else:
+        label = "pending"
+    return {"score": _clamp(_js_round(score), 0, 100), "outcome_label": label}
+
+
+def _parse_time(value):
+    """Epoch milliseconds for an ISO timestamp (naive values are UTC), or NaN."""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str) and value:
+        text = value.strip().replace(" ", "T", 1)
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        if "." in text:
+            # fromisoformat() before 3.11 only accepts 3 or 6 fractional digits.
+            head, _, rest = text.partition(".")
+            digits = len(rest) - len(rest.lstrip("0123456789"))
+            text = f"{head}.{rest[:digits][:6].ljust(6, '0')}{rest[digits:]}"
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return math.nan
+    else:
+        return math.nan
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return float((dt - _EPOCH) // timedelta(milliseconds=1))
+
+
+def _iso(ms):
+    """new Date(ms).toISOString()"""
+    return (_EPOCH + timedelta(milliseconds=ms)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+# --- Grouped reductions over columns (NumPy or pure Python, same results) ---
+
+def _dense(codes, use_numpy):
+    """Renumber group codes 0..n-1. Returns (unique codes in ascending order, dense codes)."""
+    if use_numpy:
+        uniques, inverse = np.unique(codes, return_inverse=True)
+        return uniques.tolist(), inverse
+    uniques = sorted(set(codes))
+    index = {code: i for i, code in enumerate(uniques)}
+    return uniques, [index[c] for c in codes]
+
+
+def _group_sums(codes, values, n, use_numpy):
+    """Per-group counts and sums; values are added in row order, like the JS reduce()."""
+    if use_numpy:
+        return (np.bincount(codes, minlength=n).tolist(),
+                np.bincount(codes, weights=values, minlength=n).tolist())
+    counts, sums = [0] * n, [0.0] * n
+    for code, value in zip(codes, values):
+        counts[code] += 1
+        sums[code] += value
+    return counts, sums
+
+
+def _group_sq_dev(codes, values, centers, n, use_numpy):
+    if use_numpy:
+        return np.bincount(codes, weights=(values - np.asarray(centers)[codes]) ** 2, minlength=n).tolist()
+    out = [0.0] * n
+    for code, value in zip(codes, values):
+        out[code] += (value - centers[code]) ** 2
+    return out
+
+
+def _group_min(codes, values, n, use_numpy):
+    if use_numpy:
+        out = np.full(n, np.inf)
+        np.minimum.at(out, codes, values)
+        return out.tolist()
+    out = [math.inf] * n
+    for code, value in zip(codes, values):
+        if value < out[code]:
+            out[code] = value
+    return out
+
+
+def _group_sorted(codes, values, n, use_numpy):
+    """Each group's values in ascending order."""
+    if use_numpy:
+        order = np.lexsort((values, codes))
+        bounds = np.cumsum(np.bincount(codes, minlength=n))[:-1]
+        return np.split(values[order], bounds)
+    groups = [[] for _ in range(n)]
+    for code, value in zip(codes, values):
+        groups[code].append(value)
+    for group in groups:
+        group.sort()
+    return groups
+
+
+def _stddev(sq_dev, count):
+    return math.sqrt(sq_dev / (count - 1)) if count >= 2 else 0
+
+
+class ActionFrame:
+    """
+    Columnar, in-memory copy of action records for local analytics.
+
+    Each field is one column (a list, or a NumPy array on demand), agent and
+    action type names are stored as integer codes, and every action also
+    carries its learning-episode score and outcome as computed by the server's
+    learning loop. Actions are de-duplicated by action_id, so overlapping
+    pages or exports can be appended safely.
+
+    Usage:
+        frame = ActionFrame.fetch(claw, agent_id="my-agent")
+        frame.extend(more_actions)
+    """
+
+    NUMERIC_COLUMNS = ("risk_score", "confidence", "duration_ms", "cost_estimate", "tokens_in", "tokens_out")
+    TEXT_COLUMNS = ("agent_id", "agent_name", "action_type")
+
+    def __init__(self, actions=()):
+        self._ids = set()
+        self._data = {
+            name: [] for name in self.NUMERIC_COLUMNS + ("created_at", "episode_at", "episode_score", "episode_success")
+        }
+        self._codes = {name: [] for name in self.TEXT_COLUMNS}
+        self._labels = {name: [] for name in self.TEXT_COLUMNS}
+        self._index = {name: {} for name in self.TEXT_COLUMNS}
+        self._arrays = {}
+        self.extend(actions)
+
+    @classmethod
+    def fetch(cls, client, page_size=200, max_actions=None, **filters):
+        """Page through GET /api/actions (newest first) into a new frame. filters are passed to get_actions."""
+        frame = cls()
+        offset = 0
+        while max_actions is None or offset < max_actions:
+            limit = page_size if max_actions is None else min(page_size, max_actions - offset)
+            page = client.get_actions(limit=limit, offset=offset, **filters)
+            actions = page.get("actions") or []
+            frame.extend(actions)
+            offset += len(actions)
+            if len(actions) < limit or offset >= (page.get("total") or 0):
+                break
+        return frame
+
+    def extend(self, actions):
+        """Append action dicts. Returns the number of new actions."""
+        added = 0
+        for action in actions:
+            action_id = action.get("action_id")
+            if action_id is not None:
+                if action_id in self._ids:
+                    continue
+                self._ids.add(action_id)
+            for name in self.NUMERIC_COLUMNS:
+                self._data[name].append(_to_number(action.get(name)))
+            created = _parse_time(action.get("created_at"))
+            started = _parse_time(action.get("timestamp_start"))
+            # Drift reads action_records.created_at; episodes are dated by timestamp_start.
+            self._data["created_at"].append(started if math.isnan(created) else created)
+            self._data["episode_at"].append(created if math.isnan(started) else started)
+            episode = score_action_episode(action)
+            self._data["episode_score"].append(float(episode["score"]))
+            self._data["episode_success"].append(1.0 if episode["outcome_label"] == "success" else 0.0)
+            for name in self.TEXT_COLUMNS:
+                label = action.get(name)
+                if label is None or label == "":
+                    code = -1
+                else:
+                    code = self._index[name].get(label)
+                    if code is None:
+                        code = self._index[name][label] = len(self._labels[name])
+                        self._labels[name].append(label)
+                self._codes[name].append(code)
+            added += 1
+        if added:
+            self._arrays.clear()
+        return added
+
+    def __len__(self):
+        return len(self._data["created_at"])
+
+    def labels(self, name):
+        return self._labels[name]
+
+    def column(self, name, use_numpy=False):
+        """A column as a list, or as a cached NumPy array (float64, int64 for codes)."""
+        source = self._codes[name] if name in self._codes else self._data[name]
+        if not use_numpy:
+            return source
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.asarray(source, dtype=np.int64 if name in self._codes else np.float64)
+        return array
+
+
+class LocalAnalytics:
+    """
+    Drift detection and learning analytics computed in-process over an
+    ActionFrame, mirroring app/lib/drift.js and app/lib/learningAnalytics.js.
+
+    Results have the same shape as compute_drift_baselines, detect_drift,
+    compute_learning_velocity and compute_learning_curves, without persisted
+    row ids, so analysts can re-run them as often as they like without load on
+    the API. Window statistics are computed for all agents at once with
+    grouped reductions (NumPy when installed, identical pure-Python fallback).
+
+    Learning episodes are derived from the actions with the server's episode
+    scoring rules. The actions list does not include assumption and open-loop
+    counts, so those penalties only apply when the action dicts carry
+    invalidated_assumptions / open_loops themselves.
+
+    Usage:
+        analytics = claw.local_analytics(agent_id="my-agent")
+        analytics.compute_baselines(lookback_days=30)
+        alerts = analytics.detect_drift(window_days=7)["alerts"]
+    """
+
+    def __init__(self, frame, use_numpy=None, now=None):
+        self.frame = frame if isinstance(frame, ActionFrame) else ActionFrame(frame)
+        self.use_numpy = (np is not None) if use_numpy is None else (bool(use_numpy) and np is not None)
+        self._now = now
+        self._baselines = {}
+
+    @property
+    def now(self):
+        """Reference time in epoch ms; pass now= (datetime or ISO string) to pin it for reproducible runs."""
+        if self._now is None:
+            return float(int(time.time() * 1000))
+        return _parse_time(self._now)
+
+    def _select(self, mask_fn, key, time_column, since, until=None):
+        """Row indexes (array or list) with a valid key, since <= time (<= until) and mask_fn true."""
+        f = self.frame
+        until = math.inf if until is None else until
+        if self.use_numpy:
+            keys = f.column(key, True)
+            times = f.column(time_column, True)
+            return np.nonzero((keys >= 0) & (times >= since) & (times <= until) & mask_fn(True))[0]
+        keys = f.column(key)
+        times = f.column(time_column)
+        valid = mask_fn(False)
+        return [i for i in range(len(f)) if keys[i] >= 0 and since <= times[i] <= until and (valid is True or valid[i])]
+
+    def _take(self, name, rows):
+        column = self.frame.column(name, self.use_numpy)
+        return column[rows] if self.use_numpy else [column[i] for i in rows]
+
+    def _metric_rows(self, metric_id, since, agent=None, until=None):
+        """(key column, agent codes, values, times) for a drift metric, filtered like the SQL in drift.js."""
+        f = self.frame
+        if metric_id == "learning_score":
+            key, time_column = "agent_id", "episode_at"
+        else:
+            key, time_column = "agent_name", "created_at"
+
+        def values(use_numpy):
+            if metric_id == "tokens_total":
+                tin, tout = f.column("tokens_in", use_numpy), f.column("tokens_out", use_numpy)
+                return tin + tout if use_numpy else [a + b for a, b in zip(tin, tout)]
+            return f.column("episode_score" if metric_id == "learning_score" else metric_id, use_numpy)
+
+        def mask(use_numpy):
+            col = values(use_numpy)
+            if metric_id in ("duration_ms", "cost_estimate", "tokens_total"):
+                return col > 0 if use_numpy else [v > 0 for v in col]
+            return ~np.isnan(col) if use_numpy else [not math.isnan(v) for v in col]
+
+        rows = self._select(mask, key, time_column, since, until)
+        if agent is not None:
+            code = f._index[key].get(agent, -2)
+            codes = self._take(key, rows)
+            rows = rows[codes == code] if self.use_numpy else [i for i, c in zip(rows, codes) if c == code]
+        vals = values(self.use_numpy)
+        vals = vals[rows] if self.use_numpy else [vals[i] for i in rows]
+        return key, self._take(key, rows), vals, self._take(time_column, rows)
+    # --- Drift (app/lib/drift.js) ---
+
+    def compute_baselines(self, agent_id=None, lookback_days=30):
+        """Baseline statistics per agent and metric over the lookback window (min 5 samples).
+        Also kept on this object as the reference for detect_drift()."""
+        since = self.now - (lookback_days or 30) * DAY_MS
+        results = []
+        for metric in DRIFT_METRICS:
+            key, codes, values, times = self._metric_rows(metric["id"], since, agent_id)
+            labels = self.frame.labels(key)
+            n = len(labels)
+            counts, sums = _group_sums(codes, values, n, self.use_numpy)
+            means = [s / c if c else 0 for s, c in zip(sums, counts)]
+            sq_dev = _group_sq_dev(codes, values, means, n, self.use_numpy)
+            groups = _group_sorted(codes, values, n, self.use_numpy)
+            for i, label in enumerate(labels):
+                if counts[i] < 5:
+                    continue
+                ordered = groups[i]
+                stats = {
+                    "mean": _round3(means[i]),
+                    "stddev": _round3(_stddev(sq_dev[i], counts[i])),
+                    "median": _round3(_percentile(ordered, 50)),
+                    "p5": _round3(_percentile(ordered, 5)),
+                    "p25": _round3(_percentile(ordered, 25)),
+                    "p75": _round3(_percentile(ordered, 75)),
+                    "p95": _round3(_percentile(ordered, 95)),
+                    "min_val": _round3(float(ordered[0])),
+                    "max_val": _round3(float(ordered[-1])),
+                }
+                baseline = {
+                    "agent_id": label, "metric": metric["id"], "sample_count": counts[i], **stats,
+                    "distribution": self._distribution(ordered, stats),
+                }
+                self._baselines[(label, metric["id"])] = baseline
+                results.append(baseline)
+        return {"baselines_computed": len(results), "results": results}
+
+    @staticmethod
+    def _distribution(ordered, stats):
+        """The 10-bucket histogram stored with each baseline."""
+        bucket_size = ((stats["max_val"] - stats["min_val"]) or 1) / 10
+        distribution = {}
+        for i in range(10):
+            lo = _round3(stats["min_val"] + i * bucket_size)
+            hi = _round3(stats["min_val"] + (i + 1) * bucket_size)
+            end = bisect.bisect_right(ordered, hi) if i == 9 else bisect.bisect_left(ordered, hi)
+            distribution[f"{_js_str(lo)}-{_js_str(hi)}"] = max(0, end - bisect.bisect_left(ordered, lo))
+        return distribution
+
+    def _window_moments(self, codes, values, n):
+        """Per-group (count, mean, stddev) with the stddev taken around the rounded mean, as drift.js does."""
+        counts, sums = _group_sums(codes, values, n, self.use_numpy)
+        means = [_round3(s / c) if c else 0 for s, c in zip(sums, counts)]
+        sq_dev = _group_sq_dev(codes, values, means, n, self.use_numpy)
+        return [(c, m, _round3(_stddev(d, c))) for c, m, d in zip(counts, means, sq_dev)]
+
+    def detect_drift(self, agent_id=None, window_days=7, baseline_days=30):
+        """Compare each agent's recent window against its baseline. Baselines are computed first
+        (over baseline_days) if compute_baselines() has not been run on this object."""
+        if not self._baselines:
+            self.compute_baselines(agent_id=agent_id, lookback_days=baseline_days)
+        since = self.now - (window_days or 7) * DAY_MS
+        alerts = []
+        for metric in DRIFT_METRICS:
+            key, codes, values, times = self._metric_rows(metric["id"], since, agent_id)
+            labels = self.frame.labels(key)
+            for label, (count, mean, stddev) in zip(labels, self._window_moments(codes, values, len(labels))):
+                baseline = self._baselines.get((label, metric["id"]))
+                if baseline is None or count < 3:
+                    continue
+                z = _round3(z_score(mean, baseline["mean"], baseline["stddev"]))
+                severity = classify_severity(abs(z))
+                if not severity:
+                    continue
+                direction = "increasing" if z > 0 else "decreasing"
+                pct_change = _round3((mean - baseline["mean"]) / baseline["mean"] * 100) if baseline["mean"] != 0 else 0
+                description = (
+                    f"{metric['label']} for {label} has {'increased' if z > 0 else 'decreased'} by "
+                    f"{_js_str(abs(pct_change))}% (z-score: {_js_str(z)}). Baseline mean: "
+                    f"{_js_str(baseline['mean'])}, current mean: {_js_str(mean)}."
+                )
+                alerts.append({
+                    "agent_id": label,
+                    "metric": metric["id"],
+                    "severity": severity,
+                    "drift_type": "shift",
+                    "baseline_mean": baseline["mean"],
+                    "baseline_stddev": baseline["stddev"],
+                    "current_mean": mean,
+                    "current_stddev": stddev,
+                    "z_score": z,
+                    "pct_change": pct_change,
+                    "sample_count": count,
+                    "direction": direction,
+                    "description": description,
+                })
+        return {"alerts_generated": len(alerts), "alerts": alerts}
+
+    def drift_snapshots(self, agent_id=None, metric=None, days=30, period="daily"):
+        """Per-period mean/stddev series for every agent and metric, like the rows behind
+        get_drift_snapshots but back-filled over the whole range. Periods end at `now`."""
+        now = self.now
+        width = 7 * DAY_MS if period == "weekly" else DAY_MS
+        since = now - days * DAY_MS
+        snapshots = []
+        for m in DRIFT_METRICS:
+            if metric is not None and m["id"] != metric:
+                continue
+            key, codes, values, times = self._metric_rows(m["id"], since, agent_id, until=now)
+            if self.use_numpy:
+                buckets = np.floor((now - times) / width).astype(np.int64)
+                nb = int(buckets.max()) + 1 if len(buckets) else 1
+                uniques, dense = _dense(codes * nb + buckets, True)
+            else:
+                buckets = [int((now - t) // width) for t in times]
+                nb = max(buckets) + 1 if buckets else 1
+                uniques, dense = _dense([c * nb + b for c, b in zip(codes, buckets)], False)
+            labels = self.frame.labels(key)
+            for group, (count, mean, stddev) in zip(uniques, self._window_moments(dense, values, len(uniques))):
+                code, bucket = divmod(group, nb)
+                snapshots.append({
+                    "agent_id": labels[code],
+                    "metric": m["id"],
+                    "period": period,
+                    "period_start": _iso(now - (bucket + 1) * width),
+                    "mean": mean,
+                    "stddev": stddev,
+                    "sample_count": count,
+                })
+        snapshots.sort(key=lambda s: (s["agent_id"], s["metric"], s["period_start"]))
+        return {"snapshots": snapshots}
+
+    # --- Learning analytics (app/lib/learningAnalytics.js) ---
+
+    def _episodes(self, since, agent=None, by_action_type=False):
+        """Episode columns in time order, grouped per agent (or per agent and action type)."""
+        f = self.frame
+        until = self.now
+
+        def mask(use_numpy):
+            if not by_action_type:
+                return True
+            types = f.column("action_type", use_numpy)
+            return types >= 0 if use_numpy else [t >= 0 for t in types]
+
+        rows = self._select(mask, "agent_id", "episode_at", since, until)
+        if agent is not None:
+            code = f._index["agent_id"].get(agent, -2)
+            agents = self._take("agent_id", rows)
+            rows = rows[agents == code] if self.use_numpy else [i for i, c in zip(rows, agents) if c == code]
+        times = self._take("episode_at", rows)
+        if self.use_numpy:
+            rows = rows[np.argsort(times, kind="stable")]
+        else:
+            rows = [i for _, i in sorted(zip(times, rows), key=lambda pair: pair[0])]
+        columns = {name: self._take(name, rows) for name in (
+            "agent_id", "action_type", "episode_at", "episode_score", "episode_success", "duration_ms", "cost_estimate",
+        )}
+        n_types = max(1, len(f.labels("action_type")))
+        if by_action_type:
+            keys = (columns["agent_id"] * n_types + columns["action_type"] if self.use_numpy
+                    else [a * n_types + t for a, t in zip(columns["agent_id"], columns["action_type"])])
+        else:
+            keys = columns["agent_id"]
+        groups, dense = _dense(keys, self.use_numpy)
+        return columns, groups, dense, n_types
+
+    def _windows(self, columns, dense, n, width, detail=False):
+        """Split each group's episodes into fixed windows starting at its first episode.
+        Returns, per group, the non-empty windows in time order."""
+        times = columns["episode_at"]
+        first = _group_min(dense, times, n, self.use_numpy)
+        if self.use_numpy:
+            buckets = np.floor((times - np.asarray(first)[dense]) / width).astype(np.int64)
+            nb = int(buckets.max()) + 1 if len(buckets) else 1
+            keys, wcodes = _dense(dense * nb + buckets, True)
+        else:
+            buckets = [int((t - first[g]) // width) for g, t in zip(dense, times)]
+            nb = max(buckets) + 1 if buckets else 1
+            keys, wcodes = _dense([g * nb + b for g, b in zip(dense, buckets)], False)
+        m = len(keys)
+        counts, score_sums = _group_sums(wcodes, columns["episode_score"], m, self.use_numpy)
+        _, success = _group_sums(wcodes, columns["episode_success"], m, self.use_numpy)
+        if detail:
+            extras = {}
+            for name in ("duration_ms", "cost_estimate"):
+                values = columns[name]
+                if self.use_numpy:
+                    keep = values > 0
+                    extras[name] = _group_sums(wcodes[keep], values[keep], m, True)
+                else:
+                    kept = [(w, v) for w, v in zip(wcodes, values) if v > 0]
+                    extras[name] = _group_sums([w for w, _ in kept], [v for _, v in kept], m, False)
+            sorted_scores = _group_sorted(wcodes, columns["episode_score"], m, self.use_numpy)
+
+        out = [[] for _ in range(n)]
+        for w, key in enumerate(keys):
+            group, bucket = divmod(key, nb)
+            start = first[group] + bucket * width
+            window = {
+                "start": _iso(start),
+                "end": _iso(start + width),
+                "count": counts[w],
+                "avg_score": _round3(score_sums[w] / counts[w]),
+                "success_rate": _round3(success[w] / counts[w]),
+            }
+            if detail:
+                for name, field in (("duration_ms", "avg_duration_ms"), ("cost_estimate", "avg_cost")):
+                    c, s = extras[name][0][w], extras[name][1][w]
+                    window[field] = _round3(s / c if c else 0)
+                window["p25_score"] = _round3(_percentile(sorted_scores[w], 25))
+                window["p75_score"] = _round3(_percentile(sorted_scores[w], 75))
+            out[group].append(window)
+        return out
+
+    def compute_learning_velocity(self, agent_id=None, lookback_days=30, period="daily"):
+        """Score velocity, acceleration and maturity per agent. Each result also carries its
+        per-window timeline."""
+        now = self.now
+        width = 7 * DAY_MS if period == "weekly" else DAY_MS
+        columns, groups, dense, _ = self._episodes(now - (lookback_days or 30) * DAY_MS, agent_id)
+        n = len(groups)
+        counts, score_sums = _group_sums(dense, columns["episode_score"], n, self.use_numpy)
+        _, success = _group_sums(dense, columns["episode_success"], n, self.use_numpy)
+        windows = self._windows(columns, dense, n, width)
+        labels = self.frame.labels("agent_id")
+
+        results = []
+        for g, code in enumerate(groups):
+            timeline = windows[g]
+            if counts[g] < 3 or len(timeline) < 2:
+                continue
+            scores = [w["avg_score"] for w in timeline]
+            acceleration = 0
+            if len(scores) >= 3:
+                half = len(scores) // 2
+                acceleration = _round3(linear_reg_slope(scores[half:]) - linear_reg_slope(scores[:half]))
+            avg_score = score_sums[g] / counts[g]
+            success_rate = success[g] / counts[g]
+            results.append({
+                "agent_id": labels[code],
+                "period": period,
+                "period_start": timeline[0]["start"],
+                "period_end": _iso(now),
+                "episode_count": counts[g],
+                "avg_score": _round3(avg_score),
+                "success_rate": _round3(success_rate),
+                "score_delta": _round3(scores[-1] - scores[0]),
+                "velocity": _round3(linear_reg_slope(scores)),
+                "acceleration": acceleration,
+                "maturity": classify_maturity(counts[g], success_rate, avg_score),
+                "windows": len(timeline),
+                "timeline": timeline,
+            })
+        return {"agents_computed": len(results), "results": results}
+
+    def compute_learning_curves(self, agent_id=None, lookback_days=60):
+        """Weekly learning-curve rows per agent and action type (min 3 episodes), in the shape
+        returned by get_learning_curves."""
+        columns, groups, dense, n_types = self._episodes(
+            self.now - (lookback_days or 60) * DAY_MS, agent_id, by_action_type=True
+        )
+        n = len(groups)
+        counts, _ = _group_sums(dense, columns["episode_score"], n, self.use_numpy)
+        windows = self._windows(columns, dense, n, 7 * DAY_MS, detail=True)
+        agents, types = self.frame.labels("agent_id"), self.frame.labels("action_type")
+
+        results = []
+        for g, key in enumerate(groups):
+            if counts[g] < 3:
+                continue
+            agent_code, type_code = divmod(key, n_types)
+            for w in windows[g]:
+                results.append({
+                    "agent_id": agents[agent_code],
+                    "action_type": types[type_code],
+                    "window_start": w["start"],
+                    "window_end": w["end"],
+                    "episode_count": w["count"],
+                    "avg_score": w["avg_score"],
+                    "success_rate": w["success_rate"],
+                    "avg_duration_ms": w["avg_duration_ms"],
+                    "avg_cost": w["avg_cost"],
+                    "p25_score": w["p25_score"],
+                    "p75_score": w["p75_score"],
+                })
+        return {"curves_computed": len(results), "results": results}
@@ -0,0 +1,115 @@
+import base64
+import json
+import mimetypes
+import os
+import uuid
+
+# Multiple of 3 so every raw chunk base64-encodes without padding mid-stream.
+DEFAULT_CHUNK_SIZE = 3 * 256 * 1024
+# Server-side limit per attachment (MAX_ATTACHMENT_SIZE in app/api/messages/route.js).
+MAX_ATTACHMENT_SIZE = 5 * 1024 * 1024
+
+
+class AttachmentFile:
+    """
+    An on-disk attachment for send_message(). The file is base64-encoded in
+    chunks while the request body is being sent, so only one chunk is held in
+    memory at a time instead of the whole file plus its base64 copy.
+
+    Usage:
+        claw.send_message("Build output", to="reviewer",
+                          attachments=[AttachmentFile("dist/report.pdf")])
+    """
+
+    def __init__(self, path, filename=None, mime_type=None):
+        self.path = os.fspath(path)
+        self.filename = filename or os.path.basename(self.path)
+        self.mime_type = mime_type or mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    @property
+    def encoded_size(self):
+        return 4 * ((self.size + 2) // 3)
+
+
+def check_attachment_sizes(attachments):
+    """Raise ValueError for any attachment over MAX_ATTACHMENT_SIZE, before
+    anything is encoded or sent. Sizes are measured the way the server does,
+    as ceil(len(base64 data) * 3 / 4), which rounds a file up to a multiple of 3."""
+    for attachment in attachments:
+        if isinstance(attachment, AttachmentFile):
+            name, encoded = attachment.filename, attachment.encoded_size
+        elif isinstance(attachment, dict) and isinstance(attachment.get("data"), str):
+            name, encoded = attachment.get("filename"), len(attachment["data"])
+        else:
+            continue
+        size = -(-encoded * 3 // 4)
+        if size > MAX_ATTACHMENT_SIZE:
+            raise ValueError(f'Attachment "{name}" exceeds 5MB limit ({size} bytes)')
+
+
+class StreamingJSONBody:
+    """
+    Iterable request body that serialises a JSON payload containing
+    AttachmentFile objects without materialising the encoded files.
+
+    The payload is dumped once with a placeholder token for each file's data,
+    then streamed as: JSON prefix, base64 chunks of the file, JSON up to the
+    next placeholder, and so on. len() gives the exact Content-Length.
+    """
+
+    def __init__(self, payload, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        self.progress = progress
+        self.files = []
+        tokens = {}
+
+        def replace(value):
+            if isinstance(value, AttachmentFile):
+                token = f"__dashclaw_attachment_{uuid.uuid4().hex}__"
+                tokens[token] = value
+                self.files.append(value)
+                return {"filename": value.filename, "mime_type": value.mime_type, "data": token}
+            if isinstance(value, dict):
+                return {k: replace(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [replace(v) for v in value]
+            return value
+
+        text = json.dumps(replace(payload))
+        self._segments = []
+        for token, attachment in tokens.items():
+            before, text = text.split(f'"{token}"', 1)
+            self._segments.append((before + '"').encode("utf-8"))
+            self._segments.append(attachment)
+            text = '"' + text
+        self._segments.append(text.encode("utf-8"))
+        self.total_bytes = sum(
+            s.encoded_size if isinstance(s, AttachmentFile) else len(s) for s in self._segments
+        )
+
+    def __len__(self):
+        return self.total_bytes
+
+    def __iter__(self):
+        sent = 0
+        for segment in self._segments:
+            if not isinstance(segment, AttachmentFile):
+                sent += len(segment)
+                yield segment
+                if self.progress:
+                    self.progress(sent, self.total_bytes)
+                continue
+            with open(segment.path, "rb") as f:
+                while True:
+                    raw = f.read(self.chunk_size)
+                    if not raw:
+                        break
+                    encoded = base64.b64encode(raw)
+                    sent += len(encoded)
+                    yield encoded
+                    if self.progress:
+                        self.progress(sent, self.total_bytes)
@@ -0,0 +1,145 @@
+import atexit
+import threading
+import time
+import weakref
+from collections import deque
+
+# Queues still open at interpreter exit get flushed. Held weakly, so a queue
+# (and the tracer or client its sender closes over) can still be freed.
+_open_queues = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_queues():
+    for queue in list(_open_queues):
+        queue.close()
+
+
+class BatchQueue:
+    """
+    Thread-safe queue that hands items to a sender callable in batches from a
+    background daemon thread.
+
+    Items are flushed when ``max_batch`` items are waiting, when
+    ``flush_interval`` seconds have passed since the first waiting item, or
+    when ``flush()`` is called. Telemetry must never break the caller, so
+    sender failures are logged and the batch is dropped. The thread exits
+    whenever the queue drains and is restarted by the next item, so an
+    idle queue holds no thread.
+
+    Usage:
+        queue = BatchQueue(lambda items: claw.record_actions(items))
+        queue.put({"action_type": "research", ...})
+        queue.flush()
+    """
+
+    def __init__(self, sender, max_batch=100, flush_interval=2.0, max_queue=10000, name="dashclaw-batch"):
+        self.sender = sender
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.max_queue = max(1, int(max_queue))
+        self.name = name
+        self.dropped = 0
+
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._first_item_at = None
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+        _open_queues.add(self)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item):
+        self.put_many([item])
+
+    def put_many(self, items):
+        items = list(items or [])
+        if not items:
+            return
+        with self._cond:
+            if self._closed:
+                self.dropped += len(items)
+                return
+            for item in items:
+                if len(self._items) >= self.max_queue:
+                    # Drop the oldest item rather than growing without bound.
+                    self._items.popleft()
+                    self.dropped += 1
+                self._items.append(item)
+            if self._first_item_at is None:
+                self._first_item_at = time.monotonic()
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Send everything queued so far. Returns True once the queue is drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._items and not self._in_flight:
+                return True
+            self._flush_requested = True
+            self._ensure_thread()
+            self._cond.notify_all()
+            while self._items or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout=5.0):
+        """Flush pending items and stop the background thread."""
+        self.flush(timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        _open_queues.discard(self)
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def _ensure_thread(self):
+        # Caller holds self._cond.
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _should_send(self):
+        if not self._items:
+            return False
+        if self._flush_requested or self._closed or len(self._items) >= self.max_batch:
+            return True
+        return self._first_item_at is not None and (time.monotonic() - self._first_item_at) >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._should_send():
+                    if not self._items:
+                        # Drained: exit so the thread does not keep the queue alive.
+                        # put_many() and flush() start a new one when needed.
+                        self._thread = None
+                        return
+                    wait = self.flush_interval - (time.monotonic() - self._first_item_at)
+                    self._cond.wait(max(wait, 0.001))
+                count = min(len(self._items), self.max_batch)
+                batch = [self._items.popleft() for _ in range(count)]
+                self._in_flight += 1
+                self._first_item_at = time.monotonic() if self._items else None
+                if not self._items:
+                    self._flush_requested = False
+
+            try:
+                self.sender(batch)
+            except Exception as e:
+                print(f"[DashClaw] Failed to send {len(batch)} queued item(s) from {self.name}: {e}")
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
@@ -1,18 +1,36 @@
 import json
+import os
+import threading
 import time
 import urllib.parse
-import urllib.request
-import urllib.error
 import base64
 from datetime import datetime, timezone
 from contextlib import contextmanager
 
+from .transport import UrllibTransport
+
+MAX_BATCH_ACTIONS = 100  # Server-side limit per POST /api/actions batch
+
+_preflight_pool = None
+_preflight_pool_lock = threading.Lock()
+
+
+def _preflight_executor():
+    """One small pool shared by every client; created on first use."""
+    global _preflight_pool
+    with _preflight_pool_lock:
+        if _preflight_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _preflight_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dashclaw-preflight")
+        return _preflight_pool
+
 class DashClawError(Exception):
-    """Base error for DashClaw SDK."""
-    def __init__(self, message, status=None, details=None):
+    """Base error for DashClaw SDK. `body` holds the parsed JSON error response, if any."""
+    def __init__(self, message, status=None, details=None, body=None):
         super().__init__(message)
         self.status = status
         self.details = details
+        self.body = body
 
 class GuardBlockedError(DashClawError):
     """Thrown when behavior guard blocks an action."""
@@ -31,6 +49,20 @@ class ApprovalDeniedError(DashClawError):
     def __init__(self, message):
         super().__init__(message, status=403)
 
+def merge_recommendation_events(events):
+    """Collapse recommendation events sharing (recommendation_id, event_type, details.reason, agent_id)
+    into one event whose details.count sums the merged events (1 each unless already counted)."""
+    merged = {}
+    for event in events:
+        details = event.get("details") or {}
+        count = details.get("count", 1)
+        key = (event.get("recommendation_id"), event.get("event_type"), details.get("reason"), event.get("agent_id"))
+        if key in merged:
+            merged[key]["details"]["count"] += count
+        else:
+            merged[key] = {**event, "details": {**details, "count": count}}
+    return list(merged.values())
+
 class DashClaw:
     def __init__(
         self,
@@ -46,6 +78,10 @@ class DashClaw:
         auto_recommend="off",
         recommendation_confidence_min=70,
         recommendation_callback=None,
+        guard_evaluation="remote",
+        policy_refresh_interval=60,
+        recommendation_event_window=5.0,
+        transport=None,
     ):
         self.base_url = base_url.rstrip("/")
         if not self.base_url.startswith("https://") and "localhost" not in self.base_url and "127.0.0.1" not in self.base_url:
@@ -56,6 +92,7 @@ class DashClaw:
                 stacklevel=2,
             )
         self.api_key = api_key
+        self.transport = transport or UrllibTransport() # see dashclaw.transport
         self.agent_id = agent_id
         self.agent_name = agent_name
         self.swarm_id = swarm_id
@@ -69,17 +106,30 @@ class DashClaw:
         except Exception:
             self.recommendation_confidence_min = 70
         self.recommendation_callback = recommendation_callback
+        self.recommendation_event_window = recommendation_event_window # seconds; 0 sends each event immediately
+        self._recommendation_events = None
+        self.guard_evaluation = guard_evaluation # "remote" | "local"
+        self.policy_refresh_interval = policy_refresh_interval
+        self._policy_snapshot = None
+        self._guard_reports = None
+        self.last_request_at = None # time.monotonic() of the last successful non-heartbeat request
+        self._heartbeat_scheduler = None
+        self._owns_heartbeat_scheduler = False
+        self._local_scorers = {}
+        self._prompt_cache = None
 
         if guard_mode not in ["off", "warn", "enforce"]:
             raise ValueError("guard_mode must be one of: off, warn, enforce")
         if auto_recommend not in ["off", "warn", "enforce"]:
             raise ValueError("auto_recommend must be one of: off, warn, enforce")
+        if guard_evaluation not in ["remote", "local"]:
+            raise ValueError("guard_evaluation must be one of: remote, local")
 
-    def _request(self, path_or_method, method_or_path=None, body=None, params=None, json_payload=None, **kwargs):
+    def _request(self, path_or_method, method_or_path=None, body=None, params=None, json_payload=None, raw=False, **kwargs):
         # Support both (path, method, body) and (method, path, json=...) signatures
         if path_or_method.startswith("/"):
             path = path_or_method
-            method = method_or_path or "GET"
+            method = kwargs.pop("method", None) or method_or_path or "GET"
         else:
             method = path_or_method
             path = method_or_path
@@ -104,40 +154,65 @@ class DashClaw:
             import json as json_mod
             data = json_mod.dumps(payload).encode("utf-8")
 
-        req = urllib.request.Request(url, data=data, headers=headers, method=method)
-        
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
+            with self.transport.request(method, url, headers=headers, body=data, timeout=30) as response:
+                if response.status >= 400:
+                    raise self._http_error(response)
+                self._note_activity(path)
+                if raw:
+                    return response.read()
                 import json as json_mod
                 return json_mod.loads(response.read().decode("utf-8"))
-        except urllib.error.HTTPError as e:
-            try:
-                error_data = json.loads(e.read().decode("utf-8"))
-                message = error_data.get("error", str(e))
-                details = error_data.get("details")
-            except:
-                message = str(e)
-                details = None
-            raise DashClawError(message, status=e.code, details=details)
+        except DashClawError:
+            raise
         except Exception as e:
             raise DashClawError(f"Request failed: {str(e)}")
 
-    def _guard_check(self, action_def):
-        if self.guard_mode == "off":
-            return
-
-        context = {
-            "action_type": action_def.get("action_type"),
-            "risk_score": action_def.get("risk_score"),
-            "systems_touched": action_def.get("systems_touched"),
-            "reversible": action_def.get("reversible"),
-            "declared_goal": action_def.get("declared_goal"),
-        }
+    def _note_activity(self, path):
+        # Any successful request shows the agent is alive, so the heartbeat scheduler can skip a beat.
+        if not path.startswith("/api/agents/heartbeat"):
+            self.last_request_at = time.monotonic()
 
+    def _http_error(self, e):
+        status = getattr(e, "status", None) or e.code
+        fallback = f"HTTP Error {status}: {getattr(e, 'reason', '')}"
+        error_data = None
         try:
-            decision = self.guard(context)
+            error_data = json.loads(e.read().decode("utf-8"))
+            message = error_data.get("error", fallback)
+            details = error_data.get("details")
+        except:
+            message = fallback
+            details = None
+        finally:
+            e.close()
+        return DashClawError(message, status=status, details=details, body=error_data)
+
+    def _open(self, path, method="GET", data=None, headers=None, timeout=60, allow_status=()):
+        """Open a raw response for streaming. The caller must close it. HTTP errors
+        raise DashClawError unless their status is in allow_status, in which case
+        the error response itself is returned."""
+        req_headers = {"x-api-key": self.api_key}
+        req_headers.update(headers or {})
+        try:
+            resp = self.transport.request(method, f"{self.base_url}{path}", headers=req_headers, body=data, timeout=timeout)
         except Exception as e:
-            print(f"[DashClaw] Guard check failed (proceeding): {str(e)}")
+            raise DashClawError(f"Request failed: {str(e)}")
+        if resp.status >= 400 and resp.status not in allow_status:
+            raise self._http_error(resp)
+        self._note_activity(path)
+        return resp
+
+    def _guard_check(self, action_def, decision=None):
+        """Enforce guard_mode for action_def. A decision (or the exception raised while
+        fetching it) already evaluated for the same guard context can be passed in to skip the request."""
+        if self.guard_mode == "off":
+            return
+
+        if decision is None:
+            decision = self._evaluate_guard(action_def)
+        if isinstance(decision, Exception):
+            print(f"[DashClaw] Guard check failed (proceeding): {str(decision)}")
             return
 
         if self.guard_callback:
@@ -156,6 +231,58 @@ class DashClaw:
         if self.guard_mode == "enforce" and is_blocked:
             raise GuardBlockedError(decision)
 
+    def _evaluate_guard(self, action_def):
+        """Fetch a guard decision for action_def. Returns the exception instead of raising."""
+        try:
+            return self.guard(self._build_guard_context(action_def))
+        except Exception as e:
+            return e
+
+    def _guard_context_key(self, action_def):
+        return json.dumps(self._build_guard_context(action_def), sort_keys=True, default=str)
+
+    def _preflight(self, action_def):
+        """Resolve recommendation and guard for create_action.
+
+        Guard decisions are memoized per guard context, so the recommendation probe and
+        enforcement share one decision whenever they evaluate the same action. Every guard
+        call writes an audit row, so the original action is only evaluated ahead of time
+        when that decision is certain to be enforced: in auto_recommend="warn" mode the
+        original action always goes ahead, and its guard evaluation runs concurrently with
+        the recommendation fetch. Returns (recommendation_result, final_action, guard_decision).
+        """
+        wants_recommendation = self.auto_recommend != "off" and isinstance(action_def, dict) and bool(action_def.get("action_type"))
+        decisions = {}
+
+        def evaluate(action):
+            key = self._guard_context_key(action)
+            if key not in decisions:
+                decisions[key] = self._evaluate_guard(action)
+            return decisions[key]
+
+        if not wants_recommendation:
+            recommendation_result = self._auto_recommend(action_def)
+        elif self.guard_mode == "off" or self.auto_recommend == "enforce":
+            # The probe decision (if any) is taken past the confidence gate, and enforcement
+            # reuses it whenever the adapted action is the one that goes ahead.
+            recommendation_result = self._auto_recommend(action_def, evaluate_guard=evaluate)
+        else:
+            # Warn mode never adapts the action, so enforcement will need the original
+            # action's decision: fetch it while the recommendation is in flight.
+            executor = _preflight_executor()
+            guard_future = executor.submit(self._evaluate_guard, action_def)
+            recommendation_future = executor.submit(self.recommend_action, action_def)
+            try:
+                fetched = recommendation_future.result()
+            except Exception as e:
+                fetched = e
+            decisions[self._guard_context_key(action_def)] = guard_future.result()
+            recommendation_result = self._auto_recommend(action_def, evaluate_guard=evaluate, fetched=fetched)
+
+        final_action = recommendation_result.get("action") or action_def
+        guard_decision = evaluate(final_action) if self.guard_mode != "off" else None
+        return recommendation_result, final_action, guard_decision
+
     def _is_restrictive_decision(self, decision):
         return isinstance(decision, dict) and decision.get("decision") in ["block", "require_approval"]
 
@@ -170,24 +297,56 @@ class DashClaw:
         }
 
     def _report_recommendation_event(self, event):
+        payload = dict(event or {})
+        if "agent_id" not in payload or payload.get("agent_id") is None:
+            payload["agent_id"] = self.agent_id
+        if self.recommendation_event_window:
+            if self._recommendation_events is None:
+                from .batching import BatchQueue
+                self._recommendation_events = BatchQueue(
+                    self._send_recommendation_events,
+                    max_batch=1000,
+                    flush_interval=self.recommendation_event_window,
+                    name="dashclaw-recommendation-events",
+                )
+            payload.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+            self._recommendation_events.put(payload)
+            return
         try:
-            payload = dict(event or {})
-            if "agent_id" not in payload or payload.get("agent_id") is None:
-                payload["agent_id"] = self.agent_id
             self._request("/api/learning/recommendations/events", method="POST", body=payload)
         except Exception:
             # Telemetry should not break action flow.
             pass
 
-    def _auto_recommend(self, action_def):
+    def _send_recommendation_events(self, events):
+        """Collapse events that share (recommendation_id, event_type, reason) into one event carrying
+        details.count, then send them with the list form of record_recommendation_events."""
+        batch = merge_recommendation_events(events)
+        # The events endpoint accepts at most 100 events per request.
+        for start in range(0, len(batch), 100):
+            self.record_recommendation_events(batch[start:start + 100])
+
+    def flush_recommendation_events(self, timeout=None):
+        """Send buffered applied/overridden recommendation events now."""
+        if self._recommendation_events is None:
+            return True
+        return self._recommendation_events.flush(timeout=timeout)
+
+    def _auto_recommend(self, action_def, evaluate_guard=None, fetched=None):
+        """Apply auto_recommend to action_def. `fetched` is a recommend_action() result (or the
+        exception it raised) fetched ahead of time; `evaluate_guard` resolves the probe decision."""
         if self.auto_recommend == "off" or not isinstance(action_def, dict) or not action_def.get("action_type"):
             return {"action": action_def, "recommendation": None, "adapted_fields": []}
 
-        try:
-            result = self.recommend_action(action_def)
-        except Exception as e:
-            print(f"[DashClaw] Recommendation fetch failed (proceeding): {str(e)}")
+        if fetched is None:
+            try:
+                fetched = self.recommend_action(action_def)
+            except Exception as e:
+                fetched = e
+        if isinstance(fetched, Exception):
+            print(f"[DashClaw] Recommendation fetch failed (proceeding): {str(fetched)}")
             return {"action": action_def, "recommendation": None, "adapted_fields": []}
+        result = fetched
 
         if self.recommendation_callback:
             try:
@@ -225,11 +384,10 @@ class DashClaw:
                 },
             }
 
-        guard_decision = None
-        try:
-            guard_decision = self.guard(self._build_guard_context(result.get("action") or action_def))
-        except Exception as e:
-            print(f"[DashClaw] Recommendation guard probe failed: {str(e)}")
+        guard_decision = (evaluate_guard or self._evaluate_guard)(result.get("action") or action_def)
+        if isinstance(guard_decision, Exception):
+            print(f"[DashClaw] Recommendation guard probe failed: {str(guard_decision)}")
+            guard_decision = None
 
         if self._is_restrictive_decision(guard_decision):
             override_reason = f"guard_restrictive:{guard_decision.get('decision')}"
@@ -324,9 +482,8 @@ class DashClaw:
             "declared_goal": declared_goal,
             **kwargs
         }
-        recommendation_result = self._auto_recommend(action_def)
-        final_action = recommendation_result.get("action") or action_def
-        self._guard_check(final_action)
+        recommendation_result, final_action, guard_decision = self._preflight(action_def)
+        self._guard_check(final_action, decision=guard_decision)
         
         payload = {
             "agent_id": self.agent_id,
@@ -375,6 +532,59 @@ class DashClaw:
             payload["timestamp_end"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         return self._request(f"/api/actions/{action_id}", method="PATCH", body=payload)
 
+    def record_actions(self, actions):
+        """Record already-finished actions (e.g. trace spans) as-is, skipping the guard/recommendation preflight.
+
+        Each action may carry a client-assigned action_id and parent_action_id so a whole
+        trace can be linked before anything is sent. Actions are sent in batches of up to
+        100 per POST /api/actions request (one request each on servers without batch
+        support). Returns one result per action; failures are reported as {"error": ...}
+        instead of raising so one bad record cannot drop a batch.
+        """
+        payloads = []
+        for action in actions or []:
+            payload = {
+                "agent_id": self.agent_id,
+                "agent_name": self.agent_name,
+                "swarm_id": self.swarm_id,
+                **action,
+            }
+            signature = self._sign_payload(payload)
+            if signature:
+                payload["_signature"] = signature
+            payloads.append(payload)
+
+        results = []
+        for start in range(0, len(payloads), MAX_BATCH_ACTIONS):
+            chunk = payloads[start:start + MAX_BATCH_ACTIONS]
+            if getattr(self, "_batch_actions_supported", True) and len(chunk) > 1:
+                try:
+                    response = self._request("/api/actions", method="POST", body={"actions": chunk})
+                    results.extend(
+                        result if result.get("status", 201) < 400
+                        else {"error": result.get("error"), "status": result.get("status"), "action_id": payload.get("action_id")}
+                        for result, payload in zip(response.get("results", []), chunk)
+                    )
+                    continue
+                except DashClawError as e:
+                    if e.status != 400:
+                        results.extend({"error": str(e), "status": e.status, "action_id": p.get("action_id")} for p in chunk)
+                        continue
+                    # Older servers validate the batch body as one action; send one by one from now on.
+                    self._batch_actions_supported = False
+            for payload in chunk:
+                try:
+                    results.append(self._request("/api/actions", method="POST", body=payload))
+                except DashClawError as e:
+                    results.append({"error": str(e), "status": e.status, "action_id": payload.get("action_id")})
+        return results
+
+    def events(self, reconnect=True, max_retries=None, retry_interval=3.0):
+        """Subscribe to real-time SSE events. Returns an unstarted EventStream: register handlers
+        with .on(event_type, callback), then call .start()."""
+        from .events import EventStream
+        return EventStream(self, reconnect=reconnect, max_retries=max_retries, retry_interval=retry_interval)
+
     def heartbeat(self, status="online", current_task_id=None, metadata=None):
         """Report agent presence and health."""
         payload = {
@@ -386,31 +596,34 @@ class DashClaw:
         }
         return self._request("/api/agents/heartbeat", method="POST", body=payload)
 
-    def start_heartbeat(self, interval=60, **kwargs):
-        """Start an automatic heartbeat timer in a background thread."""
-        if hasattr(self, "_heartbeat_thread") and self._heartbeat_thread and self._heartbeat_thread.is_alive():
-            return
+    def heartbeats(self, beats):
+        """Report presence for many agents in one request. Each item: {agent_id, agent_name?, status, current_task_id?, metadata?}."""
+        return self._request("/api/agents/heartbeat", method="POST", body={"heartbeats": list(beats)})
 
-        import threading
-        self._heartbeat_stop_event = threading.Event()
-
-        def _heartbeat_loop():
-            while not self._heartbeat_stop_event.is_set():
-                try:
-                    self.heartbeat(**kwargs)
-                except Exception:
-                    pass
-                self._heartbeat_stop_event.wait(interval)
+    def start_heartbeat(self, interval=60, jitter=0.1, max_silence=300, scheduler=None, **kwargs):
+        """Start automatic heartbeats in a background thread. Beats are jittered and skipped while
+        other requests show the agent is alive (at least one is still sent every max_silence seconds).
+        Pass a shared HeartbeatScheduler to multiplex many agents onto one thread and batched requests."""
+        if self._heartbeat_scheduler is not None:
+            return
 
-        self._heartbeat_thread = threading.Thread(target=_heartbeat_loop, daemon=True)
-        self._heartbeat_thread.start()
+        from .heartbeat import HeartbeatScheduler
+        self._owns_heartbeat_scheduler = scheduler is None
+        if scheduler is None:
+            scheduler = HeartbeatScheduler(self, interval=interval, jitter=jitter, max_silence=max_silence)
+        scheduler.register(self, **kwargs)
+        scheduler.start()
+        self._heartbeat_scheduler = scheduler
 
     def stop_heartbeat(self):
         """Stop the automatic heartbeat timer."""
-        if hasattr(self, "_heartbeat_stop_event"):
-            self._heartbeat_stop_event.set()
-            self._heartbeat_thread.join(timeout=1)
-            self._heartbeat_thread = None
+        scheduler = self._heartbeat_scheduler
+        if scheduler is None:
+            return
+        scheduler.unregister(self.agent_id)
+        if self._owns_heartbeat_scheduler:
+            scheduler.stop()
+        self._heartbeat_scheduler = None
 
     def get_actions(self, **filters):
         query = urllib.parse.urlencode({k: v for k, v in filters.items() if v is not None})
@@ -456,6 +669,50 @@ class DashClaw:
                 pass
             raise
 
+    # --- Tracing (Spans) ---
+
+    def configure_tracing(self, exporters=None, otlp_file=None, otlp_endpoint=None, export_to_dashclaw=True,
+                          service_name=None, max_batch=200, flush_interval=2.0):
+        """Configure span export. Spans go to DashClaw actions by default; optionally also to OTLP/JSON."""
+        from .tracing import Tracer, DashClawExporter, OTLPJsonExporter
+
+        exporters = list(exporters or [])
+        if export_to_dashclaw:
+            exporters.insert(0, DashClawExporter(self))
+        if otlp_file or otlp_endpoint:
+            exporters.append(OTLPJsonExporter(
+                path=otlp_file,
+                endpoint=otlp_endpoint,
+                service_name=service_name or self.agent_name or self.agent_id,
+            ))
+
+        previous = getattr(self, "_tracer", None)
+        self._tracer = Tracer(self, exporters=exporters, max_batch=max_batch, flush_interval=flush_interval)
+        if previous is not None:
+            previous.flush(timeout=5)
+        return self._tracer
+
+    @property
+    def tracer(self):
+        if getattr(self, "_tracer", None) is None:
+            self.configure_tracing()
+        return self._tracer
+
+    def span(self, name, action_type="other", **kwargs):
+        """Context manager that times a block as a span, nested under the current span.
+
+        Finished spans are batch-exported in the background as linked actions, so no
+        network call is made per span. Optional: parent_action_id, attributes, and any
+        action field (risk_score, systems_touched, input_summary, ...).
+        """
+        return self.tracer.span(name, action_type, **kwargs)
+
+    def flush_spans(self, timeout=None):
+        """Export all finished spans now. Returns True once they have been delivered."""
+        if getattr(self, "_tracer", None) is None:
+            return True
+        return self._tracer.flush(timeout=timeout)
+
     # --- Category 2: Decision Integrity (Loops & Assumptions) ---
 
     def register_open_loop(self, action_id, loop_type, description, **kwargs):
@@ -903,7 +1160,10 @@ class DashClaw:
 
     # --- Category 11: Agent Messaging ---
 
-    def send_message(self, body, to=None, message_type="info", attachments=None, **kwargs):
+    def send_message(self, body, to=None, message_type="info", attachments=None, progress=None, **kwargs):
+        """Send a message. Attachments are dicts with base64 data, or AttachmentFile
+        objects which are streamed from disk (progress(bytes_sent, total) is called per chunk).
+        Attachments over the server's 5MB limit raise ValueError before anything is sent."""
         payload = {
             "from_agent_id": self.agent_id,
             "to_agent_id": to,
@@ -913,14 +1173,30 @@ class DashClaw:
         }
         if attachments:
             payload["attachments"] = attachments
+            from .attachments import AttachmentFile, check_attachment_sizes
+            check_attachment_sizes(attachments)
+            if any(isinstance(a, AttachmentFile) for a in attachments):
+                return self._send_streaming("/api/messages", payload, progress=progress)
         return self._request("/api/messages", method="POST", body=payload)
 
+    def _send_streaming(self, path, payload, progress=None):
+        from .attachments import StreamingJSONBody
+        stream = StreamingJSONBody(payload, progress=progress)
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(stream))}
+        with self._open(path, method="POST", data=stream, headers=headers, timeout=300) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
     def get_inbox(self, **filters):
         filters["agent_id"] = self.agent_id
         filters["direction"] = "inbox"
         query = urllib.parse.urlencode({k: v for k, v in filters.items() if v is not None})
         return self._request(f"/api/messages?{query}")
 
+    def inbox_sync(self, path=":memory:", page_size=100, max_batch=100, flush_interval=2.0):
+        """Create a local SQLite-backed inbox that syncs incrementally and batches read/archive changes."""
+        from .inbox import InboxSync
+        return InboxSync(self, path=path, page_size=page_size, max_batch=max_batch, flush_interval=flush_interval)
+
     def get_sent_messages(self, message_type=None, thread_id=None, limit=None):
         """Get messages sent by this agent."""
         params = {"agent_id": self.agent_id, "direction": "sent"}
@@ -1010,19 +1286,94 @@ class DashClaw:
         """Get the URL to download an attachment."""
         return f"{self.base_url}/api/messages/attachments?id={urllib.parse.quote(attachment_id)}"
 
-    def get_attachment(self, attachment_id):
-        """Download an attachment's binary data."""
-        url = self.get_attachment_url(attachment_id)
-        req = urllib.request.Request(url, headers={"x-api-key": self.api_key})
-        with urllib.request.urlopen(req) as resp:
+    def get_attachment(self, attachment_id, timeout=60):
+        """Download an attachment's binary data into memory. Use download_attachment() for large files."""
+        path = f"/api/messages/attachments?id={urllib.parse.quote(attachment_id)}"
+        with self._open(path, timeout=timeout) as resp:
             data = resp.read()
             content_type = resp.headers.get("Content-Type", "application/octet-stream")
-            cd = resp.headers.get("Content-Disposition", "")
-            import re
-            match = re.search(r'filename="(.+?)"', cd)
-            filename = match.group(1) if match else attachment_id
+            filename = self._response_filename(resp, attachment_id)
             return {"data": data, "filename": filename, "mime_type": content_type}
 
+    def _response_filename(self, resp, default):
+        import re
+        match = re.search(r'filename="(.+?)"', resp.headers.get("Content-Disposition", ""))
+        return match.group(1) if match else default
+
+    def download_attachment(self, attachment_id, dest, chunk_size=1024 * 1024, progress=None, resume=False, timeout=60):
+        """
+        Stream an attachment to a file path or writable binary file object, holding
+        at most chunk_size bytes in memory. progress(bytes_done, total) is called per chunk.
+
+        With resume=True, bytes already present in dest (the file size for a path,
+        the current position for a file object) are requested with a Range header.
+        If the server ignores the range the download restarts from the beginning.
+        A 416 counts as complete only when its Content-Range size equals the bytes
+        already present; otherwise dest is truncated and downloaded again.
+        """
+        is_path = isinstance(dest, (str, os.PathLike))
+        offset = 0
+        if resume:
+            if is_path:
+                offset = os.path.getsize(dest) if os.path.exists(dest) else 0
+            else:
+                offset = dest.tell()
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        path = f"/api/messages/attachments?id={urllib.parse.quote(attachment_id)}"
+        with self._open(path, headers=headers, timeout=timeout, allow_status=(416,)) as resp:
+            status = resp.status if hasattr(resp, "status") else resp.code
+            filename = self._response_filename(resp, attachment_id)
+            mime_type = resp.headers.get("Content-Type", "application/octet-stream")
+            if status == 416:
+                # "bytes */N": nothing is left past offset. The previous download only
+                # completed if N is exactly what we hold; otherwise dest is not this attachment.
+                size = resp.headers.get("Content-Range", "").rpartition("/")[2].strip()
+                if size.isdigit() and int(size) == offset:
+                    return {"filename": filename, "mime_type": mime_type, "bytes": offset, "resumed": True}
+                restart = True
+            else:
+                restart = False
+                resumed = status == 206
+                if not resumed:
+                    offset = 0
+                total = None
+                content_range = resp.headers.get("Content-Range", "")
+                if content_range and "/" in content_range and not content_range.endswith("/*"):
+                    total = int(content_range.rsplit("/", 1)[1])
+                elif resp.headers.get("Content-Length"):
+                    total = offset + int(resp.headers["Content-Length"])
+
+                if is_path:
+                    out = open(dest, "ab" if resumed else "wb")
+                else:
+                    out = dest
+                    if not resumed and resume and dest.tell():
+                        dest.seek(0)
+                        dest.truncate()
+
+                done = offset
+                try:
+                    while True:
+                        chunk = resp.read(chunk_size)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        done += len(chunk)
+                        if progress:
+                            progress(done, total)
+                finally:
+                    if is_path:
+                        out.close()
+
+        if restart:
+            if not is_path:
+                dest.seek(0)
+                dest.truncate()
+            return self.download_attachment(attachment_id, dest, chunk_size=chunk_size, progress=progress, timeout=timeout)
+
+        return {"filename": filename, "mime_type": mime_type, "bytes": done, "resumed": resumed}
+
     # --- Category 13: Policy Enforcement (Guard) ---
 
     def guard(self, context, include_signals=False):
@@ -1031,7 +1382,73 @@ class DashClaw:
         query = urllib.parse.urlencode(params)
         path = f"/api/guard?{query}" if query else "/api/guard"
         body = {**context, "agent_id": context.get("agent_id", self.agent_id)}
-        return self._request(path, method="POST", body=body)
+        if self.guard_evaluation == "local" and not include_signals:
+            decision = self._guard_locally(body)
+            if decision is not None:
+                return decision
+        try:
+            return self._request(path, method="POST", body=body)
+        except DashClawError as e:
+            # block / require_approval come back as 403 with the decision as the body. Return it
+            # like a locally made decision so guard_mode enforces both the same way.
+            if e.status == 403 and isinstance(e.body, dict) and "decision" in e.body:
+                return e.body
+            raise
+
+    def _ensure_policy_snapshot(self):
+        if self._policy_snapshot is None:
+            from .policy import PolicySnapshot
+            from .batching import BatchQueue
+            self._policy_snapshot = PolicySnapshot(self, refresh_interval=self.policy_refresh_interval)
+            self._guard_reports = BatchQueue(self._report_guard_decisions, name="dashclaw-guard-audit")
+        return self._policy_snapshot
+
+    def _guard_locally(self, context):
+        """Evaluate context against the synced policy snapshot. Returns None when the server must decide."""
+        snapshot = self._ensure_policy_snapshot()
+        if not snapshot.loaded:
+            try:
+                snapshot.refresh()
+            except Exception as e:
+                print(f"[DashClaw] Policy snapshot sync failed (using remote guard): {str(e)}")
+                return None
+            snapshot.start()
+
+        decision = snapshot.evaluate(context)
+        if decision is not None:
+            self._guard_reports.put({
+                **context,
+                "decision": decision["decision"],
+                "reasons": decision["reasons"],
+                "matched_policies": decision["matched_policies"],
+                "evaluated_at": decision["evaluated_at"],
+                "snapshot_version": decision["snapshot_version"],
+            })
+        return decision
+
+    def _report_guard_decisions(self, records):
+        # Record-only: the server stores each decision as made locally instead of re-evaluating it.
+        for start in range(0, len(records), 100):
+            self._request("/api/guard/decisions", method="POST", body={"decisions": records[start:start + 100]})
+
+    def sync_policies(self):
+        """Pull the org's active guard policies for local evaluation (guard_evaluation="local")."""
+        snapshot = self._ensure_policy_snapshot()
+        policies = snapshot.refresh()
+        snapshot.start()
+        return policies
+
+    def stop_policy_sync(self):
+        """Stop refreshing the local policy snapshot and flush pending guard audit reports."""
+        if self._policy_snapshot is not None:
+            self._policy_snapshot.stop()
+        self.flush_guard_reports(timeout=5)
+
+    def flush_guard_reports(self, timeout=None):
+        """Send locally evaluated guard decisions to the server audit trail now."""
+        if self._guard_reports is None:
+            return True
+        return self._guard_reports.flush(timeout=timeout)
 
     def get_guard_decisions(self, decision=None, limit=20, offset=0, agent_id=None):
         params = {
@@ -1067,6 +1484,10 @@ class DashClaw:
 
     # --- Category 14: Policy Testing ---
 
+    def list_policies(self):
+        """List the org's guard policies."""
+        return self._request("/api/policies")
+
     def test_policies(self):
         """Run guardrails tests against all active policies."""
         return self._request("/api/policies/test", method="POST", body={
@@ -1188,6 +1609,11 @@ class DashClaw:
             payload["error"] = error
         return self._request(f"/api/routing/tasks/{task_id}/complete", method="POST", body=payload)
 
+    def routing_client(self, refresh_interval=30, max_workers=8):
+        """Create a RoutingClient with a locally cached agent index and bulk submit/complete."""
+        from .routing import RoutingClient
+        return RoutingClient(self, refresh_interval=refresh_interval, max_workers=max_workers)
+
     def get_routing_stats(self):
         """Get routing statistics for the org."""
         return self._request("/api/routing/stats")
@@ -1372,10 +1798,33 @@ class DashClaw:
 
     def activate_prompt_version(self, template_id: str, version_id: str) -> dict:
         """Activate a specific version (deactivates all others for that template)."""
-        return self._request(f"/api/prompts/templates/{template_id}/versions/{version_id}", "POST")
-
-    def render_prompt(self, template_id: str = None, version_id: str = None, variables: dict = None, action_id: str = None, agent_id: str = None, record: bool = False) -> dict:
-        """Render a prompt template with variables. Optionally record as a prompt run."""
+        result = self._request(f"/api/prompts/templates/{template_id}/versions/{version_id}", "POST")
+        if self._prompt_cache is not None:
+            self._prompt_cache.invalidate(template_id)
+        return result
+
+    def prompt_cache(self, ttl: float = 300, max_batch: int = 50, flush_interval: float = 2.0):
+        """Get this client's PromptCache, which renders templates in-process (see render_prompt(local=True))."""
+        if self._prompt_cache is None:
+            from .prompts import PromptCache
+            self._prompt_cache = PromptCache(self, ttl=ttl, max_batch=max_batch, flush_interval=flush_interval)
+        return self._prompt_cache
+
+    def flush_prompt_runs(self, timeout=None):
+        """Send prompt runs recorded by local renders now."""
+        if self._prompt_cache is None:
+            return True
+        return self._prompt_cache.flush(timeout=timeout)
+
+    def render_prompt(self, template_id: str = None, version_id: str = None, variables: dict = None, action_id: str = None, agent_id: str = None, record: bool = False, local: bool = False) -> dict:
+        """Render a prompt template with variables. Optionally record as a prompt run.
+        With local=True the version is rendered from the client's prompt cache and runs are recorded in
+        the background, so the result has no run_id."""
+        if local:
+            return self.prompt_cache().render(
+                template_id=template_id, version_id=version_id, variables=variables,
+                action_id=action_id, agent_id=agent_id, record=record,
+            )
         return self._request("/api/prompts/render", "POST", body={
             "template_id": template_id,
             "version_id": version_id,
@@ -1535,9 +1984,57 @@ class DashClaw:
         """Get a specific compliance export with full report content."""
         return self._request("GET", f"/api/compliance/exports/{export_id}")
 
-    def download_compliance_export(self, export_id: str) -> str:
-        """Download the raw report content for an export."""
-        return self._request("GET", f"/api/compliance/exports/{export_id}/download")
+    def download_compliance_export(self, export_id: str, dest=None, chunk_size: int = 1024 * 1024, progress=None):
+        """Download the raw report content for an export. Without dest, returns it as a str.
+        With a path or writable binary file object, streams it there and returns
+        {"filename", "content_type", "bytes"}. progress(bytes_done, total) is called per chunk."""
+        path = f"/api/compliance/exports/{export_id}/download"
+        if dest is None:
+            return self._request("GET", path, raw=True).decode("utf-8")
+
+        is_path = isinstance(dest, (str, os.PathLike))
+        with self._open(path, timeout=300) as resp:
+            total = int(resp.headers["Content-Length"]) if resp.headers.get("Content-Length") else None
+            result = {
+                "filename": self._response_filename(resp, f"{export_id}.md"),
+                "content_type": resp.headers.get("Content-Type"),
+                "bytes": 0,
+            }
+            out = open(dest, "wb") if is_path else dest
+            try:
+                while True:
+                    chunk = resp.read(chunk_size)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    result["bytes"] += len(chunk)
+                    if progress:
+                        progress(result["bytes"], total)
+            finally:
+                if is_path:
+                    out.close()
+        return result
+
+    def iter_compliance_export(self, export_id: str, chunk_size: int = 64 * 1024):
+        """Yield the raw report content of an export as bytes chunks."""
+        with self._open(f"/api/compliance/exports/{export_id}/download", timeout=300) as resp:
+            while True:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_compliance_export_sections(self, export_id: str, chunk_size: int = 64 * 1024):
+        """Yield parsed sections of an export as they arrive: markdown sections split at
+        headings, and each framework's JSON document for JSON exports."""
+        import codecs
+        from .compliance import ExportSectionParser
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        parser = ExportSectionParser()
+        for chunk in self.iter_compliance_export(export_id, chunk_size=chunk_size):
+            yield from parser.feed(decoder.decode(chunk))
+        yield from parser.feed(decoder.decode(b"", final=True))
+        yield from parser.close()
 
     def delete_compliance_export(self, export_id: str) -> dict:
         """Delete a compliance export."""
@@ -1659,6 +2156,13 @@ class DashClaw:
         """Get the maturity level definitions."""
         return self._request("GET", "/api/learning/analytics/maturity")
 
+    def local_analytics(self, page_size: int = 200, max_actions: int = None, use_numpy: bool = None, now=None, **filters):
+        """Page actions (get_actions filters, e.g. agent_id) into memory once and return a LocalAnalytics
+        that computes drift baselines, drift alerts, snapshots, velocity and learning curves in-process."""
+        from .analytics import ActionFrame, LocalAnalytics
+        frame = ActionFrame.fetch(self, page_size=page_size, max_actions=max_actions, **filters)
+        return LocalAnalytics(frame, use_numpy=use_numpy, now=now)
+
     # --- Scoring Profiles -----------------------------------
 
     def create_scoring_profile(self, **kwargs):
@@ -1688,8 +2192,27 @@ class DashClaw:
     def score_with_profile(self, profile_id, action):
         return self._request("POST", "/api/scoring/score", json={"profile_id": profile_id, "action": action})
 
-    def batch_score_with_profile(self, profile_id, actions):
-        return self._request("POST", "/api/scoring/score", json={"profile_id": profile_id, "actions": actions})
+    def batch_score_with_profile(self, profile_id, actions, local=False, upload=False, scorer_name=None):
+        """Score many actions against a profile. With local=True the profile is fetched once and the
+        actions are scored in-process (see local_scorer); upload=True then stores the results as
+        evaluation scores via create_score."""
+        if not local:
+            return self._request("POST", "/api/scoring/score", json={"profile_id": profile_id, "actions": actions})
+        scorer = self.local_scorer(profile_id)
+        batch = scorer.score_many(actions)
+        if upload:
+            batch["uploaded"] = scorer.upload(self, batch["results"], scorer_name=scorer_name)
+        return batch
+
+    def local_scorer(self, profile_id, custom_functions=None, use_numpy=None, refresh=False):
+        """Get an in-process LocalScorer for a profile. Scorers are cached per profile id;
+        pass refresh=True after editing the profile's dimensions."""
+        from .scoring import LocalScorer
+        if refresh or custom_functions is not None or use_numpy is not None or profile_id not in self._local_scorers:
+            self._local_scorers[profile_id] = LocalScorer.from_profile_id(
+                self, profile_id, custom_functions=custom_functions, use_numpy=use_numpy
+            )
+        return self._local_scorers[profile_id]
 
     def get_profile_scores(self, **params):
         return self._request("GET", "/api/scoring/score", params=params)
@@ -0,0 +1,93 @@
+import json
+import re
+
+_HEADING = re.compile(r"^(#{1,2}) (.+)$")
+
+
+class ExportSectionParser:
+    """
+    Incremental parser for compliance export content (see app/lib/compliance/exporter.js).
+
+    Markdown exports are split into sections at "# " and "## " headings. JSON
+    exports are a sequence of pretty-printed JSON documents, one per framework,
+    interleaved with markdown remediation/evidence sections. Each JSON document
+    is emitted as soon as its closing brace arrives.
+
+    Only the section currently being read is buffered, so memory is bounded by
+    the largest section rather than the whole export.
+
+    Usage:
+        parser = ExportSectionParser()
+        for chunk in chunks:
+            for section in parser.feed(chunk):
+                handle(section)
+        for section in parser.close():
+            handle(section)
+
+    Sections are {"type": "markdown", "level", "title", "content"} or {"type": "json", "data"}.
+    """
+
+    def __init__(self):
+        self._partial = ""
+        self._lines = []
+        self._json_lines = None
+        self._heading = (0, None)
+
+    def feed(self, text):
+        out = []
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._line(line, out)
+        return out
+
+    def close(self):
+        out = []
+        if self._partial:
+            self._line(self._partial, out)
+            self._partial = ""
+        if self._json_lines is not None:
+            # Truncated or malformed document: surface it as text rather than dropping it.
+            self._lines.extend(self._json_lines)
+            self._json_lines = None
+        self._emit_markdown(out)
+        return out
+
+    def _line(self, line, out):
+        if self._json_lines is not None:
+            self._json_lines.append(line)
+            # Top-level documents are indented, so only a closing bracket in column 0 can end one.
+            if line.startswith(("}", "]")):
+                self._try_json(out)
+            return
+
+        if line.startswith("{") or line.rstrip() == "[":
+            self._emit_markdown(out)
+            self._json_lines = [line]
+            if line.rstrip().endswith("}"):
+                self._try_json(out)
+            return
+
+        match = _HEADING.match(line)
+        if match:
+            self._emit_markdown(out)
+            self._heading = (len(match.group(1)), match.group(2).strip())
+        self._lines.append(line)
+
+    def _try_json(self, out):
+        try:
+            data = json.loads("\n".join(self._json_lines))
+        except ValueError:
+            return
+        self._json_lines = None
+        out.append({"type": "json", "data": data})
+
+    def _emit_markdown(self, out):
+        content = "\n".join(self._lines).strip()
+        while content.endswith("---"):
+            content = content[:-3].rstrip()
+        if content:
+            level, title = self._heading
+            out.append({"type": "markdown", "level": level, "title": title, "content": content})
+        self._lines = []
+        self._heading = (0, None)
@@ -0,0 +1,111 @@
+import json
+import threading
+
+
+class EventStream:
+    """
+    Subscription to real-time SSE events from /api/stream, read on a background
+    thread. Port of events() in sdk/dashclaw.js: reconnects resume from the
+    last event id, and handler errors are ignored.
+
+    Nothing is read until start() is called, so handlers registered before it
+    (including one for the initial "connected" event) see every event.
+
+    Usage:
+        stream = claw.events()
+        stream.on("message.created", lambda msg: print(msg["body"]))
+        stream.on("reconnecting", lambda info: print(info["attempt"]))
+        stream.start()
+        ...
+        stream.close()
+    """
+
+    def __init__(self, client, reconnect=True, max_retries=None, retry_interval=3.0, timeout=60):
+        self.client = client
+        self.reconnect = reconnect
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.last_event_id = None
+        self._retry_count = 0
+        self._handlers = {}
+        self._closed = threading.Event()
+        self._response = None
+        self._thread = None
+
+    def on(self, event_type, callback):
+        self._handlers.setdefault(event_type, []).append(callback)
+        return self
+
+    def start(self):
+        """Connect and start dispatching events on a background thread. Safe to call twice."""
+        if self._thread is None and not self._closed.is_set():
+            self._thread = threading.Thread(target=self._connect_loop, name="dashclaw-events", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._closed.set()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def _emit(self, event_type, data):
+        for callback in list(self._handlers.get(event_type, [])):
+            try:
+                callback(data)
+            except Exception:
+                pass
+
+    def _connect(self):
+        headers = {"Accept": "text/event-stream"}
+        if self.last_event_id:
+            headers["last-event-id"] = self.last_event_id
+        with self.client._open("/api/stream", headers=headers, timeout=self.timeout) as resp:
+            self._response = resp
+            self._retry_count = 0  # reset on successful connection
+            event, data = None, ""
+            for raw in resp:
+                if self._closed.is_set():
+                    return
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if line.startswith("id: "):
+                    self.last_event_id = line[4:].strip()
+                elif line.startswith("event: "):
+                    event = line[7:].strip()
+                elif line.startswith("data: "):
+                    data += line[6:]
+                elif line.startswith(":"):
+                    pass  # keepalive heartbeat
+                elif line == "":
+                    if event and data:
+                        try:
+                            self._emit(event, json.loads(data))
+                        except ValueError:
+                            pass
+                    event, data = None, ""
+
+    def _connect_loop(self):
+        while not self._closed.is_set():
+            try:
+                self._connect()
+            except Exception as e:
+                if self._closed.is_set():
+                    return
+                self._emit("error", e)
+            finally:
+                self._response = None
+            if self._closed.is_set():
+                return
+            if not self.reconnect or (self.max_retries is not None and self._retry_count >= self.max_retries):
+                self._emit("error", ConnectionError("SSE stream ended"))
+                return
+            self._retry_count += 1
+            self._emit("reconnecting", {"attempt": self._retry_count, "max_retries": self.max_retries})
+            if self._closed.wait(self.retry_interval):
+                return
@@ -0,0 +1,202 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from .client import DashClawError
+
+
+class HeartbeatScheduler:
+    """
+    Sends presence heartbeats for one or many agents from a single thread.
+
+    - The first beat for an agent goes out after a random delay of up to
+      interval × jitter, so a fleet started at once does not send its first
+      beats in the same instant. The second is placed at a random point in
+      the interval, and later beats are spaced interval ± jitter. Agents
+      started together therefore drift out of phase instead of hitting the
+      server together every interval.
+    - A beat is skipped when the agent's client made another request within
+      the last interval, since that traffic already shows it is alive. A real
+      heartbeat is still sent at least every max_silence seconds, so the
+      server's stale-presence signal (10 minutes) never fires for a live agent.
+    - Beats due within coalesce_window of each other are sent together as one
+      POST /api/agents/heartbeat {"heartbeats": [...]} request. Servers without
+      batch support get individual requests.
+
+    Usage:
+        scheduler = HeartbeatScheduler(uplink, interval=60)
+        for agent in fleet:          # DashClaw clients or plain agent ids
+            scheduler.register(agent)
+        scheduler.start()
+    """
+
+    def __init__(self, client, interval=60, jitter=0.1, max_silence=300, coalesce_window=5.0, max_batch=500):
+        self.client = client
+        self.interval = float(interval)
+        self.jitter = max(0.0, min(float(jitter), 0.5))
+        self.max_silence = float(max_silence) if max_silence is not None else self.interval * 5
+        self.coalesce_window = float(coalesce_window)
+        self.max_batch = max(1, int(max_batch))
+        self.sent = 0
+        self.skipped = 0
+        self.failures = 0
+
+        self._agents = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._batch_supported = True
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def _schedule(self, entry, due):
+        # Caller holds self._cond. Superseded heap entries are skipped when popped.
+        entry["next_due"] = due
+        heapq.heappush(self._heap, (due, next(self._seq), entry["agent_id"]))
+        self._cond.notify_all()
+
+    def _next_interval(self):
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def register(self, agent, agent_name=None, status="online", current_task_id=None, metadata=None):
+        """Add an agent, given as a DashClaw client (whose traffic can stand in for beats) or an agent id."""
+        source = None if isinstance(agent, str) else agent
+        agent_id = agent if source is None else source.agent_id
+        with self._cond:
+            entry = {
+                "agent_id": agent_id,
+                "agent_name": agent_name if agent_name is not None else getattr(source, "agent_name", None),
+                "status": status,
+                "current_task_id": current_task_id,
+                "metadata": metadata,
+                "source": source,
+                "last_beat": None,
+                "dirty": True,
+            }
+            self._agents[agent_id] = entry
+            self._schedule(entry, time.monotonic() + random.uniform(0, self.interval * self.jitter))
+        return agent_id
+
+    def update(self, agent_id, **fields):
+        """Change status, current_task_id, metadata or agent_name; the change is sent on the next tick."""
+        with self._cond:
+            entry = self._agents.get(agent_id)
+            if entry is None:
+                raise KeyError(agent_id)
+            for key in ("agent_name", "status", "current_task_id", "metadata"):
+                if key in fields:
+                    entry[key] = fields[key]
+            entry["dirty"] = True
+            self._schedule(entry, time.monotonic())
+
+    def unregister(self, agent_id):
+        with self._cond:
+            self._agents.pop(agent_id, None)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._agents)
+
+    def _is_active(self, entry, now):
+        if entry["dirty"] or entry["last_beat"] is None:
+            return False
+        if now - entry["last_beat"] >= self.max_silence:
+            return False
+        last_request = getattr(entry["source"], "last_request_at", None)
+        return last_request is not None and now - last_request < self.interval
+
+    def _collect_due(self, now):
+        """Pop every agent due within the coalescing window. Returns (payloads, skipped)."""
+        beats = []
+        skipped = 0
+        with self._cond:
+            horizon = now + self.coalesce_window
+            due_entries = []
+            while self._heap and self._heap[0][0] <= horizon:
+                due, _, agent_id = heapq.heappop(self._heap)
+                entry = self._agents.get(agent_id)
+                if entry is not None and entry["next_due"] == due:
+                    due_entries.append(entry)
+
+            for entry in due_entries:
+                if self._is_active(entry, now):
+                    skipped += 1
+                    self._schedule(entry, now + self._next_interval())
+                    continue
+                first = entry["last_beat"] is None
+                beats.append({
+                    "agent_id": entry["agent_id"],
+                    "agent_name": entry["agent_name"],
+                    "status": entry["status"],
+                    "current_task_id": entry["current_task_id"],
+                    "metadata": entry["metadata"],
+                })
+                entry["last_beat"] = now
+                entry["dirty"] = False
+                # After the first beat, move the agent to a random phase of the interval.
+                self._schedule(entry, now + (random.uniform(0, self.interval) if first else self._next_interval()))
+        return beats, skipped
+
+    def _send(self, payloads):
+        for start in range(0, len(payloads), self.max_batch):
+            chunk = payloads[start:start + self.max_batch]
+            if self._batch_supported and len(chunk) > 1:
+                try:
+                    self.client.heartbeats(chunk)
+                    self.sent += len(chunk)
+                    continue
+                except DashClawError as e:
+                    if e.status != 400:
+                        self.failures += len(chunk)
+                        continue
+                    # Older servers reject the batch body; send one by one from now on.
+                    self._batch_supported = False
+            for payload in chunk:
+                try:
+                    self.client._request("/api/agents/heartbeat", method="POST", body=payload)
+                    self.sent += 1
+                except Exception:
+                    self.failures += 1
+
+    def tick(self, now=None):
+        """Send every beat that is due now. Returns {"sent": n, "skipped": n}."""
+        now = time.monotonic() if now is None else now
+        payloads, skipped = self._collect_due(now)
+        self.skipped += skipped
+        if payloads:
+            self._send(payloads)
+        return {"sent": len(payloads), "skipped": skipped}
+
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="dashclaw-heartbeat", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=1):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._heap[0][0] - time.monotonic() if self._heap else None
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"[DashClaw] Heartbeat tick failed: {str(e)}")
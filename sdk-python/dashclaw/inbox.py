@@ -0,0 +1,251 @@
+import json
+import sqlite3
+import threading
+
+from .batching import BatchQueue
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    from_agent_id TEXT,
+    to_agent_id TEXT,
+    message_type TEXT,
+    thread_id TEXT,
+    is_read INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_created ON messages (archived, created_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class InboxStore:
+    """SQLite copy of one agent's inbox, keyed by message id, plus the sync cursor."""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_cursor(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'cursor'").fetchone()
+        return row["value"] if row else None
+
+    def set_cursor(self, cursor):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (key, value) VALUES ('cursor', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (cursor,),
+            )
+
+    def upsert(self, messages):
+        """Insert or refresh messages. Returns the number that were not stored before.
+        Local read/archive flags win over the server copy until their change is flushed."""
+        rows = [
+            (
+                m["id"], m.get("created_at"), m.get("from_agent_id"), m.get("to_agent_id"),
+                m.get("message_type"), m.get("thread_id"),
+                1 if m.get("is_read") or m.get("status") == "read" else 0,
+                1 if m.get("status") == "archived" else 0,
+                json.dumps(m),
+            )
+            for m in messages if m.get("id")
+        ]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO messages (id, created_at, from_agent_id, to_agent_id, message_type, thread_id, is_read, archived, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self._conn.total_changes - before
+            self._conn.executemany(
+                "UPDATE messages SET data = ?, is_read = MAX(is_read, ?), archived = MAX(archived, ?) WHERE id = ?",
+                [(r[8], r[6], r[7], r[0]) for r in rows],
+            )
+        return added
+
+    def set_flag(self, message_ids, flag):
+        if flag not in ("is_read", "archived"):
+            raise ValueError("flag must be is_read or archived")
+        with self._lock, self._conn:
+            self._conn.executemany(f"UPDATE messages SET {flag} = 1 WHERE id = ?", [(i,) for i in message_ids])
+
+    def query(self, unread=None, message_type=None, thread_id=None, include_archived=False, limit=None):
+        clauses = []
+        params = []
+        if not include_archived:
+            clauses.append("archived = 0")
+        if unread:
+            clauses.append("is_read = 0")
+        if message_type is not None:
+            clauses.append("message_type = ?")
+            params.append(message_type)
+        if thread_id is not None:
+            clauses.append("thread_id = ?")
+            params.append(thread_id)
+        sql = "SELECT data, is_read, archived FROM messages"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        out = []
+        for row in rows:
+            message = json.loads(row["data"])
+            message["is_read"] = bool(row["is_read"])
+            if row["archived"]:
+                message["status"] = "archived"
+            out.append(message)
+        return out
+
+    def unread_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages WHERE archived = 0 AND is_read = 0").fetchone()[0]
+
+
+class InboxSync:
+    """
+    Local inbox for an agent that syncs incrementally instead of re-downloading
+    the full message list on every poll.
+
+    sync() asks /api/messages only for messages at or after the stored cursor,
+    paging until a page reaches the cursor itself (so it also stays cheap
+    against servers that ignore the since filter). start_push() subscribes to
+    message.created events on /api/stream and runs a catch-up sync() on every
+    (re)connect. mark_read() and archive() update the store immediately and
+    send the changes to the server in batched PATCH requests from a
+    background thread.
+
+    Usage:
+        inbox = claw.inbox_sync("inbox.db")
+        inbox.start_push()
+        for msg in inbox.messages(unread=True):
+            handle(msg)
+            inbox.mark_read([msg["id"]])
+        inbox.close()
+    """
+
+    def __init__(self, client, path=":memory:", page_size=100, max_batch=100, flush_interval=2.0):
+        self.client = client
+        self.agent_id = client.agent_id
+        self.store = InboxStore(path)
+        self.page_size = page_size
+        self._sync_lock = threading.Lock()
+        self._stream = None
+        self._changes = BatchQueue(
+            self._send_changes,
+            max_batch=max_batch,
+            flush_interval=flush_interval,
+            name="dashclaw-inbox-changes",
+        )
+
+    def _addressed_to_me(self, message):
+        return message.get("from_agent_id") != self.agent_id and message.get("to_agent_id") in (None, self.agent_id)
+
+    def sync(self):
+        """Fetch messages newer than the cursor. Returns the number of new messages stored."""
+        with self._sync_lock:
+            cursor = self.store.get_cursor()
+            added = 0
+            newest = cursor
+            offset = 0
+            while True:
+                page = self.client.get_inbox(since=cursor, limit=self.page_size, offset=offset or None)
+                messages = (page or {}).get("messages", [])
+                added += self.store.upsert(messages)
+                reached_cursor = False
+                for m in messages:
+                    created_at = m.get("created_at")
+                    if not created_at:
+                        continue
+                    if newest is None or created_at > newest:
+                        newest = created_at
+                    if cursor is not None and created_at <= cursor:
+                        reached_cursor = True
+                # Newest-first pages: we are caught up once a page is short or reaches the cursor.
+                # Already-stored messages are not a stopping point, since newer ones pushed over
+                # the stream can sit above older messages that were never fetched.
+                if len(messages) < self.page_size or reached_cursor:
+                    break
+                offset += len(messages)
+            if newest != cursor:
+                self.store.set_cursor(newest)
+            return added
+
+    def start_push(self, retry_interval=3.0):
+        """Apply message.created events from the realtime stream as they arrive."""
+        if self._stream is not None:
+            return self._stream
+
+        def on_message(message):
+            if isinstance(message, dict) and message.get("id") and self._addressed_to_me(message):
+                self.store.upsert([message])
+
+        def on_connected(_info):
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"[DashClaw] Inbox catch-up sync failed: {str(e)}")
+
+        self._stream = self.client.events(retry_interval=retry_interval)
+        self._stream.on("message.created", on_message).on("connected", on_connected).start()
+        return self._stream
+
+    def stop_push(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def messages(self, unread=None, message_type=None, thread_id=None, limit=None):
+        """Messages from the local store, newest first. Archived messages are excluded."""
+        return self.store.query(unread=unread, message_type=message_type, thread_id=thread_id, limit=limit)
+
+    def unread_count(self):
+        return self.store.unread_count()
+
+    def mark_read(self, message_ids):
+        self.store.set_flag(message_ids, "is_read")
+        self._changes.put_many(("read", i) for i in message_ids)
+
+    def archive(self, message_ids):
+        self.store.set_flag(message_ids, "archived")
+        self._changes.put_many(("archive", i) for i in message_ids)
+
+    def _send_changes(self, changes):
+        read_ids = list(dict.fromkeys(i for action, i in changes if action == "read"))
+        archive_ids = list(dict.fromkeys(i for action, i in changes if action == "archive"))
+        if read_ids:
+            self.client.mark_read(read_ids)
+        if archive_ids:
+            self.client.archive_messages(archive_ids)
+
+    def flush(self, timeout=None):
+        """Send pending read/archive changes now. Returns True once they are sent."""
+        return self._changes.flush(timeout=timeout)
+
+    def close(self):
+        self.stop_push()
+        self._changes.close()
+        self.store.close()
@@ -1,5 +1,7 @@
-from typing import Any, Dict, Optional
-import time
+from typing import Any, Optional
+import contextvars
+import threading
+import warnings
 
 try:
     from crewai import Agent, Task
@@ -9,15 +11,62 @@ except ImportError:
     class Task: pass
 
 from dashclaw import DashClaw
+from dashclaw.tracing import Span, Tracer, current_span
+
+_SUMMARY_LIMIT = 1000
+
+# The crew run the current task belongs to, per kickoff() call.
+_crew_run = contextvars.ContextVar("dashclaw_crew_run", default=None)
+
+
+class _CrewRun:
+    """One kickoff() call: its root span and, in crew_end mode, the finished spans held for it."""
+
+    __slots__ = ("span", "pending")
+
+    def __init__(self, span):
+        self.span = span
+        self.pending = []
+
+
+def _truncate(value, limit=_SUMMARY_LIMIT):
+    if value is None:
+        return None
+    text = str(value)
+    return text[:limit] if len(text) > limit else text
+
+
+def _patch(obj, name, fn):
+    # CrewAI agents and tools are pydantic models, which reject unknown attributes.
+    try:
+        setattr(obj, name, fn)
+    except (AttributeError, TypeError, ValueError):
+        object.__setattr__(obj, name, fn)
+
 
 class DashClawCrewIntegration:
     """
     CrewAI Integration for DashClaw.
-    Provides callbacks to automatically log Task execution to DashClaw.
-    
+    Traces crew -> task -> agent -> tool spans as linked DashClaw actions.
+
+    Spans are recorded in memory and sent from a background thread, so no
+    DashClaw request blocks task execution. With flush_mode="crew_end" (default)
+    the whole trace is sent as one batch when the crew finishes; with
+    flush_mode="stream" each span is queued as soon as it finishes.
+
+    Spans are created on the client's tracer (see DashClaw.span), so spans
+    opened inside a tool nest under it and share its exporters; configure its
+    batching with client.configure_tracing(max_batch=..., flush_interval=...).
+    max_batch and flush_interval here only apply to the tracer created for a
+    client that is not a DashClaw instance.
+
     Usage:
         integration = DashClawCrewIntegration(claw)
-        
+        integration.instrument_crew(crew)
+        crew.kickoff()
+        integration.flush()  # optional: wait for the trace to be delivered
+
+        # Or, per task, without crew-level tracing
         task = Task(
             description="...",
             agent=my_agent,
@@ -25,68 +74,207 @@ class DashClawCrewIntegration:
         )
     """
 
-    def __init__(self, client: DashClaw):
+    def __init__(self, client: DashClaw, flush_mode: str = "crew_end", max_batch: Optional[int] = None,
+                 flush_interval: Optional[float] = None, tracer: Optional[Tracer] = None):
+        if flush_mode not in ["crew_end", "stream"]:
+            raise ValueError("flush_mode must be one of: crew_end, stream")
         self.client = client
-        self.active_tasks = {} # task_id -> action_id
+        self.flush_mode = flush_mode
+        self.active_tasks = {}  # task_id -> action_id of the running task span
+        if tracer is None and not isinstance(client, DashClaw):
+            tracer = Tracer(client, max_batch=max_batch or 500, flush_interval=2.0 if flush_interval is None else flush_interval)
+        elif max_batch is not None or flush_interval is not None:
+            warnings.warn(
+                "DashClawCrewIntegration: max_batch and flush_interval are ignored when spans go to an existing "
+                "tracer; use client.configure_tracing(max_batch=..., flush_interval=...) instead.",
+                UserWarning,
+                stacklevel=2,
+            )
+        self.tracer = tracer or client.tracer
+        self._lock = threading.Lock()
+        self._runs = []  # crew runs in progress
+        self._thread_state = threading.local()
+
+    # --- Span bookkeeping ---
+
+    def _current_run(self) -> Optional[_CrewRun]:
+        run = _crew_run.get()
+        if run is None:
+            # CrewAI runs async tasks in fresh threads, which start with an empty
+            # context. Only a single crew in progress can be attributed safely.
+            with self._lock:
+                if len(self._runs) == 1:
+                    run = self._runs[0]
+        return run
+
+    def _start_span(self, name: str, action_type: str, parent: Optional[Span] = None, root: bool = False, **fields) -> Span:
+        if parent is None and not root:
+            run = self._current_run()
+            parent = current_span() or (run.span if run else None)
+        return self.tracer.start_span(name, action_type, parent=parent, root=root, **fields)
+
+    def _finish_span(self, span: Span, output: Any = None, error: Optional[BaseException] = None) -> None:
+        run = self._current_run() if self.flush_mode == "crew_end" else None
+        self.tracer.end_span(span, output=output, error=error, export=run is None)
+        if run is not None:
+            with self._lock:
+                run.pending.append(span)
+
+    def _run_in_span(self, span: Span, fn, *args, **kwargs):
+        with self.tracer.use_span(span):
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._finish_span(span, error=e)
+                raise
+        self._finish_span(span, output=result)
+        return result
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send all finished spans now. Returns True once everything has been delivered."""
+        pending = []
+        with self._lock:
+            for run in self._runs:
+                pending.extend(run.pending)
+                run.pending = []
+        self.tracer.export(pending)
+        return self.tracer.flush(timeout=timeout)
+
+    # --- Callbacks & instrumentation ---
 
     def task_callback(self, output: Any) -> None:
         """
         Callback for CrewAI Task completion.
-        Logs the finished task as a completed action in DashClaw.
+        If the task ran on an instrumented agent its span already holds the output;
+        otherwise the finished task is queued as an action linked to the running crew.
         """
         try:
-            # CrewAI Task callback only provides output string/object
-            # We try to infer context or just log the result
-            output_str = str(output)
-            
-            self.client.create_action(
-                action_type="task",
-                declared_goal="CrewAI Task Completed",
-                status="completed",
-                output_summary=output_str[:1000] if len(output_str) > 1000 else output_str,
-                risk_score=20
-            )
+            if getattr(self._thread_state, "last_task_span", None) is not None:
+                self._thread_state.last_task_span = None
+                return
+
+            span = self._start_span("CrewAI Task Completed", "other", risk_score=20)
+            self._finish_span(span, output=output)
         except Exception as e:
             print(f"[DashClaw] Failed to log CrewAI task: {e}")
 
+    def instrument_crew(self, crew: Any):
+        """
+        Trace a whole crew run: wraps kickoff in a crew span and instruments every
+        agent, so tasks (including ones CrewAI runs in parallel threads) are linked under it.
+        """
+        if getattr(crew, "_dashclaw_instrumented", False):
+            return crew
+
+        for agent in getattr(crew, "agents", None) or []:
+            self.instrument_agent(agent)
+
+        original_kickoff = crew.kickoff
+
+        def wrapped_kickoff(*args, **kwargs):
+            span = self._start_span(
+                f"Crew kickoff: {getattr(crew, 'name', None) or 'crew'}",
+                "other",
+                root=True,
+                input_summary=_truncate(kwargs.get("inputs") or (args[0] if args else None)),
+            )
+            run = _CrewRun(span)
+            with self._lock:
+                self._runs.append(run)
+            token = _crew_run.set(run)
+            try:
+                with self.tracer.use_span(span):
+                    result = original_kickoff(*args, **kwargs)
+                self._finish_span(span, output=result)
+                return result
+            except Exception as e:
+                self._finish_span(span, error=e)
+                raise
+            finally:
+                _crew_run.reset(token)
+                with self._lock:
+                    self._runs.remove(run)
+                    pending, run.pending = run.pending, []
+                # Send the trace parents-first as a single batch, off the caller's thread.
+                pending.sort(key=lambda s: s.start_time_unix_ns)
+                self.tracer.export(pending)
+
+        _patch(crew, "kickoff", wrapped_kickoff)
+        _patch(crew, "_dashclaw_instrumented", True)
+        return crew
+
+    def instrument_tool(self, tool: Any):
+        """Wrap a CrewAI tool's run method so each call is traced under the running agent span."""
+        if getattr(tool, "_dashclaw_instrumented", False) or not hasattr(tool, "run"):
+            return tool
+
+        original_run = tool.run
+        tool_name = getattr(tool, "name", None) or type(tool).__name__
+
+        def wrapped_run(*args, **kwargs):
+            span = self._start_span(
+                f"Use Tool: {tool_name}",
+                "api",
+                input_summary=_truncate(kwargs or args),
+                systems_touched=[tool_name],
+                risk_score=30,
+            )
+            return self._run_in_span(span, original_run, *args, **kwargs)
+
+        _patch(tool, "run", wrapped_run)
+        _patch(tool, "_dashclaw_instrumented", True)
+        return tool
+
     def instrument_agent(self, agent: Agent):
         """
-        Experimental: Patch a CrewAI agent to log step-by-step progress.
+        Patch a CrewAI agent so each execute_task call records a task span with a
+        nested agent span, and any tools it uses record tool spans beneath that.
         """
-        # This is more complex because CrewAI doesn't have a standard 'start' callback yet
-        # But we could wrap the agent's execute_task method
+        if getattr(agent, "_dashclaw_instrumented", False):
+            return agent
+
         original_execute = agent.execute_task
-        
+        for tool in getattr(agent, "tools", None) or []:
+            self.instrument_tool(tool)
+
         def wrapped_execute(task, context=None, tools=None):
-            res = self.client.create_action(
-                action_type="research",
-                declared_goal=f"Agent {agent.role} executing task",
-                input_summary=task.description,
-                agent_name=agent.role,
-                risk_score=30
+            for tool in tools or []:
+                self.instrument_tool(tool)
+
+            task_key = str(getattr(task, "id", None) or id(task))
+            # Pin the crew run for this thread so the task's spans are held with it.
+            run_token = _crew_run.set(self._current_run())
+            task_span = self._start_span(
+                f"Task: {_truncate(getattr(task, 'description', None), 200) or 'CrewAI task'}",
+                "other",
+                input_summary=_truncate(getattr(task, "description", None)),
+                agent_name=getattr(agent, "role", None),
             )
-            action_id = res.get('action_id') if res else None
-            
-            start_time = time.time()
+            agent_span = self._start_span(
+                f"Agent {getattr(agent, 'role', 'agent')} executing task",
+                "research",
+                parent=task_span,
+                input_summary=_truncate(context),
+                agent_name=getattr(agent, "role", None),
+                risk_score=30,
+            )
+            with self._lock:
+                self.active_tasks[task_key] = task_span.action_id
+
             try:
-                result = original_execute(task, context, tools)
-                if action_id:
-                    self.client.update_outcome(
-                        action_id, 
-                        status="completed", 
-                        output_summary=str(result),
-                        duration_ms=int((time.time() - start_time) * 1000)
-                    )
+                with self.tracer.use_span(task_span):
+                    result = self._run_in_span(agent_span, original_execute, task, context, tools)
+                self._finish_span(task_span, output=result)
                 return result
             except Exception as e:
-                if action_id:
-                    self.client.update_outcome(
-                        action_id, 
-                        status="failed", 
-                        error_message=str(e),
-                        duration_ms=int((time.time() - start_time) * 1000)
-                    )
-                raise e
-        
-        agent.execute_task = wrapped_execute
+                self._finish_span(task_span, error=e)
+                raise
+            finally:
+                with self._lock:
+                    self.active_tasks.pop(task_key, None)
+                self._thread_state.last_task_span = task_span
+                _crew_run.reset(run_token)
+
+        _patch(agent, "execute_task", wrapped_execute)
+        _patch(agent, "_dashclaw_instrumented", True)
         return agent
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+# Mirrors DECISION_SEVERITY in app/lib/guard.js.
+DECISION_SEVERITY = {"allow": 0, "warn": 1, "require_approval": 2, "block": 3}
+
+# Policy types whose outcome depends only on the action context, so they can be
+# evaluated in-process. Everything else (rate_limit, webhook_check,
+# behavioral_anomaly, semantic_check) needs server-side state.
+LOCAL_POLICY_TYPES = ("risk_threshold", "require_approval", "block_action_type")
+
+
+def _evaluate_policy(policy_type, rules, context):
+    """Port of the context-only branches of evaluatePolicy() in app/lib/guard.js."""
+    if policy_type == "risk_threshold":
+        threshold = rules.get("threshold")
+        if threshold is None:
+            threshold = 80
+        try:
+            raw_score = float(context.get("risk_score") or 0)
+        except (TypeError, ValueError):
+            raw_score = 0
+        risk_score = max(0, min(raw_score, 100))
+        if risk_score == int(risk_score):
+            risk_score = int(risk_score)
+        if risk_score >= threshold:
+            return {"action": rules.get("action") or "block", "reason": f"Risk score {risk_score} >= threshold {threshold}"}
+        return None
+
+    if policy_type == "require_approval":
+        if context.get("action_type") in (rules.get("action_types") or []):
+            return {"action": "require_approval", "reason": f"Action type \"{context.get('action_type')}\" requires approval"}
+        return None
+
+    if policy_type == "block_action_type":
+        if context.get("action_type") in (rules.get("action_types") or []):
+            return {"action": "block", "reason": f"Action type \"{context.get('action_type')}\" is blocked by policy"}
+        return None
+
+    return None
+
+
+class PolicySnapshot:
+    """
+    In-process copy of the org's active guard policies, pulled from /api/policies
+    and refreshed periodically, that evaluates context-only policy types locally.
+
+    evaluate() returns a guard decision in the same shape as POST /api/guard, or
+    None when a policy needs the server (the caller should fall back to remote
+    evaluation). A locally decided block is final, since remote-only policies can
+    only make a decision more restrictive.
+    """
+
+    def __init__(self, client, refresh_interval=60):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.policies = []
+        self.remote_policy_count = 0
+        self.fetched_at = None
+        self.version = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self.fetched_at is not None
+
+    def refresh(self):
+        """Pull the active policy set now."""
+        res = self.client.list_policies()
+        compiled = []
+        remote = 0
+        for policy in (res or {}).get("policies", []):
+            if policy.get("active", 1) in (0, False):
+                continue
+            rules = policy.get("rules")
+            if isinstance(rules, str):
+                try:
+                    rules = json.loads(rules)
+                except ValueError:
+                    continue  # the server skips malformed rules too
+            if not isinstance(rules, dict):
+                continue
+            if policy.get("policy_type") not in LOCAL_POLICY_TYPES:
+                remote += 1
+            compiled.append({
+                "id": policy.get("id"),
+                "name": policy.get("name"),
+                "policy_type": policy.get("policy_type"),
+                "rules": rules,
+            })
+
+        # Identifies the policy set a local decision was made against in the audit trail.
+        version = hashlib.sha256(json.dumps(compiled, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            self.policies = compiled
+            self.remote_policy_count = remote
+            self.fetched_at = time.monotonic()
+            self.version = version
+        return compiled
+
+    def start(self):
+        """Refresh in a background thread every refresh_interval seconds."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def _refresh_loop():
+            while not self._stop_event.wait(self.refresh_interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"[DashClaw] Policy snapshot refresh failed (keeping previous snapshot): {str(e)}")
+
+        self._thread = threading.Thread(target=_refresh_loop, name="dashclaw-policy-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def evaluate(self, context):
+        with self._lock:
+            policies = self.policies
+            needs_remote = self.remote_policy_count > 0
+            version = self.version
+
+        reasons = []
+        warnings = []
+        matched = []
+        highest = "allow"
+        for policy in policies:
+            if policy["policy_type"] not in LOCAL_POLICY_TYPES:
+                continue
+            result = _evaluate_policy(policy["policy_type"], policy["rules"], context)
+            if not result:
+                continue
+            if result["action"] == "warn":
+                warnings.append(f"{policy['name']}: {result['reason']}")
+            elif result["action"] != "allow":
+                reasons.append(f"{policy['name']}: {result['reason']}")
+            matched.append(policy["id"])
+            if DECISION_SEVERITY.get(result["action"], 0) > DECISION_SEVERITY[highest]:
+                highest = result["action"]
+
+        if needs_remote and highest != "block":
+            return None
+
+        return {
+            "decision": highest,
+            "reasons": reasons,
+            "warnings": warnings,
+            "matched_policies": matched,
+            "risk_score": context.get("risk_score"),
+            "evaluated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "evaluated_locally": True,
+            "snapshot_version": version,
+        }
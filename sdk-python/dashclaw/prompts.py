@@ -0,0 +1,218 @@
+import math
+import re
+import threading
+import time
+from decimal import Decimal
+
+from .batching import BatchQueue
+from .client import DashClawError
+
+_PARAMETER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def _js_number(value):
+    """Number.prototype.toString(): integers without ".0", exponents only below 1e-6 or from 1e21."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value == 0:
+        return "0"
+    if abs(value) >= 1e21 or abs(value) < 1e-6:
+        mantissa, exponent = repr(float(value)).split("e")
+        return f"{mantissa}e{exponent[0]}{exponent[1:].lstrip('0')}"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return format(Decimal(repr(value)), "f")
+
+
+def _js_string(value):
+    """String(value) for the JSON values prompt variables hold: arrays join their
+    items with "," (null items empty), objects become "[object Object]"."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return _js_number(value)
+    if isinstance(value, (list, tuple)):
+        return ",".join("" if item is None else _js_string(item) for item in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return str(value)
+
+
+def render_template(content, variables=None):
+    """Port of renderPrompt() in app/lib/prompt.js: replace each {{ name }} with its variable."""
+    rendered = content
+    for key, value in (variables or {}).items():
+        text = _js_string(value)
+        rendered = re.sub(r"\{\{\s*" + re.escape(str(key)) + r"\s*\}\}", lambda _m: text, rendered)
+    return rendered
+
+
+def extract_parameters(content):
+    """Port of extractParameters() in app/lib/prompt.js: distinct {{name}} placeholders in order."""
+    return list(dict.fromkeys(_PARAMETER_RE.findall(content or "")))
+
+
+class PromptCache:
+    """
+    Renders prompt templates in-process from locally cached versions.
+
+    Version content never changes once created, so versions fetched by id are
+    kept for the life of the cache. The active version of a template is cached
+    for `ttl` seconds, and is dropped early when activate_prompt_version() is
+    called through the same client or, with start_push(), when any client
+    activates a version (prompt.version_activated on the realtime stream).
+
+    With record=True, runs are queued and sent in batches to POST
+    /api/prompts/runs from a background thread, so rendering never waits on
+    the network. Servers without that endpoint get one render call per run.
+
+    Usage:
+        prompts = claw.prompt_cache(ttl=300)
+        prompts.start_push()
+        result = prompts.render("pt_abc", variables={"name": "Ada"}, record=True)
+    """
+
+    def __init__(self, client, ttl=300, max_batch=50, flush_interval=2.0):
+        self.client = client
+        self.ttl = float(ttl)
+        self.hits = 0
+        self.misses = 0
+        self._versions = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stream = None
+        self._batch_supported = True
+        self._runs = BatchQueue(
+            self._send_runs,
+            max_batch=max_batch,
+            flush_interval=flush_interval,
+            name="dashclaw-prompt-runs",
+        )
+
+    def _cache_version(self, version):
+        with self._lock:
+            self._versions[version["id"]] = version
+
+    def get_version(self, template_id, version_id):
+        with self._lock:
+            version = self._versions.get(version_id)
+        if version is not None:
+            self.hits += 1
+            return version
+        self.misses += 1
+        # The version route looks versions up by id alone, so any template segment works.
+        version = self.client.get_prompt_version(template_id or "_", version_id)
+        self._cache_version(version)
+        return version
+
+    def get_active_version(self, template_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._active.get(template_id)
+            if cached is not None and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+        self.misses += 1
+        versions = self.client.list_prompt_versions(template_id).get("versions", [])
+        active = next((v for v in versions if v.get("is_active")), None)
+        if active is None:
+            raise DashClawError("No active version found for this template", status=404)
+        with self._lock:
+            for v in versions:
+                self._versions[v["id"]] = v
+            self._active[template_id] = (active, now + self.ttl)
+        return active
+
+    def invalidate(self, template_id=None):
+        """Forget the cached active version of one template, or of all templates."""
+        with self._lock:
+            if template_id is None:
+                self._active.clear()
+            else:
+                self._active.pop(template_id, None)
+
+    def render(self, template_id=None, version_id=None, variables=None, action_id=None, agent_id=None,
+               record=False, tokens_used=None, latency_ms=None, outcome=None):
+        """Same result as render_prompt(), rendered locally. Recorded runs are sent in the
+        background, so the result has no run_id."""
+        if not template_id and not version_id:
+            raise ValueError("template_id or version_id is required")
+        if version_id:
+            version = self.get_version(template_id, version_id)
+        else:
+            version = self.get_active_version(template_id)
+
+        rendered = render_template(version.get("content") or "", variables)
+        result = {
+            "rendered": rendered,
+            "version_id": version["id"],
+            "template_id": version.get("template_id"),
+            "version": version.get("version"),
+            "parameters": extract_parameters(version.get("content")),
+        }
+        if record:
+            self._runs.put({
+                "template_id": result["template_id"],
+                "version_id": result["version_id"],
+                "action_id": action_id,
+                "agent_id": agent_id,
+                "input_vars": variables or {},
+                "rendered": rendered,
+                "tokens_used": tokens_used,
+                "latency_ms": latency_ms,
+                "outcome": outcome,
+            })
+        return result
+
+    def _send_runs(self, runs):
+        if self._batch_supported:
+            try:
+                self.client._request("/api/prompts/runs", method="POST", body={"runs": runs})
+                return
+            except DashClawError as e:
+                if e.status not in (404, 405):
+                    raise
+                # Older servers can only record runs through the render endpoint.
+                self._batch_supported = False
+        for run in runs:
+            self.client._request("/api/prompts/render", method="POST", body={
+                "version_id": run["version_id"],
+                "variables": run["input_vars"],
+                "action_id": run["action_id"],
+                "agent_id": run["agent_id"],
+                "record": True,
+                "tokens_used": run["tokens_used"],
+                "latency_ms": run["latency_ms"],
+                "outcome": run["outcome"],
+            })
+
+    def start_push(self, retry_interval=3.0):
+        """Invalidate cached active versions as soon as prompt.version_activated events arrive."""
+        if self._stream is not None:
+            return self._stream
+
+        def on_activated(event):
+            if isinstance(event, dict) and event.get("template_id"):
+                self.invalidate(event["template_id"])
+
+        self._stream = self.client.events(retry_interval=retry_interval)
+        # Activations missed while disconnected are unknown, so a reconnect drops everything.
+        self._stream.on("prompt.version_activated", on_activated).on("connected", lambda _info: self.invalidate()).start()
+        return self._stream
+
+    def stop_push(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def flush(self, timeout=None):
+        """Send queued runs now. Returns True once they are sent."""
+        return self._runs.flush(timeout=timeout)
+
+    def close(self):
+        self.stop_push()
+        self._runs.close()
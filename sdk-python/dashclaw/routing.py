@@ -0,0 +1,248 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _capabilities(agent):
+    caps = agent.get("capabilities") or []
+    if isinstance(caps, str):
+        try:
+            caps = json.loads(caps or "[]")
+        except ValueError:
+            caps = []
+    return [c if isinstance(c, dict) else {"skill": c, "priority": 0} for c in caps]
+
+
+def _has_capacity(agent):
+    return agent.get("status") == "available" and (agent.get("current_load") or 0) < (agent.get("max_concurrent") or 0)
+
+
+def score_agent(agent, required_skills, urgency="normal"):
+    """
+    Port of scoreAgent() in app/lib/routing/matcher.js. Performance history lives
+    on the server, so it is scored as neutral (12.5) just like an agent with no metrics.
+    """
+    caps = _capabilities(agent)
+    skills = [c.get("skill") for c in caps]
+    matched = [s for s in required_skills if s in skills]
+    coverage = len(matched) / len(required_skills)
+    if coverage == 0:
+        return 0
+
+    load = agent.get("current_load") or 0
+    max_concurrent = agent.get("max_concurrent") or 1
+    score = coverage * 40
+    score += (1 - load / max_concurrent) * 20
+    score += 12.5
+    priority_sum = sum(c.get("priority") or 0 for c in caps if c.get("skill") in required_skills)
+    score += (priority_sum / (len(required_skills) * 10)) * 15
+    if urgency == "critical" and load == 0:
+        score += 10
+    return round(score, 2)
+
+
+class RoutingIndex:
+    """
+    Locally cached index of routing agents by capability and status.
+
+    refresh() re-lists agents and only re-indexes the ones whose updated_at changed,
+    so keeping the index warm costs one list call per refresh_interval instead of
+    one per routing decision. Loads are also adjusted locally from submit and
+    complete responses between refreshes.
+    """
+
+    def __init__(self, client, refresh_interval=30):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.agents = {}
+        self.refreshed_at = None
+        self._versions = {}
+        self._by_skill = {}
+        self._by_status = {}
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+
+    def _unindex(self, agent_id):
+        agent = self.agents.pop(agent_id, None)
+        self._versions.pop(agent_id, None)
+        if agent is None:
+            return
+        for cap in _capabilities(agent):
+            ids = self._by_skill.get(cap.get("skill"))
+            if ids is not None:
+                ids.discard(agent_id)
+                if not ids:
+                    del self._by_skill[cap.get("skill")]
+        ids = self._by_status.get(agent.get("status"))
+        if ids is not None:
+            ids.discard(agent_id)
+
+    def _index(self, agent):
+        agent_id = agent["id"]
+        self.agents[agent_id] = agent
+        self._versions[agent_id] = agent.get("updated_at")
+        for cap in _capabilities(agent):
+            self._by_skill.setdefault(cap.get("skill"), set()).add(agent_id)
+        self._by_status.setdefault(agent.get("status"), set()).add(agent_id)
+
+    def refresh(self):
+        """Re-list agents and apply only the differences. Returns counts of changes."""
+        listed = (self.client.list_routing_agents() or {}).get("agents", [])
+        changes = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            seen = set()
+            for agent in listed:
+                agent_id = agent.get("id")
+                if not agent_id:
+                    continue
+                seen.add(agent_id)
+                if agent_id not in self.agents:
+                    changes["added"] += 1
+                elif self._versions.get(agent_id) != agent.get("updated_at"):
+                    changes["updated"] += 1
+                else:
+                    continue
+                self._unindex(agent_id)
+                self._index(dict(agent))
+            for agent_id in [a for a in self.agents if a not in seen]:
+                self._unindex(agent_id)
+                changes["removed"] += 1
+            self.refreshed_at = time.monotonic()
+        return changes
+
+    def _stale(self):
+        return self.refreshed_at is None or (time.monotonic() - self.refreshed_at) >= self.refresh_interval
+
+    def ensure_fresh(self):
+        if not self._stale():
+            return
+        # Only one thread refreshes; the others wait for it rather than stampeding the list endpoint.
+        with self._refresh_lock:
+            if self._stale():
+                self.refresh()
+
+    def find(self, skill=None, status=None):
+        """Agents with the given capability and/or status, from the local index."""
+        self.ensure_fresh()
+        with self._lock:
+            ids = set(self.agents)
+            if skill is not None:
+                ids &= self._by_skill.get(skill, set())
+            if status is not None:
+                ids &= self._by_status.get(status, set())
+            return [self.agents[i] for i in sorted(ids)]
+
+    def candidates(self, required_skills=None, urgency="normal"):
+        """Available agents with spare capacity that could take the task, best first."""
+        self.ensure_fresh()
+        required_skills = list(required_skills or [])
+        with self._lock:
+            ids = set(self._by_status.get("available", set()))
+            if required_skills:
+                by_skill = set()
+                for skill in required_skills:
+                    by_skill |= self._by_skill.get(skill, set())
+                ids &= by_skill
+            agents = [self.agents[i] for i in ids if _has_capacity(self.agents[i])]
+
+        if not required_skills:
+            return sorted(agents, key=lambda a: a.get("current_load") or 0)
+        scored = [(score_agent(a, required_skills, urgency), a) for a in agents]
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [a for score, a in scored if score > 0]
+
+    def adjust_load(self, agent_id, delta):
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is not None:
+                agent["current_load"] = max(0, (agent.get("current_load") or 0) + delta)
+
+
+class RoutingClient:
+    """
+    Dispatcher-side routing client backed by a RoutingIndex.
+
+    Tasks can be pre-filtered against the local index before submission, and
+    submit_tasks / complete_tasks fan bulk work out over a thread pool.
+
+    Usage:
+        router = claw.routing_client()
+        results = router.submit_tasks([
+            {"title": "Summarize doc 1", "required_skills": ["summarize"]},
+            {"title": "Summarize doc 2", "required_skills": ["summarize"]},
+        ], require_candidate=True)
+        router.complete_tasks([{"task_id": "rt_1", "success": True}])
+    """
+
+    def __init__(self, client, refresh_interval=30, max_workers=8):
+        self.client = client
+        self.index = RoutingIndex(client, refresh_interval=refresh_interval)
+        self.max_workers = max_workers
+        self._assignments = {}  # task_id -> agent_id, for local load accounting
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dashclaw-routing")
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def find_agents(self, skill=None, status=None):
+        return self.index.find(skill=skill, status=status)
+
+    def candidates(self, required_skills=None, urgency="normal"):
+        return self.index.candidates(required_skills, urgency=urgency)
+
+    def submit_task(self, title, required_skills=None, urgency="normal", require_candidate=False, **kwargs):
+        """Submit one task. With require_candidate, skip the request when no indexed agent can take it."""
+        if require_candidate and not self.index.candidates(required_skills, urgency=urgency):
+            return {
+                "task": None,
+                "routing": {"status": "skipped", "reason": "No matching agent available in local index"},
+            }
+
+        res = self.client.submit_routing_task(title, required_skills=required_skills, urgency=urgency, **kwargs)
+        routing = (res or {}).get("routing") or {}
+        task_id = ((res or {}).get("task") or {}).get("id")
+        if routing.get("status") == "assigned" and routing.get("agent_id"):
+            self.index.adjust_load(routing["agent_id"], 1)
+            if task_id:
+                with self._lock:
+                    self._assignments[task_id] = routing["agent_id"]
+        return res
+
+    def complete_task(self, task_id, success=True, result=None, error=None):
+        res = self.client.complete_routing_task(task_id, success=success, result=result, error=error)
+        with self._lock:
+            agent_id = self._assignments.pop(task_id, None)
+        if agent_id:
+            self.index.adjust_load(agent_id, -1)
+        return res
+
+    def _run_bulk(self, fn, items):
+        def call(item):
+            try:
+                return fn(**item)
+            except Exception as e:
+                return {"error": str(e), "status": getattr(e, "status", None)}
+
+        return list(self._executor().map(call, items))
+
+    def submit_tasks(self, tasks, require_candidate=False):
+        """Submit many tasks concurrently. Each item holds submit_routing_task keyword arguments.
+        Results come back in input order; failures are returned as {"error": ...}."""
+        self.index.ensure_fresh()
+        return self._run_bulk(
+            lambda **task: self.submit_task(require_candidate=require_candidate, **task),
+            [dict(t) for t in tasks],
+        )
+
+    def complete_tasks(self, completions):
+        """Complete many tasks concurrently. Each item: {"task_id", "success", "result", "error"}."""
+        return self._run_bulk(self.complete_task, [dict(c) for c in completions])
@@ -0,0 +1,361 @@
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: the pure-Python engine produces identical results, just slower.
+    np = None
+
+COMPOSITE_METHODS = ("weighted_average", "minimum", "geometric_mean")
+
+
+def _js_round2(value):
+    """Math.round(value * 100) / 100, which rounds halves up unlike round()."""
+    return math.floor(value * 100 + 0.5) / 100
+
+
+def _js_str(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _metadata(action):
+    meta = action.get("metadata")
+    if isinstance(meta, str):
+        try:
+            meta = json.loads(meta)
+        except ValueError:
+            meta = None
+    return meta if isinstance(meta, dict) else {}
+
+
+def _first(*values):
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+def extract_raw_value(action, dimension, custom_functions=None):
+    """Port of extractRawValue() in app/lib/scoringProfiles.js."""
+    source = dimension.get("data_source")
+    if source == "duration_ms":
+        return _first(action.get("duration_ms"), _metadata(action).get("duration_ms"))
+    if source == "cost_estimate":
+        return _first(action.get("cost_estimate"), _metadata(action).get("cost_estimate"))
+    if source == "tokens_total":
+        total = (action.get("prompt_tokens") or 0) + (action.get("completion_tokens") or 0)
+        return total or _metadata(action).get("tokens_total")
+    if source == "risk_score":
+        return action.get("risk_score")
+    if source == "confidence":
+        return _first(action.get("confidence"), _metadata(action).get("confidence"))
+    if source == "eval_score":
+        return _first(action.get("eval_score"), _metadata(action).get("eval_score"))
+    if source == "metadata_field":
+        field = (dimension.get("data_config") or {}).get("field")
+        if not field:
+            return None
+        value = _metadata(action)
+        for key in field.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        return value
+    if source == "custom_function":
+        fn = (custom_functions or {}).get(dimension.get("name"))
+        if fn is None:
+            return None
+        try:
+            return fn(action)
+        except Exception:
+            return None
+    return None
+
+
+def _matches(rule, raw):
+    """One scale rule against one raw value, with the JS comparison semantics."""
+    operator = rule.get("operator")
+    target = rule.get("value")
+    if operator == "contains":
+        return isinstance(raw, str) and _js_str(target).lower() in raw.lower()
+    if operator == "eq":
+        val = raw if isinstance(raw, str) else _to_number(raw)
+        return val == target or _js_str(val) == _js_str(target)
+    val = _to_number(raw)
+    try:
+        if operator == "lt":
+            return val < _to_number(target)
+        if operator == "lte":
+            return val <= _to_number(target)
+        if operator == "gt":
+            return val > _to_number(target)
+        if operator == "gte":
+            return val >= _to_number(target)
+        if operator == "between":
+            return _to_number(target[0]) <= val <= _to_number(target[1])
+    except (TypeError, IndexError):
+        return False
+    return False
+
+
+def _numeric_rule(rule):
+    if rule.get("operator") in ("lt", "lte", "gt", "gte"):
+        return True
+    target = rule.get("value")
+    return rule.get("operator") == "between" and isinstance(target, (list, tuple)) and len(target) == 2
+
+
+def score_dimension_value(raw, scale):
+    """Port of scoreDimensionValue() in app/lib/scoringProfiles.js. Returns (score, label)."""
+    if raw is None:
+        return None, "no_data"
+    if not isinstance(scale, list) or not scale:
+        return 50, "unscaled"
+    for rule in scale:
+        if _matches(rule, raw):
+            return rule.get("score"), rule.get("label") or "matched"
+    return min(rule.get("score") for rule in scale), "default"
+
+
+def compute_composite(scores, weights, method):
+    """Port of computeComposite() in app/lib/scoringProfiles.js for one action."""
+    scored = [(s, w) for s, w in zip(scores, weights) if s is not None]
+    if not scored:
+        return None
+    total_weight = sum(w for _, w in scored)
+    if method == "weighted_average":
+        if total_weight == 0:
+            return None
+        return _js_round2(sum(s * w / total_weight for s, w in scored))
+    if method == "minimum":
+        return min(s for s, _ in scored)
+    if method == "geometric_mean":
+        if any(s == 0 for s, _ in scored):
+            return 0
+        product = 1.0
+        for s, w in scored:
+            product *= math.pow(s, w / total_weight)
+        return _js_round2(product)
+    return None
+
+
+class LocalScorer:
+    """
+    Scores actions against a scoring profile in-process, using the same rules as
+    POST /api/scoring/score (app/lib/scoringProfiles.js).
+
+    The profile's dimensions are fetched once. Actions are then scored column by
+    column: raw values are extracted per dimension, scale rules are applied to
+    the whole column, and composites are computed across columns. When NumPy is
+    installed, the numeric rules and the composite use array operations.
+    Results have the same shape as the server's batch response, without
+    persisted score ids. Pass them to upload() to store them as evaluation
+    scores in bulk.
+
+    custom_function dimensions run JavaScript on the server. To score them
+    locally, provide an equivalent Python callable via custom_functions, keyed
+    by dimension name.
+
+    Usage:
+        scorer = claw.local_scorer("sp_abc")
+        batch = scorer.score_many(actions)
+        scorer.upload(claw, batch["results"])
+    """
+
+    def __init__(self, profile, custom_functions=None, use_numpy=None):
+        self.profile = profile
+        self.profile_id = profile.get("id")
+        self.profile_name = profile.get("name")
+        self.composite_method = profile.get("composite_method") or "weighted_average"
+        self.custom_functions = custom_functions or {}
+        self.use_numpy = (np is not None) if use_numpy is None else (bool(use_numpy) and np is not None)
+
+        self.dimensions = []
+        for dim in profile.get("dimensions") or []:
+            scale = dim.get("scale")
+            if isinstance(scale, str):
+                try:
+                    scale = json.loads(scale)
+                except ValueError:
+                    scale = []
+            config = dim.get("data_config")
+            if isinstance(config, str):
+                try:
+                    config = json.loads(config)
+                except ValueError:
+                    config = {}
+            self.dimensions.append({**dim, "scale": scale, "data_config": config or {}, "weight": _to_number(dim.get("weight"))})
+        if not self.dimensions:
+            raise ValueError("Profile has no dimensions")
+
+        missing = [
+            d.get("name") for d in self.dimensions
+            if d.get("data_source") == "custom_function" and d.get("name") not in self.custom_functions
+        ]
+        if missing:
+            raise ValueError(
+                f"custom_function dimensions need a Python equivalent in custom_functions: {', '.join(missing)}"
+            )
+
+    @classmethod
+    def from_profile_id(cls, client, profile_id, custom_functions=None, use_numpy=None):
+        profile = client.get_scoring_profile(profile_id)
+        return cls(profile.get("profile", profile), custom_functions=custom_functions, use_numpy=use_numpy)
+
+    def _score_column(self, raws, scale):
+        """Apply a dimension's scale to a column of raw values. Returns (scores, labels)."""
+        if self.use_numpy and isinstance(scale, list) and scale and all(_numeric_rule(r) for r in scale):
+            return self._score_column_numpy(raws, scale)
+        scored = [score_dimension_value(raw, scale) for raw in raws]
+        return [s for s, _ in scored], [l for _, l in scored]
+
+    def _score_column_numpy(self, raws, scale):
+        values = np.array([_to_number(r) if r is not None else math.nan for r in raws], dtype=float)
+        missing = np.array([r is None for r in raws], dtype=bool)
+        scores = np.full(len(raws), min(r.get("score") for r in scale), dtype=float)
+        labels = np.full(len(raws), "default", dtype=object)
+        unmatched = ~missing
+        with np.errstate(invalid="ignore"):
+            for rule in scale:
+                target = rule.get("value")
+                operator = rule.get("operator")
+                if operator == "between":
+                    hit = (values >= _to_number(target[0])) & (values <= _to_number(target[1]))
+                else:
+                    t = _to_number(target)
+                    hit = {"lt": values < t, "lte": values <= t, "gt": values > t, "gte": values >= t}[operator]
+                hit &= unmatched
+                scores[hit] = rule.get("score")
+                labels[hit] = rule.get("label") or "matched"
+                unmatched &= ~hit
+        out_scores = [None if m else (int(s) if float(s).is_integer() else float(s)) for s, m in zip(scores.tolist(), missing)]
+        out_labels = ["no_data" if m else l for l, m in zip(labels.tolist(), missing)]
+        return out_scores, out_labels
+
+    def _composites(self, score_columns, weights):
+        if not self.use_numpy or self.composite_method not in COMPOSITE_METHODS:
+            rows = zip(*score_columns)
+            return [compute_composite(list(row), weights, self.composite_method) for row in rows]
+
+        matrix = np.array(
+            [[math.nan if s is None else float(s) for s in column] for column in score_columns], dtype=float
+        ).T
+        has = ~np.isnan(matrix)
+        w = np.where(has, np.array(weights, dtype=float), 0.0)
+        total = w.sum(axis=1)
+        any_scored = has.any(axis=1)
+        filled = np.where(has, matrix, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.composite_method == "weighted_average":
+                values = (filled * w).sum(axis=1) / total
+                valid = any_scored & (total != 0)
+                values = np.floor(values * 100 + 0.5) / 100
+            elif self.composite_method == "minimum":
+                values = np.where(has, matrix, np.inf).min(axis=1)
+                valid = any_scored
+            else:
+                has_zero = (has & (matrix == 0)).any(axis=1)
+                logs = np.where(has & (matrix > 0), np.log(np.where(matrix > 0, matrix, 1.0)), 0.0)
+                values = np.exp((logs * w).sum(axis=1) / total)
+                values = np.where(has_zero, 0.0, np.floor(values * 100 + 0.5) / 100)
+                valid = any_scored
+        out = []
+        for value, ok in zip(values.tolist(), valid.tolist()):
+            if not ok or math.isnan(value):
+                out.append(None)
+            else:
+                out.append(int(value) if float(value).is_integer() else value)
+        return out
+
+    def score_many(self, actions):
+        """Score actions in one pass. Returns {"results", "summary"} like batch_score_with_profile()."""
+        actions = list(actions)
+        weights = [d["weight"] for d in self.dimensions]
+        raw_columns = []
+        score_columns = []
+        label_columns = []
+        for dim in self.dimensions:
+            raws = [extract_raw_value(a, dim, self.custom_functions) for a in actions]
+            scores, labels = self._score_column(raws, dim["scale"])
+            raw_columns.append(raws)
+            score_columns.append(scores)
+            label_columns.append(labels)
+        composites = self._composites(score_columns, weights)
+
+        results = []
+        for i, action in enumerate(actions):
+            action_id = action.get("action_id") or action.get("id")
+            if composites[i] is None:
+                results.append({"action_id": action_id, "error": "Could not compute composite score  --  no dimensions had data"})
+                continue
+            results.append({
+                "profile_id": self.profile_id,
+                "profile_name": self.profile_name,
+                "action_id": action_id,
+                "agent_id": action.get("agent_id"),
+                "composite_score": composites[i],
+                "composite_method": self.composite_method,
+                "dimensions": [
+                    {
+                        "dimension_id": dim.get("id"),
+                        "dimension_name": dim.get("name"),
+                        "weight": dim["weight"],
+                        "raw_value": raw_columns[d][i],
+                        "score": score_columns[d][i],
+                        "label": label_columns[d][i],
+                    }
+                    for d, dim in enumerate(self.dimensions)
+                ],
+            })
+
+        scored = [r["composite_score"] for r in results if "error" not in r]
+        avg = _js_round2(sum(scored) / len(scored)) if scored else None
+        return {"results": results, "summary": {"total": len(actions), "scored": len(scored), "avg_score": avg}}
+
+    def score(self, action):
+        result = self.score_many([action])["results"][0]
+        if "error" in result:
+            raise ValueError(result["error"])
+        return result
+
+    def upload(self, client, results, scorer_name=None, evaluated_by="local_scoring", max_workers=8):
+        """Store scored results as evaluation scores (0-1) via create_score, concurrently.
+        Results without an action_id or with an error are skipped. Returns a list of
+        create_score responses, with {"error", "action_id"} entries for failures."""
+        scorer_name = scorer_name or f"profile:{self.profile_name or self.profile_id}"
+        uploadable = [r for r in results if "error" not in r and r.get("action_id")]
+
+        def send(result):
+            try:
+                return client.create_score(
+                    result["action_id"],
+                    scorer_name,
+                    result["composite_score"] / 100,
+                    evaluated_by=evaluated_by,
+                    metadata={
+                        "profile_id": self.profile_id,
+                        "composite_score": result["composite_score"],
+                        "composite_method": self.composite_method,
+                        "dimensions": result["dimensions"],
+                    },
+                )
+            except Exception as e:
+                return {"error": str(e), "status": getattr(e, "status", None), "action_id": result["action_id"]}
+
+        if not uploadable:
+            return []
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashclaw-scores") as pool:
+            return list(pool.map(send, uploadable))
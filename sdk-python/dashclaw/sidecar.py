@@ -0,0 +1,587 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .batching import BatchQueue
+from .client import merge_recommendation_events
+from .policy import LOCAL_POLICY_TYPES
+from .transport import HTTPPoolTransport, TransportResponse
+
+MAX_BATCH_HEARTBEATS = 1000
+MAX_BATCH_RECOMMENDATION_EVENTS = 100
+MAX_BATCH_GUARD_DECISIONS = 100
+
+# Request headers passed through to the dashboard, and response headers passed back.
+_FORWARD_REQUEST_HEADERS = ("content-type", "accept", "range", "last-event-id")
+_FORWARD_RESPONSE_HEADERS = ("Content-Type", "Content-Length", "Content-Disposition", "Content-Range", "Cache-Control")
+
+
+class _GzipBody:
+    """Decompressing reader over a gzip-encoded upstream response."""
+
+    def __init__(self, response):
+        self._response = response
+        self._gzip = gzip.GzipFile(fileobj=response, mode="rb")
+
+    def read(self, amt=-1):
+        return self._gzip.read(-1 if amt is None else amt)
+
+    def readline(self, limit=-1):
+        return self._gzip.readline(limit)
+
+    def close(self):
+        self._gzip.close()
+        self._response.close()
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class Sidecar:
+    """
+    Local aggregation daemon shared by the agents on one host.
+
+    Agents point their DashClaw client at the sidecar, over a Unix socket with
+    UnixSocketTransport or over localhost, and keep calling the normal API.
+    The sidecar holds the only connections to the dashboard, a pooled
+    keep-alive uplink, and cuts upstream traffic:
+
+    - Heartbeats and recommendation events are answered at once and queued.
+      Every flush_interval they go upstream in batches, one heartbeat per agent
+      and recommendation events merged into details.count.
+    - Guard decisions (POST /api/guard) are cached for guard_ttl seconds per
+      API key and request body, but only while every active policy of the
+      org depends on the action context alone (the policy types the SDK can
+      evaluate locally; the policy list is re-read every policy_ttl seconds).
+      rate_limit, webhook_check and other stateful policies, or
+      include_signals, send every guard call upstream. Answers served from
+      the cache are sent in batches to the record-only POST
+      /api/guard/decisions, the way guard_evaluation="local" reports its
+      decisions. The server still records every decision in guard_decisions
+      without evaluating it again. Against a dashboard without that endpoint
+      they are replayed to POST /api/guard instead.
+    - Recommendation lists (GET /api/learning/recommendations) are cached for
+      recommendation_ttl seconds.
+    - Identical requests already in flight share one upstream call. Writes to
+      /api/policies or /api/learning/recommendations clear the matching cache.
+    - Everything else is forwarded as-is, including streamed downloads and
+      the /api/stream SSE feed.
+
+    Compression covers responses only: the uplink asks for gzip and
+    decompresses before answering agents. Request bodies go upstream
+    uncompressed, since the dashboard's route handlers do not decode a
+    gzip Content-Encoding; batching is what shrinks the upload side.
+
+    Requests are forwarded with the agent's own x-api-key. Only with
+    inject_api_key=True do requests without one get the sidecar's api_key;
+    otherwise they reach the dashboard unauthenticated (queued heartbeats and
+    events are refused with 401 instead).
+
+    Usage:
+        sidecar = Sidecar("https://dashclaw.example.com", api_key=key, socket_path="/run/dashclaw.sock")
+        sidecar.start()
+        claw = DashClaw(base_url="http://localhost", api_key=key, agent_id="agent-7",
+                        transport=UnixSocketTransport("/run/dashclaw.sock"))
+
+    Or from a shell: dashclaw-sidecar --base-url https://dashclaw.example.com --socket /run/dashclaw.sock
+    """
+
+    def __init__(self, base_url, api_key=None, socket_path=None, host="127.0.0.1", port=8787,
+                 transport=None, flush_interval=2.0, guard_ttl=5.0, recommendation_ttl=30.0, timeout=30,
+                 inject_api_key=False, policy_ttl=60.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.inject_api_key = bool(inject_api_key)
+        if self.inject_api_key and not api_key:
+            raise ValueError("inject_api_key requires an api_key")
+        self.socket_path = str(socket_path) if socket_path else None
+        self.host = host
+        self.port = port
+        self.uplink = transport or HTTPPoolTransport()
+        self.guard_ttl = float(guard_ttl)
+        self.recommendation_ttl = float(recommendation_ttl)
+        self.policy_ttl = float(policy_ttl)
+        self.timeout = timeout
+        self.stats = {
+            "requests": 0,
+            "upstream_requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "heartbeats_queued": 0,
+            "events_queued": 0,
+            "guard_audits_queued": 0,
+        }
+        self._cache = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._heartbeat_batch_supported = True
+        self._guard_record_supported = True
+        self._heartbeats = BatchQueue(
+            self._send_heartbeats,
+            max_batch=MAX_BATCH_HEARTBEATS * 10,
+            flush_interval=flush_interval,
+            max_queue=100000,
+            name="dashclaw-sidecar-heartbeats",
+        )
+        self._events = BatchQueue(
+            self._send_events,
+            max_batch=MAX_BATCH_RECOMMENDATION_EVENTS * 10,
+            flush_interval=flush_interval,
+            max_queue=100000,
+            name="dashclaw-sidecar-events",
+        )
+        self._guard_audits = BatchQueue(
+            self._send_guard_audits,
+            max_batch=1000,
+            flush_interval=flush_interval,
+            max_queue=100000,
+            name="dashclaw-sidecar-guard-audit",
+        )
+        self._server = None
+        self._thread = None
+
+    # -- request handling ---------------------------------------------------
+
+    def handle(self, method, path, headers, body):
+        """Answer one agent request. Same signature as an InProcessTransport handler,
+        so InProcessTransport(sidecar.handle) skips the local socket entirely."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        api_key = headers.get("x-api-key") or (self.api_key if self.inject_api_key else None)
+        route = path.split("?", 1)[0]
+        with self._lock:
+            self.stats["requests"] += 1
+
+        queued = method == "POST" and route in ("/api/agents/heartbeat", "/api/learning/recommendations/events")
+        if queued and not api_key:
+            # Nothing upstream would accept these later; say so now rather than drop them at flush.
+            return self._json_response(401, {"error": "x-api-key header is required"})
+        if method == "POST" and route == "/api/agents/heartbeat":
+            return self._queue_heartbeats(api_key, body)
+        if method == "POST" and route == "/api/learning/recommendations/events":
+            return self._queue_events(api_key, body)
+        if method == "POST" and route == "/api/guard":
+            return self._guard(path, api_key, headers, body)
+        if method == "GET" and route == "/api/learning/recommendations":
+            return self._cached(("recommendations", api_key, path), self.recommendation_ttl,
+                                lambda: self._fetch(method, path, api_key, headers, body))
+
+        if method != "GET":
+            if route.startswith("/api/policies"):
+                self._invalidate("guard")
+                self._invalidate("policies")
+            elif route.startswith("/api/learning/recommendations"):
+                self._invalidate("recommendations")
+        return self._forward(method, path, api_key, headers, body)
+
+    def _json_response(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        return TransportResponse(status, {"Content-Type": "application/json", "Content-Length": str(len(data))}, data)
+
+    def _parse(self, body):
+        try:
+            return json.loads(body.decode("utf-8")) if body else {}
+        except ValueError:
+            return None
+
+    def _queue_heartbeats(self, api_key, body):
+        payload = self._parse(body)
+        if not isinstance(payload, dict):
+            return self._json_response(400, {"error": "Invalid JSON body"})
+        beats = payload["heartbeats"] if isinstance(payload.get("heartbeats"), list) else [payload]
+        if any(not isinstance(b, dict) or not b.get("agent_id") for b in beats):
+            return self._json_response(400, {"error": "agent_id is required"})
+        self._heartbeats.put_many((api_key, beat) for beat in beats)
+        with self._lock:
+            self.stats["heartbeats_queued"] += len(beats)
+        response = {"status": "ok", "timestamp": _now_iso(), "queued": True}
+        if "heartbeats" in payload:
+            response["count"] = len(beats)
+        return self._json_response(200, response)
+
+    def _queue_events(self, api_key, body):
+        payload = self._parse(body)
+        if not isinstance(payload, dict):
+            return self._json_response(400, {"error": "Invalid JSON body"})
+        events = payload["events"] if isinstance(payload.get("events"), list) else [payload]
+        if not events:
+            return self._json_response(400, {"error": "At least one event is required"})
+        created_at = _now_iso()
+        self._events.put_many((api_key, {"created_at": created_at, **event}) for event in events)
+        with self._lock:
+            self.stats["events_queued"] += len(events)
+        return self._json_response(202, {"queued": len(events)})
+
+    # -- guard ----------------------------------------------------------------
+
+    def _guard(self, path, api_key, headers, body):
+        fetch = lambda: self._fetch("POST", path, api_key, headers, body)  # noqa: E731
+        if self.guard_ttl <= 0 or "include_signals=true" in path or not self._guard_cacheable(api_key):
+            return self._replay(fetch())
+
+        def audit(result):
+            self._guard_audits.put((api_key, path, body, result[0], result[2]))
+            with self._lock:
+                self.stats["guard_audits_queued"] += 1
+
+        return self._cached(("guard", api_key, path, self._digest(body)), self.guard_ttl, fetch, on_reuse=audit)
+
+    def _guard_cacheable(self, api_key):
+        """Whether the org's active policies all depend on the action context alone,
+        so the same request body always gets the same decision."""
+        response = self._cached(("policies", api_key), self.policy_ttl,
+                                lambda: self._fetch("GET", "/api/policies", api_key, {"accept": "application/json"}, None))
+        if response.status >= 400:
+            return False
+        payload = self._parse(response.read())
+        if not isinstance(payload, dict) or not isinstance(payload.get("policies"), list):
+            return False
+        return all(
+            policy.get("policy_type") in LOCAL_POLICY_TYPES
+            for policy in payload["policies"]
+            if isinstance(policy, dict) and policy.get("active", 1) not in (0, False)
+        )
+
+    def _send_guard_audits(self, items):
+        # Each answer served from the cache is recorded as the decision it was, without
+        # a second evaluation.
+        by_key = {}
+        for api_key, path, body, status, data in items:
+            record = self._guard_record(body, status, data)
+            if record is None or not self._guard_record_supported:
+                self._fetch("POST", path, api_key, {"content-type": "application/json"}, body)
+            else:
+                by_key.setdefault(api_key, []).append((path, body, record))
+        for api_key, entries in by_key.items():
+            for start in range(0, len(entries), MAX_BATCH_GUARD_DECISIONS):
+                chunk = entries[start:start + MAX_BATCH_GUARD_DECISIONS]
+                if self._guard_record_supported:
+                    status, data = self._post_json("/api/guard/decisions", api_key,
+                                                   {"decisions": [record for _path, _body, record in chunk]})
+                    if status < 400:
+                        continue
+                    if status not in (404, 405):
+                        raise RuntimeError(f"guard decision records failed with HTTP {status}: {data[:200]!r}")
+                    # Older servers have no record-only endpoint; replay against /api/guard from now on.
+                    self._guard_record_supported = False
+                for path, body, _record in chunk:
+                    self._fetch("POST", path, api_key, {"content-type": "application/json"}, body)
+
+    def _guard_record(self, body, status, data):
+        """The /api/guard/decisions entry for a guard request and the answer it was served,
+        or None when either cannot be read."""
+        context = self._parse(body)
+        decision = self._parse(data) if status in (200, 403) else None
+        if not isinstance(context, dict) or not isinstance(decision, dict) or not decision.get("decision"):
+            return None
+        return {
+            **context,
+            "decision": decision["decision"],
+            "reasons": decision.get("reasons") or [],
+            "matched_policies": decision.get("matched_policies") or [],
+            "evaluated_at": decision.get("evaluated_at"),
+        }
+
+    # -- caching ------------------------------------------------------------
+
+    def _digest(self, body):
+        payload = self._parse(body)
+        canonical = json.dumps(payload, sort_keys=True).encode("utf-8") if payload is not None else (body or b"")
+        return hashlib.sha256(canonical).hexdigest()
+
+    def _invalidate(self, kind):
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == kind]:
+                del self._cache[key]
+
+    def _cached(self, key, ttl, fetch, on_reuse=None):
+        """fetch() through the cache. on_reuse(result) is called whenever the answer of an
+        earlier upstream call is served instead (a cache hit or a coalesced call)."""
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] > now:
+                self.stats["cache_hits"] += 1
+            else:
+                hit = None
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._in_flight[key] = Future()
+                else:
+                    self.stats["coalesced"] += 1
+        if hit is not None:
+            if on_reuse:
+                on_reuse(hit[1])
+            return self._replay(hit[1])
+
+        if not leader:
+            result = future.result()
+            if on_reuse:
+                on_reuse(result)
+            return self._replay(result)
+        try:
+            result = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._in_flight.pop(key, None)
+            # Only successful answers are cached; errors are retried by the next caller.
+            if ttl > 0 and result[0] < 400:
+                self._cache[key] = (time.monotonic() + ttl, result)
+        future.set_result(result)
+        return self._replay(result)
+
+    def _replay(self, result):
+        status, headers, data = result
+        return TransportResponse(status, headers, data)
+
+    # -- uplink -------------------------------------------------------------
+
+    def _upstream(self, method, path, api_key, headers=None, body=None, timeout=None):
+        request_headers = {k: v for k, v in (headers or {}).items() if k in _FORWARD_REQUEST_HEADERS}
+        if api_key:
+            request_headers["x-api-key"] = api_key
+        if path.split("?", 1)[0] != "/api/stream":
+            request_headers["accept-encoding"] = "gzip"
+        with self._lock:
+            self.stats["upstream_requests"] += 1
+        response = self.uplink.request(method, f"{self.base_url}{path}", headers=request_headers, body=body,
+                                       timeout=timeout or self.timeout)
+        response_headers = {}
+        for name in _FORWARD_RESPONSE_HEADERS:
+            value = response.headers.get(name)
+            if value is not None:
+                response_headers[name] = value
+        if (response.headers.get("Content-Encoding") or "").lower() == "gzip":
+            response_headers.pop("Content-Length", None)
+            return response.status, response_headers, _GzipBody(response)
+        return response.status, response_headers, response
+
+    def _forward(self, method, path, api_key, headers, body):
+        # SSE connections stay open until the agent disconnects, so they get no read timeout.
+        timeout = 3600 if path.split("?", 1)[0] == "/api/stream" else None
+        status, response_headers, stream = self._upstream(method, path, api_key, headers, body, timeout=timeout)
+        return TransportResponse(status, response_headers, stream)
+
+    def _fetch(self, method, path, api_key, headers, body):
+        status, response_headers, stream = self._upstream(method, path, api_key, headers, body)
+        try:
+            data = stream.read()
+        finally:
+            stream.close()
+        response_headers["Content-Length"] = str(len(data))
+        return status, response_headers, data
+
+    def _post_json(self, path, api_key, payload):
+        status, _headers, data = self._fetch("POST", path, api_key, {"content-type": "application/json"},
+                                             json.dumps(payload).encode("utf-8"))
+        return status, data
+
+    def _send_heartbeats(self, items):
+        by_key = {}
+        for api_key, beat in items:
+            # Only the latest beat per agent matters.
+            by_key.setdefault(api_key, {})[beat["agent_id"]] = beat
+        for api_key, beats in by_key.items():
+            beats = list(beats.values())
+            for start in range(0, len(beats), MAX_BATCH_HEARTBEATS):
+                chunk = beats[start:start + MAX_BATCH_HEARTBEATS]
+                if self._heartbeat_batch_supported:
+                    status, data = self._post_json("/api/agents/heartbeat", api_key, {"heartbeats": chunk})
+                    if status < 400:
+                        continue
+                    if status != 400:
+                        raise RuntimeError(f"heartbeat batch failed with HTTP {status}: {data[:200]!r}")
+                    # Older servers reject the batch body; send one by one from now on.
+                    self._heartbeat_batch_supported = False
+                for beat in chunk:
+                    self._post_json("/api/agents/heartbeat", api_key, beat)
+
+    def _send_events(self, items):
+        by_key = {}
+        for api_key, event in items:
+            by_key.setdefault(api_key, []).append(event)
+        for api_key, events in by_key.items():
+            merged = merge_recommendation_events(events)
+            for start in range(0, len(merged), MAX_BATCH_RECOMMENDATION_EVENTS):
+                chunk = merged[start:start + MAX_BATCH_RECOMMENDATION_EVENTS]
+                status, data = self._post_json("/api/learning/recommendations/events", api_key, {"events": chunk})
+                if status >= 400:
+                    raise RuntimeError(f"recommendation events failed with HTTP {status}: {data[:200]!r}")
+
+    # -- serving ------------------------------------------------------------
+
+    @property
+    def address(self):
+        """The socket path, or the base URL agents should use for a TCP sidecar."""
+        if self.socket_path:
+            return self.socket_path
+        host, port = self._server.server_address[:2] if self._server else (self.host, self.port)
+        return f"http://{host}:{port}"
+
+    def _make_server(self):
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            return _UnixHTTPServer(self.socket_path, _SidecarRequestHandler, self)
+        return _TCPHTTPServer((self.host, self.port), _SidecarRequestHandler, self)
+
+    def start(self):
+        """Serve on a background thread and return immediately."""
+        if self._server is None:
+            self._server = self._make_server()
+            self._thread = threading.Thread(target=self._server.serve_forever, name="dashclaw-sidecar", daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        if self._server is None:
+            self._server = self._make_server()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.stop()
+
+    def flush(self, timeout=None):
+        """Send queued heartbeats and events now. Returns True once both are sent."""
+        heartbeats_sent = self._heartbeats.flush(timeout=timeout)
+        events_sent = self._events.flush(timeout=timeout)
+        audits_sent = self._guard_audits.flush(timeout=timeout)
+        return heartbeats_sent and events_sent and audits_sent
+
+    def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            if self._thread is not None:
+                server.shutdown()
+                self._thread = None
+            server.server_close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self._heartbeats.close()
+        self._events.close()
+        self._guard_audits.close()
+        self.uplink.close()
+
+
+class _SidecarRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        sidecar = self.server.sidecar
+        try:
+            response = sidecar.handle(self.command, self.path, dict(self.headers.items()), body)
+        except Exception as e:
+            response = sidecar._json_response(502, {"error": f"DashClaw sidecar uplink failed: {e}"})
+        try:
+            self._write(response)
+        except (BrokenPipeError, ConnectionResetError):
+            # The agent went away (e.g. closed its event stream); drop the upstream response with it.
+            self.close_connection = True
+        finally:
+            response.close()
+
+    def _write(self, response):
+        self.send_response(response.status)
+        for name in _FORWARD_RESPONSE_HEADERS:
+            value = response.headers.get(name)
+            if value is not None:
+                self.send_header(name, value)
+        if response.headers.get("Content-Length") is None:
+            # Unknown length (streams, decompressed bodies): the end of the body is the end of the connection.
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        if (response.headers.get("Content-Type") or "").startswith("text/event-stream"):
+            for line in iter(response.readline, b""):
+                self.wfile.write(line)
+                self.wfile.flush()
+            return
+        while True:
+            chunk = response.read(64 * 1024)
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address, handler, sidecar):
+        self.sidecar = sidecar
+        super().__init__(address, handler)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, handler, sidecar):
+        self.sidecar = sidecar
+        super().__init__(path, handler)
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("unix", 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="dashclaw-sidecar", description="Local DashClaw aggregation daemon")
+    parser.add_argument("--base-url", default=os.environ.get("DASHCLAW_BASE_URL"), help="DashClaw dashboard URL")
+    parser.add_argument("--api-key", default=os.environ.get("DASHCLAW_API_KEY"),
+                        help="API key used by --inject-api-key (default: $DASHCLAW_API_KEY)")
+    parser.add_argument("--inject-api-key", action="store_true",
+                        help="Send --api-key upstream for agent requests that carry no x-api-key header")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    parser.add_argument("--guard-ttl", type=float, default=5.0)
+    parser.add_argument("--recommendation-ttl", type=float, default=30.0)
+    parser.add_argument("--policy-ttl", type=float, default=60.0)
+    args = parser.parse_args(argv)
+    if not args.base_url:
+        parser.error("--base-url or DASHCLAW_BASE_URL is required")
+    if args.inject_api_key and not args.api_key:
+        parser.error("--inject-api-key needs --api-key or DASHCLAW_API_KEY")
+
+    sidecar = Sidecar(
+        args.base_url,
+        api_key=args.api_key,
+        socket_path=args.socket,
+        host=args.host,
+        port=args.port,
+        flush_interval=args.flush_interval,
+        guard_ttl=args.guard_ttl,
+        recommendation_ttl=args.recommendation_ttl,
+        inject_api_key=args.inject_api_key,
+        policy_ttl=args.policy_ttl,
+    )
+    print(f"[DashClaw] Sidecar listening on {args.socket or f'http://{args.host}:{args.port}'}")
+    if args.inject_api_key:
+        print("[DashClaw] Requests without x-api-key will use the sidecar's API key")
+    try:
+        sidecar.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .batching import BatchQueue
+
+# The span open in the current thread or asyncio task. asyncio tasks copy the
+# context they were created in; plain threads start empty, so use wrap() to
+# carry the active span into a thread or executor.
+_current_span = contextvars.ContextVar("dashclaw_span", default=None)
+
+_SUMMARY_LIMIT = 1000
+
+# DashClaw action fields a span may carry; anything else is exported as an attribute only.
+ACTION_FIELDS = (
+    "agent_name", "swarm_id", "reasoning", "authorization_scope", "trigger",
+    "systems_touched", "input_summary", "reversible", "risk_score", "confidence",
+    "side_effects", "artifacts_created", "tokens_in", "tokens_out", "model", "cost_estimate",
+)
+
+
+def _iso_from_ns(unix_ns):
+    dt = datetime.fromtimestamp(unix_ns / 1e9, tz=timezone.utc)
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _truncate(value, limit=_SUMMARY_LIMIT):
+    if value is None:
+        return None
+    text = str(value)
+    return text[:limit] if len(text) > limit else text
+
+
+def current_span():
+    """Return the span open in the current context, or None."""
+    return _current_span.get()
+
+
+def wrap(fn):
+    """
+    Bind fn to the current context so spans opened inside it nest under the
+    active span, even when it runs in another thread.
+
+    Usage:
+        executor.submit(tracing.wrap(work), item)
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def runner(*args, **kwargs):
+        # A Context can only be entered by one thread at a time, so run each call in a copy.
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return runner
+
+
+class Span:
+    """A timed unit of agent work that is exported as a DashClaw action."""
+
+    def __init__(self, name, action_type="other", parent=None, parent_action_id=None, attributes=None, **fields):
+        self.name = name
+        self.action_type = action_type
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.action_id = f"act_{uuid.uuid4()}"
+        self.parent_action_id = parent.action_id if parent else parent_action_id
+        self.attributes = dict(attributes or {})
+        self.fields = {k: v for k, v in fields.items() if v is not None}
+        self.status = "running"
+        self.output = None
+        self.error = None
+        self.start_time_unix_ns = time.time_ns()
+        self._start_perf_ns = time.perf_counter_ns()
+        self.duration_ns = None
+
+    @property
+    def ended(self):
+        return self.duration_ns is not None
+
+    @property
+    def duration_ms(self):
+        if self.duration_ns is None:
+            return None
+        return self.duration_ns // 1_000_000
+
+    @property
+    def end_time_unix_ns(self):
+        if self.duration_ns is None:
+            return None
+        return self.start_time_unix_ns + self.duration_ns
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_output(self, output):
+        self.output = output
+
+    def record_exception(self, error):
+        self.error = error
+
+    def end(self, status=None, output=None, error=None):
+        if self.ended:
+            return
+        self.duration_ns = time.perf_counter_ns() - self._start_perf_ns
+        if output is not None:
+            self.output = output
+        if error is not None:
+            self.error = error
+        self.status = status or ("failed" if self.error is not None else "completed")
+
+    def to_action(self):
+        action = {
+            "action_id": self.action_id,
+            "action_type": self.action_type,
+            "declared_goal": self.fields.get("declared_goal") or self.name,
+            "status": self.status,
+            "timestamp_start": _iso_from_ns(self.start_time_unix_ns),
+        }
+        if self.parent_action_id:
+            action["parent_action_id"] = self.parent_action_id
+        for key in ACTION_FIELDS:
+            if key in self.fields:
+                action[key] = self.fields[key]
+        if self.ended:
+            action["timestamp_end"] = _iso_from_ns(self.end_time_unix_ns)
+            action["duration_ms"] = self.duration_ms
+        if self.output is not None:
+            action["output_summary"] = _truncate(self.output)
+        if self.error is not None:
+            action["error_message"] = _truncate(self.error, 4000)
+        return action
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(values):
+    return [{"key": k, "value": _otlp_value(v)} for k, v in values.items() if v is not None]
+
+
+class DashClawExporter:
+    """Exports finished spans to DashClaw as linked actions via record_actions()."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def export(self, spans):
+        return self.client.record_actions([span.to_action() for span in spans])
+
+
+class OTLPJsonExporter:
+    """
+    Exports finished spans as OTLP/JSON (ExportTraceServiceRequest).
+
+    Writes one JSON document per batch to a local file (JSON lines), and/or
+    POSTs it to an OTLP/HTTP collector endpoint such as
+    http://localhost:4318/v1/traces.
+    """
+
+    def __init__(self, path=None, endpoint=None, service_name="dashclaw-agent", headers=None, timeout=10):
+        if not path and not endpoint:
+            raise ValueError("OTLPJsonExporter requires a path or an endpoint")
+        self.path = path
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def to_otlp(self, spans):
+        otlp_spans = []
+        for span in spans:
+            attributes = {f"dashclaw.{k}": v for k, v in span.fields.items()}
+            attributes.update({
+                "dashclaw.action_id": span.action_id,
+                "dashclaw.action_type": span.action_type,
+                "dashclaw.parent_action_id": span.parent_action_id,
+            })
+            attributes.update(span.attributes)
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_time_unix_ns),
+                "endTimeUnixNano": str(span.end_time_unix_ns or span.start_time_unix_ns),
+                "attributes": _otlp_attributes(attributes),
+                "status": {"code": 2, "message": str(span.error)} if span.status == "failed" else {"code": 1},
+            }
+            if span.parent is not None:
+                otlp_span["parentSpanId"] = span.parent.span_id
+            otlp_spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "dashclaw"}, "spans": otlp_spans}],
+            }]
+        }
+
+    def export(self, spans):
+        document = self.to_otlp(spans)
+        if self.path:
+            line = json.dumps(document, separators=(",", ":")) + "\n"
+            with self._lock:
+                with open(os.fspath(self.path), "a", encoding="utf-8") as fh:
+                    fh.write(line)
+        if self.endpoint:
+            data = json.dumps(document).encode("utf-8")
+            req = urllib.request.Request(
+                self.endpoint,
+                data=data,
+                headers={"Content-Type": "application/json", **self.headers},
+                method="POST",
+            )
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+
+
+class Tracer:
+    """
+    Creates spans and batch-exports them from a background thread, so
+    recording a span never costs a network call on the caller's path.
+
+    Usage:
+        tracer = Tracer(claw, exporters=[DashClawExporter(claw), OTLPJsonExporter(path="spans.jsonl")])
+        with tracer.span("plan", action_type="research") as span:
+            with tracer.span("search", action_type="api", systems_touched=["web"]):
+                ...
+            span.set_output("plan ready")
+        tracer.flush()
+    """
+
+    def __init__(self, client=None, exporters=None, max_batch=200, flush_interval=2.0):
+        if exporters is None:
+            exporters = [DashClawExporter(client)] if client is not None else []
+        self.exporters = list(exporters)
+        self._queue = BatchQueue(
+            self._export_batch,
+            max_batch=max_batch,
+            flush_interval=flush_interval,
+            name="dashclaw-tracer",
+        )
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+
+    def start_span(self, name, action_type="other", parent=None, root=False, parent_action_id=None, attributes=None, **fields):
+        """Start a span without activating it. Pair with end_span()."""
+        if parent is None and not root:
+            parent = _current_span.get()
+        return Span(name, action_type, parent=parent, parent_action_id=parent_action_id, attributes=attributes, **fields)
+
+    def end_span(self, span, status=None, output=None, error=None, export=True):
+        span.end(status=status, output=output, error=error)
+        if export:
+            self.export([span])
+        return span
+
+    @contextmanager
+    def use_span(self, span):
+        """Make span the current span for the duration of the block without ending it."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name, action_type="other", **kwargs):
+        """Open a span around a block; it is ended (completed or failed) and exported on exit."""
+        span = self.start_span(name, action_type, **kwargs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, error=e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            _current_span.reset(token)
+
+    def traced(self, name=None, action_type="other", **kwargs):
+        """Decorator that runs a sync or async function inside a span."""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kw):
+                    with self.span(span_name, action_type, **kwargs):
+                        return await fn(*args, **kw)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kw):
+                with self.span(span_name, action_type, **kwargs):
+                    return fn(*args, **kw)
+            return wrapper
+        return decorator
+
+    def export(self, spans):
+        self._queue.put_many(spans)
+
+    def flush(self, timeout=None):
+        """Export all finished spans now. Returns True once they have been delivered."""
+        return self._queue.flush(timeout=timeout)
+
+    def _export_batch(self, spans):
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                print(f"[DashClaw] Span export via {type(exporter).__name__} failed: {e}")
@@ -0,0 +1,264 @@
+import email.message
+import http.client
+import io
+import json
+import socket
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+class TransportResponse:
+    """
+    File-like response returned by transports that do not produce an
+    http.client response of their own. Exposes what the client reads:
+    status (and code), headers.get(), read(), readline() and line iteration.
+    """
+
+    def __init__(self, status, headers=None, body=b"", reason=""):
+        self.status = self.code = int(status)
+        self.reason = reason
+        self.headers = email.message.Message()
+        for name, value in (headers or {}).items():
+            self.headers[name] = str(value)
+        self._body = body if hasattr(body, "read") else io.BytesIO(body or b"")
+
+    def read(self, amt=-1):
+        return self._body.read(-1 if amt is None else amt)
+
+    def readline(self, limit=-1):
+        return self._body.readline(limit)
+
+    def __iter__(self):
+        return iter(self._body.readline, b"")
+
+    def close(self):
+        self._body.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Transport:
+    """
+    Carries DashClaw API requests. request() returns a response for every
+    status code, including errors; the client turns 4xx/5xx into DashClawError.
+    body is None, bytes, or an iterable of bytes (streamed uploads).
+    """
+
+    def request(self, method, url, headers=None, body=None, timeout=30):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class UrllibTransport(Transport):
+    """Default transport: one urllib connection per request, honouring the *_PROXY environment variables."""
+
+    def request(self, method, url, headers=None, body=None, timeout=30):
+        req = urllib.request.Request(url, data=body, headers=headers or {}, method=method)
+        try:
+            return urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            return e
+
+
+class _PooledResponse:
+    """http.client response that hands its connection back to the pool once fully read."""
+
+    def __init__(self, transport, key, conn, response):
+        self._transport = transport
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.status = self.code = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def read(self, amt=None):
+        return self._response.read(None if amt is None or amt < 0 else amt)
+
+    def readline(self, limit=-1):
+        return self._response.readline(limit)
+
+    def __iter__(self):
+        return iter(self._response.readline, b"")
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        # A partly read body leaves the connection mid-response, so only reuse it once drained.
+        reusable = self._response.isclosed() and not self._response.will_close
+        self._response.close()
+        if reusable:
+            self._transport._release(self._key, conn)
+        else:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HTTPPoolTransport(Transport):
+    """
+    Keep-alive transport that reuses HTTP(S) connections across requests,
+    keeping up to max_idle idle connections per host. Saves the TCP and TLS
+    handshake on every call after the first. Proxy environment variables are
+    not applied; use UrllibTransport behind a proxy.
+
+    Usage:
+        transport = HTTPPoolTransport(max_idle=8)
+        claw = DashClaw(base_url=..., api_key=..., agent_id=..., transport=transport)
+        ...
+        transport.close()
+    """
+
+    def __init__(self, max_idle=8, ssl_context=None):
+        self.max_idle = max(1, int(max_idle))
+        self.ssl_context = ssl_context
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _new_connection(self, scheme, host, port, timeout):
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.connections_opened += 1
+        return self._new_connection(*key, timeout), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, url, headers=None, body=None, timeout=30):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        replayable = body is None or isinstance(body, (bytes, bytearray))
+
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, target, body=body, headers=headers or {})
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # The server dropped an idle keep-alive connection; retry once on a fresh one.
+                if reused and replayable:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            return _PooledResponse(self, key, conn, response)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, host, timeout):
+        super().__init__(host or "localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixSocketTransport(HTTPPoolTransport):
+    """
+    Keep-alive HTTP over a Unix domain socket, for agents talking to a DashClaw
+    sidecar on the same host. The base_url host only fills the Host header.
+
+    Usage:
+        claw = DashClaw(base_url="http://localhost", api_key=..., agent_id=...,
+                        transport=UnixSocketTransport("/run/dashclaw/sidecar.sock"))
+    """
+
+    def __init__(self, socket_path, max_idle=8):
+        super().__init__(max_idle=max_idle)
+        self.socket_path = str(socket_path)
+
+    def _new_connection(self, scheme, host, port, timeout):
+        return _UnixHTTPConnection(self.socket_path, host, timeout)
+
+
+class InProcessTransport(Transport):
+    """
+    Calls a handler directly instead of going over a socket, for tests,
+    benchmarks that isolate SDK overhead, and servers embedded in the agent.
+
+    handler(method, path, headers, body) receives the path with its query
+    string and the request body as bytes (or None), and returns either a
+    TransportResponse or a (status, body) / (status, headers, body) tuple.
+    A dict or list body is sent as JSON; str bodies are UTF-8 encoded.
+
+    Usage:
+        def handler(method, path, headers, body):
+            return 200, {"ok": True}
+        claw = DashClaw(base_url="http://localhost", api_key=..., agent_id=...,
+                        transport=InProcessTransport(handler))
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def request(self, method, url, headers=None, body=None, timeout=30):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if body is not None and not isinstance(body, (bytes, bytearray)):
+            body = b"".join(body)
+
+        result = self.handler(method, path, dict(headers or {}), body)
+        if isinstance(result, TransportResponse):
+            return result
+        if len(result) == 2:
+            status, payload = result
+            response_headers = {}
+        else:
+            status, response_headers, payload = result
+        response_headers = dict(response_headers or {})
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload).encode("utf-8")
+            response_headers.setdefault("Content-Type", "application/json")
+        elif isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        return TransportResponse(status, response_headers, payload)
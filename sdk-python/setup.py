@@ -16,7 +16,11 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=[], # Zero dependencies for core
+    entry_points={
+        "console_scripts": ["dashclaw-sidecar=dashclaw.sidecar:main"],
+    },
     extras_require={
         "langchain": ["langchain-core>=0.1.0"],
+        "numpy": ["numpy>=1.20"],
     },
 )
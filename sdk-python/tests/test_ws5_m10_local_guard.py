@@ -0,0 +1,129 @@
+import json
+import pathlib
+import sys
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, DashClawError, GuardBlockedError  # noqa: E402
+
+
+def policy(pid, policy_type, rules, active=1):
+    return {"id": pid, "name": pid.upper(), "policy_type": policy_type, "rules": json.dumps(rules), "active": active}
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self, policies, **kwargs):
+        super().__init__(
+            base_url="https://example.test",
+            api_key="test-key",
+            agent_id="agent-1",
+            guard_evaluation="local",
+            **kwargs,
+        )
+        self.calls = []
+        self.policies = policies
+        self.remote_decision = {"decision": "warn", "reasons": [], "warnings": ["remote"], "matched_policies": []}
+
+    def _request(self, path, method="GET", body=None):
+        self.calls.append({"path": path, "method": method, "body": body})
+        if path == "/api/policies":
+            return {"policies": self.policies}
+        if path == "/api/guard/decisions":
+            return {"recorded_count": len(body["decisions"])}
+        if path.startswith("/api/guard"):
+            if self.remote_decision["decision"] in ("block", "require_approval"):
+                raise DashClawError("HTTP Error 403: Forbidden", status=403, body=self.remote_decision)
+            return self.remote_decision
+        return {"ok": True}
+
+    def guard_posts(self):
+        return [c for c in self.calls if c["path"].startswith("/api/guard")]
+
+
+class LocalGuardEvaluationTests(unittest.TestCase):
+    def test_context_only_policies_are_evaluated_locally_and_reported_async(self):
+        client = RecordingDashClaw([
+            policy("gp_risk", "risk_threshold", {"threshold": 70, "action": "warn"}),
+            policy("gp_appr", "require_approval", {"action_types": ["deploy"]}),
+            policy("gp_off", "block_action_type", {"action_types": ["deploy"]}, active=0),
+        ])
+
+        decision = client.guard({"action_type": "deploy", "risk_score": 75})
+
+        self.assertTrue(decision["evaluated_locally"])
+        self.assertEqual(decision["decision"], "require_approval")
+        self.assertEqual(decision["matched_policies"], ["gp_risk", "gp_appr"])
+        self.assertEqual(decision["warnings"], ["GP_RISK: Risk score 75 >= threshold 70"])
+        self.assertEqual(decision["reasons"], ['GP_APPR: Action type "deploy" requires approval'])
+
+        self.assertTrue(client.flush_guard_reports(timeout=5))
+        # Reported record-only, with the decision made, rather than re-evaluated by POST /api/guard.
+        self.assertEqual([c["path"] for c in client.guard_posts()], ["/api/guard/decisions"])
+        record = client.guard_posts()[0]["body"]["decisions"][0]
+        self.assertEqual(record["agent_id"], "agent-1")
+        self.assertEqual(record["decision"], "require_approval")
+        self.assertEqual(record["matched_policies"], ["gp_risk", "gp_appr"])
+        self.assertEqual(record["snapshot_version"], decision["snapshot_version"])
+        self.assertEqual(len(record["snapshot_version"]), 16)
+
+        client.guard({"action_type": "research", "risk_score": 10})
+        policy_fetches = [c for c in client.calls if c["path"] == "/api/policies"]
+        self.assertEqual(len(policy_fetches), 1)
+        client.stop_policy_sync()
+
+    def test_remote_only_policy_types_fall_back_to_server(self):
+        client = RecordingDashClaw([
+            policy("gp_risk", "risk_threshold", {"threshold": 90}),
+            policy("gp_rate", "rate_limit", {"max_actions": 5}),
+        ])
+
+        decision = client.guard({"action_type": "deploy", "risk_score": 20})
+        self.assertEqual(decision["warnings"], ["remote"])
+        self.assertNotIn("evaluated_locally", decision)
+
+        blocked = client.guard({"action_type": "deploy", "risk_score": 95})
+        self.assertEqual(blocked["decision"], "block")
+        self.assertTrue(blocked["evaluated_locally"])
+        client.stop_policy_sync()
+
+    def test_snapshot_version_tracks_policy_changes(self):
+        client = RecordingDashClaw([policy("gp_risk", "risk_threshold", {"threshold": 90})])
+        client.sync_policies()
+        first = client._policy_snapshot.version
+        client.sync_policies()
+        self.assertEqual(client._policy_snapshot.version, first)
+        client.policies = [policy("gp_risk", "risk_threshold", {"threshold": 80})]
+        client.sync_policies()
+        self.assertNotEqual(client._policy_snapshot.version, first)
+        client.stop_policy_sync()
+
+    def test_local_and_remote_blocks_are_enforced_the_same_way(self):
+        block_policy = policy("gp_block", "block_action_type", {"action_types": ["deploy"]})
+        local = RecordingDashClaw([block_policy], guard_mode="enforce")
+        remote = RecordingDashClaw([block_policy], guard_mode="enforce")
+        remote.guard_evaluation = "remote"
+        remote.remote_decision = {"decision": "block", "reasons": ["GP_BLOCK: blocked"], "warnings": [], "matched_policies": ["gp_block"]}
+
+        for client in (local, remote):
+            self.assertEqual(client.guard({"action_type": "deploy"})["decision"], "block")
+            with self.assertRaises(GuardBlockedError) as ctx:
+                client.create_action(action_type="deploy", declared_goal="Ship")
+            self.assertEqual(ctx.exception.status, 403)
+            self.assertFalse(any(c["path"] == "/api/actions" for c in client.calls))
+        local.stop_policy_sync()
+
+    def test_include_signals_always_uses_server(self):
+        client = RecordingDashClaw([policy("gp_risk", "risk_threshold", {"threshold": 90})])
+        decision = client.guard({"action_type": "deploy"}, include_signals=True)
+        self.assertEqual(decision["warnings"], ["remote"])
+        self.assertFalse(any(c["path"] == "/api/policies" for c in client.calls))
+
+    def test_constructor_validates_guard_evaluation(self):
+        with self.assertRaises(ValueError):
+            DashClaw(base_url="https://example.test", api_key="k", agent_id="a", guard_evaluation="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import pathlib
+import sys
+import threading
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+
+
+def agent(agent_id, skills, status="available", load=0, max_concurrent=3, updated_at="t1"):
+    return {
+        "id": agent_id,
+        "name": agent_id,
+        "capabilities": skills,
+        "status": status,
+        "current_load": load,
+        "max_concurrent": max_concurrent,
+        "updated_at": updated_at,
+    }
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self):
+        super().__init__(
+            base_url="https://example.test",
+            api_key="test-key",
+            agent_id="dispatcher",
+        )
+        self.calls = []
+        self.agents = []
+        self._lock = threading.Lock()
+        self._next_task = 0
+
+    def _request(self, path, method="GET", body=None):
+        with self._lock:
+            self.calls.append({"path": path, "method": method, "body": body})
+            self._next_task += 1
+            task_number = self._next_task
+        if path.startswith("/api/routing/agents"):
+            return {"agents": self.agents}
+        if path == "/api/routing/tasks" and method == "POST":
+            return {
+                "task": {"id": f"rt_{task_number}", "title": body["title"]},
+                "routing": {"status": "assigned", "agent_id": "ra_writer"},
+            }
+        if path.endswith("/complete"):
+            return {"routing": {"status": "completed"}}
+        return {"ok": True}
+
+    def count(self, prefix, method=None):
+        return len([c for c in self.calls if c["path"].startswith(prefix) and (method is None or c["method"] == method)])
+
+
+class RoutingClientTests(unittest.TestCase):
+    def test_index_answers_lookups_locally_and_refreshes_incrementally(self):
+        client = RecordingDashClaw()
+        client.agents = [
+            agent("ra_writer", ["write", {"skill": "summarize", "priority": 5}]),
+            agent("ra_coder", ["code"], status="busy"),
+        ]
+        router = client.routing_client(refresh_interval=3600)
+
+        self.assertEqual([a["id"] for a in router.find_agents(skill="summarize")], ["ra_writer"])
+        self.assertEqual([a["id"] for a in router.find_agents(status="busy")], ["ra_coder"])
+        self.assertEqual([a["id"] for a in router.candidates(["code"])], [])
+        self.assertEqual(client.count("/api/routing/agents"), 1)
+
+        client.agents = [
+            agent("ra_writer", ["write", "summarize"]),
+            agent("ra_coder", ["code"], updated_at="t2"),
+        ]
+        changes = router.index.refresh()
+        self.assertEqual(changes, {"added": 0, "updated": 1, "removed": 0})
+        self.assertEqual([a["id"] for a in router.candidates(["code"])], ["ra_coder"])
+
+    def test_bulk_submit_prefilters_and_tracks_load(self):
+        client = RecordingDashClaw()
+        client.agents = [agent("ra_writer", ["write"], max_concurrent=100)]
+        router = client.routing_client()
+
+        tasks = [{"title": f"write {i}", "required_skills": ["write"]} for i in range(20)]
+        tasks.append({"title": "code", "required_skills": ["code"]})
+        results = router.submit_tasks(tasks, require_candidate=True)
+
+        self.assertEqual(len(results), 21)
+        self.assertEqual(results[-1]["routing"]["status"], "skipped")
+        self.assertEqual(client.count("/api/routing/tasks", "POST"), 20)
+        self.assertEqual(router.index.agents["ra_writer"]["current_load"], 20)
+
+        task_ids = [r["task"]["id"] for r in results[:-1]]
+        completions = router.complete_tasks([{"task_id": t, "success": True} for t in task_ids])
+        self.assertEqual(len(completions), 20)
+        self.assertEqual(router.index.agents["ra_writer"]["current_load"], 0)
+        self.assertEqual(client.count("/api/routing/agents"), 1)
+        router.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import base64
+import io
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+from dashclaw.attachments import MAX_ATTACHMENT_SIZE, AttachmentFile, StreamingJSONBody  # noqa: E402
+
+PAYLOAD = bytes(range(256)) * 4000  # ~1MB
+
+
+class AttachmentHandler(BaseHTTPRequestHandler):
+    honour_range = True
+    received = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = PAYLOAD
+        status = 200
+        headers = {"Content-Type": "application/octet-stream", "Content-Disposition": 'attachment; filename="blob.bin"'}
+        range_header = self.headers.get("Range")
+        if range_header and self.honour_range:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = PAYLOAD[start:]
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        body = json.loads(self.rfile.read(length))
+        AttachmentHandler.received.append(body)
+        out = json.dumps({"message": {"id": "msg_1"}}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+class AttachmentStreamingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), AttachmentHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.client = DashClaw(
+            base_url=f"http://127.0.0.1:{cls.server.server_address[1]}",
+            api_key="test-key",
+            agent_id="agent-1",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        AttachmentHandler.honour_range = True
+        AttachmentHandler.received = []
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_download_streams_to_path_with_progress(self):
+        dest = os.path.join(self.tmp.name, "out.bin")
+        seen = []
+        res = self.client.download_attachment("att_1", dest, chunk_size=64 * 1024, progress=lambda d, t: seen.append((d, t)))
+
+        self.assertEqual(pathlib.Path(dest).read_bytes(), PAYLOAD)
+        self.assertEqual(res["filename"], "blob.bin")
+        self.assertEqual(res["bytes"], len(PAYLOAD))
+        self.assertGreater(len(seen), 1)
+        self.assertEqual(seen[-1], (len(PAYLOAD), len(PAYLOAD)))
+
+    def test_resume_requests_only_missing_bytes(self):
+        dest = os.path.join(self.tmp.name, "partial.bin")
+        pathlib.Path(dest).write_bytes(PAYLOAD[:1000])
+
+        res = self.client.download_attachment("att_1", dest, resume=True)
+        self.assertTrue(res["resumed"])
+        self.assertEqual(pathlib.Path(dest).read_bytes(), PAYLOAD)
+
+        again = self.client.download_attachment("att_1", dest, resume=True)
+        self.assertEqual(again["bytes"], len(PAYLOAD))
+        self.assertEqual(pathlib.Path(dest).read_bytes(), PAYLOAD)
+
+    def test_resume_restarts_when_server_ignores_range(self):
+        AttachmentHandler.honour_range = False
+        buf = io.BytesIO()
+        buf.write(b"stale bytes")
+        res = self.client.download_attachment("att_1", buf, resume=True)
+        self.assertFalse(res["resumed"])
+        self.assertEqual(buf.getvalue(), PAYLOAD)
+
+    def test_unsatisfiable_range_redownloads_when_sizes_differ(self):
+        dest = os.path.join(self.tmp.name, "longer.bin")
+        pathlib.Path(dest).write_bytes(PAYLOAD + b"trailing bytes from another file")
+
+        res = self.client.download_attachment("att_1", dest, resume=True)
+        self.assertFalse(res["resumed"])
+        self.assertEqual(res["bytes"], len(PAYLOAD))
+        self.assertEqual(pathlib.Path(dest).read_bytes(), PAYLOAD)
+
+        buf = io.BytesIO()
+        buf.write(PAYLOAD + b"extra")
+        res = self.client.download_attachment("att_1", buf, resume=True)
+        self.assertFalse(res["resumed"])
+        self.assertEqual(buf.getvalue(), PAYLOAD)
+
+    def test_send_message_streams_attachment_files(self):
+        src = os.path.join(self.tmp.name, "report.bin")
+        pathlib.Path(src).write_bytes(PAYLOAD[:100001])
+        seen = []
+
+        res = self.client.send_message(
+            "see attached",
+            to="agent-2",
+            attachments=[AttachmentFile(src, mime_type="application/pdf")],
+            progress=lambda d, t: seen.append((d, t)),
+        )
+
+        self.assertEqual(res["message"]["id"], "msg_1")
+        body = AttachmentHandler.received[0]
+        self.assertEqual(body["to_agent_id"], "agent-2")
+        att = body["attachments"][0]
+        self.assertEqual(att["filename"], "report.bin")
+        self.assertEqual(att["mime_type"], "application/pdf")
+        self.assertEqual(base64.b64decode(att["data"]), PAYLOAD[:100001])
+        self.assertEqual(seen[-1][0], seen[-1][1])
+
+    def test_oversized_attachments_are_rejected_before_sending(self):
+        src = os.path.join(self.tmp.name, "big.bin")
+        with open(src, "wb") as f:
+            f.truncate(MAX_ATTACHMENT_SIZE + 1)
+        before = len(AttachmentHandler.received)
+
+        with self.assertRaises(ValueError):
+            self.client.send_message("too big", attachments=[AttachmentFile(src, mime_type="application/pdf")])
+        oversized = {"filename": "a.txt", "mime_type": "text/plain",
+                     "data": base64.b64encode(b"x" * (MAX_ATTACHMENT_SIZE + 1)).decode()}
+        with self.assertRaises(ValueError):
+            self.client.send_message("too big", attachments=[oversized])
+        self.assertEqual(len(AttachmentHandler.received), before)
+
+    def test_streaming_body_length_matches_serialised_payload(self):
+        src = os.path.join(self.tmp.name, "a.txt")
+        pathlib.Path(src).write_bytes(b"hello world")
+        stream = StreamingJSONBody({"body": "x", "attachments": [AttachmentFile(src)]}, chunk_size=4)
+        raw = b"".join(stream)
+        self.assertEqual(len(raw), len(stream))
+        self.assertEqual(json.loads(raw)["attachments"][0]["data"], base64.b64encode(b"hello world").decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+from dashclaw.compliance import ExportSectionParser  # noqa: E402
+
+MARKDOWN_EXPORT = (
+    "# Compliance Export\n\n**Frameworks:** soc2\n\n---\n\n"
+    "# SOC 2 Report\n\nCoverage 80%\n\n"
+    "## Remediation Priority Matrix\n\n| Priority | Control |\n|---|---|\n| 1 | CC6.1 -- Access ✓ |\n"
+    "\n---\n\n\n# Enforcement Evidence\n\n**Blocked:** 3\n"
+)
+
+JSON_EXPORT = (
+    json.dumps({"framework": "soc2", "controls": [{"id": "CC6.1", "status": "covered"}]}, indent=2)
+    + "\n## Remediation Priority Matrix\n\n| 1 | CC6.1 |\n\n"
+    + json.dumps({"framework": "iso27001", "controls": []}, indent=2)
+    + "\n\n# Enforcement Evidence\n\n**Blocked:** 0\n"
+)
+
+EXPORTS = {"ce_md": MARKDOWN_EXPORT, "ce_json": JSON_EXPORT}
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        export_id = self.path.split("/")[4]
+        data = EXPORTS[export_id].encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Disposition", 'attachment; filename="Compliance_Export_2026-10-19.md"')
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def parse_in_chunks(text, size):
+    parser = ExportSectionParser()
+    sections = []
+    for i in range(0, len(text), size):
+        sections.extend(parser.feed(text[i:i + size]))
+    sections.extend(parser.close())
+    return sections
+
+
+class ComplianceExportStreamingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ExportHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.client = DashClaw(
+            base_url=f"http://127.0.0.1:{cls.server.server_address[1]}",
+            api_key="test-key",
+            agent_id="agent-1",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_download_without_dest_returns_text(self):
+        self.assertEqual(self.client.download_compliance_export("ce_md"), MARKDOWN_EXPORT)
+
+    def test_download_streams_to_disk_and_file_objects(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "export.md")
+            seen = []
+            res = self.client.download_compliance_export("ce_md", dest, chunk_size=16, progress=lambda d, t: seen.append((d, t)))
+            self.assertEqual(pathlib.Path(dest).read_text(encoding="utf-8"), MARKDOWN_EXPORT)
+            self.assertEqual(res["filename"], "Compliance_Export_2026-10-19.md")
+            self.assertEqual(seen[-1][0], seen[-1][1])
+
+        buf = io.BytesIO()
+        self.client.download_compliance_export("ce_json", buf)
+        self.assertEqual(buf.getvalue().decode("utf-8"), JSON_EXPORT)
+
+    def test_markdown_sections_are_parsed_incrementally(self):
+        sections = list(self.client.iter_compliance_export_sections("ce_md", chunk_size=7))
+        self.assertEqual(
+            [(s["level"], s["title"]) for s in sections],
+            [(1, "Compliance Export"), (1, "SOC 2 Report"), (2, "Remediation Priority Matrix"), (1, "Enforcement Evidence")],
+        )
+        self.assertIn("✓", sections[2]["content"])
+        self.assertFalse(sections[0]["content"].endswith("---"))
+
+    def test_json_documents_are_emitted_as_they_complete(self):
+        parser = ExportSectionParser()
+        first_doc_end = JSON_EXPORT.index("\n}") + 3
+        emitted = parser.feed(JSON_EXPORT[:first_doc_end])
+        self.assertEqual(emitted, [{"type": "json", "data": json.loads(JSON_EXPORT[:first_doc_end])}])
+
+        sections = parse_in_chunks(JSON_EXPORT, 5)
+        self.assertEqual([s["type"] for s in sections], ["json", "markdown", "json", "markdown"])
+        self.assertEqual(sections[2]["data"]["framework"], "iso27001")
+
+    def test_truncated_json_is_returned_as_text(self):
+        sections = parse_in_chunks('{\n  "framework": "soc2",\n', 4)
+        self.assertEqual(sections[0]["type"], "markdown")
+        self.assertIn('"framework"', sections[0]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import json
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+
+
+def message(n, to="agent-1", sender="agent-2"):
+    return {
+        "id": f"msg_{n}",
+        "created_at": f"2026-10-19T10:00:{n:02d}Z",
+        "from_agent_id": sender,
+        "to_agent_id": to,
+        "message_type": "info",
+        "body": f"hello {n}",
+        "is_read": False,
+        "status": "sent",
+    }
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    events = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b": heartbeat\n\n")
+        self.wfile.write(b'event: connected\ndata: {"status": "ok"}\n\n')
+        for i, (event, data) in enumerate(self.events):
+            self.wfile.write(f"id: {i}\nevent: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self, base_url="https://example.test"):
+        super().__init__(base_url=base_url, api_key="test-key", agent_id="agent-1")
+        self.calls = []
+        self.server_messages = []
+
+    def _request(self, path, method="GET", body=None):
+        self.calls.append({"path": path, "method": method, "body": body})
+        if path.startswith("/api/messages?") and method == "GET":
+            params = dict(p.split("=", 1) for p in path.split("?", 1)[1].split("&"))
+            since = params.get("since", "").replace("%3A", ":")
+            limit = int(params.get("limit", 50))
+            offset = int(params.get("offset", 0))
+            rows = sorted(
+                [m for m in self.server_messages if not since or m["created_at"] >= since],
+                key=lambda m: m["created_at"],
+                reverse=True,
+            )
+            return {"messages": rows[offset:offset + limit]}
+        return {"updated": len((body or {}).get("message_ids", []))}
+
+    def list_calls(self):
+        return [c for c in self.calls if c["path"].startswith("/api/messages?")]
+
+    def patch_calls(self):
+        return [c for c in self.calls if c["method"] == "PATCH"]
+
+
+class InboxSyncTests(unittest.TestCase):
+    def test_sync_only_downloads_new_messages(self):
+        client = RecordingDashClaw()
+        client.server_messages = [message(n) for n in range(1, 6)]
+        inbox = client.inbox_sync(page_size=2)
+
+        self.assertEqual(inbox.sync(), 5)
+        self.assertEqual(len(inbox.messages()), 5)
+        first_pass = len(client.list_calls())
+
+        client.server_messages.append(message(6))
+        self.assertEqual(inbox.sync(), 1)
+        self.assertEqual(len(client.list_calls()) - first_pass, 1)
+        self.assertIn("since=2026-10-19T10%3A00%3A05Z", client.list_calls()[-1]["path"])
+        self.assertEqual(inbox.messages(limit=1)[0]["id"], "msg_6")
+        inbox.close()
+
+    def test_sync_pages_past_pushed_messages_to_the_cursor(self):
+        client = RecordingDashClaw()
+        client.server_messages = [message(1), message(2)]
+        inbox = client.inbox_sync(page_size=2)
+        inbox.sync()
+        first_pass = len(client.list_calls())
+
+        client.server_messages += [message(n) for n in range(3, 8)]
+        # The newest message already arrived over the stream; the ones before it did not.
+        inbox.store.upsert([message(7)])
+
+        self.assertEqual(inbox.sync(), 4)
+        self.assertEqual([m["id"] for m in inbox.messages()], [f"msg_{n}" for n in range(7, 0, -1)])
+        # Pages [7, 6], [5, 4], [3, 2]: the last one reaches the cursor (msg_2).
+        self.assertEqual(len(client.list_calls()) - first_pass, 3)
+        inbox.close()
+
+    def test_state_changes_are_applied_locally_and_flushed_in_batches(self):
+        client = RecordingDashClaw()
+        client.server_messages = [message(n) for n in range(1, 5)]
+        inbox = client.inbox_sync(flush_interval=60)
+        inbox.sync()
+
+        inbox.mark_read(["msg_1", "msg_2"])
+        inbox.mark_read(["msg_3"])
+        inbox.archive(["msg_4"])
+        self.assertEqual(inbox.unread_count(), 0)
+        self.assertEqual([m["id"] for m in inbox.messages()], ["msg_3", "msg_2", "msg_1"])
+        self.assertEqual(client.patch_calls(), [])
+
+        self.assertTrue(inbox.flush(timeout=5))
+        bodies = sorted((c["body"]["action"], c["body"]["message_ids"]) for c in client.patch_calls())
+        self.assertEqual(bodies, [("archive", ["msg_4"]), ("read", ["msg_1", "msg_2", "msg_3"])])
+
+        # A later sync returning the server's stale copy must not undo local state.
+        inbox.sync()
+        self.assertEqual(inbox.unread_count(), 0)
+        inbox.close()
+
+    def test_store_persists_cursor_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(pathlib.Path(tmp) / "inbox.db")
+            client = RecordingDashClaw()
+            client.server_messages = [message(1), message(2)]
+            inbox = client.inbox_sync(path)
+            inbox.sync()
+            inbox.close()
+
+            again = client.inbox_sync(path)
+            self.assertEqual(again.sync(), 0)
+            self.assertEqual(len(again.messages()), 2)
+            again.close()
+
+    def test_push_applies_stream_events_for_this_agent(self):
+        StreamHandler.events = [
+            ("message.created", message(7)),
+            ("message.created", message(8, to="agent-9")),
+            ("message.created", message(9, sender="agent-1")),
+        ]
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = RecordingDashClaw(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+            inbox = client.inbox_sync()
+            inbox.start_push(retry_interval=60)
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and not inbox.messages():
+                time.sleep(0.02)
+            inbox.stop_push()
+
+            self.assertEqual([m["id"] for m in inbox.messages()], ["msg_7"])
+            self.assertTrue(client.list_calls())  # catch-up sync on connect
+            inbox.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_event_stream_connects_only_once_started(self):
+        StreamHandler.events = [("message.created", message(7))]
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = RecordingDashClaw(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+            stream = client.events(reconnect=False)
+            connected = threading.Event()
+            stream.on("connected", lambda _info: connected.set())
+            self.assertFalse(connected.wait(0.2))
+            self.assertIsNone(stream._thread)
+
+            # The handler registered before start() sees the very first event.
+            self.assertIs(stream.start(), stream)
+            self.assertTrue(connected.wait(5))
+            stream.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
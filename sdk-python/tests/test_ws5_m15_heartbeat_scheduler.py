@@ -0,0 +1,122 @@
+import pathlib
+import sys
+import time
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, DashClawError  # noqa: E402
+from dashclaw.heartbeat import HeartbeatScheduler  # noqa: E402
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self, agent_id="agent-1", batch_supported=True):
+        super().__init__(base_url="https://example.test", api_key="test-key", agent_id=agent_id)
+        self.calls = []
+        self.batch_supported = batch_supported
+
+    def _request(self, path, method="GET", body=None):
+        self.calls.append({"path": path, "method": method, "body": body})
+        if "heartbeats" in (body or {}) and not self.batch_supported:
+            raise DashClawError("agent_id is required", status=400)
+        self._note_activity(path)
+        return {"status": "ok"}
+
+    def heartbeat_calls(self):
+        return [c for c in self.calls if c["path"] == "/api/agents/heartbeat"]
+
+
+class HeartbeatSchedulerTests(unittest.TestCase):
+    def test_fleet_is_multiplexed_into_batched_requests(self):
+        uplink = RecordingDashClaw("uplink")
+        scheduler = HeartbeatScheduler(uplink, interval=60, jitter=0, max_batch=2)
+        for i in range(5):
+            scheduler.register(f"worker-{i}", status="online")
+
+        self.assertEqual(scheduler.tick(), {"sent": 5, "skipped": 0})
+        calls = uplink.heartbeat_calls()
+        self.assertEqual([len(c["body"]["heartbeats"]) for c in calls[:2]], [2, 2])
+        self.assertEqual(calls[0]["body"]["heartbeats"][0]["agent_id"], "worker-0")
+        # A lone beat uses the single-agent body.
+        self.assertEqual(calls[2]["body"]["agent_id"], "worker-4")
+        self.assertEqual(len(calls), 3)
+
+    def test_phases_are_spread_after_the_first_beat(self):
+        uplink = RecordingDashClaw("uplink")
+        scheduler = HeartbeatScheduler(uplink, interval=60, jitter=0, coalesce_window=0)
+        for i in range(50):
+            scheduler.register(f"worker-{i}")
+        now = time.monotonic()
+        scheduler.tick(now)
+
+        dues = sorted(entry["next_due"] - now for entry in scheduler._agents.values())
+        self.assertTrue(all(0 <= d <= 60 for d in dues))
+        self.assertGreater(dues[-1] - dues[0], 20)
+
+    def test_first_beats_are_jittered(self):
+        uplink = RecordingDashClaw("uplink")
+        scheduler = HeartbeatScheduler(uplink, interval=60, jitter=0.1, coalesce_window=0)
+        before = time.monotonic()
+        for i in range(50):
+            scheduler.register(f"worker-{i}")
+
+        dues = sorted(entry["next_due"] - before for entry in scheduler._agents.values())
+        self.assertTrue(all(0 <= d <= 6.1 for d in dues))
+        self.assertGreater(dues[-1] - dues[0], 2)
+        self.assertLess(scheduler.tick(before)["sent"], 50)
+        scheduler.tick(before + 6.1)
+        self.assertEqual(scheduler.sent, 50)
+
+    def test_beats_are_skipped_while_the_agent_has_other_traffic(self):
+        agent = RecordingDashClaw()
+        scheduler = HeartbeatScheduler(agent, interval=60, jitter=0, max_silence=300, coalesce_window=0)
+        scheduler.register(agent)
+        start = time.monotonic()
+        scheduler.tick(start)
+        self.assertEqual(len(agent.heartbeat_calls()), 1)
+
+        agent.last_request_at = start + 100
+        self.assertEqual(scheduler.tick(start + 120), {"sent": 0, "skipped": 1})
+
+        # Even with constant traffic a real beat goes out once max_silence has elapsed.
+        agent.last_request_at = start + 310
+        self.assertEqual(scheduler.tick(start + 320)["sent"], 1)
+
+    def test_status_updates_are_never_skipped(self):
+        agent = RecordingDashClaw()
+        scheduler = HeartbeatScheduler(agent, interval=60, jitter=0, coalesce_window=0)
+        scheduler.register(agent)
+        scheduler.tick()
+        agent.last_request_at = time.monotonic()
+
+        scheduler.update("agent-1", status="busy", current_task_id="task_1")
+        self.assertEqual(scheduler.tick()["sent"], 1)
+        self.assertEqual(agent.heartbeat_calls()[-1]["body"]["status"], "busy")
+
+    def test_falls_back_to_single_heartbeats_when_batch_is_rejected(self):
+        uplink = RecordingDashClaw("uplink", batch_supported=False)
+        scheduler = HeartbeatScheduler(uplink, interval=60, jitter=0)
+        scheduler.register("worker-1")
+        scheduler.register("worker-2")
+        scheduler.tick()
+
+        bodies = [c["body"] for c in uplink.heartbeat_calls()]
+        self.assertIn("heartbeats", bodies[0])
+        self.assertEqual([b["agent_id"] for b in bodies[1:]], ["worker-1", "worker-2"])
+        self.assertEqual(scheduler.sent, 2)
+
+    def test_start_heartbeat_sends_promptly_and_stops(self):
+        agent = RecordingDashClaw()
+        agent.start_heartbeat(interval=10, status="online")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not agent.heartbeat_calls():
+            time.sleep(0.01)
+        agent.stop_heartbeat()
+
+        self.assertEqual(agent.heartbeat_calls()[0]["body"]["agent_id"], "agent-1")
+        self.assertIsNone(agent._heartbeat_scheduler)
+
+
+if __name__ == "__main__":
+    unittest.main()
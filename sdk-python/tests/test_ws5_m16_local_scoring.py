@@ -0,0 +1,119 @@
+import pathlib
+import sys
+import threading
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+from dashclaw import scoring  # noqa: E402
+from dashclaw.scoring import LocalScorer  # noqa: E402
+
+PROFILE = {
+    "id": "sp_1",
+    "name": "Ops quality",
+    "composite_method": "weighted_average",
+    "dimensions": [
+        {
+            "id": "sd_speed", "name": "speed", "data_source": "duration_ms", "weight": "0.5",
+            "scale": [
+                {"label": "excellent", "operator": "lt", "value": 1000, "score": 100},
+                {"label": "good", "operator": "between", "value": [1000, 5000], "score": 70},
+                {"label": "poor", "operator": "gte", "value": 20000, "score": 10},
+            ],
+        },
+        {
+            "id": "sd_env", "name": "env", "data_source": "metadata_field", "weight": 0.25,
+            "data_config": '{"field": "deploy.env"}',
+            "scale": '[{"label": "prod", "operator": "eq", "value": "production", "score": 40}, {"label": "other", "operator": "contains", "value": "", "score": 90}]',
+        },
+        {
+            "id": "sd_tokens", "name": "tokens", "data_source": "tokens_total", "weight": 0.25,
+            "scale": [{"label": "cheap", "operator": "lte", "value": 500, "score": 100}],
+        },
+    ],
+}
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self):
+        super().__init__(base_url="https://example.test", api_key="test-key", agent_id="agent-1")
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _request(self, path_or_method, method_or_path=None, body=None, **kwargs):
+        path = path_or_method if path_or_method.startswith("/") else method_or_path
+        with self._lock:
+            self.calls.append({"path": path, "body": body})
+        if path == "/api/scoring/profiles/sp_1":
+            return PROFILE
+        return {"id": "es_1"}
+
+
+ACTIONS = [
+    {"action_id": "act_1", "duration_ms": 400, "metadata": {"deploy": {"env": "production"}}, "prompt_tokens": 100, "completion_tokens": 50},
+    {"action_id": "act_2", "duration_ms": 3000, "metadata": '{"deploy": {"env": "staging"}}', "prompt_tokens": 800},
+    {"action_id": "act_3", "duration_ms": 12000},
+    {"action_id": "act_4"},
+]
+
+
+class LocalScoringTests(unittest.TestCase):
+    def test_matches_server_scoring_rules(self):
+        batch = LocalScorer(PROFILE, use_numpy=False).score_many(ACTIONS)
+        results = batch["results"]
+
+        self.assertEqual(results[0]["composite_score"], 85)  # 100*.5 + 40*.25 + 100*.25
+        self.assertEqual([d["label"] for d in results[0]["dimensions"]], ["excellent", "prod", "cheap"])
+        # No rule matches 800 tokens, so the lowest score in the scale applies.
+        self.assertEqual(results[1]["dimensions"][2]["label"], "default")
+        self.assertEqual(results[1]["composite_score"], 82.5)
+        # Only the speed dimension has data; weights are renormalised over scored dimensions.
+        self.assertEqual(results[2]["dimensions"][0]["label"], "default")
+        self.assertEqual(results[2]["composite_score"], 10)
+        self.assertIn("error", results[3])
+        self.assertEqual(batch["summary"], {"total": 4, "scored": 3, "avg_score": 59.17})
+
+    def test_composite_methods(self):
+        scores, weights = [100, 40, None], [0.5, 0.5, 1]
+        self.assertEqual(scoring.compute_composite(scores, weights, "minimum"), 40)
+        self.assertEqual(scoring.compute_composite(scores, weights, "geometric_mean"), 63.25)
+        self.assertEqual(scoring.compute_composite([0, 90], weights, "geometric_mean"), 0)
+        self.assertEqual(scoring.compute_composite([None], [1], "weighted_average"), None)
+
+    @unittest.skipUnless(scoring.np is not None, "NumPy not installed")
+    def test_numpy_engine_matches_pure_python(self):
+        actions = [{"action_id": f"a{i}", "duration_ms": i * 37, "prompt_tokens": i % 900} for i in range(2000)]
+        for method in scoring.COMPOSITE_METHODS:
+            profile = {**PROFILE, "composite_method": method}
+            fast = LocalScorer(profile, use_numpy=True).score_many(actions)
+            slow = LocalScorer(profile, use_numpy=False).score_many(actions)
+            self.assertEqual(fast, slow)
+
+    def test_profile_fetched_once_and_results_uploaded_in_bulk(self):
+        client = RecordingDashClaw()
+        first = client.batch_score_with_profile("sp_1", ACTIONS, local=True, upload=True)
+        client.batch_score_with_profile("sp_1", ACTIONS[:1], local=True)
+
+        profile_fetches = [c for c in client.calls if c["path"] == "/api/scoring/profiles/sp_1"]
+        self.assertEqual(len(profile_fetches), 1)
+        self.assertFalse(any(c["path"] == "/api/scoring/score" for c in client.calls))
+
+        uploads = sorted((c["body"] for c in client.calls if c["path"] == "/api/evaluations"), key=lambda b: b["action_id"])
+        self.assertEqual(len(first["uploaded"]), 3)
+        self.assertEqual([u["action_id"] for u in uploads], ["act_1", "act_2", "act_3"])
+        self.assertEqual(uploads[0]["score"], 0.85)
+        self.assertEqual(uploads[0]["scorer_name"], "profile:Ops quality")
+        self.assertEqual(uploads[0]["metadata"]["profile_id"], "sp_1")
+
+    def test_custom_function_dimensions_need_python_equivalent(self):
+        profile = {**PROFILE, "dimensions": [{"name": "custom", "data_source": "custom_function", "weight": 1, "scale": []}]}
+        with self.assertRaises(ValueError):
+            LocalScorer(profile)
+        scorer = LocalScorer(profile, custom_functions={"custom": lambda action: action.get("risk_score")})
+        self.assertEqual(scorer.score({"risk_score": 5})["composite_score"], 50)  # unscaled
+
+
+if __name__ == "__main__":
+    unittest.main()
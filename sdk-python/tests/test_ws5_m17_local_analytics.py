@@ -0,0 +1,127 @@
+import pathlib
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+from dashclaw import analytics  # noqa: E402
+from dashclaw.analytics import ActionFrame, LocalAnalytics  # noqa: E402
+
+NOW = "2026-10-19T12:00:00.000Z"
+
+
+def action(n, day, agent="agent-1", risk=20, status="completed", action_type="deploy", **extra):
+    ts = (datetime(2026, 10, 19, 9) - timedelta(days=day, minutes=-(n % 60))).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    return {
+        "action_id": f"act_{agent}_{n}",
+        "agent_id": agent,
+        "agent_name": agent,
+        "action_type": action_type,
+        "status": status,
+        "risk_score": risk,
+        "confidence": 80,
+        "reversible": 1,
+        "duration_ms": 1000 + n,
+        "cost_estimate": 0.01,
+        "tokens_in": 100,
+        "tokens_out": 50,
+        "timestamp_start": ts,
+        "created_at": ts,
+        **extra,
+    }
+
+
+class PagingDashClaw(DashClaw):
+    def __init__(self, actions):
+        super().__init__(base_url="https://example.test", api_key="test-key", agent_id="agent-1")
+        self.actions = actions
+        self.paths = []
+
+    def _request(self, path, method="GET", body=None):
+        self.paths.append(path)
+        params = dict(p.split("=", 1) for p in path.split("?", 1)[1].split("&"))
+        limit, offset = int(params["limit"]), int(params["offset"])
+        return {"actions": self.actions[offset:offset + limit], "total": len(self.actions)}
+
+
+class LocalAnalyticsTests(unittest.TestCase):
+    def test_episode_scoring_matches_learning_loop(self):
+        self.assertEqual(analytics.score_action_episode(action(1, 0)), {"score": 100, "outcome_label": "success"})
+        failed = action(2, 0, risk=90, status="failed", reversible=0, duration_ms=None, confidence=85)
+        # 50 - 35 (failed) - 15 (risk) - 8 (irreversible) + 6 (null duration is 0ms) + 4 (cost) - 8 (confident failure)
+        self.assertEqual(analytics.score_action_episode(failed), {"score": 0, "outcome_label": "failure"})
+
+    def test_baselines_and_drift_alerts(self):
+        actions = [action(n, day=8 + n % 10, risk=20 + n % 5) for n in range(30)]
+        actions += [action(100 + n, day=1, risk=60) for n in range(4)]
+        local = LocalAnalytics(actions, use_numpy=False, now=NOW)
+
+        baselines = {b["metric"]: b for b in local.compute_baselines(lookback_days=30)["results"]}
+        risk = baselines["risk_score"]
+        self.assertEqual(risk["sample_count"], 34)
+        self.assertEqual((risk["min_val"], risk["max_val"], risk["median"]), (20, 60, 22))
+        self.assertEqual(sum(risk["distribution"].values()), 34)
+        self.assertEqual(risk["distribution"]["56-60"], 4)
+
+        alerts = {a["metric"]: a for a in local.detect_drift(window_days=7)["alerts"]}
+        self.assertNotIn("confidence", alerts)
+        alert = alerts["risk_score"]
+        self.assertEqual((alert["severity"], alert["direction"], alert["current_mean"]), ("warning", "increasing", 60))
+        self.assertIn("Risk Score for agent-1 has increased by", alert["description"])
+        # Riskier actions lose the low-risk bonus, so their episode scores drop too.
+        self.assertEqual(alerts["learning_score"]["direction"], "decreasing")
+
+    def test_learning_velocity_and_curves(self):
+        actions = []
+        for day in range(6):
+            # Early days fail, later days succeed, so scores rise over time.
+            status = "completed" if day < 3 else "failed"
+            actions += [action(i + 60 * day, day=day, status=status, action_type="deploy") for i in range(3)]
+        local = LocalAnalytics(actions, use_numpy=False, now=NOW)
+
+        velocity = local.compute_learning_velocity(lookback_days=30)["results"][0]
+        self.assertEqual((velocity["episode_count"], velocity["windows"]), (18, 6))
+        self.assertGreater(velocity["velocity"], 0)
+        self.assertEqual(velocity["success_rate"], 0.5)
+        self.assertEqual([w["avg_score"] for w in velocity["timeline"]], [26, 26, 26, 100, 100, 100])
+
+        curves = local.compute_learning_curves()["results"]
+        self.assertEqual(len(curves), 1)  # one weekly window
+        self.assertEqual((curves[0]["action_type"], curves[0]["episode_count"]), ("deploy", 18))
+        self.assertEqual((curves[0]["p25_score"], curves[0]["p75_score"]), (26, 100))
+        self.assertEqual(curves[0]["avg_duration_ms"], 1151)
+
+    def test_fetch_pages_and_deduplicates(self):
+        actions = [action(n, day=n % 5) for n in range(450)]
+        client = PagingDashClaw(actions + actions[:10])
+        local = client.local_analytics(agent_id="agent-1", use_numpy=False, now=NOW)
+
+        self.assertEqual(len(local.frame), 450)
+        self.assertEqual(len(client.paths), 3)
+        self.assertIn("agent_id=agent-1", client.paths[0])
+
+    @unittest.skipUnless(analytics.np is not None, "NumPy not installed")
+    def test_numpy_engine_matches_pure_python(self):
+        rng = random.Random(7)
+        actions = [
+            action(
+                n, day=rng.randrange(40), agent=f"agent-{rng.randrange(4)}", risk=rng.randrange(100),
+                status=rng.choice(["completed", "failed", "running"]), action_type=rng.choice(["a", "b", ""]),
+                duration_ms=rng.choice([None, rng.randrange(1, 400000)]), cost_estimate=rng.random() * 3,
+            )
+            for n in range(3000)
+        ]
+        frame = ActionFrame(actions)
+        fast = LocalAnalytics(frame, use_numpy=True, now=NOW)
+        slow = LocalAnalytics(frame, use_numpy=False, now=NOW)
+        for name in ("compute_baselines", "detect_drift", "drift_snapshots",
+                     "compute_learning_velocity", "compute_learning_curves"):
+            self.assertEqual(getattr(fast, name)(), getattr(slow, name)(), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
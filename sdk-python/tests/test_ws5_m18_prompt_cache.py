@@ -0,0 +1,154 @@
+import pathlib
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, DashClawError  # noqa: E402
+from dashclaw.prompts import extract_parameters, render_template  # noqa: E402
+
+
+class ActivationStreamHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b'id: 1\nevent: prompt.version_activated\ndata: {"template_id": "pt_1", "version_id": "pv_1"}\n\n')
+        self.wfile.flush()
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self, batch_supported=True, base_url="https://example.test"):
+        super().__init__(base_url=base_url, api_key="test-key", agent_id="agent-1")
+        self.calls = []
+        self.batch_supported = batch_supported
+        self._lock = threading.Lock()
+        self.versions = [
+            {"id": "pv_1", "template_id": "pt_1", "version": 1, "content": "Hi {{ name }}", "is_active": False},
+            {"id": "pv_2", "template_id": "pt_1", "version": 2, "content": "Hello {{name}}, you are {{ role }}. {{name}}!", "is_active": True},
+        ]
+
+    def _request(self, path, method="GET", body=None):
+        with self._lock:
+            self.calls.append({"path": path, "method": method, "body": body})
+        if path == "/api/prompts/templates/pt_1/versions":
+            return {"versions": [dict(v) for v in self.versions]}
+        if path.startswith("/api/prompts/templates/pt_1/versions/") and method == "POST":
+            version_id = path.rsplit("/", 1)[1]
+            for v in self.versions:
+                v["is_active"] = v["id"] == version_id
+            return {"id": version_id, "message": "Version activated"}
+        if path == "/api/prompts/runs" and not self.batch_supported:
+            raise DashClawError("Method Not Allowed", status=405)
+        return {"run_id": "pr_1"}
+
+    def paths(self, path):
+        return [c for c in self.calls if c["path"] == path]
+
+
+class PromptCacheTests(unittest.TestCase):
+    def test_renderer_matches_server_rules(self):
+        content = "{{ a }} and {{a}} but not {{ b }}; {{c.d}} stays"
+        self.assertEqual(render_template(content, {"a": 1.0, "b": None}), "1 and 1 but not null; {{c.d}} stays")
+        self.assertEqual(render_template("{{x}}", {"x": "$& \\1"}), "$& \\1")
+
+    def test_variables_are_stringified_like_js_string(self):
+        cases = [
+            ([1, "a", [2, [3.0]], None, True], "1,a,2,3,,true"),
+            ({"k": "v"}, "[object Object]"),
+            ([{"k": 1}], "[object Object]"),
+            ([], ""),
+            (0.1, "0.1"),
+            (-0.0, "0"),
+            (1e21, "1e+21"),
+            (1.5e-7, "1.5e-7"),
+            (0.00001, "0.00001"),
+            (1e16, "10000000000000000"),
+            (float("nan"), "NaN"),
+            (float("-inf"), "-Infinity"),
+        ]
+        for value, expected in cases:
+            self.assertEqual(render_template("{{v}}", {"v": value}), expected, msg=repr(value))
+        self.assertEqual(extract_parameters("{{b}} {{ a }} {{b}}"), ["b", "a"])
+
+    def test_active_version_is_fetched_once_and_rendered_locally(self):
+        client = RecordingDashClaw()
+        first = client.render_prompt("pt_1", variables={"name": "Ada", "role": "admin"}, local=True)
+        client.render_prompt("pt_1", variables={"name": "Bob"}, local=True)
+
+        self.assertEqual(first["rendered"], "Hello Ada, you are admin. Ada!")
+        self.assertEqual((first["version_id"], first["version"]), ("pv_2", 2))
+        self.assertEqual(first["parameters"], ["name", "role"])
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(client.paths("/api/prompts/render"), [])
+
+        # Versions listed with the active one are cached by id too.
+        pinned = client.render_prompt(version_id="pv_1", variables={"name": "Cy"}, local=True)
+        self.assertEqual(pinned["rendered"], "Hi Cy")
+        self.assertEqual(len(client.calls), 1)
+
+    def test_activation_and_ttl_invalidate_the_active_version(self):
+        client = RecordingDashClaw()
+        client.render_prompt("pt_1", local=True)
+        client.activate_prompt_version("pt_1", "pv_1")
+        self.assertEqual(client.render_prompt("pt_1", local=True)["version_id"], "pv_1")
+        self.assertEqual(len(client.paths("/api/prompts/templates/pt_1/versions")), 2)
+
+        expiring = RecordingDashClaw()
+        expiring.prompt_cache(ttl=0)
+        expiring.render_prompt("pt_1", local=True)
+        expiring.render_prompt("pt_1", local=True)
+        self.assertEqual(len(expiring.paths("/api/prompts/templates/pt_1/versions")), 2)
+
+    def test_activation_events_from_the_stream_invalidate(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ActivationStreamHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = RecordingDashClaw(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+            cache = client.prompt_cache()
+            client.render_prompt("pt_1", local=True)
+            self.assertIn("pt_1", cache._active)
+
+            cache.start_push(retry_interval=60)
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and "pt_1" in cache._active:
+                time.sleep(0.02)
+            cache.stop_push()
+            self.assertNotIn("pt_1", cache._active)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_recorded_runs_are_batched(self):
+        client = RecordingDashClaw()
+        for name in ("a", "b", "c"):
+            client.render_prompt("pt_1", variables={"name": name}, record=True, agent_id="agent-1", local=True)
+        self.assertTrue(client.flush_prompt_runs(timeout=5))
+
+        batches = client.paths("/api/prompts/runs")
+        self.assertEqual(len(batches), 1)
+        runs = batches[0]["body"]["runs"]
+        self.assertEqual([r["input_vars"]["name"] for r in runs], ["a", "b", "c"])
+        self.assertEqual(runs[0]["rendered"], "Hello a, you are {{ role }}. a!")
+        self.assertEqual(runs[0]["version_id"], "pv_2")
+
+    def test_runs_fall_back_to_render_on_older_servers(self):
+        client = RecordingDashClaw(batch_supported=False)
+        client.render_prompt("pt_1", variables={"name": "a"}, record=True, local=True)
+        client.render_prompt("pt_1", variables={"name": "b"}, record=True, local=True)
+        self.assertTrue(client.flush_prompt_runs(timeout=5))
+
+        renders = client.paths("/api/prompts/render")
+        self.assertEqual([r["body"]["variables"]["name"] for r in renders], ["a", "b"])
+        self.assertTrue(all(r["body"]["record"] and r["body"]["version_id"] == "pv_2" for r in renders))
+
+
+if __name__ == "__main__":
+    unittest.main()
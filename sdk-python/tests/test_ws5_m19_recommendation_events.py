@@ -0,0 +1,76 @@
+import pathlib
+import sys
+import threading
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw  # noqa: E402
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self, **kwargs):
+        super().__init__(base_url="https://example.test", api_key="test-key", agent_id="agent-1", **kwargs)
+        self.calls = []
+        self._lock = threading.Lock()
+        self.recommendation_response = {
+            "recommendations": [{"id": "r1", "confidence": 95, "hints": {"preferred_risk_cap": 40}}]
+        }
+
+    def _request(self, path, method="GET", body=None):
+        with self._lock:
+            self.calls.append({"path": path, "method": method, "body": body})
+        if path.startswith("/api/learning/recommendations?"):
+            return self.recommendation_response
+        if path == "/api/actions" and method == "POST":
+            return {"action_id": "act_1", "action": body or {}}
+        return {"ok": True}
+
+    def event_calls(self):
+        return [c for c in self.calls if c["path"] == "/api/learning/recommendations/events"]
+
+
+class RecommendationEventTests(unittest.TestCase):
+    def test_repeated_events_are_collapsed_with_counts(self):
+        client = RecordingDashClaw(auto_recommend="enforce", recommendation_event_window=60)
+        for _ in range(5):
+            client.create_action(action_type="deploy", declared_goal="Ship", risk_score=90)
+        client.auto_recommend = "warn"
+        for _ in range(2):
+            client.create_action(action_type="deploy", declared_goal="Ship", risk_score=90)
+        self.assertEqual(client.event_calls(), [])
+
+        self.assertTrue(client.flush_recommendation_events(timeout=5))
+        calls = client.event_calls()
+        self.assertEqual(len(calls), 1)
+        events = {e["event_type"]: e for e in calls[0]["body"]["events"]}
+        self.assertEqual(events["applied"]["details"]["count"], 5)
+        self.assertEqual(events["overridden"]["details"]["count"], 2)
+        self.assertEqual(events["overridden"]["details"]["reason"], "warn_mode_no_autoadapt")
+        self.assertEqual(events["applied"]["agent_id"], "agent-1")
+        self.assertIn("created_at", events["applied"])
+
+    def test_distinct_reasons_stay_separate_and_batches_are_capped(self):
+        client = RecordingDashClaw(recommendation_event_window=60)
+        for i in range(150):
+            client._report_recommendation_event({
+                "recommendation_id": f"r{i}", "event_type": "overridden", "details": {"reason": "a"},
+            })
+        client._report_recommendation_event({"recommendation_id": "r0", "event_type": "overridden", "details": {"reason": "b"}})
+        client.flush_recommendation_events(timeout=5)
+
+        sizes = [len(c["body"]["events"]) for c in client.event_calls()]
+        self.assertEqual(sizes, [100, 51])
+
+    def test_zero_window_sends_each_event_immediately(self):
+        client = RecordingDashClaw(auto_recommend="enforce", recommendation_event_window=0)
+        client.create_action(action_type="deploy", declared_goal="Ship", risk_score=90)
+
+        calls = client.event_calls()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]["body"]["event_type"], "applied")
+
+
+if __name__ == "__main__":
+    unittest.main()
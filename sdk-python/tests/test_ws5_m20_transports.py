@@ -0,0 +1,131 @@
+import json
+import os
+import pathlib
+import socketserver
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, DashClawError  # noqa: E402
+from dashclaw.transport import HTTPPoolTransport, InProcessTransport, UnixSocketTransport  # noqa: E402
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self, status, payload, close=False):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if close:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith("/api/missing"):
+            self._reply(404, {"error": "Not found", "details": {"path": self.path}})
+        else:
+            self._reply(200, {"path": self.path, "key": self.headers.get("x-api-key")}, close=self.path.endswith("close"))
+            # Simulates an idle timeout: the client still believes the connection is open.
+            self.close_connection = self.close_connection or self.path.endswith("drop")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply(200, {"received": json.loads(body)})
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("uds", 0)
+
+
+def serve(server):
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TransportTests(unittest.TestCase):
+    def test_in_process_transport_calls_the_handler_directly(self):
+        calls = []
+
+        def handler(method, path, headers, body):
+            calls.append((method, path, headers["x-api-key"], body))
+            if path == "/api/missing":
+                return 404, {"error": "Not found", "details": {"id": 1}}
+            return 200, {"Content-Type": "application/json"}, '{"ok": true}'
+
+        client = DashClaw(base_url="http://localhost", api_key="k", agent_id="a", transport=InProcessTransport(handler))
+        self.assertEqual(client._request("/api/things", "POST", body={"x": 1}), {"ok": True})
+        self.assertEqual(client._request("GET", "/api/things?a=1", params={"b": 2}), {"ok": True})
+        self.assertEqual(calls[0], ("POST", "/api/things", "k", b'{"x": 1}'))
+        self.assertEqual(calls[1][1], "/api/things?a=1&b=2")
+
+        with self.assertRaises(DashClawError) as ctx:
+            client._request("/api/missing")
+        self.assertEqual((str(ctx.exception), ctx.exception.status, ctx.exception.details), ("Not found", 404, {"id": 1}))
+
+    def test_pool_reuses_connections_and_retries_dropped_ones(self):
+        server = serve(ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        transport = HTTPPoolTransport()
+        self.addCleanup(transport.close)
+        client = DashClaw(base_url=f"http://127.0.0.1:{server.server_port}", api_key="k", agent_id="a", transport=transport)
+
+        for i in range(5):
+            self.assertEqual(client._request(f"/api/echo?i={i}")["path"], f"/api/echo?i={i}")
+        self.assertEqual(client._request("/api/echo", "POST", body={"n": 1}), {"received": {"n": 1}})
+        with self.assertRaises(DashClawError) as ctx:
+            client._request("/api/missing")
+        self.assertEqual(ctx.exception.status, 404)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(transport.connections_opened, 1)
+
+        # A response with Connection: close is not pooled.
+        client._request("/api/echo?close")
+        client._request("/api/echo")
+        self.assertEqual(server.connections, 2)
+
+        # An idle connection the server has dropped is replaced transparently.
+        client._request("/api/echo?drop")
+        self.assertEqual(client._request("/api/echo")["key"], "k")
+        self.assertEqual(server.connections, 3)
+        self.assertEqual(transport.connections_opened, 3)
+
+    @unittest.skipUnless(hasattr(socketserver, "ThreadingUnixStreamServer"), "Unix sockets not available")
+    def test_unix_socket_transport(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "dashclaw.sock")
+        server = serve(UnixHTTPServer(socket_path, EchoHandler))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        transport = UnixSocketTransport(socket_path)
+        self.addCleanup(transport.close)
+        client = DashClaw(base_url="http://localhost", api_key="k", agent_id="a", transport=transport)
+
+        self.assertEqual(client._request("/api/echo"), {"path": "/api/echo", "key": "k"})
+        self.assertEqual(client._request("/api/echo", "POST", body=[1, 2]), {"received": [1, 2]})
+        self.assertEqual(server.connections, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+import gzip
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, DashClawError  # noqa: E402
+from dashclaw.sidecar import Sidecar  # noqa: E402
+from dashclaw.transport import InProcessTransport, UnixSocketTransport  # noqa: E402
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """Stand-in dashboard that records every request it receives."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _record(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path, self.headers.get("x-api-key"), body))
+        return body
+
+    def do_GET(self):
+        self._record()
+        if self.path == "/api/stream":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(b'id: 1\nevent: action.created\ndata: {"action_id": "act_1"}\n\n')
+            self.close_connection = True
+        elif self.path.startswith("/api/learning/recommendations"):
+            self._reply(200, {"recommendations": [{"id": "lr_1", "hints": {}}]})
+        elif self.path == "/api/policies":
+            self._reply(200, {"policies": self.server.policies})
+        else:
+            self._reply(404, {"error": "Not found", "details": {"path": self.path}})
+
+    def do_POST(self):
+        body = self._record()
+        if self.path == "/api/guard/decisions":
+            if self.server.record_endpoint:
+                self._reply(201, {"recorded_count": len(body["decisions"])})
+            else:
+                self._reply(404, {"error": "Not found"})
+        elif self.path.startswith("/api/guard"):
+            self._reply(200, {"decision": "allow", "reasons": [], "risk_score": body.get("risk_score")})
+        elif self.path == "/api/learning/recommendations/events":
+            self._reply(201, {"created_count": len(body["events"])})
+        else:
+            self._reply(200, {"status": "ok"})
+
+
+def start_dashboard():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DashboardHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = 0
+    server.record_endpoint = True
+    server.policies = [{"id": "gp_1", "policy_type": "risk_threshold", "rules": '{"threshold": 80}', "active": 1}]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class SidecarTests(unittest.TestCase):
+    def setUp(self):
+        self.dashboard = start_dashboard()
+        self.addCleanup(self.dashboard.server_close)
+        self.addCleanup(self.dashboard.shutdown)
+        self.dashboard_url = f"http://127.0.0.1:{self.dashboard.server_port}"
+
+    def upstream(self, path):
+        return [r for r in self.dashboard.requests if r[1].split("?")[0] == path]
+
+    def test_fleet_over_unix_socket_shares_one_uplink(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "sidecar.sock")
+        sidecar = Sidecar(self.dashboard_url, api_key="fleet-key", socket_path=socket_path, flush_interval=60).start()
+        self.addCleanup(sidecar.stop)
+        transport = UnixSocketTransport(socket_path)
+        self.addCleanup(transport.close)
+
+        agents = [
+            DashClaw(base_url="http://localhost", api_key="fleet-key", agent_id=f"agent-{i}",
+                     transport=transport, recommendation_event_window=0)
+            for i in range(20)
+        ]
+        for claw in agents:
+            self.assertEqual(claw.heartbeat()["status"], "ok")
+            claw.heartbeat(status="busy")
+            self.assertEqual(claw.get_recommendations(action_type="deploy", agent_id="fleet")["recommendations"][0]["id"], "lr_1")
+            decision = claw.guard({"action_type": "deploy", "risk_score": 40, "agent_id": "fleet"})
+            self.assertEqual(decision["decision"], "allow")
+            claw._report_recommendation_event({"recommendation_id": "lr_1", "event_type": "applied", "agent_id": "fleet"})
+        self.assertTrue(sidecar.flush(timeout=5))
+
+        beats = self.upstream("/api/agents/heartbeat")
+        self.assertEqual(len(beats), 1)
+        self.assertEqual(len(beats[0][3]["heartbeats"]), 20)
+        self.assertTrue(all(b["status"] == "busy" for b in beats[0][3]["heartbeats"]))
+        self.assertEqual(beats[0][2], "fleet-key")
+
+        events = self.upstream("/api/learning/recommendations/events")
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][3]["events"][0]["details"]["count"], 20)
+
+        self.assertEqual(len(self.upstream("/api/learning/recommendations")), 1)
+        self.assertEqual(len(self.upstream("/api/policies")), 1)
+        # One guard call answered every agent; the other 19 answers are recorded, not re-evaluated.
+        self.assertEqual(len(self.upstream("/api/guard")), 1)
+        records = self.upstream("/api/guard/decisions")
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0][2], "fleet-key")
+        decisions = records[0][3]["decisions"]
+        self.assertEqual(len(decisions), 19)
+        self.assertTrue(all(d["decision"] == "allow" and d["risk_score"] == 40 and d["agent_id"] == "fleet" for d in decisions))
+        self.assertEqual(sidecar.stats["guard_audits_queued"], 19)
+        self.assertEqual(self.dashboard.connections, 1)
+        self.assertEqual(sidecar.stats["requests"], 100)
+        self.assertEqual(sidecar.stats["upstream_requests"], 6)
+
+    def test_caches_are_cleared_by_writes_and_errors_pass_through(self):
+        sidecar = Sidecar(self.dashboard_url, api_key="k", flush_interval=60)
+        self.addCleanup(sidecar.stop)
+        claw = DashClaw(base_url="http://localhost", api_key="k", agent_id="a", transport=InProcessTransport(sidecar.handle))
+
+        claw.guard({"action_type": "deploy", "risk_score": 40})
+        claw.guard({"risk_score": 40, "action_type": "deploy"})  # same decision, keys reordered
+        claw.guard({"action_type": "deploy", "risk_score": 90})
+        self.assertEqual(len(self.upstream("/api/guard")), 2)
+
+        claw._request("/api/policies", method="POST", body={"name": "p"})
+        claw.guard({"action_type": "deploy", "risk_score": 40})
+        self.assertEqual(len(self.upstream("/api/guard")), 3)
+        self.assertEqual(len([r for r in self.upstream("/api/policies") if r[0] == "GET"]), 2)
+        self.assertTrue(sidecar.flush(timeout=5))
+        self.assertEqual(len(self.upstream("/api/guard")), 3)
+        self.assertEqual(len(self.upstream("/api/guard/decisions")), 1)  # the cache hit, recorded
+
+        with self.assertRaises(DashClawError) as ctx:
+            claw.get_action("act_missing")
+        self.assertEqual((ctx.exception.status, ctx.exception.details), (404, {"path": "/api/actions/act_missing"}))
+
+    def test_cache_hits_are_replayed_when_the_dashboard_cannot_record_them(self):
+        self.dashboard.record_endpoint = False
+        sidecar = Sidecar(self.dashboard_url, flush_interval=60)
+        self.addCleanup(sidecar.stop)
+        claw = DashClaw(base_url="http://localhost", api_key="k", agent_id="a", transport=InProcessTransport(sidecar.handle))
+
+        for _ in range(3):
+            claw.guard({"action_type": "deploy", "risk_score": 40})
+        self.assertTrue(sidecar.flush(timeout=5))
+        self.assertEqual(len(self.upstream("/api/guard/decisions")), 1)
+        self.assertEqual(len(self.upstream("/api/guard")), 3)
+
+        claw.guard({"action_type": "deploy", "risk_score": 40})
+        self.assertTrue(sidecar.flush(timeout=5))
+        self.assertEqual(len(self.upstream("/api/guard/decisions")), 1)  # not retried
+        self.assertEqual(len(self.upstream("/api/guard")), 4)
+
+    def test_stateful_policies_bypass_the_guard_cache(self):
+        self.dashboard.policies.append({"id": "gp_2", "policy_type": "rate_limit", "rules": "{}", "active": 1})
+        self.dashboard.policies.append({"id": "gp_3", "policy_type": "webhook_check", "rules": "{}", "active": 0})
+        sidecar = Sidecar(self.dashboard_url, flush_interval=60)
+        self.addCleanup(sidecar.stop)
+        claw = DashClaw(base_url="http://localhost", api_key="k", agent_id="a", transport=InProcessTransport(sidecar.handle))
+
+        for _ in range(3):
+            claw.guard({"action_type": "deploy", "risk_score": 40})
+        self.assertEqual(len(self.upstream("/api/guard")), 3)
+        self.assertEqual(sidecar.stats["cache_hits"], 2)  # the policy list only
+        self.assertEqual(sidecar.stats["guard_audits_queued"], 0)
+
+    def test_api_key_is_only_injected_when_enabled(self):
+        sidecar = Sidecar(self.dashboard_url, api_key="sidecar-key", flush_interval=60)
+        self.addCleanup(sidecar.stop)
+        response = sidecar.handle("POST", "/api/agents/heartbeat", {}, b'{"agent_id": "a"}')
+        self.assertEqual(response.status, 401)
+        sidecar.handle("GET", "/api/actions/act_1", {}, None).read()
+        self.assertIsNone(self.upstream("/api/actions/act_1")[0][2])
+
+        injecting = Sidecar(self.dashboard_url, api_key="sidecar-key", flush_interval=60, inject_api_key=True)
+        self.addCleanup(injecting.stop)
+        self.assertEqual(injecting.handle("POST", "/api/agents/heartbeat", {}, b'{"agent_id": "a"}').status, 200)
+        injecting.handle("GET", "/api/actions/act_2", {}, None).read()
+        self.assertEqual(self.upstream("/api/actions/act_2")[0][2], "sidecar-key")
+        with self.assertRaises(ValueError):
+            Sidecar(self.dashboard_url, inject_api_key=True)
+
+    def test_event_stream_is_forwarded(self):
+        sidecar = Sidecar(self.dashboard_url, api_key="k", port=0).start()
+        self.addCleanup(sidecar.stop)
+        claw = DashClaw(base_url=sidecar.address, api_key="k", agent_id="a")
+
+        received = threading.Event()
+        stream = claw.events(reconnect=False)
+        stream.on("action.created", lambda action: received.set() if action["action_id"] == "act_1" else None).start()
+        self.addCleanup(stream.close)
+        self.assertTrue(received.wait(5))
+        self.assertEqual(self.upstream("/api/stream")[0][2], "k")
+
+
+if __name__ == "__main__":
+    unittest.main()
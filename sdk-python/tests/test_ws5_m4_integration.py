@@ -1,8 +1,10 @@
 import json
 import pathlib
 import sys
+import threading
 import unittest
 import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 ROOT = pathlib.Path(__file__).resolve().parents[2]
 FIXTURE_PATH = ROOT / "docs" / "sdk-critical-contract-harness.json"
@@ -100,5 +102,50 @@ class WS5M4IntegrationHarnessTests(unittest.TestCase):
         self.assertEqual(set(expected.keys()), seen, msg="fixture and Python case sets differ")
 
 
+class RecordingHandler(BaseHTTPRequestHandler):
+    def _record(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.calls.append({"method": self.command, "path": self.path, "body": body})
+        payload = json.dumps({"ok": True}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = _record
+
+    def log_message(self, *args):
+        pass
+
+
+class WS5M4RequestMethodTests(unittest.TestCase):
+    """Exercises the real _request against a local HTTP server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+        self.server.calls = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = DashClaw(
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+            api_key="test-key",
+            agent_id="agent-1",
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_method_keyword_is_sent(self):
+        self.client.update_outcome("act_1", status="completed")
+        self.client.heartbeat(status="online")
+        self.client.get_action("act_1")
+
+        self.assertEqual(["PATCH", "POST", "GET"], [call["method"] for call in self.server.calls])
+        self.assertEqual("/api/actions/act_1", self.server.calls[0]["path"])
+        self.assertEqual("completed", self.server.calls[0]["body"]["status"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -79,12 +79,13 @@ class AdaptiveLoopPythonTests(unittest.TestCase):
         }
 
         client.create_action(action_type="deploy", declared_goal="Ship", risk_score=70)
+        client.flush_recommendation_events(timeout=5)
         action_call = next(call for call in client.calls if call["path"] == "/api/actions")
         event_call = next(call for call in client.calls if call["path"] == "/api/learning/recommendations/events")
 
         self.assertEqual(action_call["body"]["recommendation_applied"], False)
         self.assertIn("confidence_below_threshold", action_call["body"]["recommendation_override_reason"])
-        self.assertEqual(event_call["body"]["event_type"], "overridden")
+        self.assertEqual(event_call["body"]["events"][0]["event_type"], "overridden")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+import pathlib
+import sys
+import threading
+import unittest
+import warnings
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, DashClawError  # noqa: E402
+from dashclaw.integrations.crewai import DashClawCrewIntegration  # noqa: E402
+from dashclaw.tracing import Tracer  # noqa: E402
+
+
+class RecordingClient:
+    def __init__(self):
+        self.batches = []
+        self.created = []
+
+    def record_actions(self, actions):
+        self.batches.append(list(actions))
+        return [{"action_id": a.get("action_id")} for a in actions]
+
+    def create_action(self, **kwargs):
+        self.created.append(kwargs)
+        return {"action_id": f"act_{len(self.created)}"}
+
+    @property
+    def recorded(self):
+        return [record for batch in self.batches for record in batch]
+
+
+class FakeTool:
+    name = "web_search"
+
+    def run(self, query):
+        return f"results for {query}"
+
+
+class FakeTask:
+    def __init__(self, description):
+        self.description = description
+
+
+class FakeAgent:
+    def __init__(self, role, tools=None):
+        self.role = role
+        self.tools = tools or []
+
+    def execute_task(self, task, context=None, tools=None):
+        for tool in self.tools:
+            tool.run(task.description)
+        if task.description == "explode":
+            raise RuntimeError("boom")
+        return f"{self.role} done: {task.description}"
+
+
+class FakeCrew:
+    name = "research-crew"
+
+    def __init__(self, agents, tasks, parallel=False):
+        self.agents = agents
+        self.tasks = tasks
+        self.parallel = parallel
+
+    def kickoff(self, inputs=None):
+        if not self.parallel:
+            return [self.agents[0].execute_task(task) for task in self.tasks]
+        results = [None] * len(self.tasks)
+
+        def run(index, task):
+            results[index] = self.agents[index % len(self.agents)].execute_task(task)
+
+        threads = [threading.Thread(target=run, args=(i, t)) for i, t in enumerate(self.tasks)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+
+class ExportLog(Tracer):
+    """Tracer that records each export call instead of sending it."""
+
+    def __init__(self):
+        super().__init__(exporters=[])
+        self.exports = []
+
+    def export(self, spans):
+        self.exports.append([span.to_action() for span in spans])
+
+
+class PausingCrew(FakeCrew):
+    """Runs its tasks, then waits for `resume` before kickoff() returns."""
+
+    def __init__(self, agents, tasks, tasks_done, resume):
+        super().__init__(agents, tasks)
+        self.tasks_done = tasks_done
+        self.resume = resume
+
+    def kickoff(self, inputs=None):
+        results = super().kickoff(inputs)
+        self.tasks_done.set()
+        self.resume.wait(timeout=5)
+        return results
+
+
+class BatchServerDashClaw(DashClaw):
+    def __init__(self, batch_supported=True):
+        super().__init__(base_url="https://example.test", api_key="test-key", agent_id="agent-1")
+        self.batch_supported = batch_supported
+        self.requests = []
+
+    def _request(self, path, method="GET", body=None):
+        self.requests.append(body)
+        if "actions" in body:
+            if not self.batch_supported:
+                raise DashClawError("Validation failed", status=400)
+            return {"results": [
+                {"status": 409, "error": "Action with this action_id already exists"} if a["action_id"] == "dup"
+                else {"status": 201, "action_id": a["action_id"]}
+                for a in body["actions"]
+            ]}
+        return {"action_id": body["action_id"]}
+
+
+class CrewAITracingTests(unittest.TestCase):
+    def test_crew_trace_links_crew_task_agent_tool_and_flushes_once(self):
+        client = RecordingClient()
+        integration = DashClawCrewIntegration(client)
+        crew = FakeCrew([FakeAgent("researcher", tools=[FakeTool()])], [FakeTask("a"), FakeTask("b")])
+        integration.instrument_crew(crew)
+
+        crew.kickoff(inputs={"topic": "x"})
+        self.assertTrue(integration.flush(timeout=5))
+
+        self.assertEqual(len(client.batches), 1)
+        records = client.recorded
+        by_id = {r["action_id"]: r for r in records}
+        crew_span = next(r for r in records if r["declared_goal"].startswith("Crew kickoff"))
+        self.assertNotIn("parent_action_id", crew_span)
+        self.assertEqual(records[0]["action_id"], crew_span["action_id"])
+
+        tool_spans = [r for r in records if r["declared_goal"] == "Use Tool: web_search"]
+        self.assertEqual(len(tool_spans), 2)
+        for tool_span in tool_spans:
+            agent_span = by_id[tool_span["parent_action_id"]]
+            task_span = by_id[agent_span["parent_action_id"]]
+            self.assertEqual(agent_span["agent_name"], "researcher")
+            self.assertTrue(task_span["declared_goal"].startswith("Task: "))
+            self.assertEqual(task_span["parent_action_id"], crew_span["action_id"])
+        self.assertTrue(all(r["status"] == "completed" for r in records))
+
+    def test_parallel_tasks_in_threads_link_to_crew_root(self):
+        client = RecordingClient()
+        integration = DashClawCrewIntegration(client)
+        agents = [FakeAgent("a1"), FakeAgent("a2")]
+        crew = FakeCrew(agents, [FakeTask(f"t{i}") for i in range(8)], parallel=True)
+        integration.instrument_crew(crew)
+
+        crew.kickoff()
+        self.assertTrue(integration.flush(timeout=5))
+
+        records = client.recorded
+        crew_id = next(r["action_id"] for r in records if r["declared_goal"].startswith("Crew kickoff"))
+        task_spans = [r for r in records if r["declared_goal"].startswith("Task: ")]
+        self.assertEqual(len(task_spans), 8)
+        self.assertTrue(all(r["parent_action_id"] == crew_id for r in task_spans))
+        self.assertEqual(integration.active_tasks, {})
+
+    def test_failed_task_records_error_and_stream_mode_skips_crew_buffer(self):
+        client = RecordingClient()
+        integration = DashClawCrewIntegration(client, flush_mode="stream")
+        agent = integration.instrument_agent(FakeAgent("worker"))
+
+        with self.assertRaises(RuntimeError):
+            agent.execute_task(FakeTask("explode"))
+        self.assertTrue(integration.flush(timeout=5))
+
+        failed = [r for r in client.recorded if r["status"] == "failed"]
+        self.assertEqual(len(failed), 2)
+        self.assertIn("boom", failed[0]["error_message"])
+
+    def test_task_callback_does_not_duplicate_instrumented_task(self):
+        client = RecordingClient()
+        integration = DashClawCrewIntegration(client, flush_mode="stream")
+        agent = integration.instrument_agent(FakeAgent("worker"))
+
+        output = agent.execute_task(FakeTask("a"))
+        integration.task_callback(output)
+        integration.task_callback("standalone output")
+        self.assertTrue(integration.flush(timeout=5))
+
+        goals = [r["declared_goal"] for r in client.recorded]
+        self.assertEqual(goals.count("CrewAI Task Completed"), 1)
+        self.assertEqual(client.created, [])
+
+    def test_overlapping_kickoffs_hold_and_flush_their_own_traces(self):
+        tracer = ExportLog()
+        integration = DashClawCrewIntegration(RecordingClient(), tracer=tracer)
+        first_done, resume = threading.Event(), threading.Event()
+        slow = integration.instrument_crew(PausingCrew([FakeAgent("slow")], [FakeTask("s")], first_done, resume))
+        fast = integration.instrument_crew(FakeCrew([FakeAgent("fast")], [FakeTask("f")]))
+
+        # The slow crew's task spans finish, then the fast crew runs start to end
+        # before the slow crew's kickoff returns.
+        thread = threading.Thread(target=slow.kickoff)
+        thread.start()
+        self.assertTrue(first_done.wait(timeout=5))
+        fast.kickoff()
+        resume.set()
+        thread.join()
+
+        self.assertEqual(len(tracer.exports), 2)
+        for batch, role in zip(tracer.exports, ["fast", "slow"]):
+            self.assertEqual(len(batch), 3)
+            self.assertEqual(len({r.get("parent_action_id") for r in batch[1:]} - {r["action_id"] for r in batch}), 0)
+            self.assertEqual({r.get("agent_name") for r in batch[1:]}, {role})
+
+    def test_warns_when_batching_options_cannot_apply(self):
+        claw = DashClaw(base_url="https://example.test", api_key="test-key", agent_id="agent-1")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            integration = DashClawCrewIntegration(claw, max_batch=50)
+            DashClawCrewIntegration(claw)
+        self.assertIs(integration.tracer, claw.tracer)
+        self.assertEqual(len(caught), 1)
+        self.assertIn("configure_tracing", str(caught[0].message))
+
+    def test_record_actions_sends_one_request_per_batch(self):
+        claw = BatchServerDashClaw()
+        results = claw.record_actions([{"action_id": f"act_{i}"} for i in range(3)] + [{"action_id": "dup"}])
+
+        self.assertEqual(len(claw.requests), 1)
+        self.assertEqual([r.get("action_id") for r in results], ["act_0", "act_1", "act_2", "dup"])
+        self.assertEqual(results[3]["status"], 409)
+        self.assertIn("error", results[3])
+        self.assertEqual(claw.requests[0]["actions"][0]["agent_id"], "agent-1")
+
+    def test_record_actions_falls_back_to_single_posts_on_older_servers(self):
+        claw = BatchServerDashClaw(batch_supported=False)
+        claw.record_actions([{"action_id": "a"}, {"action_id": "b"}])
+        claw.record_actions([{"action_id": "c"}, {"action_id": "d"}])
+
+        self.assertEqual(len(claw.requests), 1 + 2 + 2)
+        self.assertEqual([body.get("action_id") for body in claw.requests[1:]], ["a", "b", "c", "d"])
+
+    def test_rejects_unknown_flush_mode(self):
+        with self.assertRaises(ValueError):
+            DashClawCrewIntegration(RecordingClient(), flush_mode="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
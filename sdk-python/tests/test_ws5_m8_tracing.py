@@ -0,0 +1,165 @@
+import asyncio
+import gc
+import json
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+import weakref
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw import batching, tracing  # noqa: E402
+from dashclaw.client import DashClaw  # noqa: E402
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self):
+        super().__init__(
+            base_url="https://example.test",
+            api_key="test-key",
+            agent_id="agent-1",
+        )
+        self.calls = []
+        self._calls_lock = threading.Lock()
+
+    def _request(self, path, method="GET", body=None):
+        with self._calls_lock:
+            self.calls.append({"path": path, "method": method, "body": body})
+        if "actions" in (body or {}):
+            return {"results": [{"status": 201, "action_id": a.get("action_id")} for a in body["actions"]]}
+        return {"action_id": (body or {}).get("action_id")}
+
+    def actions(self):
+        bodies = [c["body"] for c in self.calls if c["path"] == "/api/actions"]
+        return [a for body in bodies for a in body.get("actions", [body])]
+
+
+class SpanTracingTests(unittest.TestCase):
+    def test_nested_spans_are_linked_and_batched(self):
+        client = RecordingDashClaw()
+        with client.span("plan", action_type="research") as outer:
+            with client.span("search", action_type="api", systems_touched=["web"]) as inner:
+                inner.set_output("3 hits")
+            self.assertEqual(len(client.calls), 0)
+
+        self.assertTrue(client.flush_spans(timeout=5))
+        self.assertEqual(len(client.calls), 1)
+        by_id = {a["action_id"]: a for a in client.actions()}
+        child = by_id[inner.action_id]
+        self.assertEqual(child["parent_action_id"], outer.action_id)
+        self.assertEqual(child["systems_touched"], ["web"])
+        self.assertEqual(child["output_summary"], "3 hits")
+        self.assertEqual(child["agent_id"], "agent-1")
+        self.assertNotIn("parent_action_id", by_id[outer.action_id])
+        self.assertEqual(inner.trace_id, outer.trace_id)
+        self.assertGreaterEqual(by_id[outer.action_id]["duration_ms"], 0)
+
+    def test_failed_span_records_error_and_reraises(self):
+        client = RecordingDashClaw()
+        with self.assertRaises(ValueError):
+            with client.span("step"):
+                raise ValueError("bad input")
+
+        client.flush_spans(timeout=5)
+        action = client.actions()[0]
+        self.assertEqual(action["status"], "failed")
+        self.assertIn("bad input", action["error_message"])
+
+    def test_context_propagates_to_threads_with_wrap_and_to_asyncio_tasks(self):
+        client = RecordingDashClaw()
+        seen = {}
+
+        def work(key):
+            with client.span(f"thread-{key}") as span:
+                seen[key] = span.parent_action_id
+
+        async def child():
+            with client.span("async-child") as span:
+                return span.parent_action_id
+
+        async def main():
+            with client.span("async-root") as root:
+                parent_id = await asyncio.create_task(child())
+                return root.action_id, parent_id
+
+        with client.span("root") as root:
+            threads = [threading.Thread(target=tracing.wrap(work), args=(i,)) for i in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(set(seen.values()), {root.action_id})
+        async_root_id, async_parent_id = asyncio.run(main())
+        self.assertEqual(async_parent_id, async_root_id)
+
+    def test_otlp_file_export(self):
+        client = RecordingDashClaw()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "spans.jsonl"
+            client.configure_tracing(otlp_file=str(path), export_to_dashclaw=False)
+            with client.span("outer", attributes={"llm.model": "gpt-test"}):
+                with client.span("inner", risk_score=10):
+                    pass
+            client.flush_spans(timeout=5)
+
+            documents = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(client.calls, [])
+        spans = [s for d in documents for s in d["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+        outer = next(s for s in spans if s["name"] == "outer")
+        inner = next(s for s in spans if s["name"] == "inner")
+        self.assertEqual(inner["parentSpanId"], outer["spanId"])
+        self.assertEqual(len(outer["traceId"]), 32)
+        self.assertEqual(len(outer["spanId"]), 16)
+        self.assertGreaterEqual(int(outer["endTimeUnixNano"]), int(outer["startTimeUnixNano"]))
+        attributes = {a["key"]: a["value"] for a in outer["attributes"]}
+        self.assertEqual(attributes["llm.model"], {"stringValue": "gpt-test"})
+        inner_attributes = {a["key"]: a["value"] for a in inner["attributes"]}
+        self.assertEqual(inner_attributes["dashclaw.risk_score"], {"intValue": "10"})
+
+
+class BatchQueueLifetimeTests(unittest.TestCase):
+    def test_drained_queue_stops_its_thread_and_can_be_freed(self):
+        sent = []
+        queue = batching.BatchQueue(sent.extend, flush_interval=0.01)
+        queue.put("a")
+        self.assertTrue(queue.flush(timeout=5))
+        thread = queue._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self.assertIsNone(queue._thread)
+        self.assertEqual(sent, ["a"])
+
+        ref = weakref.ref(queue)
+        del queue
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_idle_queue_restarts_thread_on_next_item(self):
+        sent = []
+        queue = batching.BatchQueue(sent.extend, flush_interval=0.01)
+        queue.put("a")
+        queue.flush(timeout=5)
+        queue.put("b")
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(sent, ["a", "b"])
+        queue.close()
+
+    def test_exit_hook_flushes_open_queues_only(self):
+        sent = []
+        open_queue = batching.BatchQueue(sent.extend, flush_interval=60)
+        closed_queue = batching.BatchQueue(sent.extend, flush_interval=60)
+        closed_queue.close()
+        self.assertNotIn(closed_queue, batching._open_queues)
+
+        open_queue.put("pending")
+        batching._close_open_queues()
+        self.assertEqual(sent, ["pending"])
+        self.assertNotIn(open_queue, batching._open_queues)
+
+
+if __name__ == "__main__":
+    unittest.main()
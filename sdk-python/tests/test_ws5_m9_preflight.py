@@ -0,0 +1,116 @@
+import pathlib
+import sys
+import threading
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "sdk-python"))
+
+from dashclaw.client import DashClaw, GuardBlockedError  # noqa: E402
+
+
+class RecordingDashClaw(DashClaw):
+    def __init__(self, **kwargs):
+        super().__init__(
+            base_url="https://example.test",
+            api_key="test-key",
+            agent_id="agent-1",
+            **kwargs,
+        )
+        self.calls = []
+        self.recommendation_response = {"recommendations": []}
+        self.guard_decider = lambda body: {"decision": "allow", "reasons": [], "warnings": []}
+        self.barrier = None
+
+    def _request(self, path, method="GET", body=None):
+        self.calls.append({"path": path, "method": method, "body": body})
+        if self.barrier and (path.startswith("/api/guard") or path.startswith("/api/learning/recommendations?")):
+            # Both preflight requests must be in flight at once to get past the barrier.
+            self.barrier.wait()
+        if path.startswith("/api/learning/recommendations?"):
+            return self.recommendation_response
+        if path.startswith("/api/guard"):
+            return self.guard_decider(body)
+        if path == "/api/actions" and method == "POST":
+            return {"action_id": "act_1", "action": body or {}}
+        return {"ok": True}
+
+    def guard_calls(self):
+        return [c for c in self.calls if c["path"].startswith("/api/guard")]
+
+
+def recommendation(hints, confidence=90):
+    return {"recommendations": [{"id": "r1", "confidence": confidence, "hints": hints}]}
+
+
+class PreflightPipelineTests(unittest.TestCase):
+    def test_warn_mode_fetches_recommendation_and_guard_concurrently(self):
+        client = RecordingDashClaw(auto_recommend="warn", guard_mode="enforce")
+        client.recommendation_response = recommendation({"preferred_risk_cap": 40})
+        # Drop the barrier once it trips so the later probe call does not wait on it.
+        client.barrier = threading.Barrier(2, action=lambda: setattr(client, "barrier", None), timeout=5)
+
+        client.create_action(action_type="deploy", declared_goal="Ship", risk_score=90)
+
+        self.assertEqual([c["body"]["risk_score"] for c in client.guard_calls()], [90, 40])
+        action_call = next(c for c in client.calls if c["path"] == "/api/actions")
+        self.assertEqual(action_call["body"]["recommendation_applied"], False)
+        self.assertEqual(action_call["body"]["risk_score"], 90)
+
+    def test_enforce_mode_shares_one_decision_when_guard_fields_are_unchanged(self):
+        client = RecordingDashClaw(auto_recommend="enforce", guard_mode="enforce")
+        client.recommendation_response = recommendation({"confidence_floor": 80})
+
+        client.create_action(action_type="deploy", declared_goal="Ship", risk_score=30)
+
+        self.assertEqual(len(client.guard_calls()), 1)
+        action_call = next(c for c in client.calls if c["path"] == "/api/actions")
+        self.assertEqual(action_call["body"]["recommendation_applied"], True)
+        self.assertEqual(action_call["body"]["confidence"], 80)
+
+    def test_enforce_mode_does_not_evaluate_an_action_that_is_replaced(self):
+        client = RecordingDashClaw(auto_recommend="enforce", guard_mode="enforce")
+        client.recommendation_response = recommendation({"preferred_risk_cap": 40})
+
+        client.create_action(action_type="deploy", declared_goal="Ship", risk_score=90)
+
+        # Only the adapted action is sent to /api/guard, so no audit row is written for
+        # the original action that never ran.
+        self.assertEqual([c["body"]["risk_score"] for c in client.guard_calls()], [40])
+        action_call = next(c for c in client.calls if c["path"] == "/api/actions")
+        self.assertEqual(action_call["body"]["risk_score"], 40)
+
+    def test_restrictive_probe_falls_back_to_original_decision_and_enforces(self):
+        client = RecordingDashClaw(auto_recommend="enforce", guard_mode="enforce")
+        client.recommendation_response = recommendation({"preferred_risk_cap": 40})
+        client.guard_decider = lambda body: {"decision": "block", "reasons": ["risky"], "warnings": []}
+
+        with self.assertRaises(GuardBlockedError):
+            client.create_action(action_type="deploy", declared_goal="Ship", risk_score=90)
+
+        self.assertEqual(len(client.guard_calls()), 2)
+        self.assertFalse(any(c["path"] == "/api/actions" for c in client.calls))
+        client.flush_recommendation_events(timeout=5)
+        event = next(c for c in client.calls if c["path"] == "/api/learning/recommendations/events")
+        self.assertEqual(event["body"]["events"][0]["details"]["reason"], "guard_restrictive:block")
+
+    def test_guard_only_makes_a_single_guard_call(self):
+        client = RecordingDashClaw(guard_mode="warn")
+        client.create_action(action_type="deploy", declared_goal="Ship", risk_score=20)
+
+        self.assertEqual(len(client.guard_calls()), 1)
+        self.assertEqual(client.guard_calls()[0]["body"]["agent_id"], "agent-1")
+
+    def test_guard_failure_does_not_block_action(self):
+        client = RecordingDashClaw(auto_recommend="enforce", guard_mode="enforce")
+
+        def failing(body):
+            raise RuntimeError("guard down")
+
+        client.guard_decider = failing
+        res = client.create_action(action_type="deploy", declared_goal="Ship")
+        self.assertEqual(res["action_id"], "act_1")
+
+
+if __name__ == "__main__":
+    unittest.main()